@@ -0,0 +1,159 @@
+import time
+import select
+import socket
+import threading
+
+import wire
+
+# seções do snapshot (além dos processos) replicadas para o agregador
+AGENT_SNAPSHOT_SECTIONS = ("cpu", "memory", "filesystem")
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que monta a mensagem de snapshot completo a partir de um snapshot publicado pelo Controller (snapshot.Snapshot)
+def build_snapshot_message(host_name, snapshot):
+
+    message = {"host": host_name, "version": snapshot.version, "timestamp": snapshot.timestamp}
+    for section_name in AGENT_SNAPSHOT_SECTIONS:
+        message[section_name] = getattr(snapshot, section_name)
+    message["processes"] = snapshot.processes
+    return message
+
+# função que monta a mensagem de delta: seções alteradas, processos novos/alterados e PIDs removidos
+def build_delta_message(host_name, previous_state, snapshot):
+
+    changed_sections = {
+        section_name: getattr(snapshot, section_name)
+        for section_name in AGENT_SNAPSHOT_SECTIONS
+        if getattr(snapshot, section_name) != previous_state["sections"].get(section_name)
+    }
+
+    previous_processes = previous_state["processes"]
+    upserted_processes, current_pids = [], set()
+    for process_info in snapshot.processes:
+        pid = process_info["pid"]
+        current_pids.add(pid)
+        if previous_processes.get(pid) != process_info:
+            upserted_processes.append(process_info)
+
+    return {
+        "host": host_name,
+        "version": snapshot.version,
+        "base_version": previous_state["version"],
+        "timestamp": snapshot.timestamp,
+        "sections": changed_sections,
+        "upsert": upserted_processes,
+        "remove": [pid for pid in previous_processes if pid not in current_pids],
+    }
+
+# função que guarda o estado enviado, usado como base do próximo delta
+def _build_sent_state(snapshot):
+
+    return {
+        "version": snapshot.version,
+        "sections": {section_name: getattr(snapshot, section_name) for section_name in AGENT_SNAPSHOT_SECTIONS},
+        "processes": snapshot.processes_by_pid,
+    }
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# classe do modo agente: envia cada snapshot do Controller ao agregador (completo na conexão, deltas depois)
+class AgentPublisher:
+
+    def __init__(self, controller, aggregator_address, host_name=None, reconnect_delay_seconds=2.0, token=None):
+        self.aggregator_address = aggregator_address
+        self.token = token or None
+        self.host_name = host_name or socket.gethostname()
+        self.reconnect_delay_seconds = reconnect_delay_seconds
+        self.update_interval_seconds = controller.update_interval_seconds
+
+        # apenas o snapshot mais recente fica pendente; se o envio atrasar, snapshots intermediários são descartados
+        self._pending_snapshot = None
+        self._pending_condition = threading.Condition()
+        self._sock = None
+        self._sent_state = None
+        self._thread = None
+
+        # estatísticas simples do envio
+        self.messages_sent = {"snapshot": 0, "delta": 0}
+        self.bytes_sent = 0
+
+        controller.add_snapshot_listener(self._on_snapshot_published)
+
+    # função chamada pelo Controller a cada snapshot publicado
+    def _on_snapshot_published(self, snapshot):
+        with self._pending_condition:
+            self._pending_snapshot = snapshot
+            self._pending_condition.notify()
+
+    # função que inicia a thread de envio
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            print(f"Agente: enviando snapshots de '{self.host_name}' para {self.aggregator_address}")
+            self._thread = threading.Thread(target=self._send_loop, name="so-dashboard-agent", daemon=True)
+            self._thread.start()
+
+    # função que (re)abre a conexão e se apresenta ao agregador
+    def _connect(self):
+        self._sock = wire.connect(self.aggregator_address)
+        self._sock.sendall(wire.encode_frame(wire.MSG_HELLO, {
+            "host": self.host_name,
+            "update_interval_seconds": self.update_interval_seconds,
+            **({"token": self.token} if self.token is not None else {}),
+        }))
+        self._sent_state = None # uma nova conexão sempre começa com um snapshot completo
+
+    def _disconnect(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock, self._sent_state = None, None
+
+    # função que processa mensagens do agregador (pedido de ressincronização) sem bloquear
+    def _drain_aggregator_messages(self):
+        while select.select([self._sock], [], [], 0)[0]:
+            frame = wire.read_frame(self._sock)
+            if frame is None:
+                raise ConnectionError("agregador encerrou a conexão")
+            if frame[0] == wire.MSG_RESYNC:
+                self._sent_state = None
+
+    # função que envia um snapshot: completo se não houver base, caso contrário apenas o delta
+    def _send_snapshot(self, snapshot):
+        if self._sent_state is None:
+            frame = wire.encode_frame(wire.MSG_SNAPSHOT, build_snapshot_message(self.host_name, snapshot))
+            message_kind = "snapshot"
+        else:
+            frame = wire.encode_frame(wire.MSG_DELTA, build_delta_message(self.host_name, self._sent_state, snapshot))
+            message_kind = "delta"
+
+        self._sock.sendall(frame)
+        self._sent_state = _build_sent_state(snapshot)
+        self.messages_sent[message_kind] += 1
+        self.bytes_sent += len(frame)
+
+    # laço da thread de envio
+    def _send_loop(self):
+        while True:
+            with self._pending_condition:
+                while self._pending_snapshot is None:
+                    self._pending_condition.wait()
+                snapshot, self._pending_snapshot = self._pending_snapshot, None
+
+            try:
+                if self._sock is None:
+                    self._connect()
+                self._drain_aggregator_messages()
+                self._send_snapshot(snapshot)
+
+            except (OSError, ConnectionError, wire.WireFormatError) as e_agent_send:
+                print(f"Agente: falha ao enviar para {self.aggregator_address}: {e_agent_send}")
+                self._disconnect()
+
+                # mantém o snapshot para a próxima tentativa, a menos que um mais novo já tenha chegado
+                with self._pending_condition:
+                    if self._pending_snapshot is None:
+                        self._pending_snapshot = snapshot
+                time.sleep(self.reconnect_delay_seconds)
@@ -0,0 +1,308 @@
+import os
+import hmac
+import ipaddress
+import time
+import heapq
+import socket
+import threading
+import socketserver
+
+import wire
+import snapshot
+
+# campos numéricos de processo aceitos na consulta de top-N da frota
+FLEET_TOP_METRICS = ("cpu_percent", "memory_rss_mb", "memory_pss_mb", "threads")
+
+# um host é considerado desatualizado após este número de intervalos sem mensagens
+STALE_HOST_INTERVALS = 3
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# estado replicado de um host: mesmas seções do cache do Controller, com processos indexados por PID
+class HostState:
+
+    def __init__(self, host_name):
+        self.host_name = host_name
+        self.version = 0
+        self.local_version = 0
+        self.timestamp = 0.0
+        self.last_seen = 0.0
+        self.update_interval_seconds = 5
+        self.peer = None
+        self.cpu = {}
+        self.memory = {"ram": {}, "swap": {}}
+        self.filesystem = []
+        self.processes = {}
+        self.process_list = []
+
+    def to_summary(self):
+        now = time.time()
+        return {
+            "host": self.host_name,
+            "version": self.version,
+            "timestamp": self.timestamp,
+            "last_seen": self.last_seen,
+            "stale": (now - self.last_seen) > self.update_interval_seconds * STALE_HOST_INTERVALS,
+            "peer": self.peer,
+            "total_processes": len(self.process_list),
+            "overall_usage_percent": self.cpu.get("overall_usage_percent", 0.0),
+            "ram_usage_percent": self.memory.get("ram", {}).get("usage_percent", 0.0),
+        }
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# visão de um host com a mesma interface de leitura do Controller, usada pelas rotas /api/* com host=
+class HostView:
+
+    def __init__(self, cluster_cache, host_state):
+        self._cluster_cache = cluster_cache
+        self._host_state = host_state
+
+    # versão local (monotônica mesmo se o agente reiniciar), usada pelo cache de respostas pré-codificadas
+    @property
+    def snapshot_version(self):
+        return self._host_state.local_version
+
+    # o agente sempre coleta todos os campos; a demanda dos consumidores não se aplica a hosts remotos
+    def note_demand(self, consumer_name, fields=None):
+        pass
+
+    def get_all_processes_info_from_cache(self):
+        with self._cluster_cache.lock:
+            return list(self._host_state.process_list)
+
+    def get_system_memory_info_from_cache(self):
+        with self._cluster_cache.lock:
+            return dict(self._host_state.memory)
+
+    def get_system_cpu_info_from_cache(self):
+        with self._cluster_cache.lock:
+            return dict(self._host_state.cpu)
+
+    # snapshot montado com as seções do host lidas sob a mesma trava (mesma versão em todas as seções)
+    def get_snapshot(self):
+        with self._cluster_cache.lock:
+            return snapshot.Snapshot(
+                version=self._host_state.local_version,
+                processes=self._host_state.process_list,
+                memory=dict(self._host_state.memory),
+                cpu=dict(self._host_state.cpu),
+                filesystem=self._host_state.filesystem,
+                timestamp=self._host_state.timestamp,
+            )
+
+    def get_specific_process_info_from_cache(self, pid_to_find):
+        with self._cluster_cache.lock:
+            process_info = self._host_state.processes.get(pid_to_find)
+            return dict(process_info) if process_info else None
+
+    def get_filesystem_info_from_cache(self):
+        with self._cluster_cache.lock:
+            return list(self._host_state.filesystem)
+
+    # navegação de diretórios, E/S por processo, agregação por cgroup, a série de alta frequência da CPU e o
+    # histórico de memória dependem do host local e não são replicados
+    def get_cgroups_info_from_cache(self):
+        return None
+
+    def get_collector_status(self):
+        return None
+
+    def get_cpu_history(self, window_seconds, include_cores=False):
+        return None
+
+    def get_memory_history(self, window_seconds):
+        return None
+
+    def get_directory_contents(self, path='/'):
+        return {"path": path, "contents": [], "error": f"Navegação de diretórios indisponível para o host remoto '{self._host_state.host_name}'."}
+
+    def get_directory_usage(self, path='/', start=False):
+        return None
+
+    def cancel_directory_usage(self, path='/'):
+        return None
+
+    def search_files(self, query, limit=50):
+        return None
+
+    def get_process_io_info(self, pid):
+        return {"io_stats": {}, "open_files": []}
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# cache da frota: aplica snapshots e deltas recebidos dos agentes
+class ClusterCache:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hosts = {}
+
+    def _host_state(self, host_name):
+        host_state = self.hosts.get(host_name)
+        if host_state is None:
+            host_state = self.hosts[host_name] = HostState(host_name)
+        return host_state
+
+    # função que registra a apresentação (HELLO) de um agente
+    def register_host(self, host_name, update_interval_seconds, peer):
+        with self.lock:
+            host_state = self._host_state(host_name)
+            host_state.update_interval_seconds = update_interval_seconds or host_state.update_interval_seconds
+            host_state.peer = peer
+            host_state.last_seen = time.time()
+
+    # função que substitui todo o estado do host por um snapshot completo
+    def apply_snapshot(self, message):
+        with self.lock:
+            host_state = self._host_state(message["host"])
+            host_state.cpu = message.get("cpu", {})
+            host_state.memory = message.get("memory", {"ram": {}, "swap": {}})
+            host_state.filesystem = message.get("filesystem", [])
+            host_state.processes = {process_info["pid"]: process_info for process_info in message.get("processes", [])}
+            host_state.process_list = list(host_state.processes.values())
+            host_state.version = message["version"]
+            host_state.local_version += 1
+            host_state.timestamp = message.get("timestamp", 0.0)
+            host_state.last_seen = time.time()
+
+    # função que aplica um delta; retorna False se a versão base não coincidir (o agente deve reenviar tudo)
+    def apply_delta(self, message):
+        with self.lock:
+            host_state = self.hosts.get(message["host"])
+            if host_state is None or host_state.version != message.get("base_version"):
+                return False
+
+            for section_name, section_value in message.get("sections", {}).items():
+                if section_name in ("cpu", "memory", "filesystem"):
+                    setattr(host_state, section_name, section_value)
+            for removed_pid in message.get("remove", []):
+                host_state.processes.pop(removed_pid, None)
+            for process_info in message.get("upsert", []):
+                host_state.processes[process_info["pid"]] = process_info
+
+            host_state.process_list = list(host_state.processes.values())
+            host_state.version = message["version"]
+            host_state.local_version += 1
+            host_state.timestamp = message.get("timestamp", 0.0)
+            host_state.last_seen = time.time()
+            return True
+
+    def host_names(self):
+        with self.lock:
+            return sorted(self.hosts)
+
+    def hosts_summary(self):
+        with self.lock:
+            return [self.hosts[host_name].to_summary() for host_name in sorted(self.hosts)]
+
+    # função que retorna a visão de um host, ou None se ele nunca enviou dados
+    def view(self, host_name):
+        with self.lock:
+            host_state = self.hosts.get(host_name)
+        return HostView(self, host_state) if host_state is not None else None
+
+    # função que retorna os N processos com maior valor da métrica em toda a frota, anotados com o host
+    def fleet_top(self, metric_name="cpu_percent", limit=10):
+        with self.lock:
+            candidates = [(host_name, process_info)
+                          for host_name, host_state in self.hosts.items()
+                          for process_info in host_state.process_list]
+        top_entries = heapq.nlargest(limit, candidates, key=lambda entry: entry[1].get(metric_name, 0) or 0)
+        return [{**process_info, "host": host_name} for host_name, process_info in top_entries]
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# tratador de uma conexão de agente: HELLO seguido de snapshots e deltas
+class _AgentConnectionHandler(socketserver.BaseRequestHandler):
+
+    def handle(self):
+        cluster_cache = self.server.cluster_cache
+        peer = str(self.client_address) if self.client_address else "unix"
+        host_name = None
+
+        try:
+            while True:
+                frame = wire.read_frame(self.request)
+                if frame is None:
+                    break
+                message_type, message = frame
+                if not isinstance(message, dict):
+                    raise wire.WireFormatError("mensagem não é um dicionário")
+
+                if message_type == wire.MSG_HELLO:
+                    # com um token configurado, o agente só é aceito se apresentar o mesmo token (a conexão é encerrada)
+                    if self.server.token is not None and not hmac.compare_digest(str(message.get("token", "")), self.server.token):
+                        print(f"Agregador: conexão de {peer} recusada (token inválido)")
+                        break
+                    host_name = str(message["host"])
+                    cluster_cache.register_host(host_name, message.get("update_interval_seconds"), peer)
+
+                elif host_name is None or message.get("host") != host_name:
+                    print(f"Agregador: mensagem ignorada de {peer} (host não apresentado ou divergente)")
+
+                elif message_type == wire.MSG_SNAPSHOT:
+                    cluster_cache.apply_snapshot(message)
+
+                elif message_type == wire.MSG_DELTA:
+                    # delta sobre uma versão que não temos: pede um snapshot completo
+                    if not cluster_cache.apply_delta(message):
+                        self.request.sendall(wire.encode_frame(wire.MSG_RESYNC, {"host": host_name}))
+
+        # TypeError/AttributeError: mensagem bem codificada, mas com estrutura inesperada (ex: processo que não é dicionário)
+        except (OSError, wire.WireFormatError, KeyError, TypeError, AttributeError) as e_agent_connection:
+            print(f"Agregador: conexão com {host_name or peer} encerrada: {e_agent_connection}")
+
+# função que verifica se o host de escuta só aceita conexões da própria máquina
+def _is_loopback_host(listen_host):
+    try:
+        return ipaddress.ip_address(listen_host).is_loopback
+    except ValueError:
+        return listen_host == "localhost"
+
+# servidores TCP e Unix com uma thread por agente conectado
+class _ThreadingTCPAggregatorServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+class _ThreadingUnixAggregatorServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# classe que escuta conexões de agentes (tcp://host:porta ou unix:///caminho) e alimenta o ClusterCache
+#
+# os agentes se identificam com o token compartilhado no HELLO; sem token, o agregador só escuta em um socket Unix ou
+# em um endereço de loopback, pois qualquer máquina da rede poderia registrar hosts falsos e injetar dados
+class AggregatorServer:
+
+    def __init__(self, listen_address, cluster_cache=None, token=None):
+        self.listen_address = listen_address
+        self.cluster_cache = cluster_cache or ClusterCache()
+        self.token = token or None
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        family, socket_address = wire.parse_address(self.listen_address)
+        if family == socket.AF_UNIX:
+            # remove um socket antigo deixado por uma execução anterior
+            if os.path.exists(socket_address):
+                os.unlink(socket_address)
+            self._server = _ThreadingUnixAggregatorServer(socket_address, _AgentConnectionHandler)
+        else:
+            if self.token is None and not _is_loopback_host(socket_address[0]):
+                raise ValueError(f"O agregador em {self.listen_address} aceitaria agentes de qualquer máquina: "
+                                 "defina SO_DASHBOARD_AGGREGATOR_TOKEN (o mesmo nos agentes) ou escute em 127.0.0.1.")
+            self._server = _ThreadingTCPAggregatorServer(socket_address, _AgentConnectionHandler)
+
+        self._server.cluster_cache = self.cluster_cache
+        self._server.token = self.token
+        self._thread = threading.Thread(target=self._server.serve_forever, name="so-dashboard-aggregator", daemon=True)
+        self._thread.start()
+        print(f"Agregador: aguardando agentes em {self.listen_address}")
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
@@ -0,0 +1,445 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import tracemalloc
+import contextlib
+import multiprocessing
+
+import model
+import cgroups
+import vm_pressure
+import procfs_reader
+import collection_plan
+import procfs_fixture
+import controller
+
+# tolerância padrão (fração) antes de uma métrica ser considerada regressão em relação à linha de base
+DEFAULT_REGRESSION_TOLERANCE = 0.25
+
+# variação absoluta mínima por métrica para evitar falsos positivos em coletores muito rápidos
+MIN_ABSOLUTE_CHANGE = {"wall_mean_ms": 1.0, "syscalls_per_cycle": 2.0, "peak_memory_kb": 64.0}
+
+# contadores de eventos de E/S observados pelo hook de auditoria durante as medições
+_audit_event_counters = {"open": 0, "os.listdir": 0, "os.scandir": 0}
+_audit_hook_installed = False
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que instala (uma única vez) o hook de auditoria que conta aberturas de arquivos e listagens de diretórios
+def _install_audit_hook():
+
+    global _audit_hook_installed
+    if _audit_hook_installed:
+        return
+
+    def _count_audit_event(event_name, _event_args):
+        if event_name in _audit_event_counters:
+            _audit_event_counters[event_name] += 1
+
+    sys.addaudithook(_count_audit_event)
+    _audit_hook_installed = True
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que lê a quantidade de chamadas de sistema de leitura (syscr) feitas pelo próprio processo
+def _read_self_read_syscalls():
+
+    try:
+        with open("/proc/self/io", "r") as self_io_file:
+            for line in self_io_file:
+                if line.startswith("syscr:"):
+                    return int(line.split(":", 1)[1])
+    except (OSError, ValueError):
+        pass
+    return None
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que mede um coletor: tempo de parede, chamadas de sistema por ciclo e pico de memória
+def measure_collector(collector_fn, cycles=5, warmup=1):
+
+    _install_audit_hook()
+
+    # os coletores imprimem mensagens de status; descartamos a saída para não distorcer o tempo medido
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+
+        # ciclos de aquecimento preenchem os snapshots anteriores de CPU, como na operação normal
+        for _ in range(warmup):
+            collector_fn()
+
+        wall_times = []
+        for key in _audit_event_counters:
+            _audit_event_counters[key] = 0
+        read_syscalls_before = _read_self_read_syscalls()
+
+        for _ in range(cycles):
+            started_at = time.perf_counter()
+            collector_fn()
+            wall_times.append(time.perf_counter() - started_at)
+
+        read_syscalls_after = _read_self_read_syscalls()
+        opened = _audit_event_counters["open"]
+        listed = _audit_event_counters["os.listdir"] + _audit_event_counters["os.scandir"]
+
+        # a leitura de /proc/self/io também conta como syscall; o valor é descontado
+        read_syscalls = None
+        if read_syscalls_before is not None and read_syscalls_after is not None:
+            read_syscalls = max(0, read_syscalls_after - read_syscalls_before - 1)
+
+        # o pico de memória é medido em uma execução separada, pois o tracemalloc deixa o coletor mais lento
+        tracemalloc.start()
+        collector_fn()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    wall_times.sort()
+    return {
+        "cycles": cycles,
+        "wall_mean_ms": round(sum(wall_times) / len(wall_times) * 1000, 3),
+        "wall_min_ms": round(wall_times[0] * 1000, 3),
+        "wall_max_ms": round(wall_times[-1] * 1000, 3),
+        "files_opened_per_cycle": round(opened / cycles, 1),
+        "dirs_listed_per_cycle": round(listed / cycles, 1),
+        "read_syscalls_per_cycle": round(read_syscalls / cycles, 1) if read_syscalls is not None else None,
+        "syscalls_per_cycle": round((opened + listed + (read_syscalls or 0)) / cycles, 1),
+        "peak_memory_kb": round(peak_bytes / 1024, 1),
+    }
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que monta a lista de coletores medidos, na mesma ordem em que o Controller os chama
+def build_collector_suite(fs_root):
+
+    return [
+        ("get_processes", model.get_processes),
+        # varredura só de contagens (card de CPU sem outros consumidores): apenas /proc/<pid>/stat
+        ("get_processes_counts_only", lambda: model.get_processes(collection_plan.sources_for_fields(collection_plan.DEFAULT_CONSUMER_FIELDS["cpu"]))),
+        ("get_memory_usage", model.get_memory_usage),
+        ("get_vm_pressure", vm_pressure.get_vm_pressure),
+        ("get_cpu_usage", model.get_cpu_usage),
+        ("get_filesystem_info", model.get_filesystem_info),
+        ("get_directory_contents", lambda: model.get_directory_contents(fs_root)),
+        # usa os PIDs da última varredura de get_processes (executada antes, como no ciclo do Controller)
+        ("get_cgroup_usage", cgroups.get_cgroup_usage),
+    ]
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que executa todos os coletores sobre a fixture configurada e retorna o relatório
+def run_benchmark_suite(paths, cycles=5, warmup=1, only=None):
+
+    model.configure_system_roots(paths["proc_root"], paths["sys_root"], paths["passwd_path"])
+
+    results = {}
+    for collector_name, collector_fn in build_collector_suite(paths["fs_root"]):
+        if only and collector_name not in only:
+            continue
+        results[collector_name] = measure_collector(collector_fn, cycles=cycles, warmup=warmup)
+    return results
+
+# tempo máximo de espera por snapshot em cada modo da medição de partida
+STARTUP_TIMEOUT_SECONDS = 30.0
+
+# função que avança os contadores do /proc/stat da fixture (uso e ócio em todas as linhas "cpu"), simulando um sistema
+# com CPU ocupada, para que uma resposta válida seja reconhecível pelo uso de CPU diferente de zero
+def _tick_fixture_cpu(stat_path, stop_event, tick_seconds=0.01):
+
+    while not stop_event.is_set():
+        with open(stat_path) as stat_file:
+            stat_lines = stat_file.read().splitlines()
+        for line_index, stat_line in enumerate(stat_lines):
+            if stat_line.startswith("cpu"):
+                line_fields = stat_line.split()
+                line_fields[1] = str(int(line_fields[1]) + 1)
+                line_fields[4] = str(int(line_fields[4]) + 1)
+                stat_lines[line_index] = " ".join(line_fields)
+        with open(stat_path + ".tmp", "w") as stat_file:
+            stat_file.write("\n".join(stat_lines) + "\n")
+        os.replace(stat_path + ".tmp", stat_path)
+        stop_event.wait(tick_seconds)
+
+# função executada em um processo separado por modo de partida: inicia o laço real do Controller sobre a fixture e
+# registra quando foi publicado o primeiro snapshot com uso de CPU calculado (diferente de zero) e o primeiro completo
+def _measure_startup_mode(paths, warm_start_enabled, result_queue):
+
+    model.configure_system_roots(paths["proc_root"], paths["sys_root"], paths["passwd_path"])
+
+    # o /proc/stat original da fixture é restaurado ao final
+    stat_path = os.path.join(paths["proc_root"], "stat")
+    with open(stat_path) as stat_file:
+        original_stat_text = stat_file.read()
+    stop_event = threading.Event()
+    tick_thread = threading.Thread(target=_tick_fixture_cpu, args=(stat_path, stop_event), daemon=True)
+    tick_thread.start()
+
+    startup_times, startup_done = {}, threading.Event()
+    started_at = time.perf_counter()
+
+    def _on_snapshot_published(published_snapshot):
+        elapsed_ms = round((time.perf_counter() - started_at) * 1000, 1)
+        if published_snapshot.cpu.get("overall_usage_percent", 0.0) > 0:
+            startup_times.setdefault("first_valid_response_ms", elapsed_ms)
+        if published_snapshot.processes and "pending_sections" not in published_snapshot.extras:
+            startup_times.setdefault("complete_snapshot_ms", elapsed_ms)
+        if len(startup_times) == 2:
+            startup_done.set()
+
+    startup_controller = controller.Controller()
+    startup_controller.warm_start_enabled = warm_start_enabled
+    startup_controller.add_snapshot_listener(_on_snapshot_published)
+    startup_controller.start_periodic_cache_update_thread()
+    startup_done.wait(STARTUP_TIMEOUT_SECONDS)
+    stop_event.set()
+    tick_thread.join()
+    with open(stat_path, "w") as stat_file:
+        stat_file.write(original_stat_text)
+    result_queue.put({"first_valid_response_ms": startup_times.get("first_valid_response_ms"),
+                      "complete_snapshot_ms": startup_times.get("complete_snapshot_ms")})
+
+# função que mede, com e sem a partida rápida do Controller, o tempo até a primeira resposta válida (CPU calculada
+# entre duas leituras de /proc/stat) e até o primeiro snapshot completo (processos e sistemas de arquivos); cada modo
+# roda o laço real do Controller em um processo novo, sem estado de CPU anterior
+def run_startup_benchmark(paths):
+
+    spawn_context = multiprocessing.get_context("spawn")
+    results = {}
+    for startup_mode, warm_start_enabled in (("warm_start", True), ("cold_start", False)):
+        result_queue = spawn_context.Queue()
+        startup_process = spawn_context.Process(target=_measure_startup_mode, args=(paths, warm_start_enabled, result_queue))
+        startup_process.start()
+        results[startup_mode] = result_queue.get(timeout=STARTUP_TIMEOUT_SECONDS + 30)
+        startup_process.join(5)
+        if startup_process.is_alive():
+            startup_process.terminate()
+    return results
+
+def _format_optional_ms(value_ms):
+    return f"{value_ms:.1f}" if value_ms is not None else "timeout"
+
+# função que imprime o resultado da medição de partida
+def print_startup_report(results):
+
+    header = f"{'partida':<14}{'1ª resposta válida ms':>24}{'snapshot completo ms':>24}"
+    print(header)
+    print("-" * len(header))
+    for startup_mode, startup_results in results.items():
+        print(f"{startup_mode:<14}{_format_optional_ms(startup_results['first_valid_response_ms']):>24}"
+              f"{_format_optional_ms(startup_results['complete_snapshot_ms']):>24}")
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# leituras de referência no estilo anterior ao procfs_reader (open() em modo texto, decodificação e split de linhas),
+# usadas apenas pelo microbenchmark para comparar com o leitor binário
+_LEGACY_STATUS_MEMORY_KEYS = frozenset(status_key.decode().rstrip(":") for status_key, _ in model.PROCESS_STATUS_MEMORY_FIELDS)
+
+def _legacy_read_stat(path):
+    with open(path, "r") as stat_file:
+        stat_content = stat_file.read()
+    stat_parts_list = stat_content[stat_content.rfind(")") + 1:].split()
+    return stat_content[stat_content.find("(") + 1:stat_content.rfind(")")], int(stat_parts_list[11]), int(stat_parts_list[19])
+
+def _legacy_read_statm(path):
+    with open(path, "r") as statm_file:
+        return int(statm_file.read().split()[1])
+
+def _legacy_read_status(path):
+    memory_details_kb = {}
+    with open(path, "r") as status_file:
+        for line in status_file:
+            parts_line = line.strip().split(":", 1)
+            if len(parts_line) != 2: continue
+            value_parts = parts_line[1].strip().split()
+            if parts_line[0] in _LEGACY_STATUS_MEMORY_KEYS and value_parts and value_parts[0].isdigit():
+                memory_details_kb[parts_line[0]] = int(value_parts[0])
+    return memory_details_kb
+
+def _legacy_read_io(path):
+    io_stats = {}
+    with open(path, "r") as io_file:
+        for line in io_file:
+            key, value = line.split(":", 1)
+            io_stats[key.strip()] = int(value.strip())
+    return io_stats
+
+def _reader_read_stat(path):
+    comm, stat_fields = procfs_reader.read_stat(path)
+    return comm, int(stat_fields[procfs_reader.STAT_UTIME]), int(stat_fields[procfs_reader.STAT_STARTTIME])
+
+# pares (leitura anterior, leitura com procfs_reader) comparados para cada arquivo de /proc/<pid>
+PROCFS_READER_MICROBENCHMARKS = (
+    ("stat", _legacy_read_stat, _reader_read_stat),
+    ("statm", _legacy_read_statm, procfs_reader.read_statm_rss_pages),
+    ("status", _legacy_read_status, lambda path: procfs_reader.read_kb_fields(path, model.PROCESS_STATUS_MEMORY_FIELDS)),
+    ("io", _legacy_read_io, procfs_reader.read_process_io),
+)
+
+# função que mede o tempo por arquivo (melhor de N rodadas) e o pico de memória de uma passada por todos os PIDs
+def _measure_file_reader(read_fn, paths, rounds):
+
+    best_seconds = None
+    for _ in range(rounds):
+        started_at = time.perf_counter()
+        for path in paths:
+            read_fn(path)
+        elapsed_seconds = time.perf_counter() - started_at
+        best_seconds = elapsed_seconds if best_seconds is None else min(best_seconds, elapsed_seconds)
+
+    # os resultados são mantidos durante a passada, como na varredura real, para que o pico inclua o que é retido
+    tracemalloc.start()
+    retained_results = [read_fn(path) for path in paths]
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del retained_results
+
+    return {"us_per_file": round(best_seconds / len(paths) * 1e6, 2), "peak_memory_kb": round(peak_bytes / 1024, 1)}
+
+# função que compara, arquivo por arquivo, a leitura em modo texto com o procfs_reader sobre os PIDs da fixture
+def run_procfs_reader_microbenchmark(paths, rounds=5):
+
+    pids = [pid_str for pid_str in os.listdir(paths["proc_root"]) if pid_str.isdigit()]
+    results = {}
+    for file_name, legacy_read_fn, reader_read_fn in PROCFS_READER_MICROBENCHMARKS:
+        file_paths = [f"{paths['proc_root']}/{pid_str}/{file_name}" for pid_str in pids]
+        legacy = _measure_file_reader(legacy_read_fn, file_paths, rounds)
+        reader = _measure_file_reader(reader_read_fn, file_paths, rounds)
+        results[file_name] = {
+            "files": len(file_paths),
+            "legacy": legacy,
+            "procfs_reader": reader,
+            "speedup": round(legacy["us_per_file"] / reader["us_per_file"], 2) if reader["us_per_file"] else None,
+        }
+    return results
+
+# função que imprime o resultado do microbenchmark do procfs_reader
+def print_microbenchmark_report(results):
+
+    header = f"{'arquivo':<10}{'arquivos':>10}{'texto µs':>12}{'leitor µs':>12}{'ganho':>8}{'texto KB':>12}{'leitor KB':>12}"
+    print(header)
+    print("-" * len(header))
+    for file_name, file_results in results.items():
+        print(f"{file_name:<10}{file_results['files']:>10}{file_results['legacy']['us_per_file']:>12.2f}"
+              f"{file_results['procfs_reader']['us_per_file']:>12.2f}{file_results['speedup']:>7.2f}x"
+              f"{file_results['legacy']['peak_memory_kb']:>12.1f}{file_results['procfs_reader']['peak_memory_kb']:>12.1f}")
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que compara os resultados com a linha de base e retorna a lista de regressões encontradas
+def compare_with_baseline(results, baseline, tolerance=DEFAULT_REGRESSION_TOLERANCE):
+
+    regressions = []
+    for collector_name, current in results.items():
+        previous = baseline.get("results", {}).get(collector_name)
+        if not previous:
+            continue
+        for metric_name, min_change in MIN_ABSOLUTE_CHANGE.items():
+            previous_value, current_value = previous.get(metric_name), current.get(metric_name)
+            if not previous_value or current_value is None:
+                continue
+            if current_value > previous_value * (1.0 + tolerance) and current_value - previous_value >= min_change:
+                regressions.append({
+                    "collector": collector_name,
+                    "metric": metric_name,
+                    "baseline": previous_value,
+                    "current": current_value,
+                    "change_percent": round((current_value / previous_value - 1.0) * 100.0, 1),
+                })
+    return regressions
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que imprime o relatório em formato de tabela
+def print_report(results):
+
+    header = f"{'coletor':<28}{'média ms':>12}{'máx ms':>12}{'syscalls':>12}{'abertos':>10}{'pico KB':>12}"
+    print(header)
+    print("-" * len(header))
+    for collector_name, metrics in results.items():
+        print(f"{collector_name:<28}{metrics['wall_mean_ms']:>12.2f}{metrics['wall_max_ms']:>12.2f}"
+              f"{metrics['syscalls_per_cycle']:>12.1f}{metrics['files_opened_per_cycle']:>10.1f}{metrics['peak_memory_kb']:>12.1f}")
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Benchmark dos coletores do SO Dashboard sobre uma fixture sintética de /proc.")
+    parser.add_argument("--fixture", help="diretório de uma fixture existente (gerada por procfs_fixture.py)")
+    parser.add_argument("--processes", type=int, default=1000, help="processos da fixture temporária")
+    parser.add_argument("--threads", type=int, default=4, help="threads por processo da fixture temporária")
+    parser.add_argument("--fds", type=int, default=8, help="descritores por processo da fixture temporária")
+    parser.add_argument("--cores", type=int, default=8, help="núcleos da fixture temporária")
+    parser.add_argument("--cycles", type=int, default=5, help="ciclos medidos por coletor")
+    parser.add_argument("--only", nargs="*", help="mede apenas os coletores informados")
+    parser.add_argument("--baseline", help="arquivo JSON da linha de base usado na comparação")
+    parser.add_argument("--save-baseline", action="store_true", help="grava os resultados como nova linha de base")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_REGRESSION_TOLERANCE, help="tolerância de regressão")
+    parser.add_argument("--json", action="store_true", help="imprime o relatório em JSON")
+    parser.add_argument("--procfs-reader", action="store_true",
+                        help="executa apenas o microbenchmark de leitura (modo texto x procfs_reader) por arquivo de /proc/<pid>")
+    parser.add_argument("--startup", action="store_true",
+                        help="mede o tempo até a primeira resposta válida e até o primeiro snapshot completo (com e sem partida rápida)")
+    args = parser.parse_args()
+
+    temporary_dir = None
+    if args.fixture:
+        fixture = procfs_fixture.fixture_paths(args.fixture)
+    else:
+        temporary_dir = tempfile.mkdtemp(prefix="so-dashboard-fixture-")
+        fixture = procfs_fixture.generate_procfs_fixture(temporary_dir, args.processes, args.threads, args.fds, args.cores)
+
+    try:
+        if args.procfs_reader:
+            microbenchmark_results = run_procfs_reader_microbenchmark(fixture, rounds=args.cycles)
+        elif args.startup:
+            startup_results = run_startup_benchmark(fixture)
+        else:
+            benchmark_results = run_benchmark_suite(fixture, cycles=args.cycles, only=args.only)
+    finally:
+        if temporary_dir:
+            shutil.rmtree(temporary_dir, ignore_errors=True)
+
+    if args.procfs_reader:
+        if args.json:
+            print(json.dumps(microbenchmark_results, indent=2))
+        else:
+            print_microbenchmark_report(microbenchmark_results)
+        sys.exit(0)
+
+    if args.startup:
+        if args.json:
+            print(json.dumps(startup_results, indent=2))
+        else:
+            print_startup_report(startup_results)
+        sys.exit(0)
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "fixture": {"processes": args.processes, "threads": args.threads, "fds": args.fds, "cores": args.cores}
+                   if not args.fixture else {"path": os.path.abspath(args.fixture)},
+        "results": benchmark_results,
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(benchmark_results)
+
+    exit_code = 0
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(report, baseline_file, indent=2)
+        print(f"Linha de base gravada em {args.baseline}")
+
+    elif args.baseline:
+        with open(args.baseline, "r") as baseline_file:
+            found_regressions = compare_with_baseline(benchmark_results, json.load(baseline_file), args.tolerance)
+        for regression in found_regressions:
+            print(f"REGRESSÃO {regression['collector']}.{regression['metric']}: "
+                  f"{regression['baseline']} -> {regression['current']} (+{regression['change_percent']}%)")
+        exit_code = 1 if found_regressions else 0
+
+    sys.exit(exit_code)
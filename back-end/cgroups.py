@@ -0,0 +1,188 @@
+import os
+import time
+import heapq
+
+import model
+import metrics
+import procfs_reader
+
+# métricas aceitas pela visão de top-N dos cgroups
+CGROUP_TOP_METRICS = ("cpu_percent", "memory_current_bytes", "io_bytes_per_sec")
+
+# amostras anteriores de cada cgroup (timestamp, usage_usec, rbytes, wbytes), usadas no cálculo das taxas
+previous_cgroup_samples = {}
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que retorna a raiz da hierarquia unificada (v2): /sys/fs/cgroup em hosts v2 puros ou
+# /sys/fs/cgroup/unified em hosts híbridos; None se não houver hierarquia v2 montada
+def _find_cgroup2_root():
+
+    for candidate_root in (f"{model.SYS_ROOT}/fs/cgroup", f"{model.SYS_ROOT}/fs/cgroup/unified"):
+        if os.path.exists(os.path.join(candidate_root, "cgroup.controllers")):
+            return candidate_root
+    return None
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que lê o caminho do cgroup v2 de um processo (linha "0::/caminho" de /proc/<pid>/cgroup), ou None
+def _read_process_cgroup_path(pid):
+
+    try:
+        for line in procfs_reader.read_text(f"{model.PROC_ROOT}/{pid}/cgroup").splitlines():
+            # em hosts híbridos (v1 + v2) apenas a hierarquia unificada tem o identificador 0 e controladores vazios
+            if line.startswith("0::"):
+                return line[3:].strip() or "/"
+    except (FileNotFoundError, PermissionError, OSError):
+        pass
+    return None
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função auxiliar que lê um arquivo de interface do cgroup com um único valor inteiro ("max" e ausência viram None)
+def _read_cgroup_int(cgroup_dir, file_name):
+
+    try:
+        value_str = procfs_reader.read_text(os.path.join(cgroup_dir, file_name)).strip()
+        return int(value_str) if value_str.isdigit() else None
+    except (FileNotFoundError, PermissionError, OSError, ValueError):
+        return None
+
+# função que lê cpu.stat, memory.current, memory.max e io.stat (somado entre os dispositivos) de um cgroup
+def _read_cgroup_stats(cgroup2_root, cgroup_path):
+
+    cgroup_dir = cgroup2_root + (cgroup_path if cgroup_path != "/" else "")
+    stats = {"usage_usec": None, "user_usec": None, "system_usec": None, "rbytes": None, "wbytes": None,
+             "rios": None, "wios": None}
+
+    try:
+        for line in procfs_reader.read_text(os.path.join(cgroup_dir, "cpu.stat")).splitlines():
+            key, _, value_str = line.partition(" ")
+            if key in ("usage_usec", "user_usec", "system_usec"):
+                stats[key] = int(value_str)
+    except (FileNotFoundError, PermissionError, OSError, ValueError):
+        pass
+
+    # cada linha de io.stat é "maj:min rbytes=.. wbytes=.. rios=.. wios=.. dbytes=.. dios=.."
+    try:
+        io_stat_text = procfs_reader.read_text(os.path.join(cgroup_dir, "io.stat"))
+        for key in ("rbytes", "wbytes", "rios", "wios"):
+            stats[key] = 0
+        for line in io_stat_text.splitlines():
+            for pair in line.split()[1:]:
+                key, _, value_str = pair.partition("=")
+                if key in ("rbytes", "wbytes", "rios", "wios"):
+                    stats[key] += int(value_str)
+    except (FileNotFoundError, PermissionError, OSError, ValueError):
+        pass
+
+    stats["memory_current_bytes"] = _read_cgroup_int(cgroup_dir, "memory.current")
+    stats["memory_max_bytes"] = _read_cgroup_int(cgroup_dir, "memory.max")
+    return stats
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que descarta as amostras anteriores (ex: quando a coleta de cgroups fica inativa e as taxas perderiam sentido)
+def reset_rate_samples():
+
+    global previous_cgroup_samples
+    previous_cgroup_samples = {}
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que agrega o uso de recursos por cgroup v2 (contêineres, serviços e sessões do systemd)
+#
+# o cgroup de cada processo é lido de /proc/<pid>/cgroup uma única vez por processo (cache de campos estáticos do
+# model, validado pelo starttime); os totais vêm dos arquivos do próprio cgroup, que já incluem os cgroups filhos.
+# Usa os PIDs da última varredura de get_processes. Um processo movido para outro cgroup mantém o caminho lido
+# quando foi visto pela primeira vez
+@metrics.instrument_collector("get_cgroup_usage")
+def get_cgroup_usage():
+
+    global previous_cgroup_samples
+
+    # sem hierarquia unificada montada, não há o que agregar
+    cgroup2_root = _find_cgroup2_root()
+    if cgroup2_root is None:
+        return {"available": False, "cgroups": ()}
+
+    # contagem de processos diretamente em cada cgroup
+    direct_process_counts = {}
+    for pid in list(model.process_start_times):
+        cgroup_path = model.get_process_static_field(pid, "cgroup", _read_process_cgroup_path)
+        if cgroup_path is not None:
+            direct_process_counts[cgroup_path] = direct_process_counts.get(cgroup_path, 0) + 1
+
+    # a hierarquia inclui os ancestrais de cada cgroup com processos, até a raiz
+    cgroup_paths = set()
+    for cgroup_path in direct_process_counts:
+        while cgroup_path not in cgroup_paths:
+            cgroup_paths.add(cgroup_path)
+            if cgroup_path == "/":
+                break
+            cgroup_path = cgroup_path.rsplit("/", 1)[0] or "/"
+
+    now = time.time()
+    cgroup_nodes, current_samples = [], {}
+    for cgroup_path in sorted(cgroup_paths):
+        stats = _read_cgroup_stats(cgroup2_root, cgroup_path)
+        current_samples[cgroup_path] = (now, stats["usage_usec"], stats["rbytes"], stats["wbytes"])
+
+        # taxas em relação à amostra anterior: CPU em % de um núcleo (mesma escala de cpu_percent dos processos)
+        cpu_percent, io_read_bytes_per_sec, io_write_bytes_per_sec = None, None, None
+        previous_sample = previous_cgroup_samples.get(cgroup_path)
+        if previous_sample is not None and now > previous_sample[0]:
+            delta_seconds = now - previous_sample[0]
+            if stats["usage_usec"] is not None and previous_sample[1] is not None:
+                cpu_percent = round(max(0, stats["usage_usec"] - previous_sample[1]) / (delta_seconds * 1e6) * 100.0, 1)
+            if stats["rbytes"] is not None and previous_sample[2] is not None:
+                io_read_bytes_per_sec = round(max(0, stats["rbytes"] - previous_sample[2]) / delta_seconds, 1)
+                io_write_bytes_per_sec = round(max(0, stats["wbytes"] - previous_sample[3]) / delta_seconds, 1)
+
+        cgroup_nodes.append({
+            "path": cgroup_path,
+            "name": cgroup_path.rsplit("/", 1)[-1] or "/",
+            "parent": None if cgroup_path == "/" else (cgroup_path.rsplit("/", 1)[0] or "/"),
+            "processes": direct_process_counts.get(cgroup_path, 0),
+            "cpu_usage_usec": stats["usage_usec"],
+            "cpu_user_usec": stats["user_usec"],
+            "cpu_system_usec": stats["system_usec"],
+            "cpu_percent": cpu_percent,
+            "memory_current_bytes": stats["memory_current_bytes"],
+            "memory_max_bytes": stats["memory_max_bytes"],
+            "io_read_bytes": stats["rbytes"],
+            "io_write_bytes": stats["wbytes"],
+            "io_read_ops": stats["rios"],
+            "io_write_ops": stats["wios"],
+            "io_read_bytes_per_sec": io_read_bytes_per_sec,
+            "io_write_bytes_per_sec": io_write_bytes_per_sec,
+            "io_bytes_per_sec": None if io_read_bytes_per_sec is None else round(io_read_bytes_per_sec + io_write_bytes_per_sec, 1),
+        })
+
+    previous_cgroup_samples = current_samples
+    return {"available": True, "cgroups": tuple(cgroup_nodes)}
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que monta a árvore de cgroups a partir da lista plana, com o total de processos de cada subárvore
+def build_cgroup_tree(cgroup_nodes):
+
+    tree_nodes = {node["path"]: {**node, "processes_total": node["processes"], "children": []} for node in cgroup_nodes}
+
+    # percorre dos caminhos mais profundos para a raiz, acumulando o total de processos nos pais
+    for cgroup_path in sorted(tree_nodes, key=lambda path: path.count("/"), reverse=True):
+        tree_node = tree_nodes[cgroup_path]
+        parent_node = tree_nodes.get(tree_node["parent"])
+        if parent_node is not None and parent_node is not tree_node:
+            parent_node["children"].append(tree_node)
+            parent_node["processes_total"] += tree_node["processes_total"]
+
+    for tree_node in tree_nodes.values():
+        tree_node["children"].sort(key=lambda child: child["name"])
+    return tree_nodes.get("/")
+
+# função que retorna os N cgroups com processos próprios (serviços, contêineres, sessões) de maior uso na métrica
+def top_cgroups(cgroup_nodes, metric_name="cpu_percent", limit=10):
+
+    candidates = [node for node in cgroup_nodes if node["processes"] > 0 and node["path"] != "/"]
+    return heapq.nlargest(limit, candidates, key=lambda node: node.get(metric_name) or 0)
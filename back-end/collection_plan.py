@@ -0,0 +1,115 @@
+import time
+import threading
+
+# arquivos de /proc/<pid> que a varredura de processos pode ler; "stat" é sempre lido, pois mantém a base do cálculo
+# de CPU por processo e fornece sozinho nome, estado, PPID, threads, prioridade e horário de criação.
+# "smaps_rollup" não é lido pela varredura, e sim pelo amostrador de PSS/USS em segundo plano (pss_sampler.py)
+PROCESS_SOURCES = ("stat", "status", "cmdline", "exe", "statm", "task", "smaps_rollup")
+
+# arquivo de origem de cada campo publicado por processo
+PROCESS_FIELD_SOURCES = {
+    "pid": "stat",
+    "name": "stat",
+    "status": "stat",
+    "ppid": "stat",
+    "threads": "stat",
+    "priority": "stat",
+    "nice": "stat",
+    "cpu_percent": "stat",
+    "create_time_iso": "stat",
+    "user_name": "status",
+    "uid": "status",
+    "memory_details_kb": "status",
+    "command_line": "cmdline",
+    "executable_path": "exe",
+    "memory_rss_mb": "statm",
+    "threads_detailed_info": "task",
+    "memory_pss_mb": "smaps_rollup",
+    "memory_uss_mb": "smaps_rollup",
+    "memory_swap_pss_mb": "smaps_rollup",
+    "memory_pss_sampled_at": "smaps_rollup",
+}
+
+ALL_PROCESS_FIELDS = frozenset(PROCESS_FIELD_SOURCES)
+
+# campos usados por cada consumidor quando não há projeção fields= (o card de CPU só precisa das contagens)
+DEFAULT_CONSUMER_FIELDS = {
+    "cpu": frozenset({"pid", "threads"}),
+    "processes": ALL_PROCESS_FIELDS,
+    "process_detail": ALL_PROCESS_FIELDS,
+    "cgroups": frozenset({"pid"}),
+}
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que converte um parâmetro fields= ("pid,name,cpu_percent") em conjunto de campos; retorna (campos, inválidos)
+def parse_fields_param(fields_param):
+
+    if not fields_param:
+        return None, []
+    requested_fields = {field_name.strip() for field_name in fields_param.split(",") if field_name.strip()}
+    invalid_fields = sorted(requested_fields - ALL_PROCESS_FIELDS)
+    return frozenset(requested_fields | {"pid"}), invalid_fields
+
+# função que retorna os arquivos necessários para produzir um conjunto de campos
+def sources_for_fields(fields):
+
+    return frozenset({"stat"} | {PROCESS_FIELD_SOURCES[field_name] for field_name in fields})
+
+# função que projeta um processo apenas nos campos pedidos
+def project_process(process_info, fields):
+
+    return {field_name: process_info[field_name] for field_name in fields if field_name in process_info}
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# planejador da coleta: os consumidores ativos (rotas requisitadas recentemente e suas projeções fields=)
+# decidem quais arquivos de /proc/<pid> a varredura abre no próximo ciclo
+class CollectionPlanner:
+
+    def __init__(self, demand_window_seconds=15.0):
+        self.demand_window_seconds = demand_window_seconds
+        self._lock = threading.Lock()
+        self._recent_demand = {}
+        self._permanent_demand = {}
+
+    # função que registra o uso de um consumidor; retorna os arquivos que ele exige
+    def note_demand(self, consumer_name, fields=None, now=None):
+        fields = frozenset(fields) if fields is not None else DEFAULT_CONSUMER_FIELDS.get(consumer_name, ALL_PROCESS_FIELDS)
+        now = time.time() if now is None else now
+        with self._lock:
+            self._recent_demand[(consumer_name, fields)] = now
+        return sources_for_fields(fields)
+
+    # função que registra um consumidor sempre ativo (ex: modo agente, que replica todos os campos)
+    def add_permanent_consumer(self, consumer_name, fields=ALL_PROCESS_FIELDS):
+        with self._lock:
+            self._permanent_demand[consumer_name] = frozenset(fields)
+
+    # função que retorna os campos exigidos pelos consumidores ativos; demandas antigas expiram após a janela
+    def active_fields(self, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            for demand_key in [key for key, seen_at in self._recent_demand.items() if now - seen_at > self.demand_window_seconds]:
+                del self._recent_demand[demand_key]
+            active_fields = set().union(*self._permanent_demand.values()) if self._permanent_demand else set()
+            for (_, fields) in self._recent_demand:
+                active_fields |= fields
+        return frozenset(active_fields)
+
+    # função que indica se um consumidor fez requisições dentro da janela (ex: seções opcionais como cgroups)
+    def is_consumer_active(self, consumer_name, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            if consumer_name in self._permanent_demand:
+                return True
+            return any(name == consumer_name and now - seen_at <= self.demand_window_seconds
+                       for (name, _), seen_at in self._recent_demand.items())
+
+    # função que retorna os arquivos que a próxima varredura deve ler (sem consumidores, apenas stat)
+    def required_sources(self, now=None):
+        return sources_for_fields(self.active_fields(now))
+
+    def to_dict(self, now=None):
+        active_fields = self.active_fields(now)
+        return {"active_fields": sorted(active_fields), "sources": sorted(sources_for_fields(active_fields))}
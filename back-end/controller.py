@@ -1,6 +1,32 @@
+import os
 import time
 import model
+import metrics
+import profiler
+import snapshot
 import threading
+import contextlib
+import collections
+import cgroups
+import pss_sampler
+import cpu_sampler
+import vm_pressure
+import disk_usage
+import file_index
+import collection_plan
+import overhead_governor
+from ttl_cache import TTLCache
+
+# pontos mantidos no histórico de memória (um por snapshot publicado: 240 pontos = 20 minutos com ciclos de 5 s)
+MEMORY_HISTORY_POINTS = 240
+
+# partida rápida: publica primeiro um snapshot parcial com CPU e memória, calculados entre duas leituras separadas
+# por este intervalo, e só depois a varredura completa (SO_DASHBOARD_WARM_START=0 volta a começar pela varredura)
+WARM_START_ENABLED = os.environ.get("SO_DASHBOARD_WARM_START", "1").lower() not in ("0", "false", "no")
+WARM_START_SAMPLE_SECONDS = 0.2
+
+# seções que o snapshot parcial da partida rápida ainda não contém (extras["pending_sections"])
+WARM_START_PENDING_SECTIONS = ("processes", "filesystem")
 
 
 # definição da classe Controller, responsável por gerenciar a coleta e o cache de dados do sistema
@@ -9,28 +35,19 @@ class Controller:
     # função construtora da classe Controller
     def __init__(self):
 
+        # horário de criação, base das métricas de tempo até o primeiro snapshot
+        self._created_at = time.perf_counter()
+        self.warm_start_enabled = WARM_START_ENABLED
+
         # intervalo de atualização do cache em segundos
         self.update_interval_seconds = 5
 
-        # criação de uma trava para garantir que os dados do cache não sejam acessados simultaneamente pelas threads
+        # trava que serializa apenas os publicadores de snapshots; os leitores nunca a adquirem
         self.data_cache_lock = threading.Lock()
 
-        # dicionário que armazena os dados do cache - processos, uso de memória e uso de CPU
-        self.current_data_cache = {
-            'processes': [],
-            'memory': {"ram": {}, "swap": {}}, 
-            'cpu': {
-                "overall_usage_percent": 0.0, 
-                "overall_idle_percent": 100.0,
-                "number_of_cores": 0, 
-                "cores": [],
-                "total_processes": 0, 
-                "total_threads": 0
-            },
-            'filesystem': [],
-            'directory': {},
-            'process_io': {}
-        }
+        # snapshot publicado mais recente (processos, uso de memória, uso de CPU e sistema de arquivos);
+        # é trocado por inteiro a cada ciclo, e os leitores usam a referência sem trava e sem cópia
+        self._snapshot = snapshot.EMPTY_SNAPSHOT
 
         # inicialização da thread de atualização periódica do cache como None
         self._update_thread = None
@@ -38,37 +55,260 @@ class Controller:
         # tempo de validade do cache em segundos, apenas para directory e process_io
         self.cache_expiry_seconds = 5  # tempo de validade do cache
 
+        # caches sob demanda, com trava própria, para o conteúdo de diretórios e as informações de E/S por processo;
+        # falhas concorrentes da mesma chave aguardam uma única leitura, e um valor expirado há até mais um intervalo
+        # de validade é respondido enquanto é relido em segundo plano
+        self._directory_cache = TTLCache("directory", self.cache_expiry_seconds, stale_seconds=self.cache_expiry_seconds)
+        self._process_io_cache = TTLCache("process_io", self.cache_expiry_seconds, stale_seconds=self.cache_expiry_seconds)
+
+        # motor de uso de disco recursivo, com as suas próprias threads (iniciadas na primeira varredura pedida)
+        self.disk_usage_engine = disk_usage.DiskUsageEngine()
+
+        # índice de nomes de arquivos dos sistemas de arquivos locais, construído em segundo plano a partir da primeira
+        # busca (SO_DASHBOARD_FILE_INDEX=0 desliga)
+        self.file_index = file_index.FileIndex() if file_index.FILE_INDEX_ENABLED else None
+
+        # funções notificadas a cada snapshot publicado (ex: agente que envia os dados ao agregador)
+        self._snapshot_listeners = []
+
+        # planejador que decide quais arquivos de /proc/<pid> ler, conforme os consumidores ativos (ver collection_plan.py);
+        # uma demanda expira após três intervalos sem requisições
+        self.collection_planner = collection_plan.CollectionPlanner(demand_window_seconds=3 * self.update_interval_seconds)
+
+        # evento que antecipa o próximo ciclo e condição notificada a cada publicação, usados quando um consumidor
+        # pede campos que o snapshot atual não coletou
+        self._refresh_requested = threading.Event()
+        self._published_condition = threading.Condition()
+
+        # regulador do custo da coleta: acima do orçamento (SO_DASHBOARD_OVERHEAD_BUDGET, 2% de um núcleo por padrão)
+        # desliga detalhes opcionais e alonga o intervalo entre ciclos
+        self.overhead_governor = overhead_governor.OverheadGovernor(self.update_interval_seconds)
+
+        # amostrador de PSS/USS (smaps_rollup) em segundo plano, com orçamento de 1% de um núcleo; só trabalha enquanto
+        # algum consumidor ativo exige os campos de PSS e o regulador não desligou esse nível
+        self.pss_sampler = pss_sampler.PssSampler(
+            self.get_snapshot,
+            is_active_fn=lambda: "smaps_rollup" in self._effective_process_sources(),
+            top_refresh_seconds=self.update_interval_seconds)
+
+        # amostrador de CPU de alta frequência (apenas /proc/stat, a cada 250 ms por padrão), ativo enquanto o card de CPU
+        # é consultado; fornece picos de uso e a divisão por categoria (iowait, steal, irq...) entre dois ciclos.
+        # SO_DASHBOARD_CPU_SAMPLER_INTERVAL=0 desliga o amostrador
+        self.cpu_sampler = None
+        if cpu_sampler.DEFAULT_CPU_SAMPLER_INTERVAL > 0:
+            self.cpu_sampler = cpu_sampler.CpuSampler(
+                cpu_sampler.DEFAULT_CPU_SAMPLER_INTERVAL,
+                is_active_fn=lambda: self.collection_planner.is_consumer_active("cpu"))
+
+        # histórico de memória (uso de RAM e swap, paginação, faltas de página e PSI), alimentado a cada snapshot publicado
+        self._memory_history = collections.deque(maxlen=MEMORY_HISTORY_POINTS)
+
+        # tempo máximo que uma requisição aguarda o ciclo antecipado antes de responder com o snapshot atual
+        self.plan_refresh_wait_seconds = 5
+
+        # expõe o intervalo configurado para permitir alertas quando o ciclo de atualização atrasar
+        metrics.UPDATE_INTERVAL_SECONDS.set(self.update_interval_seconds)
+
+    #---------------------------------------------------------------------------------------------------#
+
+    # versão do snapshot publicado, incrementada a cada ciclo de atualização
+    @property
+    def snapshot_version(self):
+        return self._snapshot.version
+
+    # função que retorna o snapshot publicado mais recente (somente leitura)
+    def get_snapshot(self):
+        return self._snapshot
+
+    #---------------------------------------------------------------------------------------------------#
+
+    # função que adquire a trava do cache medindo o tempo de espera, para expor a contenção em /api/metrics
+    @contextlib.contextmanager
+    def _locked_cache(self, operation):
+
+        wait_started_at = time.perf_counter()
+        with self.data_cache_lock:
+            metrics.CACHE_LOCK_WAIT_SECONDS.observe(time.perf_counter() - wait_started_at, operation)
+            yield
+
+    #---------------------------------------------------------------------------------------------------#
+
+    # função que retorna os arquivos por processo pedidos pelos consumidores ativos, menos os desligados pelo regulador
+    def _effective_process_sources(self):
+        return self.collection_planner.required_sources() - self.overhead_governor.disabled_sources()
+
     #---------------------------------------------------------------------------------------------------#
 
     # função interna que atualiza os dados do cache e coleta informações sobre processos, uso de memória e uso de CPU
     def _update_data_cache_internal(self):
-        
+
+        # marca o início do ciclo para medir sua duração total e o tempo de CPU da thread coletora
+        cycle_started_at = time.perf_counter()
+        cycle_cpu_started_at = time.thread_time()
+
+        # arquivos por processo exigidos pelos consumidores ativos neste ciclo (respeitando o nível de degradação)
+        degradation_level = self.overhead_governor.degradation_level
+        process_sources = self._effective_process_sources()
+
         # Colete os dados fora do lock!
-        processes_list_data = model.get_processes()
-        memory_system_data = model.get_memory_usage()
-        cpu_model_raw_data = model.get_cpu_usage()
+        processes_list_data = model.get_processes(process_sources)
+
+        # acrescenta aos processos as últimas amostras de PSS/USS, com o horário de cada amostra
+        if "smaps_rollup" in process_sources:
+            self.pss_sampler.merge_into(processes_list_data)
+        memory_system_data = {**model.get_memory_usage(), "vm_pressure": vm_pressure.get_vm_pressure()}
+        # logo após a partida rápida, a leitura de /proc/stat cobriria só a duração da varredura: o ciclo mantém a amostra
+        # do snapshot parcial, e o próximo ciclo mede a partir dela
+        if "pending_sections" in self._snapshot.extras:
+            cpu_model_raw_data = self._snapshot.cpu
+        else:
+            cpu_model_raw_data = model.get_cpu_usage()
         filesystem_list_data = model.get_filesystem_info()
 
+        # picos e divisão por categoria das amostras de alta frequência desde o ciclo anterior
+        cpu_burst_data = self.cpu_sampler.summary(self.overhead_governor.interval_seconds) if self.cpu_sampler else None
+
+        # seções opcionais, coletadas apenas enquanto algum consumidor as requisita (dependem da varredura de processos)
+        snapshot_extras = {**self._snapshot.extras, "process_sources": process_sources}
+        first_complete_snapshot = snapshot_extras.pop("pending_sections", None) is not None or self._snapshot.version == 0
+        if self.collection_planner.is_consumer_active("cgroups"):
+            snapshot_extras["cgroups"] = cgroups.get_cgroup_usage()
+        else:
+            snapshot_extras.pop("cgroups", None)
+            cgroups.reset_rate_samples()
+
         self._clean_expired_cache() # Limpa o cache de dados expirados
-        # bloqueia o acesso ao cache para garantir que os dados não sejam acessados simultaneamente
-        # Atualiza o cache com os dados coletados
-        with self.data_cache_lock:
-            self.current_data_cache["processes"] = processes_list_data
-            self.current_data_cache["memory"] = memory_system_data
-            self.current_data_cache["cpu"] = {
+
+        # publica o novo snapshot trocando uma única referência
+        self._publish_snapshot(
+            processes=processes_list_data,
+            memory=memory_system_data,
+            cpu={
                 **cpu_model_raw_data,
                 "total_processes": len(processes_list_data),
                 "total_threads": sum(int(p.get("threads", 0)) for p in processes_list_data),
-            }
-            self.current_data_cache["filesystem"] = filesystem_list_data
-        """# atualiza o cache do conteúdo do diretório atual (padrão é '/')
-        self.current_data_cache['process_io'] = {}
-        for proc in processes_list_data:
-            pid = proc['pid']
-            self.current_data_cache['process_io'][pid] = {
-                'io_stats': model.get_process_es_info(pid),
-                'open_files': model.get_process_open_files(pid)
-            }"""
+                "collector_degradation_level": degradation_level,
+                "collector_interval_seconds": self.overhead_governor.interval_seconds,
+                "burst": cpu_burst_data,
+            },
+            filesystem=filesystem_list_data,
+            extras=snapshot_extras,
+        )
+
+        # registra a duração do ciclo e sinaliza quando ele excede o intervalo de atualização
+        cycle_duration_seconds = time.perf_counter() - cycle_started_at
+        self.overhead_governor.record_cycle(time.thread_time() - cycle_cpu_started_at, cycle_duration_seconds)
+        metrics.UPDATE_CYCLE_DURATION_SECONDS.observe(cycle_duration_seconds)
+        metrics.UPDATE_CYCLES_TOTAL.inc()
+        if cycle_duration_seconds > self.update_interval_seconds:
+            metrics.UPDATE_CYCLE_OVERRUNS_TOTAL.inc()
+        metrics.LAST_UPDATE_TIMESTAMP_SECONDS.set(time.time())
+        if first_complete_snapshot:
+            metrics.STARTUP_SECONDS.set(time.perf_counter() - self._created_at, "complete_snapshot")
+
+    # função da partida rápida, executada uma vez antes do primeiro ciclo: lê /proc/stat duas vezes, com
+    # WARM_START_SAMPLE_SECONDS de intervalo, e publica um snapshot parcial com CPU e memória; a leitura dos tempos de CPU
+    # dos processos ocupa esse intervalo e também dá as contagens de processos e threads e a base da primeira varredura
+    # completa, que deixa de publicar 0% de CPU. Processos e sistemas de arquivos chegam no ciclo seguinte
+    def _warm_start(self):
+
+        warm_start_started_at = time.perf_counter()
+        model.get_cpu_usage()
+        total_processes, total_threads = model.prime_process_cpu_times()
+        remaining_seconds = WARM_START_SAMPLE_SECONDS - (time.perf_counter() - warm_start_started_at)
+        if remaining_seconds > 0:
+            time.sleep(remaining_seconds)
+
+        memory_system_data = {**model.get_memory_usage(), "vm_pressure": vm_pressure.get_vm_pressure()}
+        cpu_model_raw_data = model.get_cpu_usage()
+        self._publish_snapshot(
+            memory=memory_system_data,
+            cpu={
+                **cpu_model_raw_data,
+                "total_processes": total_processes,
+                "total_threads": total_threads,
+                "collector_degradation_level": self.overhead_governor.degradation_level,
+                "collector_interval_seconds": self.overhead_governor.interval_seconds,
+                "burst": None,
+            },
+            extras={**self._snapshot.extras, "pending_sections": WARM_START_PENDING_SECTIONS},
+        )
+        metrics.STARTUP_SECONDS.set(time.perf_counter() - self._created_at, "first_snapshot")
+
+    #---------------------------------------------------------------------------------------------------#
+
+    # função que publica um novo snapshot com as seções informadas (as demais são herdadas do snapshot atual);
+    # o timestamp padrão é o horário da publicação
+    def _publish_snapshot(self, **sections):
+
+        # apenas publicadores disputam a trava; a troca da referência é atômica para os leitores
+        with self._locked_cache("publish"):
+            published_snapshot = self._snapshot.replace(**{"version": self._snapshot.version + 1, "timestamp": time.time(), **sections})
+            self._snapshot = published_snapshot
+
+        if "memory" in sections:
+            self._record_memory_history(published_snapshot)
+
+        # acorda as requisições que aguardam um snapshot com as fontes recém-pedidas
+        with self._published_condition:
+            self._published_condition.notify_all()
+
+        # notifica os ouvintes fora da trava; um ouvinte com erro não interrompe o ciclo de atualização
+        for snapshot_listener in list(self._snapshot_listeners):
+            try:
+                snapshot_listener(published_snapshot)
+            except Exception as e_listener:
+                print(f"Erro em ouvinte de snapshot do Controller: {e_listener}")
+
+        return published_snapshot
+
+    #---------------------------------------------------------------------------------------------------#
+
+    # função que acrescenta ao histórico de memória um ponto compacto do snapshot publicado
+    def _record_memory_history(self, published_snapshot):
+
+        memory_data = published_snapshot.memory
+        vm_data = memory_data.get("vm_pressure") or {}
+        rates_per_sec = vm_data.get("rates_per_sec") or {}
+        pressure = vm_data.get("pressure") or {}
+        stall_percent = vm_data.get("pressure_stall_percent") or {}
+
+        def _sum_rates(*rate_names):
+            rate_values = [rates_per_sec[rate_name] for rate_name in rate_names if rates_per_sec.get(rate_name) is not None]
+            return round(sum(rate_values), 2) if rate_values else None
+
+        # no modo replay a publicação pode voltar no tempo (seek ou loop); o histórico recomeça nesse caso
+        if self._memory_history and published_snapshot.timestamp < self._memory_history[-1]["timestamp"]:
+            self._memory_history.clear()
+
+        self._memory_history.append({
+            "timestamp": published_snapshot.timestamp,
+            "ram_usage_percent": memory_data.get("ram", {}).get("usage_percent"),
+            "swap_usage_percent": memory_data.get("swap", {}).get("usage_percent"),
+            "swap_in_pages_per_sec": rates_per_sec.get("swap_in_pages"),
+            "swap_out_pages_per_sec": rates_per_sec.get("swap_out_pages"),
+            "major_faults_per_sec": rates_per_sec.get("major_faults"),
+            "page_scans_per_sec": _sum_rates("page_scans_kswapd", "page_scans_direct"),
+            "oom_kills_per_sec": rates_per_sec.get("oom_kills"),
+            "psi_some_avg10": pressure.get("some", {}).get("avg10"),
+            "psi_full_avg10": pressure.get("full", {}).get("avg10"),
+            "pressure_stall_some_percent": stall_percent.get("some"),
+        })
+
+    # função que retorna os pontos do histórico de memória dentro da janela (em segundos) até o ponto mais recente
+    def get_memory_history(self, window_seconds):
+
+        history_points = list(self._memory_history)
+        if history_points:
+            oldest_timestamp = history_points[-1]["timestamp"] - window_seconds
+            history_points = [history_point for history_point in history_points if history_point["timestamp"] >= oldest_timestamp]
+        return {"window_seconds": window_seconds, "points": history_points}
+
+    #---------------------------------------------------------------------------------------------------#
+
+    # função que registra uma função chamada com cada snapshot publicado (dados tratados como somente leitura)
+    def add_snapshot_listener(self, listener_fn):
+        self._snapshot_listeners.append(listener_fn)
 
     #---------------------------------------------------------------------------------------------------#
 
@@ -81,43 +321,94 @@ class Controller:
             
             # função interna que executa o loop de atualização do cache
             def _cache_update_loop():
+
+                # na partida rápida, o snapshot parcial é publicado antes da primeira varredura completa
+                if self.warm_start_enabled and self._snapshot.version == 0:
+                    try:
+                        self._warm_start()
+                    except Exception as e_warm_start:
+                        print(f"Erro na partida rápida do Controller: {e_warm_start}")
+
                 while True:
                     try:
-                        self._update_data_cache_internal() # chama a função que atualiza os dados do cache
+                        # o ciclo pode ser perfilado sob demanda (ver profiler.py) sem reiniciar o processo
+                        with profiler.PROFILER.profile_iteration("collector"):
+                            self._update_data_cache_internal() # chama a função que atualiza os dados do cache
                     except Exception as e_thread_loop:
                         print(f"Erro crítico na thread de atualização do cache do Controller: {e_thread_loop}")
-                    time.sleep(self.update_interval_seconds) # aguarda 5s antes de atualizar novamente
+                    # aguarda o intervalo (5s, ou mais se o regulador o alongou), ou menos se um consumidor pedir campos
+                    # ainda não coletados
+                    self._refresh_requested.wait(self.overhead_governor.interval_seconds)
+                    self._refresh_requested.clear()
             
             #cria thread como daemon para que ela seja finalizada quando o programa principal for encerrado
             self._update_thread = threading.Thread(target=_cache_update_loop, daemon=True)
             self._update_thread.start()
+
+            # os amostradores de PSS/USS e de CPU rodam em suas próprias threads, fora do ciclo de atualização
+            self.pss_sampler.start()
+            if self.cpu_sampler:
+                self.cpu_sampler.start()
         else:
             print("Controller: Thread de atualização periódica do cache já está em execução.")
 
     #---------------------------------------------------------------------------------------------------#
 
-    # função que limpa o cache de dados expirados, removendo entradas antigas
-    def _clean_expired_cache(self):
+    # função que registra a demanda de um consumidor (rota e projeção fields=) no planejador da coleta
+    #
+    # se o snapshot publicado não leu algum arquivo que o consumidor exige (ou não tem sua seção opcional), antecipa o
+    # próximo ciclo e aguarda sua publicação (até plan_refresh_wait_seconds), para que a primeira requisição já seja completa
+    def note_demand(self, consumer_name, fields=None):
+
+        # fontes desligadas pelo regulador não são esperadas (a requisição responde sem esses detalhes)
+        required_sources = self.collection_planner.note_demand(consumer_name, fields) - self.overhead_governor.disabled_sources()
+
+        # função interna que verifica se o snapshot publicado atende ao consumidor
+        def _snapshot_covers_demand():
+            snapshot_extras = self._snapshot.extras
+            if not required_sources <= snapshot_extras.get("process_sources", frozenset()):
+                return False
+            return consumer_name != "cgroups" or "cgroups" in snapshot_extras
+
+        if _snapshot_covers_demand() or self._update_thread is None or not self._update_thread.is_alive():
+            return
+
+        deadline = time.monotonic() + self.plan_refresh_wait_seconds
+        with self._published_condition:
+            self._refresh_requested.set()
+            while not _snapshot_covers_demand():
+                remaining_seconds = deadline - time.monotonic()
+                if remaining_seconds <= 0:
+                    break
+                self._published_condition.wait(remaining_seconds)
+
+    # função que antecipa o próximo ciclo de coleta (ex: demanda recebida de outro processo pela memória compartilhada)
+    def request_refresh(self):
+        self._refresh_requested.set()
 
-        # obtém o timestamp atual para verificar a validade dos dados no cache
-        now = time.time()
+    #---------------------------------------------------------------------------------------------------#
 
-        # bloqueia o acesso ao cache para garantir que os dados não sejam acessados simultaneamente
-        with self.data_cache_lock:
+    # função que retorna o estado do regulador de custo e do planejador da coleta (rota /api/collector/status)
+    def get_collector_status(self):
+        return {
+            **self.overhead_governor.status(),
+            "snapshot_version": self._snapshot.version,
+            "process_sources": sorted(self._snapshot.extras.get("process_sources", ())),
+            "pending_sections": list(self._snapshot.extras.get("pending_sections", ())),
+            "collection_plan": self.collection_planner.to_dict(),
+        }
 
-            # limpa cache de E/S
-            self.current_data_cache['process_io'] = {
-                pid: data for pid, data in self.current_data_cache['process_io'].items()
-                if (now - data['timestamp']) <= self.cache_expiry_seconds
-            }
+    #---------------------------------------------------------------------------------------------------#
 
-            # limpa cache de diretórios
-            self.current_data_cache['directory'] = {
-                k: v for k, v in self.current_data_cache['directory'].items()
-                if (now - v['timestamp']) <= self.cache_expiry_seconds
-            }
+    # função que limpa o cache de dados expirados, removendo entradas antigas
+    def _clean_expired_cache(self):
 
+        # obtém o timestamp atual para verificar a validade dos dados no cache
+        now = time.time()
 
+        # cada cache remove as entradas expiradas sob sua própria trava, sem substituir o dicionário dos leitores
+        self._process_io_cache.prune_expired(now)
+        self._directory_cache.prune_expired(now)
 
     #---------------------------------------------------------------------------------------------------#
 
@@ -130,45 +421,47 @@ class Controller:
     # função que retorna todas as informações dos processos em execução a partir do cache
     def get_all_processes_info_from_cache(self):
 
-        # bloqueia o acesso ao cache para garantir que os dados não sejam acessados simultaneamente
-        with self.data_cache_lock:
-            return list(self.current_data_cache.get('processes', []))
+        # retorna a tupla do snapshot publicado, sem trava e sem cópia
+        return self._snapshot.processes
 
     #---------------------------------------------------------------------------------------------------#
     
     # função que retorna as informações de uso de memória do sistema a partir do cache
     def get_system_memory_info_from_cache(self):
 
-        # bloqueia o acesso ao cache para garantir que os dados não sejam acessados simultaneamente
-        with self.data_cache_lock:
-            return dict(self.current_data_cache.get('memory', {}))
+        # retorna o dicionário do snapshot publicado, sem trava e sem cópia (somente leitura)
+        return self._snapshot.memory
 
     #---------------------------------------------------------------------------------------------------#
     
     # função que retorna as informações de uso de CPU do sistema a partir do cache
     def get_system_cpu_info_from_cache(self):
 
-        # bloqueia o acesso ao cache para garantir que os dados não sejam acessados simultaneamente
-        with self.data_cache_lock:
-            return dict(self.current_data_cache.get('cpu', {}))
+        # retorna o dicionário do snapshot publicado, sem trava e sem cópia (somente leitura)
+        return self._snapshot.cpu
     
     #---------------------------------------------------------------------------------------------------#
     
     # função que busca informações específicas de um processo com base no PID no cache
     def get_specific_process_info_from_cache(self, pid_to_find):
 
-        # bloqueia o acesso ao cache para garantir que os dados não sejam acessados simultaneamente
-        with self.data_cache_lock:
+        # consulta o índice por PID do snapshot publicado; retorna None se o processo não existir
+        return self._snapshot.processes_by_pid.get(pid_to_find)
+        
 
-            # percorre a lista de processos no cache e retorna os dados do processo com o PID correspondente
-            processes_in_cache = self.current_data_cache.get('processes', [])
+    #---------------------------------------------------------------------------------------------------#
 
-            # se a lista de processos estiver vazia, retorna None
-            for proc_data in processes_in_cache:
-                if proc_data.get('pid') == pid_to_find:
-                    return dict(proc_data)
+    # função que retorna a série recente do amostrador de CPU de alta frequência, ou None se ele estiver desligado
+    def get_cpu_history(self, window_seconds, include_cores=False):
+        if self.cpu_sampler is None:
             return None
-        
+        return self.cpu_sampler.history(window_seconds, include_cores)
+
+    #---------------------------------------------------------------------------------------------------#
+
+    # função que retorna a agregação por cgroup v2 do snapshot publicado ({"available", "cgroups"}), ou None se não coletada
+    def get_cgroups_info_from_cache(self):
+        return self._snapshot.extras.get("cgroups")
 
     #---------------------------------------------------------------------------------------------------#
 
@@ -180,9 +473,8 @@ class Controller:
     # função para obter informações do sistema de arquivos
     def get_filesystem_info_from_cache(self):
 
-        # bloqueia o acesso ao cache para garantir que os dados não sejam acessados simultaneamente
-        with self.data_cache_lock:
-            return list(self.current_data_cache.get('filesystem', []))
+        # retorna a tupla do snapshot publicado, sem trava e sem cópia
+        return self._snapshot.filesystem
         
     #---------------------------------------------------------------------------------------------------#
 
@@ -194,23 +486,36 @@ class Controller:
 
         # cria uma chave de cache única baseada no caminho do diretório
         cache_key = f"dir_{path}"
-        
-        # verifica se os dados estão em cache e ainda são válidos
-        cached_data = self.current_data_cache['directory'].get(cache_key)
-        if cached_data and (now - cached_data['timestamp']) <= self.cache_expiry_seconds:
-            return cached_data['data']
-        
-        # se não houver cache válido, busca novos dados
-        new_dir_data = model.get_directory_contents(path)
-        
-        # atualiza o cache com os novos dados e garante acesso exclusivo para evitar condições de corrida
-        with self.data_cache_lock:
-            self.current_data_cache['directory'][cache_key] = {
-                'data': new_dir_data,
-                'timestamp': now
-            }
-        
-        return new_dir_data
+
+        # retorna os dados em cache se ainda forem válidos; se não, busca novos dados (uma única leitura por chave,
+        # compartilhada pelas requisições concorrentes)
+        return self._directory_cache.get_or_compute(cache_key, lambda: model.get_directory_contents(path), now)
+
+    # função que retorna o uso de disco recursivo de um diretório (parcial enquanto a varredura em segundo plano não
+    # termina); com start=True, inicia a varredura se não houver resultado recente
+    def get_directory_usage(self, path='/', start=False):
+        return self.disk_usage_engine.get_usage(path, start)
+
+    # função que cancela a varredura de uso de disco de um diretório
+    def cancel_directory_usage(self, path='/'):
+        return self.disk_usage_engine.cancel(path)
+
+    # função que busca arquivos e diretórios pelo nome no índice (iniciando-o na primeira busca); retorna os primeiros
+    # resultados e o estado do índice, ou None se o índice estiver desligado
+    def search_files(self, query, limit=50):
+        if self.file_index is None:
+            return None
+        self.file_index.start()
+
+        search_started_at = time.perf_counter()
+        search_results, truncated = self.file_index.search(query, limit)
+        return {
+            "query": query,
+            "results": search_results,
+            "truncated": truncated,
+            "elapsed_ms": round((time.perf_counter() - search_started_at) * 1000, 3),
+            "index": self.file_index.status(),
+        }
         
     #---------------------------------------------------------------------------------------------------#
 
@@ -220,23 +525,17 @@ class Controller:
         # obtém o timestamp atual para verificar a validade do cache
         now = time.time()
     
-        # verifica se os dados estão em cache e ainda são válidos
-        cached_data = self.current_data_cache['process_io'].get(pid)
-        if cached_data and (now - cached_data['timestamp']) <= self.cache_expiry_seconds:
-            return cached_data['data']
-        
-        # se não houver cache válido, busca novos dados
-        io_details = {
-            'io_stats': model.get_process_es_info(pid),
-            'open_files': model.get_process_open_files(pid),
-            'timestamp': now  # armazena o timestamp para controle de validade
-        }
-        
-        # atualiza o cache
-        with self.data_cache_lock:  # garante acesso exclusivo ao cache para evitar condições de corrida
-            self.current_data_cache['process_io'][pid] = {
-                'data': io_details,
-                'timestamp': now
+        # função interna que busca novos dados; a listagem de arquivos abertos é desligada pelo regulador de custo
+        # nos níveis de degradação mais altos
+        def _read_process_io():
+            open_files_enabled = self.overhead_governor.is_feature_enabled("open_files")
+            return {
+                'io_stats': model.get_process_es_info(pid),
+                'open_files': model.get_process_open_files(pid) if open_files_enabled else [],
+                'open_files_disabled': not open_files_enabled,
+                'timestamp': now  # armazena o timestamp para controle de validade
             }
-        
-        return io_details
+
+        # retorna os dados em cache se ainda forem válidos; se não, uma única leitura por PID é compartilhada pelas
+        # requisições concorrentes (ex: vários painéis abrindo o modal de um processo com muitos descritores)
+        return self._process_io_cache.get_or_compute(pid, _read_process_io, now)
@@ -0,0 +1,206 @@
+import os
+import time
+import array
+import bisect
+import operator
+import itertools
+import threading
+import collections
+
+import model
+import metrics
+import procfs_reader
+
+# intervalo padrão entre leituras de /proc/stat, em segundos (SO_DASHBOARD_CPU_SAMPLER_INTERVAL; 0 desliga o amostrador)
+DEFAULT_CPU_SAMPLER_INTERVAL = float(os.environ.get("SO_DASHBOARD_CPU_SAMPLER_INTERVAL", "0.25"))
+
+# categorias de jiffies das linhas "cpu" de /proc/stat, na ordem do kernel
+CPU_JIFFY_CATEGORIES = ("user", "nice", "system", "idle", "iowait", "irq", "softirq", "steal", "guest", "guest_nice")
+
+# guest e guest_nice já estão contidos em user e nice, então ficam fora do total
+CPU_TOTAL_CATEGORIES = 8
+CPU_IDLE_INDEX, CPU_IOWAIT_INDEX = 3, 4
+
+# categorias resumidas nos picos e no histórico (além do uso total)
+CPU_BURST_CATEGORIES = ("iowait", "irq", "softirq", "steal")
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que extrai os contadores de todas as linhas "cpu" (agregada e por núcleo) do conteúdo de /proc/stat no buffer;
+# retorna (linhas, colunas, contadores em um único array) ou None
+def parse_cpu_counters(buffer, length):
+
+    # as linhas "cpu" ficam no início do arquivo; o restante (intr, ctxt...) não é dividido
+    section_end = buffer.find(b"\nintr", 0, length)
+    tokens = buffer[:section_end if section_end >= 0 else length].split()
+    if not tokens or tokens[0] != b"cpu":
+        return None
+
+    # cada linha tem o rótulo seguido do mesmo número de colunas; o rótulo da segunda linha indica quantas são
+    try:
+        columns = tokens.index(b"cpu0", 1) - 1
+    except ValueError:
+        columns = len(tokens) - 1
+    if columns <= CPU_IOWAIT_INDEX or len(tokens) % (columns + 1):
+        return None
+
+    # remove os rótulos e converte todos os contadores de uma vez
+    del tokens[::columns + 1]
+    return len(tokens) // columns, columns, array.array("q", map(int, tokens))
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# amostrador de CPU de alta frequência: lê apenas /proc/stat a cada 100-250 ms, em sua própria thread
+#
+# a cada leitura, os contadores de todas as linhas (agregada e núcleos) viram um único array, e a diferença para a
+# leitura anterior é calculada de uma vez; cada amostra guarda o percentual de todas as categorias por linha
+# (float32) em um anel limitado, de onde saem os picos de uso e o steal/iowait que o ciclo de 5 s não enxerga
+class CpuSampler:
+
+    def __init__(self, interval_seconds=DEFAULT_CPU_SAMPLER_INTERVAL, history_seconds=120.0, is_active_fn=None):
+        self.interval_seconds = max(0.05, interval_seconds)
+        self.history_seconds = history_seconds
+        self.is_active_fn = is_active_fn or (lambda: True)
+
+        self._reader = procfs_reader.ProcfsReader()
+        self._previous_counters = None
+        self._lock = threading.Lock()
+
+        # anel de amostras: (timestamp, linhas, colunas, percentuais por linha e categoria)
+        self._samples = collections.deque(maxlen=max(1, int(history_seconds / self.interval_seconds)))
+        self._thread = None
+
+    # função que inicia a thread do amostrador
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._sample_loop, name="so-dashboard-cpu-sampler", daemon=True)
+            self._thread.start()
+
+    def _sample_loop(self):
+        next_sample_at = time.monotonic()
+        while True:
+            try:
+                if self.is_active_fn():
+                    self.sample()
+                else:
+                    # sem consumidores, a próxima amostra não deve cobrir o período inativo
+                    self._previous_counters = None
+            except Exception as e_cpu_sample:
+                print(f"Erro no amostrador de CPU: {e_cpu_sample}")
+
+            # agenda pelo relógio monotônico para não acumular atraso; se atrasar mais de um intervalo, realinha
+            next_sample_at += self.interval_seconds
+            sleep_seconds = next_sample_at - time.monotonic()
+            if sleep_seconds < 0:
+                next_sample_at, sleep_seconds = time.monotonic(), 0.0
+            time.sleep(sleep_seconds)
+
+    # função que lê /proc/stat e acrescenta uma amostra ao anel (a primeira leitura só define a base)
+    def sample(self):
+
+        cpu_started_at = time.thread_time()
+        parsed_counters = parse_cpu_counters(self._reader.buffer, self._reader.read_into(f"{model.PROC_ROOT}/stat"))
+        if parsed_counters is None:
+            return None
+        rows, columns, counters = parsed_counters
+
+        previous_counters, self._previous_counters = self._previous_counters, parsed_counters
+        if previous_counters is None or previous_counters[:2] != (rows, columns):
+            return None
+
+        # diferença de todos os contadores em uma única passada
+        deltas = array.array("q", map(operator.sub, counters, previous_counters[2]))
+
+        # percentuais por linha: cada linha é escalada pelo seu próprio total (sem guest/guest_nice)
+        percentages = array.array("f")
+        total_columns = min(columns, CPU_TOTAL_CATEGORIES)
+        for row_start in range(0, rows * columns, columns):
+            row_total = sum(deltas[row_start:row_start + total_columns])
+            if row_total > 0:
+                percentages.extend(map(operator.mul, deltas[row_start:row_start + columns], itertools.repeat(100.0 / row_total)))
+            else:
+                # nenhum jiffy contabilizado no intervalo (núcleo desligado ou leituras muito próximas): conta como ocioso
+                percentages.extend(100.0 if column == CPU_IDLE_INDEX else 0.0 for column in range(columns))
+
+        cpu_sample = (time.time(), rows, columns, percentages)
+        with self._lock:
+            self._samples.append(cpu_sample)
+
+        metrics.CPU_SAMPLER_SAMPLES_TOTAL.inc()
+        metrics.CPU_SAMPLER_CPU_SECONDS_TOTAL.inc(time.thread_time() - cpu_started_at)
+        return cpu_sample
+
+    #---------------------------------------------------------------------------------------------------#
+
+    # função que retorna as amostras do anel com timestamp dentro da janela (em segundos) até agora
+    def _samples_in_window(self, window_seconds):
+        with self._lock:
+            samples = list(self._samples)
+        first_index = bisect.bisect_left([cpu_sample[0] for cpu_sample in samples], time.time() - window_seconds)
+        return samples[first_index:]
+
+    # função que resume uma janela: média de todas as categorias e pico de uso da linha agregada, e pico de uso e
+    # média de steal/iowait por núcleo; retorna None se não houver amostras
+    def summary(self, window_seconds):
+
+        samples = self._samples_in_window(window_seconds)
+        if not samples:
+            return None
+        _, rows, columns, _ = samples[-1]
+        samples = [cpu_sample for cpu_sample in samples if cpu_sample[1:3] == (rows, columns)]
+        categories = CPU_JIFFY_CATEGORIES[:columns]
+
+        def _usage(percentages, row_start):
+            return 100.0 - percentages[row_start + CPU_IDLE_INDEX] - percentages[row_start + CPU_IOWAIT_INDEX]
+
+        # linha agregada (primeira linha, "cpu")
+        category_sums = [sum(cpu_sample[3][column] for cpu_sample in samples) for column in range(columns)]
+        aggregate_usages = [_usage(cpu_sample[3], 0) for cpu_sample in samples]
+        peak_breakdown = {category: round(max(cpu_sample[3][categories.index(category)] for cpu_sample in samples), 1)
+                          for category in CPU_BURST_CATEGORIES if category in categories}
+
+        cores_summary = []
+        for core_index in range(rows - 1):
+            row_start = (core_index + 1) * columns
+            core_summary = {
+                "id": core_index,
+                "peak_usage_percent": round(max(0.0, min(100.0, max(_usage(cpu_sample[3], row_start) for cpu_sample in samples))), 1),
+            }
+            for category in ("iowait", "steal"):
+                if category in categories:
+                    category_mean = sum(cpu_sample[3][row_start + categories.index(category)] for cpu_sample in samples) / len(samples)
+                    core_summary[f"{category}_percent"] = round(category_mean, 1)
+            cores_summary.append(core_summary)
+
+        return {
+            "interval_seconds": self.interval_seconds,
+            "window_seconds": window_seconds,
+            "samples": len(samples),
+            "usage_percent": round(max(0.0, min(100.0, sum(aggregate_usages) / len(samples))), 1),
+            "peak_usage_percent": round(max(0.0, min(100.0, max(aggregate_usages))), 1),
+            "breakdown_percent": {category: round(category_sums[column] / len(samples), 1) for column, category in enumerate(categories)},
+            "peak_breakdown_percent": peak_breakdown,
+            "cores": cores_summary,
+        }
+
+    # função que retorna a série da janela para gráficos: uso total e categorias de pico da linha agregada e,
+    # opcionalmente, o uso de cada núcleo
+    def history(self, window_seconds, include_cores=False):
+
+        history_points = []
+        for timestamp, rows, columns, percentages in self._samples_in_window(window_seconds):
+            categories = CPU_JIFFY_CATEGORIES[:columns]
+            history_point = {
+                "timestamp": round(timestamp, 3),
+                "usage_percent": round(max(0.0, 100.0 - percentages[CPU_IDLE_INDEX] - percentages[CPU_IOWAIT_INDEX]), 1),
+            }
+            for category in CPU_BURST_CATEGORIES:
+                if category in categories:
+                    history_point[f"{category}_percent"] = round(percentages[categories.index(category)], 1)
+            if include_cores:
+                history_point["cores_usage_percent"] = [
+                    round(max(0.0, 100.0 - percentages[row_start + CPU_IDLE_INDEX] - percentages[row_start + CPU_IOWAIT_INDEX]), 1)
+                    for row_start in range(columns, rows * columns, columns)]
+            history_points.append(history_point)
+
+        return {"interval_seconds": self.interval_seconds, "window_seconds": window_seconds, "samples": history_points}
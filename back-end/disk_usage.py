@@ -0,0 +1,315 @@
+import os
+import time
+import queue
+import threading
+
+import metrics
+
+# número de threads que percorrem os diretórios (SO_DASHBOARD_DISK_USAGE_WORKERS)
+DEFAULT_DISK_USAGE_WORKERS = int(os.environ.get("SO_DASHBOARD_DISK_USAGE_WORKERS", "4"))
+
+# uma varredura concluída há menos que isso é reaproveitada; depois, pedir o uso do diretório inicia uma nova varredura
+# (incremental: diretórios com o mesmo mtime não são listados de novo)
+RESCAN_AFTER_SECONDS = 60.0
+
+# mesmo com o mtime inalterado, a listagem em cache de um diretório é refeita após esse tempo, já que arquivos podem
+# crescer sem alterar o mtime do diretório que os contém
+DIRECTORY_ENTRY_MAX_AGE_SECONDS = 600.0
+
+# limites de memória: diretórios com listagem em cache e varreduras concluídas mantidas para consulta
+MAX_CACHED_DIRECTORIES = 500_000
+MAX_FINISHED_SCANS = 32
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# varredura de uma subárvore: progresso, tamanhos parciais por subdiretório imediato e estado (running/done/cancelled)
+class DiskUsageScan:
+
+    def __init__(self, root_path, root_device):
+        self.root_path = root_path
+        self.root_device = root_device
+        self.state = "running"
+        self.started_at = time.time()
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+
+        self.lock = threading.Lock()
+        self.pending_directories = 1
+        self.directories_scanned = 0
+        self.directories_reused = 0
+        self.files_counted = 0
+        self.skipped_mounts = 0
+        self.errors = 0
+
+        # bytes em disco (blocos alocados) e tamanho aparente: de cada diretório visitado (arquivos diretos + o próprio
+        # diretório) e acumulados por subdiretório imediato da raiz, para os tamanhos parciais
+        self.directory_usage = {}
+        self.children_usage = {}
+        self.root_usage = [0, 0]
+
+        # inodes com mais de um hard link já contados nesta varredura
+        self.seen_inodes = set()
+
+    # função que retorna o estado da varredura para a API
+    def to_dict(self):
+        with self.lock:
+            finished_at = self.finished_at
+            return {
+                "path": self.root_path,
+                "state": self.state,
+                "total_bytes": self.root_usage[0] + sum(usage[0] for usage in self.children_usage.values()),
+                "apparent_bytes": self.root_usage[1] + sum(usage[1] for usage in self.children_usage.values()),
+                "children": {name: {"bytes": usage[0], "apparent_bytes": usage[1]} for name, usage in self.children_usage.items()},
+                "progress": {
+                    "directories_scanned": self.directories_scanned,
+                    "directories_reused": self.directories_reused,
+                    "files_counted": self.files_counted,
+                    "pending_directories": self.pending_directories,
+                    "skipped_mounts": self.skipped_mounts,
+                    "errors": self.errors,
+                    "started_at": self.started_at,
+                    "finished_at": finished_at,
+                    "elapsed_seconds": round((finished_at or time.time()) - self.started_at, 3),
+                },
+            }
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# motor de uso de disco em segundo plano: calcula o tamanho recursivo de diretórios sem bloquear a API
+#
+# cada diretório é uma tarefa em uma fila compartilhada por um grupo de threads (os.scandir libera o GIL durante as
+# chamadas de sistema); cada tarefa lista o diretório, soma os blocos dos arquivos e enfileira os subdiretórios. A fila
+# é LIFO (busca em profundidade), o que mantém a fronteira pequena em árvores largas. A varredura não atravessa pontos
+# de montagem (como du -x) nem segue links simbólicos, e arquivos com vários hard links são contados uma única vez.
+#
+# a listagem de cada diretório fica em cache com o seu mtime: uma nova varredura só lista de novo os diretórios
+# alterados (nos demais, faz apenas um lstat). Ao final, o total de cada diretório visitado também fica em cache,
+# então navegar para um subdiretório já varrido responde sem nova varredura
+class DiskUsageEngine:
+
+    def __init__(self, worker_count=DEFAULT_DISK_USAGE_WORKERS, rescan_after_seconds=RESCAN_AFTER_SECONDS):
+        self.worker_count = max(1, worker_count)
+        self.rescan_after_seconds = rescan_after_seconds
+
+        self._tasks = queue.LifoQueue()
+        self._workers = []
+        self._lock = threading.Lock()
+
+        # varreduras por diretório raiz (inclui as concluídas, até MAX_FINISHED_SCANS)
+        self._scans = {}
+
+        # listagem em cache por diretório: (mtime_ns, horário da listagem, bytes em disco dos arquivos, tamanho aparente
+        # dos arquivos, quantidade de arquivos, hard links como (dispositivo, inode, bytes, aparente), subdiretórios)
+        self._directory_entries = {}
+
+        # totais recursivos por diretório, calculados ao final de cada varredura: (horário, bytes em disco, aparente)
+        self._directory_totals = {}
+
+    # função que inicia as threads de varredura na primeira utilização
+    def _ensure_workers(self):
+        if len(self._workers) < self.worker_count:
+            for worker_index in range(len(self._workers), self.worker_count):
+                worker_thread = threading.Thread(target=self._worker_loop, name=f"so-dashboard-disk-usage-{worker_index}", daemon=True)
+                worker_thread.start()
+                self._workers.append(worker_thread)
+
+    def _worker_loop(self):
+        while True:
+            scan, directory_path, top_child = self._tasks.get()
+            try:
+                self._scan_directory(scan, directory_path, top_child)
+            except Exception as e_disk_usage:
+                print(f"Erro no motor de uso de disco em {directory_path}: {e_disk_usage}")
+
+    #---------------------------------------------------------------------------------------------------#
+
+    # função que retorna a listagem do diretório, do cache (mesmo mtime e listagem recente) ou com os.scandir
+    def _list_directory(self, scan, directory_path, directory_mtime_ns):
+
+        now = time.time()
+        cached_entry = self._directory_entries.get(directory_path)
+        if (cached_entry is not None and cached_entry[0] == directory_mtime_ns
+                and now - cached_entry[1] < DIRECTORY_ENTRY_MAX_AGE_SECONDS):
+            metrics.DISK_USAGE_DIRECTORIES_TOTAL.inc(1, "cache")
+            return cached_entry, True
+
+        file_bytes, file_apparent_bytes, file_count = 0, 0, 0
+        hard_links, subdirectories = [], []
+        with os.scandir(directory_path) as directory_iterator:
+            for directory_entry in directory_iterator:
+                if scan.cancel_event.is_set():
+                    return None, False
+                try:
+                    if directory_entry.is_dir(follow_symlinks=False):
+                        subdirectories.append(directory_entry.name)
+                        continue
+                    entry_stat = directory_entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+
+                # blocos alocados (512 bytes cada, como o du); arquivos esparsos ocupam menos que o tamanho aparente
+                entry_bytes = entry_stat.st_blocks * 512
+                file_count += 1
+                if entry_stat.st_nlink > 1:
+                    hard_links.append((entry_stat.st_dev, entry_stat.st_ino, entry_bytes, entry_stat.st_size))
+                else:
+                    file_bytes += entry_bytes
+                    file_apparent_bytes += entry_stat.st_size
+
+        directory_entry_data = (directory_mtime_ns, now, file_bytes, file_apparent_bytes, file_count,
+                                tuple(hard_links), tuple(subdirectories))
+        if directory_path in self._directory_entries or len(self._directory_entries) < MAX_CACHED_DIRECTORIES:
+            self._directory_entries[directory_path] = directory_entry_data
+        metrics.DISK_USAGE_DIRECTORIES_TOTAL.inc(1, "scandir")
+        return directory_entry_data, False
+
+    # função executada pelas threads: contabiliza um diretório e enfileira os seus subdiretórios
+    def _scan_directory(self, scan, directory_path, top_child):
+
+        subdirectories = ()
+        try:
+            if scan.cancel_event.is_set():
+                return
+
+            directory_stat = os.stat(directory_path, follow_symlinks=False)
+            if directory_stat.st_dev != scan.root_device:
+                with scan.lock:
+                    scan.skipped_mounts += 1
+                return
+
+            directory_entry_data, reused = self._list_directory(scan, directory_path, directory_stat.st_mtime_ns)
+            if directory_entry_data is None:
+                return
+            _, _, file_bytes, file_apparent_bytes, file_count, hard_links, subdirectories = directory_entry_data
+
+            with scan.lock:
+                # o próprio diretório também ocupa blocos
+                usage_bytes = file_bytes + directory_stat.st_blocks * 512
+                usage_apparent_bytes = file_apparent_bytes + directory_stat.st_size
+                for device, inode, entry_bytes, entry_apparent_bytes in hard_links:
+                    if (device, inode) not in scan.seen_inodes:
+                        scan.seen_inodes.add((device, inode))
+                        usage_bytes += entry_bytes
+                        usage_apparent_bytes += entry_apparent_bytes
+
+                scan.directory_usage[directory_path] = (usage_bytes, usage_apparent_bytes)
+                accumulated_usage = scan.root_usage if top_child is None else scan.children_usage.setdefault(top_child, [0, 0])
+                accumulated_usage[0] += usage_bytes
+                accumulated_usage[1] += usage_apparent_bytes
+
+                scan.files_counted += file_count
+                if reused:
+                    scan.directories_reused += 1
+                else:
+                    scan.directories_scanned += 1
+                scan.pending_directories += len(subdirectories)
+
+        except OSError:
+            subdirectories = ()
+            with scan.lock:
+                scan.errors += 1
+
+        finally:
+            for subdirectory_name in subdirectories:
+                self._tasks.put((scan, os.path.join(directory_path, subdirectory_name),
+                                 subdirectory_name if top_child is None else top_child))
+            with scan.lock:
+                scan.pending_directories -= 1
+                scan_finished = scan.pending_directories == 0
+            if scan_finished:
+                self._finish_scan(scan)
+
+    # função que encerra a varredura: calcula o total recursivo de cada diretório visitado (das folhas para a raiz)
+    # e o guarda em cache, salvo se a varredura foi cancelada
+    def _finish_scan(self, scan):
+
+        finished_at = time.time()
+        if not scan.cancel_event.is_set():
+            recursive_usage = {}
+            for directory_path in sorted(scan.directory_usage, key=lambda path: path.rstrip(os.sep).count(os.sep), reverse=True):
+                usage_bytes, usage_apparent_bytes = scan.directory_usage[directory_path]
+                subtree_usage = recursive_usage.pop(directory_path, (0, 0))
+                directory_total = (usage_bytes + subtree_usage[0], usage_apparent_bytes + subtree_usage[1])
+                parent_path = os.path.dirname(directory_path)
+                if directory_path != scan.root_path and parent_path != directory_path:
+                    parent_usage = recursive_usage.get(parent_path, (0, 0))
+                    recursive_usage[parent_path] = (parent_usage[0] + directory_total[0], parent_usage[1] + directory_total[1])
+                if directory_path in self._directory_totals or len(self._directory_totals) < MAX_CACHED_DIRECTORIES:
+                    self._directory_totals[directory_path] = (finished_at, directory_total[0], directory_total[1])
+
+        with scan.lock:
+            scan.state = "cancelled" if scan.cancel_event.is_set() else "done"
+            scan.finished_at = finished_at
+            scan.directory_usage = {}
+            scan.seen_inodes = set()
+
+    #---------------------------------------------------------------------------------------------------#
+
+    # função que monta o resultado de um diretório a partir dos totais em cache de uma varredura anterior (dele mesmo
+    # ou de um diretório acima), ou None se não houver totais recentes para ele e todos os seus subdiretórios
+    def _usage_from_totals(self, path, now):
+
+        directory_total = self._directory_totals.get(path)
+        directory_entry_data = self._directory_entries.get(path)
+        if directory_total is None or directory_entry_data is None or now - directory_total[0] >= self.rescan_after_seconds:
+            return None
+
+        children_usage = {}
+        for subdirectory_name in directory_entry_data[6]:
+            subdirectory_total = self._directory_totals.get(os.path.join(path, subdirectory_name))
+            if subdirectory_total is not None:
+                children_usage[subdirectory_name] = {"bytes": subdirectory_total[1], "apparent_bytes": subdirectory_total[2]}
+        return {
+            "path": path,
+            "state": "done",
+            "total_bytes": directory_total[1],
+            "apparent_bytes": directory_total[2],
+            "children": children_usage,
+            "progress": {"cached": True, "finished_at": directory_total[0]},
+        }
+
+    # função que retorna o uso de disco de um diretório: a varredura em andamento (tamanhos parciais), uma concluída
+    # recentemente ou os totais em cache; com start=True, inicia uma varredura se não houver resultado recente.
+    # Retorna None se não houver resultado e a varredura não foi pedida
+    def get_usage(self, path, start=False):
+
+        path = os.path.abspath(path)
+        now = time.time()
+        with self._lock:
+            scan = self._scans.get(path)
+            if scan is not None and (scan.state == "running" or (scan.state == "done" and now - scan.finished_at < self.rescan_after_seconds)):
+                return scan.to_dict()
+
+            cached_usage = self._usage_from_totals(path, now)
+            if cached_usage is not None or not start:
+                return cached_usage if cached_usage is not None else (scan.to_dict() if scan is not None else None)
+
+            try:
+                root_stat = os.stat(path)
+            except OSError as e_root_stat:
+                return {"path": path, "state": "error", "error": str(e_root_stat)}
+
+            scan = DiskUsageScan(path, root_stat.st_dev)
+            self._scans.pop(path, None)
+            self._scans[path] = scan
+            self._discard_old_scans()
+            self._ensure_workers()
+            self._tasks.put((scan, path, None))
+            return scan.to_dict()
+
+    # função que cancela a varredura em andamento de um diretório; retorna o estado final ou None se não houver varredura
+    def cancel(self, path):
+
+        path = os.path.abspath(path)
+        with self._lock:
+            scan = self._scans.get(path)
+        if scan is None:
+            return None
+        scan.cancel_event.set()
+        return scan.to_dict()
+
+    # função que remove as varreduras concluídas mais antigas além do limite (chamada com a trava do motor)
+    def _discard_old_scans(self):
+        finished_paths = [path for path, scan in self._scans.items() if scan.state != "running"]
+        for path in finished_paths[:max(0, len(finished_paths) - MAX_FINISHED_SCANS)]:
+            del self._scans[path]
@@ -0,0 +1,433 @@
+import os
+import time
+import array
+import bisect
+import threading
+
+import model
+import wire
+
+# liga o índice de nomes de arquivos (SO_DASHBOARD_FILE_INDEX=0 desliga a busca)
+FILE_INDEX_ENABLED = os.environ.get("SO_DASHBOARD_FILE_INDEX", "1") != "0"
+
+# arquivo onde o índice é persistido entre execuções
+DEFAULT_FILE_INDEX_PATH = os.environ.get(
+    "SO_DASHBOARD_FILE_INDEX_PATH", os.path.join(os.path.expanduser("~"), ".cache", "so-dashboard", "file_index.bin"))
+
+# intervalo entre atualizações incrementais (segundos)
+DEFAULT_REFRESH_SECONDS = float(os.environ.get("SO_DASHBOARD_FILE_INDEX_REFRESH", "300"))
+
+# sistemas de arquivos fora do índice: virtuais (sem arquivos de usuário) e de rede (varrê-los seria lento e geraria
+# tráfego), além dos já ignorados por model.get_filesystem_info
+EXCLUDED_FILESYSTEM_TYPES = frozenset((
+    "proc", "sysfs", "devtmpfs", "devpts", "tmpfs", "ramfs", "cgroup", "cgroup2", "debugfs", "tracefs", "securityfs",
+    "pstore", "bpf", "mqueue", "hugetlbfs", "configfs", "fusectl", "binfmt_misc", "autofs", "nsfs", "efivarfs",
+    "rpc_pipefs", "squashfs", "nfs", "nfs4", "cifs", "smb3", "smbfs", "9p", "afs", "ceph", "glusterfs", "lustre",
+    "fuse.sshfs", "fuse.rclone", "fuse.gvfsd-fuse", "fuse.portal", "fuse.s3fs", "davfs"))
+
+# tamanho alvo do texto de cada bloco e limite de diretórios por bloco; os trigramas são indexados por bloco, não por arquivo
+BLOCK_TARGET_BYTES = 64 * 1024
+BLOCK_MAX_DIRECTORIES = 4096
+
+# versão do formato do arquivo persistido
+FILE_INDEX_FORMAT_VERSION = 1
+
+# separador entre nomes no texto dos blocos (não pode aparecer em nomes de arquivos) e marcador de diretório
+NAME_SEPARATOR = b"\0"
+DIRECTORY_MARKER = b"/"
+
+# localização de um diretório: índice do bloco nos bits altos e posição no bloco nos 20 bits baixos
+LOCATION_SHIFT = 20
+LOCATION_MASK = (1 << LOCATION_SHIFT) - 1
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que retorna o conjunto de trigramas (em minúsculas) dos nomes de um bloco
+def block_trigrams(lowercase_text):
+
+    trigrams = set()
+    for name in set(lowercase_text.split(NAME_SEPARATOR)):
+        trigrams.update(name[index:index + 3] for index in range(len(name) - 2))
+    return trigrams
+
+# função que retorna os pontos de montagem indexados: (ponto de montagem, dispositivo), sem tipos excluídos e sem
+# repetir o mesmo dispositivo (bind mounts)
+def indexed_mountpoints():
+
+    mountpoints, seen_devices = [], set()
+    for mount_info in model.get_filesystem_info():
+        if mount_info["type"] in EXCLUDED_FILESYSTEM_TYPES or mount_info["type"].startswith("fuse."):
+            continue
+        try:
+            mount_device = os.stat(mount_info["mountpoint"]).st_dev
+        except OSError:
+            continue
+        if mount_device not in seen_devices:
+            seen_devices.add(mount_device)
+            mountpoints.append((os.fsencode(mount_info["mountpoint"]), mount_device))
+    return mountpoints
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# índice de nomes de arquivos para busca por substring em todos os sistemas de arquivos locais montados
+#
+# os nomes ficam agrupados por diretório em blocos de ~64 KB: o texto de cada bloco concatena os nomes dos seus
+# diretórios (separados por \0, com "/" no final dos subdiretórios), sem um objeto Python por arquivo. Para cada
+# trigrama, um bitmap indica os blocos que o contêm; a busca intersecta os bitmaps dos trigramas da consulta e só
+# procura (bytes.find, em minúsculas) nos blocos candidatos, parando ao atingir o limite de resultados.
+#
+# a atualização é incremental: cada diretório guarda o seu mtime, e apenas os diretórios alterados (arquivos criados,
+# removidos ou renomeados) são listados de novo; diretórios novos formam blocos novos. Uma única thread escreve no
+# índice, trocando blocos inteiros, e as buscas leem sem trava; bits de trigramas removidos só geram candidatos a mais,
+# e os bitmaps são recalculados quando muitos blocos foram alterados. O índice é persistido em disco para que a
+# próxima execução parta dele
+class FileIndex:
+
+    def __init__(self, index_path=DEFAULT_FILE_INDEX_PATH, refresh_seconds=DEFAULT_REFRESH_SECONDS, mountpoints_fn=None):
+        self.index_path = index_path
+        self.refresh_seconds = refresh_seconds
+        self.mountpoints_fn = mountpoints_fn or indexed_mountpoints
+
+        # blocos: (caminhos dos diretórios, mtimes em ns, deslocamento de cada diretório no texto, texto); diretórios
+        # removidos continuam no bloco com o trecho vazio e mtime -1, para que as posições dos demais não mudem
+        self._blocks = []
+        # localização de cada diretório indexado: índice do bloco << LOCATION_SHIFT | posição no bloco
+        self._directory_locations = {}
+        # bitmap (bytearray, um bit por bloco) de cada trigrama
+        self._trigram_bitmaps = {}
+        # blocos alterados desde o último cálculo dos bitmaps
+        self._stale_blocks = set()
+
+        self.state = "idle"
+        self.file_count = 0
+        self.last_refresh_at = None
+        self.last_refresh_seconds = None
+        self.last_error = None
+        self._thread = None
+
+    # função que inicia a thread do índice (carrega o arquivo persistido e faz a primeira atualização)
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._index_loop, name="so-dashboard-file-index", daemon=True)
+            self._thread.start()
+
+    def _index_loop(self):
+
+        # a construção do índice disputa CPU com a API: a thread roda com prioridade menor (nice só desta thread)
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+        except (AttributeError, OSError):
+            pass
+
+        self.state = "loading"
+        self.load()
+        while True:
+            try:
+                self.state = "building" if not self._blocks else "refreshing"
+                # o arquivo só é regravado quando a atualização listou ou removeu diretórios
+                if self.refresh():
+                    self.save()
+                self.last_error = None
+            except Exception as e_file_index:
+                self.last_error = str(e_file_index)
+                print(f"Erro ao atualizar o índice de arquivos: {e_file_index}")
+            self.state = "ready"
+            time.sleep(self.refresh_seconds)
+
+    #---------------------------------------------------------------------------------------------------#
+
+    # função que marca os trigramas do texto no bitmap do bloco
+    @staticmethod
+    def _set_trigram_bits(trigram_bitmaps, block_index, lowercase_text):
+        byte_index, bit_mask = block_index >> 3, 1 << (block_index & 7)
+        for trigram in block_trigrams(lowercase_text):
+            trigram_bitmap = trigram_bitmaps.get(trigram)
+            if trigram_bitmap is None:
+                trigram_bitmap = trigram_bitmaps[trigram] = bytearray()
+            if len(trigram_bitmap) <= byte_index:
+                trigram_bitmap.extend(bytes(byte_index + 1 - len(trigram_bitmap)))
+            trigram_bitmap[byte_index] |= bit_mask
+
+    # função que recalcula todos os bitmaps a partir do texto atual dos blocos e troca o dicionário inteiro
+    def _rebuild_trigram_bitmaps(self):
+        rebuilt_bitmaps = {}
+        for block_index, index_block in enumerate(self._blocks):
+            self._set_trigram_bits(rebuilt_bitmaps, block_index, index_block[3].lower())
+        self._trigram_bitmaps = rebuilt_bitmaps
+        self._stale_blocks.clear()
+
+    # função que acrescenta um bloco com os diretórios novos (caminhos, mtimes e listagens); se couber, o lote é
+    # unido ao último bloco, para que atualizações com poucos diretórios novos não criem blocos minúsculos
+    def _append_directories(self, directory_paths, directory_mtimes, directory_listings):
+
+        block_index = len(self._blocks)
+        block_paths, block_mtimes, block_offsets, block_text = (), (), (), b""
+        if (self._blocks and len(self._blocks[-1][3]) + sum(map(len, directory_listings)) <= BLOCK_TARGET_BYTES
+                and len(self._blocks[-1][0]) + len(directory_paths) <= BLOCK_MAX_DIRECTORIES):
+            block_index -= 1
+            block_paths, block_mtimes, block_offsets, block_text = self._blocks[block_index]
+
+        new_offsets, text_length = [], len(block_text)
+        for directory_listing in directory_listings:
+            new_offsets.append(text_length)
+            text_length += len(directory_listing)
+        new_text = b"".join(directory_listings)
+
+        # os bits são marcados antes da troca do bloco, para que uma busca concorrente não perca os nomes novos
+        self._set_trigram_bits(self._trigram_bitmaps, block_index, new_text.lower())
+        new_block = (block_paths + tuple(directory_paths), block_mtimes + tuple(directory_mtimes),
+                     block_offsets + tuple(new_offsets), block_text + new_text)
+        if block_index == len(self._blocks):
+            self._blocks.append(new_block)
+        else:
+            self._blocks[block_index] = new_block
+
+        for position, directory_path in enumerate(directory_paths, start=len(block_paths)):
+            self._directory_locations[directory_path] = block_index << LOCATION_SHIFT | position
+        self.file_count += new_text.count(NAME_SEPARATOR)
+
+    # função que substitui a listagem de um diretório já indexado (listing None remove o diretório)
+    def _replace_directory(self, directory_path, directory_mtime_ns, listing):
+
+        directory_location = self._directory_locations[directory_path]
+        block_index, position = directory_location >> LOCATION_SHIFT, directory_location & LOCATION_MASK
+        block_paths, block_mtimes, block_offsets, block_text = self._blocks[block_index]
+        slice_start = block_offsets[position]
+        slice_end = block_offsets[position + 1] if position + 1 < len(block_offsets) else len(block_text)
+
+        if listing is None:
+            listing, directory_mtime_ns = b"", -1
+            del self._directory_locations[directory_path]
+        else:
+            self._set_trigram_bits(self._trigram_bitmaps, block_index, listing.lower())
+
+        # o trecho do diretório é trocado no texto e os diretórios seguintes do bloco são deslocados
+        shift = len(listing) - (slice_end - slice_start)
+        self.file_count += listing.count(NAME_SEPARATOR) - block_text.count(NAME_SEPARATOR, slice_start, slice_end)
+        self._blocks[block_index] = (
+            block_paths,
+            block_mtimes[:position] + (directory_mtime_ns,) + block_mtimes[position + 1:],
+            block_offsets[:position + 1] + tuple(offset + shift for offset in block_offsets[position + 1:]),
+            block_text[:slice_start] + listing + block_text[slice_end:])
+        self._stale_blocks.add(block_index)
+
+    # função que retorna (mtime, subdiretórios) de um diretório indexado, ou None
+    def _indexed_directory(self, directory_path):
+        directory_location = self._directory_locations.get(directory_path)
+        if directory_location is None:
+            return None
+        block_index, position = directory_location >> LOCATION_SHIFT, directory_location & LOCATION_MASK
+        _, block_mtimes, block_offsets, block_text = self._blocks[block_index]
+        slice_end = block_offsets[position + 1] if position + 1 < len(block_offsets) else len(block_text)
+        subdirectories = [name[:-1] for name in block_text[block_offsets[position]:slice_end].split(NAME_SEPARATOR)
+                          if name.endswith(DIRECTORY_MARKER)]
+        return block_mtimes[position], subdirectories
+
+    #---------------------------------------------------------------------------------------------------#
+
+    # função que percorre os pontos de montagem e atualiza o índice: lista apenas os diretórios novos ou com mtime
+    # alterado e remove os que não existem mais; retorna a quantidade de diretórios listados ou removidos (0 se o
+    # índice não mudou)
+    def refresh(self):
+
+        refresh_started_at = time.monotonic()
+        visited_directories, listed_directories = set(), 0
+
+        # lote de diretórios novos, gravado em um bloco a cada ~64 KB de nomes
+        new_paths, new_mtimes, new_listings, new_listings_bytes = [], [], [], 0
+
+        for mountpoint, mount_device in self.mountpoints_fn():
+            pending_directories = [mountpoint]
+            while pending_directories:
+                directory_path = pending_directories.pop()
+                try:
+                    directory_stat = os.stat(directory_path, follow_symlinks=False)
+                except OSError:
+                    continue
+                # não atravessa outros pontos de montagem (cada um é indexado a partir da sua própria raiz)
+                if directory_stat.st_dev != mount_device or directory_path in visited_directories:
+                    continue
+                visited_directories.add(directory_path)
+
+                indexed_directory = self._indexed_directory(directory_path)
+                if indexed_directory is not None and indexed_directory[0] == directory_stat.st_mtime_ns:
+                    subdirectories = indexed_directory[1]
+                else:
+                    listing_names, subdirectories = [], []
+                    try:
+                        with os.scandir(directory_path) as directory_iterator:
+                            for directory_entry in directory_iterator:
+                                try:
+                                    is_directory = directory_entry.is_dir(follow_symlinks=False)
+                                except OSError:
+                                    is_directory = False
+                                if is_directory:
+                                    subdirectories.append(directory_entry.name)
+                                    listing_names.append(directory_entry.name + DIRECTORY_MARKER)
+                                else:
+                                    listing_names.append(directory_entry.name)
+                    except OSError:
+                        continue
+                    listing_names.append(b"")
+                    listing = NAME_SEPARATOR.join(listing_names)
+                    listed_directories += 1
+
+                    if indexed_directory is not None:
+                        self._replace_directory(directory_path, directory_stat.st_mtime_ns, listing)
+                    else:
+                        new_paths.append(directory_path)
+                        new_mtimes.append(directory_stat.st_mtime_ns)
+                        new_listings.append(listing)
+                        new_listings_bytes += len(listing)
+                        if new_listings_bytes >= BLOCK_TARGET_BYTES or len(new_paths) >= BLOCK_MAX_DIRECTORIES:
+                            self._append_directories(new_paths, new_mtimes, new_listings)
+                            new_paths, new_mtimes, new_listings, new_listings_bytes = [], [], [], 0
+
+                pending_directories.extend(os.path.join(directory_path, subdirectory) for subdirectory in subdirectories)
+
+        if new_paths:
+            self._append_directories(new_paths, new_mtimes, new_listings)
+
+        # diretórios removidos (ou de pontos de montagem que deixaram de existir)
+        removed_directories = [path for path in self._directory_locations if path not in visited_directories]
+        for directory_path in removed_directories:
+            self._replace_directory(directory_path, -1, None)
+
+        if len(self._stale_blocks) > len(self._blocks) // 2:
+            self._rebuild_trigram_bitmaps()
+
+        self.last_refresh_at = time.time()
+        self.last_refresh_seconds = round(time.monotonic() - refresh_started_at, 3)
+        return listed_directories + len(removed_directories)
+
+    #---------------------------------------------------------------------------------------------------#
+
+    # função que busca nomes que contêm a consulta (sem diferenciar maiúsculas de minúsculas ASCII); retorna os
+    # primeiros `limit` resultados e se a busca parou antes de percorrer todo o índice
+    def search(self, query, limit=50):
+
+        # o separador de nomes nunca faz parte de um nome: uma consulta com ele casaria com o próprio separador
+        needle = query.encode("utf-8", "surrogateescape").lower()
+        if not needle or NAME_SEPARATOR in needle:
+            return [], False
+        index_blocks, trigram_bitmaps = self._blocks, self._trigram_bitmaps
+
+        # blocos candidatos: intersecção dos bitmaps dos trigramas da consulta (consultas curtas percorrem todos)
+        if len(needle) >= 3:
+            candidate_mask = -1
+            for trigram in {needle[index:index + 3] for index in range(len(needle) - 2)}:
+                trigram_bitmap = trigram_bitmaps.get(trigram)
+                candidate_mask &= int.from_bytes(trigram_bitmap, "little") if trigram_bitmap is not None else 0
+                if not candidate_mask:
+                    break
+            candidate_blocks = []
+            while candidate_mask > 0:
+                lowest_bit = candidate_mask & -candidate_mask
+                candidate_blocks.append(lowest_bit.bit_length() - 1)
+                candidate_mask ^= lowest_bit
+        else:
+            candidate_blocks = range(len(index_blocks))
+
+        search_results = []
+        for block_index in candidate_blocks:
+            if block_index >= len(index_blocks):
+                break
+            block_paths, _, block_offsets, block_text = index_blocks[block_index]
+            lowercase_text = block_text.lower()
+            position = lowercase_text.find(needle)
+            while position >= 0:
+                name_start = lowercase_text.rfind(NAME_SEPARATOR, 0, position) + 1
+                name_end = lowercase_text.find(NAME_SEPARATOR, position)
+                entry_name = block_text[name_start:name_end]
+                is_directory = entry_name.endswith(DIRECTORY_MARKER)
+                if is_directory:
+                    entry_name = entry_name[:-1]
+
+                # consultas terminadas em "/" podem casar com o marcador de diretório; nomes vazios são ignorados
+                if entry_name:
+                    directory_path = block_paths[bisect.bisect_right(block_offsets, name_start) - 1]
+                    search_results.append({
+                        "name": entry_name.decode("utf-8", "replace"),
+                        "path": os.path.join(directory_path, entry_name).decode("utf-8", "replace"),
+                        "is_dir": is_directory,
+                    })
+                    if len(search_results) >= limit:
+                        return search_results, True
+                # a próxima ocorrência é procurada a partir do fim do nome (uma entrada por nome), sempre avançando
+                position = lowercase_text.find(needle, max(name_end, position + 1))
+        return search_results, False
+
+    # função que retorna o estado do índice para a API
+    def status(self):
+        return {
+            "state": self.state,
+            "directories": len(self._directory_locations),
+            "entries": self.file_count,
+            "blocks": len(self._blocks),
+            "trigrams": len(self._trigram_bitmaps),
+            "last_refresh_at": self.last_refresh_at,
+            "last_refresh_seconds": self.last_refresh_seconds,
+            "error": self.last_error,
+        }
+
+    #---------------------------------------------------------------------------------------------------#
+
+    # função que grava o índice no formato binário do wire.py (gravação em arquivo temporário + rename); os
+    # diretórios removidos (trecho vazio) não são gravados
+    def save(self):
+
+        saved_blocks = []
+        for block_paths, block_mtimes, block_offsets, block_text in list(self._blocks):
+            live_positions = [position for position, directory_mtime_ns in enumerate(block_mtimes) if directory_mtime_ns >= 0]
+            saved_blocks.append([
+                NAME_SEPARATOR.join(block_paths[position] for position in live_positions),
+                array.array("q", (block_mtimes[position] for position in live_positions)).tobytes(),
+                array.array("q", (block_offsets[position] for position in live_positions)).tobytes(),
+                block_text])
+
+        trigram_keys = list(self._trigram_bitmaps)
+        index_payload = wire.encode_value({
+            "version": FILE_INDEX_FORMAT_VERSION,
+            "saved_at": time.time(),
+            "file_count": self.file_count,
+            "blocks": saved_blocks,
+            "trigram_keys": b"".join(trigram_keys),
+            "trigram_bitmaps": [bytes(self._trigram_bitmaps[trigram]) for trigram in trigram_keys],
+        })
+
+        os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+        temporary_path = f"{self.index_path}.tmp"
+        with open(temporary_path, "wb") as index_file:
+            index_file.write(index_payload)
+        os.replace(temporary_path, self.index_path)
+
+    # função que carrega o índice persistido; arquivos ausentes, de outra versão ou corrompidos são ignorados
+    # (o índice é reconstruído pela próxima atualização)
+    def load(self):
+
+        try:
+            with open(self.index_path, "rb") as index_file:
+                index_data = wire.decode_value(index_file.read())
+            if index_data.get("version") != FILE_INDEX_FORMAT_VERSION:
+                return False
+
+            loaded_blocks, loaded_directory_locations = [], {}
+            for block_paths, block_mtimes, block_offsets, block_text in index_data["blocks"]:
+                block_paths = tuple(block_paths.split(NAME_SEPARATOR)) if block_paths else ()
+                for position, block_path in enumerate(block_paths):
+                    loaded_directory_locations[block_path] = len(loaded_blocks) << LOCATION_SHIFT | position
+                loaded_blocks.append((block_paths, tuple(array.array("q", block_mtimes)),
+                                      tuple(array.array("q", block_offsets)), block_text))
+
+            trigram_keys = index_data["trigram_keys"]
+            loaded_bitmaps = {trigram_keys[index * 3:index * 3 + 3]: bytearray(trigram_bitmap)
+                              for index, trigram_bitmap in enumerate(index_data["trigram_bitmaps"])}
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, KeyError, TypeError) as e_load:
+            print(f"Índice de arquivos em {self.index_path} ignorado: {e_load}")
+            return False
+
+        self._blocks, self._directory_locations, self._trigram_bitmaps = loaded_blocks, loaded_directory_locations, loaded_bitmaps
+        self.file_count = index_data.get("file_count", 0)
+        return True
@@ -0,0 +1,392 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import signal
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+import http.client
+import multiprocessing
+
+import procfs_fixture
+
+# mistura padrão de requisições (pesos relativos por rota)
+DEFAULT_REQUEST_MIX = "processes=40,process=30,process_io=15,directory=15"
+
+# rotas aceitas na mistura; os parâmetros (PID e caminho) são sorteados a cada requisição
+LOADTEST_ENDPOINTS = ("processes", "process", "process_io", "directory", "cpu", "memory", "filesystem")
+
+# percentis reportados por rota
+REPORTED_PERCENTILES = (50, 99, 99.9)
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que converte "processes=40,process=30" em lista de (rota, peso)
+def parse_request_mix(mix_text):
+
+    request_mix = []
+    for mix_entry in mix_text.split(","):
+        endpoint_name, _, weight_text = mix_entry.strip().partition("=")
+        if endpoint_name not in LOADTEST_ENDPOINTS:
+            raise ValueError(f"Rota desconhecida '{endpoint_name}'. Use: {', '.join(LOADTEST_ENDPOINTS)}.")
+        request_mix.append((endpoint_name, float(weight_text or 1)))
+    return request_mix
+
+# função que monta a URL de uma requisição da rota sorteada
+def build_request_path(endpoint_name, pids, directory_paths, rng):
+
+    if endpoint_name == "processes":
+        return "/api/processes"
+    if endpoint_name == "process":
+        return f"/api/process/{rng.choice(pids)}"
+    if endpoint_name == "process_io":
+        return f"/api/process/{rng.choice(pids)}/io"
+    if endpoint_name == "directory":
+        return f"/api/filesystem/directory?path={rng.choice(directory_paths)}"
+    return f"/api/{endpoint_name}"
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que retorna o percentil (pelo método nearest-rank) de uma lista já ordenada
+def percentile(sorted_values, percentile_value):
+
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(percentile_value / 100.0 * len(sorted_values) + 0.4999)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+# função que soma, a partir de /proc, o tempo de CPU (em segundos) e o RSS (em MB) do servidor e de todos os processos
+# do seu grupo (workers do gunicorn, coletor do modo compartilhado), já que o servidor é iniciado em uma sessão própria.
+# O tempo de CPU inclui cutime + cstime, então um worker que termina na janela medida continua contado (no processo que
+# o aguardou); o RSS é a soma dos processos e conta mais de uma vez as páginas compartilhadas entre eles
+def read_process_group_usage(server_pid):
+
+    hertz = os.sysconf(os.sysconf_names['SC_CLK_TCK']) or 100
+    page_size_bytes = os.sysconf('SC_PAGE_SIZE')
+    cpu_ticks, rss_pages, process_count = 0, 0, 0
+    for pid_str in os.listdir("/proc"):
+        if not pid_str.isdigit():
+            continue
+        try:
+            with open(f"/proc/{pid_str}/stat", "r") as stat_file:
+                stat_parts_list = stat_file.read().rsplit(")", 1)[1].split()
+            if int(pid_str) != server_pid and int(stat_parts_list[2]) != server_pid:
+                continue
+            # utime, stime, cutime e cstime
+            cpu_ticks += sum(int(stat_value) for stat_value in stat_parts_list[11:15])
+            rss_pages += int(stat_parts_list[21])
+            process_count += 1
+        except (FileNotFoundError, IndexError, ValueError, OSError):
+            continue
+
+    if process_count == 0:
+        return None
+    return {
+        "cpu_seconds": cpu_ticks / hertz,
+        "rss_mb": round(rss_pages * page_size_bytes / (1024 ** 2), 1),
+        "processes": process_count,
+    }
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função executada por cada processo cliente: várias threads, cada uma com sua conexão keep-alive, disparando
+# requisições em laço fechado (com pausa opcional entre requisições, como um dashboard que atualiza periodicamente)
+def _run_client_process(worker_config, results_queue):
+
+    request_mix = worker_config["request_mix"]
+    endpoint_names = [endpoint_name for endpoint_name, _ in request_mix]
+    endpoint_weights = [weight for _, weight in request_mix]
+    stop_at = worker_config["started_at"] + worker_config["warmup_seconds"] + worker_config["duration_seconds"]
+    measure_from = worker_config["started_at"] + worker_config["warmup_seconds"]
+    headers = {"Accept-Encoding": worker_config["accept_encoding"]} if worker_config["accept_encoding"] else {}
+
+    latencies = {endpoint_name: [] for endpoint_name in endpoint_names}
+    errors = {endpoint_name: 0 for endpoint_name in endpoint_names}
+    response_bytes = {endpoint_name: 0 for endpoint_name in endpoint_names}
+    results_lock = threading.Lock()
+
+    def _client_loop(client_index):
+        rng = random.Random(worker_config["seed"] * 100003 + client_index)
+        connection = None
+        while True:
+            now = time.time()
+            if now >= stop_at:
+                break
+            endpoint_name = rng.choices(endpoint_names, weights=endpoint_weights)[0]
+            request_path = build_request_path(endpoint_name, worker_config["pids"], worker_config["directory_paths"], rng)
+
+            started_at = time.perf_counter()
+            try:
+                if connection is None:
+                    connection = http.client.HTTPConnection(worker_config["host"], worker_config["port"], timeout=30)
+                connection.request("GET", request_path, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+                failed = response.status >= 500
+                if response.getheader("Connection", "").lower() == "close" or response.version == 10:
+                    connection.close()
+                    connection = None
+            except (OSError, http.client.HTTPException):
+                body, failed = b"", True
+                if connection is not None:
+                    connection.close()
+                connection = None
+            elapsed_seconds = time.perf_counter() - started_at
+
+            # apenas as requisições após o aquecimento entram no relatório
+            if now >= measure_from:
+                with results_lock:
+                    if failed:
+                        errors[endpoint_name] += 1
+                    else:
+                        latencies[endpoint_name].append(elapsed_seconds)
+                        response_bytes[endpoint_name] += len(body)
+
+            if worker_config["think_time_seconds"] > 0:
+                time.sleep(rng.uniform(0.5, 1.5) * worker_config["think_time_seconds"])
+
+        if connection is not None:
+            connection.close()
+
+    client_threads = [threading.Thread(target=_client_loop, args=(client_index,), daemon=True)
+                      for client_index in range(worker_config["clients"])]
+    for client_thread in client_threads:
+        client_thread.start()
+    for client_thread in client_threads:
+        client_thread.join()
+
+    results_queue.put({"latencies": latencies, "errors": errors, "response_bytes": response_bytes})
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que escolhe uma porta TCP livre para o servidor sob teste
+def _find_free_port():
+
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe_socket:
+        probe_socket.bind(("127.0.0.1", 0))
+        return probe_socket.getsockname()[1]
+
+# função auxiliar que faz uma requisição GET simples e retorna (status, corpo JSON ou None)
+def _get_json(host, port, request_path, timeout_seconds=10):
+
+    connection = http.client.HTTPConnection(host, port, timeout=timeout_seconds)
+    try:
+        connection.request("GET", request_path)
+        response = connection.getresponse()
+        body = response.read()
+        try:
+            return response.status, json.loads(body)
+        except ValueError:
+            return response.status, None
+    finally:
+        connection.close()
+
+# função que aguarda o servidor responder e publicar o primeiro snapshot com processos
+def _wait_for_server(server_process, host, port, timeout_seconds):
+
+    deadline = time.time() + timeout_seconds
+    while time.time() < deadline:
+        if server_process.poll() is not None:
+            raise RuntimeError(f"o servidor encerrou durante a inicialização (código {server_process.returncode})")
+        try:
+            status, cpu_info = _get_json(host, port, "/api/cpu", timeout_seconds=2)
+            if status == 200 and cpu_info and cpu_info.get("total_processes", 0) > 0:
+                return
+        except (OSError, http.client.HTTPException):
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("o servidor não publicou um snapshot dentro do tempo limite")
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que executa o teste de carga contra um servidor já iniciado e retorna o relatório; o uso de CPU e de memória
+# do backend soma server_pid e os processos do grupo liderado por ele (ver read_process_group_usage)
+def run_load_test(host, port, server_pid, request_mix, clients=100, client_processes=4, duration_seconds=20.0,
+                  warmup_seconds=3.0, think_time_seconds=0.0, accept_encoding=None, directory_paths=("/",), seed=0):
+
+    # PIDs existentes no snapshot, usados pelas rotas de detalhe e de E/S
+    _, processes_info = _get_json(host, port, "/api/processes?fields=pid")
+    pids = [process_info["pid"] for process_info in (processes_info or [])] or [1]
+
+    client_processes = max(1, min(client_processes, clients))
+    results_queue = multiprocessing.Queue()
+    started_at = time.time() + 0.5
+    worker_processes = []
+    for worker_index in range(client_processes):
+        worker_config = {
+            "host": host, "port": port, "request_mix": request_mix, "pids": pids, "directory_paths": list(directory_paths),
+            "clients": clients // client_processes + (1 if worker_index < clients % client_processes else 0),
+            "started_at": started_at, "warmup_seconds": warmup_seconds, "duration_seconds": duration_seconds,
+            "think_time_seconds": think_time_seconds, "accept_encoding": accept_encoding, "seed": seed + worker_index,
+        }
+        worker_process = multiprocessing.Process(target=_run_client_process, args=(worker_config, results_queue), daemon=True)
+        worker_process.start()
+        worker_processes.append(worker_process)
+
+    # o uso de CPU do backend é medido apenas na janela de medição (após o aquecimento)
+    time.sleep(max(0.0, started_at + warmup_seconds - time.time()))
+    usage_before, measured_from = read_process_group_usage(server_pid), time.time()
+    time.sleep(max(0.0, started_at + warmup_seconds + duration_seconds - time.time()))
+    usage_after, measured_until = read_process_group_usage(server_pid), time.time()
+
+    worker_results = [results_queue.get() for _ in worker_processes]
+    for worker_process in worker_processes:
+        worker_process.join()
+
+    endpoints_report, all_latencies, total_errors = {}, [], 0
+    for endpoint_name, _ in request_mix:
+        endpoint_latencies = sorted(latency for worker_result in worker_results for latency in worker_result["latencies"][endpoint_name])
+        endpoint_errors = sum(worker_result["errors"][endpoint_name] for worker_result in worker_results)
+        endpoint_bytes = sum(worker_result["response_bytes"][endpoint_name] for worker_result in worker_results)
+        all_latencies.extend(endpoint_latencies)
+        total_errors += endpoint_errors
+        endpoints_report[endpoint_name] = {
+            "requests": len(endpoint_latencies),
+            "errors": endpoint_errors,
+            "throughput_rps": round(len(endpoint_latencies) / duration_seconds, 1),
+            "mean_response_kb": round(endpoint_bytes / len(endpoint_latencies) / 1024, 1) if endpoint_latencies else None,
+            **{f"p{percentile_value:g}_ms": round(percentile(endpoint_latencies, percentile_value) * 1000, 2) if endpoint_latencies else None
+               for percentile_value in REPORTED_PERCENTILES},
+            "max_ms": round(endpoint_latencies[-1] * 1000, 2) if endpoint_latencies else None,
+        }
+
+    all_latencies.sort()
+    backend_report = None
+    if usage_before and usage_after:
+        backend_cpu_seconds = usage_after["cpu_seconds"] - usage_before["cpu_seconds"]
+        backend_report = {
+            "cpu_seconds": round(backend_cpu_seconds, 2),
+            "cpu_percent_of_one_core": round(backend_cpu_seconds / (measured_until - measured_from) * 100.0, 1),
+            "cpu_ms_per_request": round(backend_cpu_seconds * 1000 / len(all_latencies), 3) if all_latencies else None,
+            "rss_mb": usage_after["rss_mb"],
+            "processes": usage_after["processes"],
+        }
+
+    return {
+        "clients": clients,
+        "client_processes": client_processes,
+        "duration_seconds": duration_seconds,
+        "accept_encoding": accept_encoding,
+        "total": {
+            "requests": len(all_latencies),
+            "errors": total_errors,
+            "throughput_rps": round(len(all_latencies) / duration_seconds, 1),
+            **{f"p{percentile_value:g}_ms": round(percentile(all_latencies, percentile_value) * 1000, 2) if all_latencies else None
+               for percentile_value in REPORTED_PERCENTILES},
+        },
+        "endpoints": endpoints_report,
+        "backend": backend_report,
+    }
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que imprime o relatório em formato de tabela
+def print_report(report):
+
+    header = f"{'rota':<14}{'reqs':>9}{'erros':>7}{'req/s':>9}{'p50 ms':>10}{'p99 ms':>10}{'p99.9 ms':>10}{'máx ms':>10}{'KB':>9}"
+    print(header)
+    print("-" * len(header))
+
+    def _format_ms(value):
+        return f"{value:.2f}" if value is not None else "-"
+
+    for endpoint_name, endpoint_report in report["endpoints"].items():
+        print(f"{endpoint_name:<14}{endpoint_report['requests']:>9}{endpoint_report['errors']:>7}{endpoint_report['throughput_rps']:>9.1f}"
+              f"{_format_ms(endpoint_report['p50_ms']):>10}{_format_ms(endpoint_report['p99_ms']):>10}"
+              f"{_format_ms(endpoint_report['p99.9_ms']):>10}{_format_ms(endpoint_report['max_ms']):>10}"
+              f"{endpoint_report['mean_response_kb'] if endpoint_report['mean_response_kb'] is not None else '-':>9}")
+
+    total_report = report["total"]
+    print("-" * len(header))
+    print(f"{'total':<14}{total_report['requests']:>9}{total_report['errors']:>7}{total_report['throughput_rps']:>9.1f}"
+          f"{_format_ms(total_report['p50_ms']):>10}{_format_ms(total_report['p99_ms']):>10}{_format_ms(total_report['p99.9_ms']):>10}")
+
+    if report["backend"]:
+        backend_report = report["backend"]
+        print(f"\nbackend: {backend_report['cpu_seconds']} s de CPU ({backend_report['cpu_percent_of_one_core']}% de um núcleo), "
+              f"{backend_report['cpu_ms_per_request']} ms de CPU por requisição, RSS {backend_report['rss_mb']} MB "
+              f"({backend_report['processes']} processos)")
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Teste de carga da API do SO Dashboard contra uma fixture sintética ou uma gravação.")
+    parser.add_argument("--fixture", help="diretório de uma fixture existente (gerada por procfs_fixture.py)")
+    parser.add_argument("--processes", type=int, default=10000, help="processos da fixture temporária")
+    parser.add_argument("--threads", type=int, default=4, help="threads por processo da fixture temporária")
+    parser.add_argument("--replay", help="arquivo de gravação (recording.py) servido em modo replay, em vez de uma fixture")
+    parser.add_argument("--clients", type=int, default=200, help="clientes simultâneos")
+    parser.add_argument("--client-processes", type=int, default=min(4, os.cpu_count() or 1),
+                        help="processos geradores de carga (os clientes são divididos entre eles)")
+    parser.add_argument("--duration", type=float, default=20.0, help="segundos medidos")
+    parser.add_argument("--warmup", type=float, default=3.0, help="segundos de aquecimento, fora do relatório")
+    parser.add_argument("--think-time", type=float, default=0.0, help="pausa média entre requisições de cada cliente (s)")
+    parser.add_argument("--mix", default=DEFAULT_REQUEST_MIX, help=f"pesos por rota ({', '.join(LOADTEST_ENDPOINTS)})")
+    parser.add_argument("--accept-encoding", default=None, help="cabeçalho Accept-Encoding enviado (ex: gzip)")
+    parser.add_argument("--server-cmd", default=f"{sys.executable} main.py",
+                        help="comando que inicia o servidor; a porta é passada em SO_DASHBOARD_PORT e em {port}")
+    parser.add_argument("--startup-timeout", type=float, default=120.0, help="tempo máximo para o primeiro snapshot (s)")
+    parser.add_argument("--json", action="store_true", help="imprime o relatório em JSON")
+    args = parser.parse_args()
+
+    try:
+        request_mix = parse_request_mix(args.mix)
+    except ValueError as e_mix:
+        print(e_mix)
+        sys.exit(1)
+
+    server_port = _find_free_port()
+    server_env = dict(os.environ, SO_DASHBOARD_PORT=str(server_port), SO_DASHBOARD_MODE="standalone")
+    temporary_dir, directory_paths = None, ["/"]
+
+    if args.replay:
+        server_env["SO_DASHBOARD_REPLAY_FILE"] = os.path.abspath(args.replay)
+        server_env["SO_DASHBOARD_REPLAY_LOOP"] = "1"
+    else:
+        if args.fixture:
+            fixture = procfs_fixture.fixture_paths(args.fixture)
+        else:
+            temporary_dir = tempfile.mkdtemp(prefix="so-dashboard-loadtest-")
+            print(f"Gerando fixture com {args.processes} processos...")
+            fixture = procfs_fixture.generate_procfs_fixture(temporary_dir, args.processes, args.threads)
+        server_env.update(SO_DASHBOARD_PROC_ROOT=fixture["proc_root"], SO_DASHBOARD_SYS_ROOT=fixture["sys_root"],
+                          SO_DASHBOARD_PASSWD_PATH=fixture["passwd_path"])
+        directory_paths = [fixture["fs_root"]] + [entry.path for entry in os.scandir(fixture["fs_root"]) if entry.is_dir()]
+
+    # o servidor roda em seu próprio grupo de processos, para que servidores com workers também sejam encerrados
+    server_process = subprocess.Popen(args.server_cmd.format(port=server_port).split(), env=server_env,
+                                      cwd=os.path.dirname(os.path.abspath(__file__)),
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+    try:
+        _wait_for_server(server_process, "127.0.0.1", server_port, args.startup_timeout)
+        load_test_report = run_load_test("127.0.0.1", server_port, server_process.pid, request_mix,
+                                         clients=args.clients, client_processes=args.client_processes,
+                                         duration_seconds=args.duration, warmup_seconds=args.warmup,
+                                         think_time_seconds=args.think_time, accept_encoding=args.accept_encoding,
+                                         directory_paths=directory_paths)
+    except RuntimeError as e_server:
+        print(f"Falha no teste de carga: {e_server}")
+        sys.exit(1)
+    finally:
+        try:
+            os.killpg(server_process.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+        server_process.wait(timeout=10)
+        if temporary_dir:
+            shutil.rmtree(temporary_dir, ignore_errors=True)
+
+    load_test_report["server_cmd"] = args.server_cmd
+    load_test_report["source"] = {"replay": os.path.abspath(args.replay)} if args.replay else \
+                                 {"fixture": os.path.abspath(args.fixture)} if args.fixture else {"processes": args.processes}
+
+    if args.json:
+        print(json.dumps(load_test_report, indent=2))
+    else:
+        print_report(load_test_report)
@@ -1,44 +1,333 @@
-from flask import Flask, jsonify, request
+import os
+import time
+import signal
+import threading
+from flask import Flask, Response, g, jsonify, request, send_file
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from controller import Controller
+import metrics
+import profiler
+import agent
+import aggregator
+import response_encoding
+import collection_plan
+import cgroups
+import replay
+import recording
+import shared_snapshot
+
+
+# provedor JSON que mede o tempo de serialização de cada resposta, por rota
+class TimedJSONProvider(DefaultJSONProvider):
+
+    def dumps(self, obj, **kwargs):
+        serialization_started_at = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            endpoint_name = request.endpoint if request else None
+            metrics.RESPONSE_SERIALIZATION_SECONDS.observe(time.perf_counter() - serialization_started_at, endpoint_name or "none")
 
 # istanciando a aplicação Flask
 app_flask_instance = Flask(__name__)
+app_flask_instance.json = TimedJSONProvider(app_flask_instance)
 
 # ativando o CORS para permitir requisições de outros domínios
 CORS(app_flask_instance)
 
-# criando uma instância do Controller
-app_api_controller = Controller()
-
-# iniciando a thread de atualização periódica
-app_api_controller.start_periodic_cache_update_thread()
+# modo de execução: "standalone" (padrão), "agent" (também envia snapshots ao agregador) ou "aggregator" (frota)
+SO_DASHBOARD_MODE = os.environ.get("SO_DASHBOARD_MODE", "standalone")
+
+# no modo agregador não há coleta local: os dados de cada host chegam dos agentes
+app_api_controller = None
+app_cluster_cache = None
+
+if SO_DASHBOARD_MODE == "aggregator":
+    # sem SO_DASHBOARD_AGGREGATOR_TOKEN, apenas agentes da própria máquina (loopback ou socket Unix) são aceitos
+    app_aggregator_server = aggregator.AggregatorServer(os.environ.get("SO_DASHBOARD_AGGREGATOR_LISTEN", "tcp://127.0.0.1:5100"),
+                                                        token=os.environ.get("SO_DASHBOARD_AGGREGATOR_TOKEN"))
+    app_cluster_cache = app_aggregator_server.cluster_cache
+    app_aggregator_server.start()
+
+elif os.environ.get("SO_DASHBOARD_REPLAY_FILE"):
+    # no modo replay, os snapshots vêm de uma gravação (SO_DASHBOARD_REPLAY_SPEED acelera; SO_DASHBOARD_REPLAY_LOOP recomeça)
+    app_api_controller = replay.ReplayController(os.environ["SO_DASHBOARD_REPLAY_FILE"],
+                                                 speed=float(os.environ.get("SO_DASHBOARD_REPLAY_SPEED", "1")),
+                                                 loop=os.environ.get("SO_DASHBOARD_REPLAY_LOOP", "0").lower() in ("1", "true", "yes"))
+    app_api_controller.start_periodic_cache_update_thread()
+
+elif os.environ.get("SO_DASHBOARD_SHARED_SNAPSHOT"):
+    # com vários workers (ex: gunicorn -w N), a coleta roda em um único processo (python shared_snapshot.py) e os
+    # workers apenas leem os snapshots publicados no segmento de memória compartilhada
+    app_api_controller = shared_snapshot.SharedSnapshotController(os.environ["SO_DASHBOARD_SHARED_SNAPSHOT"])
+    app_api_controller.start_periodic_cache_update_thread()
+
+else:
+    # criando uma instância do Controller
+    app_api_controller = Controller()
+
+    # iniciando a thread de atualização periódica
+    app_api_controller.start_periodic_cache_update_thread()
+
+    # no modo agente, cada snapshot publicado também é enviado ao agregador (com todos os campos de processo)
+    if SO_DASHBOARD_MODE == "agent":
+        app_api_controller.collection_planner.add_permanent_consumer("agent")
+        app_agent_publisher = agent.AgentPublisher(app_api_controller,
+                                                   os.environ.get("SO_DASHBOARD_AGGREGATOR", "tcp://127.0.0.1:5100"),
+                                                   os.environ.get("SO_DASHBOARD_HOST_NAME") or None,
+                                                   token=os.environ.get("SO_DASHBOARD_AGGREGATOR_TOKEN"))
+        app_agent_publisher.start()
+
+# grava cada snapshot publicado, para análise posterior ou reprodução (SO_DASHBOARD_REPLAY_FILE)
+if app_api_controller is not None and os.environ.get("SO_DASHBOARD_RECORD_FILE"):
+    app_snapshot_recorder = recording.SnapshotRecorder(app_api_controller, os.environ["SO_DASHBOARD_RECORD_FILE"])
+    app_snapshot_recorder.start()
+
+# o sinal SIGUSR2 perfila os próximos ciclos de coleta (tratadores de sinal só podem ser instalados na thread principal)
+if hasattr(signal, "SIGUSR2") and threading.current_thread() is threading.main_thread():
+    profiler.install_signal_handler(signal, signal.SIGUSR2)
 
 # ---------------------------------------------------------------------------------------------------------------------------------
 
-""" PROJETO A - Implementação da Funcionalidade Inicial do Dashboard """
+# registra o início de cada requisição para medir sua latência total
+@app_flask_instance.before_request
+def _mark_request_start():
+    g.request_started_at = time.perf_counter()
 
-# definindo a rota da API que retornam a lista de processos em execução
-@app_flask_instance.route('/api/processes')
-def handle_api_get_processes():
+    # se houver uma sessão de profiling de requisições ativa, esta requisição pode ser perfilada
+    g.request_profile_context = profiler.PROFILER.begin_request()
+
+# registra a latência da requisição, agrupada pela rota (e não pela URL, para limitar a cardinalidade)
+@app_flask_instance.after_request
+def _observe_request_duration(response):
+    profiler.PROFILER.end_request(g.pop("request_profile_context", None))
+    request_started_at = g.pop("request_started_at", None)
+    if request_started_at is not None:
+        metrics.HTTP_REQUEST_DURATION_SECONDS.observe(time.perf_counter() - request_started_at, request.endpoint or "not_found")
+    return response
+
+# função que escolhe a fonte de dados da requisição: o Controller local ou, no modo agregador, o host do parâmetro host=
+def _resolve_api_controller():
+
+    if app_cluster_cache is None:
+        return app_api_controller, None
+
+    host_names = app_cluster_cache.host_names()
+    host_name = request.args.get('host')
+
+    # sem host= e com apenas um agente conectado, usa esse agente
+    if not host_name and len(host_names) == 1:
+        host_name = host_names[0]
+    if not host_name:
+        return None, (jsonify({"error": "Informe o parâmetro 'host'.", "hosts": host_names}), 400)
+
+    host_view = app_cluster_cache.view(host_name)
+    if host_view is None:
+        return None, (jsonify({"error": f"Host '{host_name}' desconhecido.", "hosts": host_names}), 404)
+    return host_view, None
+
+# cache das respostas pré-serializadas (e pré-comprimidas) por versão do snapshot, compartilhado entre os clientes
+app_encoded_response_cache = response_encoding.EncodedResponseCache()
+
+# formatos aceitos pelo parâmetro format= das rotas de listas
+RESPONSE_FORMATS = ("json", "columnar")
+
+# campos numéricos aceitos pelo parâmetro sort= de /api/processes (ordem decrescente; com limit= forma um top-N)
+PROCESS_SORT_FIELDS = ("cpu_percent", "memory_rss_mb", "memory_pss_mb", "memory_uss_mb", "memory_swap_pss_mb", "threads")
+
+# seções aceitas pelo parâmetro include= de /api/snapshot; sem include=, a lista de processos não é enviada
+SNAPSHOT_INCLUDE_SECTIONS = ("cpu", "memory", "filesystem", "processes")
+SNAPSHOT_DEFAULT_INCLUDE = ("cpu", "filesystem", "memory")
+
+# função que responde com o payload de um snapshot, serializado e comprimido uma única vez por versão e variante
+def _snapshot_json_response(api_controller, route_key, variant_key, payload_fn):
+
+    # a versão é lida antes dos dados: no pior caso, dados mais novos são associados à versão anterior (nunca o contrário)
+    snapshot_version = api_controller.snapshot_version
+    if app_cluster_cache is not None:
+        route_key = f"{route_key}@{request.args.get('host', '')}"
+
+    content_encoding = response_encoding.negotiate_content_encoding(request.headers.get('Accept-Encoding'))
+    body, applied_encoding = app_encoded_response_cache.get_or_encode(route_key, snapshot_version, variant_key,
+                                                                      payload_fn, content_encoding)
+    return _encoded_json_response(body, applied_encoding)
+
+# função que monta a resposta HTTP de um corpo JSON pré-codificado
+def _encoded_json_response(body, applied_encoding):
+
+    response = Response(body, mimetype='application/json')
+    response.headers['Vary'] = 'Accept-Encoding'
+    if applied_encoding:
+        response.headers['Content-Encoding'] = applied_encoding
+    return response
+
+# função que valida o parâmetro format=; retorna (formato, resposta de erro)
+def _parse_response_format():
+
+    response_format = request.args.get('format', default='json')
+    if response_format not in RESPONSE_FORMATS:
+        return None, (jsonify({"error": f"Formato inválido. Use um de: {', '.join(RESPONSE_FORMATS)}."}), 400)
+    return response_format, None
+
+# função que valida os parâmetros de projeção da lista de processos; retorna ({limit, fields, sort}, resposta de erro)
+def _parse_process_query():
 
     # obtém o parâmetro 'limit' da URL se fornecido, ou usa o valor padrão None
     limit_param_str_val = request.args.get('limit', default=None)
     limit_int_val = None
-    
+
     # se o parâmetro 'limit' for fornecido e for um número inteiro positivo, converte para int
     if limit_param_str_val and limit_param_str_val.isdigit():
         limit_int_val = int(limit_param_str_val)
         if limit_int_val <= 0:
             limit_int_val = None
-    
-    # obtém a lista de processos do cache (dados coletados anteriormente)
-    processes_data_list = app_api_controller.get_all_processes_info_from_cache()
-    
+
+    # projeção opcional: fields=pid,name,cpu_percent retorna apenas esses campos e limita a coleta aos arquivos necessários
+    requested_fields, invalid_fields = collection_plan.parse_fields_param(request.args.get('fields'))
+    if invalid_fields:
+        return None, (jsonify({"error": f"Campos inválidos: {', '.join(invalid_fields)}.",
+                               "fields": sorted(collection_plan.ALL_PROCESS_FIELDS)}), 400)
+    # ordenação opcional: sort=memory_pss_mb&limit=10 retorna os 10 maiores consumidores (processos sem amostra por último)
+    sort_field = request.args.get('sort')
+    if sort_field is not None and sort_field not in PROCESS_SORT_FIELDS:
+        return None, (jsonify({"error": f"Ordenação inválida. Use uma de: {', '.join(PROCESS_SORT_FIELDS)}."}), 400)
+    if sort_field is not None and requested_fields is not None:
+        requested_fields = requested_fields | {sort_field}
+
+    return {"limit": limit_int_val, "fields": requested_fields, "sort": sort_field}, None
+
+# função que aplica a ordenação, o limite e a projeção de campos à lista de processos
+def _project_processes(processes_data_list, process_query):
+
+    # ordena de forma decrescente pelo campo pedido (valores ausentes ficam no fim)
+    sort_field = process_query["sort"]
+    if sort_field is not None:
+        processes_data_list = sorted(processes_data_list, key=lambda process_info: process_info.get(sort_field) or -1, reverse=True)
+
     # se um limite válido for informado, retorna apenas os n primeiros processos
-    if limit_int_val is not None and limit_int_val > 0:
-        return jsonify(processes_data_list[:limit_int_val])
-    return jsonify(processes_data_list)
+    if process_query["limit"] is not None:
+        processes_data_list = processes_data_list[:process_query["limit"]]
+    if process_query["fields"] is not None:
+        processes_data_list = [collection_plan.project_process(process_info, process_query["fields"]) for process_info in processes_data_list]
+    return processes_data_list
+
+# função que retorna a parte da chave de variante do cache de respostas correspondente à projeção de processos
+def _process_query_key(process_query):
+    fields_key = tuple(sorted(process_query["fields"])) if process_query["fields"] is not None else None
+    return process_query["limit"], fields_key, process_query["sort"]
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+""" PROJETO A - Implementação da Funcionalidade Inicial do Dashboard """
+
+# definindo a rota da API que retornam a lista de processos em execução
+@app_flask_instance.route('/api/processes')
+def handle_api_get_processes():
+
+    # obtém a fonte de dados da requisição (Controller local ou host da frota)
+    api_controller, error_response = _resolve_api_controller()
+    if error_response:
+        return error_response
+
+    # formato opcional: 'columnar' envia uma única lista de chaves e uma linha de valores por processo
+    response_format, error_response = _parse_response_format()
+    if error_response:
+        return error_response
+
+    # limit=, fields= e sort= (ver _parse_process_query)
+    process_query, error_response = _parse_process_query()
+    if error_response:
+        return error_response
+
+    api_controller.note_demand("processes", process_query["fields"])
+
+    def _build_processes_payload():
+
+        # obtém a lista de processos do cache (dados coletados anteriormente)
+        processes_data_list = _project_processes(api_controller.get_all_processes_info_from_cache(), process_query)
+        return response_encoding.to_columnar(processes_data_list) if response_format == "columnar" else processes_data_list
+
+    return _snapshot_json_response(api_controller, "processes", (response_format, *_process_query_key(process_query)),
+                                   _build_processes_payload)
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# definindo a rota que retorna várias seções de uma mesma versão do snapshot em uma única requisição
+#
+#   /api/snapshot?include=cpu,memory,processes&fields=pid,name,cpu_percent&sort=cpu_percent&limit=10
+#
+# cada seção é serializada uma única vez por versão (e projeção) e a resposta é montada pela concatenação desses
+# fragmentos; a resposta completa também fica no cache de respostas pré-codificadas, já comprimida
+@app_flask_instance.route('/api/snapshot')
+def handle_api_get_snapshot():
+
+    # obtém a fonte de dados da requisição (Controller local ou host da frota)
+    api_controller, error_response = _resolve_api_controller()
+    if error_response:
+        return error_response
+
+    include_param = request.args.get('include')
+    included_sections = SNAPSHOT_DEFAULT_INCLUDE
+    if include_param:
+        included_sections = tuple(sorted({section.strip() for section in include_param.split(",") if section.strip()}))
+    invalid_sections = [section for section in included_sections if section not in SNAPSHOT_INCLUDE_SECTIONS]
+    if invalid_sections or not included_sections:
+        return jsonify({"error": f"Seções inválidas: {', '.join(invalid_sections) or include_param}.",
+                        "sections": list(SNAPSHOT_INCLUDE_SECTIONS)}), 400
+
+    # format= vale para as listas (filesystem e processes); limit=, fields= e sort= para a lista de processos
+    response_format, error_response = _parse_response_format()
+    if error_response:
+        return error_response
+    process_query = None
+    if "processes" in included_sections:
+        process_query, error_response = _parse_process_query()
+        if error_response:
+            return error_response
+
+    if "cpu" in included_sections:
+        api_controller.note_demand("cpu")
+    if process_query is not None:
+        api_controller.note_demand("processes", process_query["fields"])
+
+    # todas as seções vêm do mesmo snapshot publicado (lido depois da demanda, que pode antecipar um ciclo)
+    published_snapshot = api_controller.get_snapshot()
+    snapshot_version = published_snapshot.version
+    route_key = "snapshot" if app_cluster_cache is None else f"snapshot@{request.args.get('host', '')}"
+
+    def _build_filesystem_section():
+        filesystem_data_list = published_snapshot.filesystem
+        return response_encoding.to_columnar(filesystem_data_list) if response_format == "columnar" else filesystem_data_list
+
+    def _build_processes_section():
+        processes_data_list = _project_processes(published_snapshot.processes, process_query)
+        return response_encoding.to_columnar(processes_data_list) if response_format == "columnar" else processes_data_list
+
+    # (função que monta a seção, variante da seção no cache)
+    section_builders = {
+        "cpu": (lambda: published_snapshot.cpu, None),
+        "memory": (lambda: published_snapshot.memory, None),
+        "filesystem": (_build_filesystem_section, response_format),
+        "processes": (_build_processes_section, (response_format, *_process_query_key(process_query)) if process_query else None),
+    }
+
+    def _build_snapshot_body():
+        section_fragments = {
+            "version": str(snapshot_version).encode("ascii"),
+            "timestamp": response_encoding.serialize_payload(published_snapshot.timestamp, route_key),
+        }
+        for section_name in included_sections:
+            section_fn, section_variant_key = section_builders[section_name]
+            section_fragments[section_name] = app_encoded_response_cache.get_or_encode(
+                f"{route_key}/{section_name}", snapshot_version, section_variant_key, section_fn)[0]
+        return response_encoding.join_json_fragments(section_fragments)
+
+    snapshot_variant_key = (included_sections, response_format, *(_process_query_key(process_query) if process_query else ()))
+    content_encoding = response_encoding.negotiate_content_encoding(request.headers.get('Accept-Encoding'))
+    body, applied_encoding = app_encoded_response_cache.get_or_encode_body(route_key, snapshot_version, snapshot_variant_key,
+                                                                           _build_snapshot_body, content_encoding)
+    return _encoded_json_response(body, applied_encoding)
 
 # ---------------------------------------------------------------------------------------------------------------------------------
 
@@ -46,8 +335,16 @@ def handle_api_get_processes():
 @app_flask_instance.route('/api/process/<int:pid_param>')
 def handle_api_get_specific_process(pid_param):
 
+    # obtém a fonte de dados da requisição (Controller local ou host da frota)
+    api_controller, error_response = _resolve_api_controller()
+    if error_response:
+        return error_response
+
+    # o detalhe de um processo usa todos os campos coletados
+    api_controller.note_demand("process_detail")
+
     # busca no cache as informações do processo através do PID
-    process_detail_data = app_api_controller.get_specific_process_info_from_cache(pid_param)
+    process_detail_data = api_controller.get_specific_process_info_from_cache(pid_param)
     
     # se o processo for encontrado, retorna os dados em formato JSON
     if process_detail_data:
@@ -61,9 +358,33 @@ def handle_api_get_specific_process(pid_param):
 @app_flask_instance.route('/api/memory')
 def handle_api_get_memory():
 
+    # obtém a fonte de dados da requisição (Controller local ou host da frota)
+    api_controller, error_response = _resolve_api_controller()
+    if error_response:
+        return error_response
+
     # obtém as informações de uso de memória do sistema a partir do cache
-    memory_usage_data = app_api_controller.get_system_memory_info_from_cache()
-    return jsonify(memory_usage_data)
+    return _snapshot_json_response(api_controller, "memory", None, api_controller.get_system_memory_info_from_cache)
+
+# definindo a rota que retorna o histórico de memória (uso, paginação, faltas de página e PSI) dos últimos window= segundos
+@app_flask_instance.route('/api/memory/history')
+def handle_api_get_memory_history():
+
+    # obtém a fonte de dados da requisição (Controller local ou host da frota)
+    api_controller, error_response = _resolve_api_controller()
+    if error_response:
+        return error_response
+
+    window_param_str_val = request.args.get('window', default='300')
+    try:
+        window_seconds = min(max(float(window_param_str_val), 0.0), 86400.0)
+    except ValueError:
+        return jsonify({"error": "O parâmetro 'window' deve ser numérico (segundos)."}), 400
+
+    memory_history = api_controller.get_memory_history(window_seconds)
+    if memory_history is None:
+        return jsonify({"error": "Histórico de memória indisponível para esta fonte de dados."}), 404
+    return jsonify(memory_history)
 
 # ---------------------------------------------------------------------------------------------------------------------------------
 
@@ -71,9 +392,38 @@ def handle_api_get_memory():
 @app_flask_instance.route('/api/cpu')
 def handle_api_get_cpu():
 
+    # obtém a fonte de dados da requisição (Controller local ou host da frota)
+    api_controller, error_response = _resolve_api_controller()
+    if error_response:
+        return error_response
+
+    # o card de CPU só precisa das contagens de processos e threads (apenas /proc/<pid>/stat)
+    api_controller.note_demand("cpu")
+
     # obtém as informações de uso de CPU do sistema a partir do cache
-    cpu_usage_data = app_api_controller.get_system_cpu_info_from_cache()
-    return jsonify(cpu_usage_data)
+    return _snapshot_json_response(api_controller, "cpu", None, api_controller.get_system_cpu_info_from_cache)
+
+# definindo a rota que retorna a série do amostrador de CPU de alta frequência (window= segundos, cores=1 inclui os núcleos)
+@app_flask_instance.route('/api/cpu/history')
+def handle_api_get_cpu_history():
+
+    # obtém a fonte de dados da requisição (Controller local ou host da frota)
+    api_controller, error_response = _resolve_api_controller()
+    if error_response:
+        return error_response
+
+    window_param_str_val = request.args.get('window', default='60')
+    try:
+        window_seconds = min(max(float(window_param_str_val), 0.0), 3600.0)
+    except ValueError:
+        return jsonify({"error": "O parâmetro 'window' deve ser numérico (segundos)."}), 400
+
+    # o amostrador só trabalha enquanto o card de CPU é consultado
+    api_controller.note_demand("cpu")
+    cpu_history = api_controller.get_cpu_history(window_seconds, include_cores=request.args.get('cores') == '1')
+    if cpu_history is None:
+        return jsonify({"error": "Amostrador de CPU de alta frequência indisponível para esta fonte de dados."}), 404
+    return jsonify(cpu_history)
 
 # ---------------------------------------------------------------------------------------------------------------------------------
 
@@ -83,8 +433,21 @@ def handle_api_get_cpu():
 @app_flask_instance.route('/api/filesystem')
 def handle_api_get_filesystem():
 
+    # obtém a fonte de dados da requisição (Controller local ou host da frota)
+    api_controller, error_response = _resolve_api_controller()
+    if error_response:
+        return error_response
+
+    response_format, error_response = _parse_response_format()
+    if error_response:
+        return error_response
+
     # obtém as informações do sistema de arquivos a partir do cache
-    return jsonify(app_api_controller.get_filesystem_info_from_cache())
+    def _build_filesystem_payload():
+        filesystem_data_list = api_controller.get_filesystem_info_from_cache()
+        return response_encoding.to_columnar(filesystem_data_list) if response_format == "columnar" else filesystem_data_list
+
+    return _snapshot_json_response(api_controller, "filesystem", response_format, _build_filesystem_payload)
 
 # ---------------------------------------------------------------------------------------------------------------------------------
 
@@ -92,21 +455,92 @@ def handle_api_get_filesystem():
 @app_flask_instance.route('/api/filesystem/directory')
 def handle_api_get_directory():
 
+    # obtém a fonte de dados da requisição (Controller local ou host da frota)
+    api_controller, error_response = _resolve_api_controller()
+    if error_response:
+        return error_response
+
     # obtém o parâmetro 'path' da URL, com valor padrão sendo a raiz do sistema
     path = request.args.get('path', default='/')
     
     # chama a função do controller para obter o conteúdo do diretório a partir do cache
-    directory_data = app_api_controller.get_directory_contents(path)
+    directory_data = api_controller.get_directory_contents(path)
+
+    # com usage=1, acrescenta o tamanho recursivo já calculado (parcial enquanto a varredura não termina) a cada
+    # subdiretório; a varredura só é iniciada por POST em /api/filesystem/directory/usage e o cache não é alterado
+    if request.args.get('usage') == '1':
+        directory_usage = api_controller.get_directory_usage(directory_data["path"], start=False)
+        if directory_usage is not None and "children" in directory_usage:
+            usage_complete = directory_usage["state"] == "done"
+            directory_data = {**directory_data, "disk_usage": directory_usage, "contents": [
+                {**entry, "disk_usage_bytes": directory_usage["children"].get(entry["name"], {}).get("bytes", 0),
+                 "disk_usage_complete": usage_complete} if entry["is_dir"] else entry
+                for entry in directory_data["contents"]]}
+        else:
+            directory_data = {**directory_data, "disk_usage": directory_usage}
     return jsonify(directory_data)
 
+# definindo a rota que controla a varredura de uso de disco de um diretório: GET retorna o progresso e os tamanhos
+# (parciais ou finais), POST inicia a varredura e DELETE a cancela
+@app_flask_instance.route('/api/filesystem/directory/usage', methods=['GET', 'POST', 'DELETE'])
+def handle_api_directory_usage():
+
+    # obtém a fonte de dados da requisição (Controller local ou host da frota)
+    api_controller, error_response = _resolve_api_controller()
+    if error_response:
+        return error_response
+
+    path = request.args.get('path', default='/')
+    if request.method == 'DELETE':
+        directory_usage = api_controller.cancel_directory_usage(path)
+    else:
+        directory_usage = api_controller.get_directory_usage(path, start=request.method == 'POST')
+
+    if directory_usage is None:
+        return jsonify({"error": f"Nenhuma varredura de uso de disco para {path} (ou indisponível para esta fonte de dados)."}), 404
+    if directory_usage["state"] == "error":
+        return jsonify(directory_usage), 404
+    return jsonify(directory_usage), 202 if request.method == 'POST' and directory_usage["state"] == "running" else 200
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# definindo a rota da API que busca arquivos e diretórios pelo nome (substring, sem diferenciar maiúsculas) no índice
+# dos sistemas de arquivos locais; a primeira busca inicia a construção do índice em segundo plano
+@app_flask_instance.route('/api/filesystem/search')
+def handle_api_search_files():
+
+    # obtém a fonte de dados da requisição (Controller local ou host da frota)
+    api_controller, error_response = _resolve_api_controller()
+    if error_response:
+        return error_response
+
+    query = request.args.get('q', default='').strip()
+    if not query:
+        return jsonify({"error": "Informe o texto da busca no parâmetro 'q'."}), 400
+    if "\0" in query:
+        return jsonify({"error": "O texto da busca não pode conter o caractere NUL."}), 400
+
+    limit_param_str_val = request.args.get('limit', default='50')
+    limit_int_val = min(int(limit_param_str_val), 1000) if limit_param_str_val.isdigit() and int(limit_param_str_val) > 0 else 50
+
+    search_data = api_controller.search_files(query, limit_int_val)
+    if search_data is None:
+        return jsonify({"error": "Busca de arquivos indisponível para esta fonte de dados."}), 404
+    return jsonify(search_data)
+
 # ---------------------------------------------------------------------------------------------------------------------------------
 
 # definindo a rota da API que retornam as estatísticas de E/S de um processo específico, identificado pelo PID
 @app_flask_instance.route('/api/process/<int:pid>/io')
 def handle_api_get_process_io(pid):
 
+    # obtém a fonte de dados da requisição (Controller local ou host da frota)
+    api_controller, error_response = _resolve_api_controller()
+    if error_response:
+        return error_response
+
     # obtém as informações de E/S do processo a partir do cache usando o PID
-    io_data = app_api_controller.get_process_io_info(pid)
+    io_data = api_controller.get_process_io_info(pid)
 
     # se não houver dados de E/S ou arquivos abertos, retorna um erro 404
     if not io_data.get('io_stats') and not io_data.get('open_files'):
@@ -116,6 +550,169 @@ def handle_api_get_process_io(pid):
 
 # ---------------------------------------------------------------------------------------------------------------------------------
 
+""" Agregação por cgroup v2 (contêineres, serviços e sessões do systemd) """
+
+# formas de visualização aceitas pelo parâmetro view= da rota de cgroups
+CGROUP_VIEWS = ("tree", "top")
+
+# definindo a rota que retorna o uso de CPU, memória e E/S por cgroup, em árvore (view=tree) ou top-N (view=top&by=&n=)
+@app_flask_instance.route('/api/cgroups')
+def handle_api_get_cgroups():
+
+    # obtém a fonte de dados da requisição (Controller local ou host da frota)
+    api_controller, error_response = _resolve_api_controller()
+    if error_response:
+        return error_response
+
+    view_name = request.args.get('view', default='tree')
+    if view_name not in CGROUP_VIEWS:
+        return jsonify({"error": f"Visão inválida. Use uma de: {', '.join(CGROUP_VIEWS)}."}), 400
+
+    metric_name = request.args.get('by', default='cpu_percent')
+    if metric_name not in cgroups.CGROUP_TOP_METRICS:
+        return jsonify({"error": f"Métrica inválida. Use uma de: {', '.join(cgroups.CGROUP_TOP_METRICS)}."}), 400
+
+    limit_param_str_val = request.args.get('n', default='10')
+    limit_int_val = int(limit_param_str_val) if limit_param_str_val.isdigit() and int(limit_param_str_val) > 0 else 10
+
+    # a agregação só é coletada enquanto houver requisições a esta rota
+    api_controller.note_demand("cgroups")
+    cgroups_data = api_controller.get_cgroups_info_from_cache()
+    if cgroups_data is None:
+        return jsonify({"error": "Agregação por cgroup indisponível para esta fonte de dados."}), 404
+    if not cgroups_data["available"]:
+        return jsonify({"error": "Hierarquia unificada de cgroups (v2) não encontrada em /sys/fs/cgroup."}), 404
+
+    def _build_cgroups_payload():
+        if view_name == "top":
+            return {"by": metric_name, "cgroups": cgroups.top_cgroups(cgroups_data["cgroups"], metric_name, limit_int_val)}
+        return {"tree": cgroups.build_cgroup_tree(cgroups_data["cgroups"])}
+
+    variant_key = (view_name, metric_name, limit_int_val) if view_name == "top" else (view_name,)
+    return _snapshot_json_response(api_controller, "cgroups", variant_key, _build_cgroups_payload)
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# definindo a rota que retorna o estado do regulador de custo da coleta (nível de degradação, intervalo e orçamento)
+@app_flask_instance.route('/api/collector/status')
+def handle_api_get_collector_status():
+
+    # obtém a fonte de dados da requisição (Controller local ou host da frota)
+    api_controller, error_response = _resolve_api_controller()
+    if error_response:
+        return error_response
+
+    collector_status = api_controller.get_collector_status()
+    if collector_status is None:
+        return jsonify({"error": "Estado da coleta disponível apenas no host local."}), 404
+    return jsonify(collector_status)
+
+# definindo a rota que controla o modo replay: GET retorna a posição; POST aceita {"timestamp": unix, "speed": n}
+@app_flask_instance.route('/api/replay', methods=['GET', 'POST'])
+def handle_api_replay():
+
+    if not isinstance(app_api_controller, replay.ReplayController):
+        return jsonify({"error": "Disponível apenas no modo replay (SO_DASHBOARD_REPLAY_FILE)."}), 404
+
+    if request.method == 'POST':
+        replay_request = request.get_json(silent=True) or {}
+        try:
+            if replay_request.get("speed") is not None:
+                app_api_controller.set_speed(float(replay_request["speed"]))
+            if replay_request.get("timestamp") is not None:
+                app_api_controller.seek(float(replay_request["timestamp"]))
+        except (TypeError, ValueError):
+            return jsonify({"error": "Os campos 'timestamp' e 'speed' devem ser numéricos."}), 400
+
+    return jsonify(app_api_controller.replay_status())
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+""" Modo agregador - visão da frota de hosts """
+
+# definindo a rota que lista os hosts conhecidos pelo agregador, com versão e horário da última mensagem
+@app_flask_instance.route('/api/fleet/hosts')
+def handle_api_get_fleet_hosts():
+
+    if app_cluster_cache is None:
+        return jsonify({"error": "Disponível apenas no modo agregador (SO_DASHBOARD_MODE=aggregator)."}), 404
+    return jsonify(app_cluster_cache.hosts_summary())
+
+# definindo a rota que retorna os N processos com maior uso em toda a frota
+@app_flask_instance.route('/api/fleet/top')
+def handle_api_get_fleet_top():
+
+    if app_cluster_cache is None:
+        return jsonify({"error": "Disponível apenas no modo agregador (SO_DASHBOARD_MODE=aggregator)."}), 404
+
+    metric_name = request.args.get('by', default='cpu_percent')
+    if metric_name not in aggregator.FLEET_TOP_METRICS:
+        return jsonify({"error": f"Métrica inválida. Use uma de: {', '.join(aggregator.FLEET_TOP_METRICS)}."}), 400
+
+    limit_param_str_val = request.args.get('n', default='10')
+    limit_int_val = int(limit_param_str_val) if limit_param_str_val.isdigit() and int(limit_param_str_val) > 0 else 10
+    return jsonify(app_cluster_cache.fleet_top(metric_name, limit_int_val))
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# definindo a rota da API que expõe as métricas internas do backend no formato de texto do Prometheus
+@app_flask_instance.route('/api/metrics')
+def handle_api_get_metrics():
+    return Response(metrics.REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+""" Depuração - profiling sob demanda (exige o token definido em SO_DASHBOARD_DEBUG_TOKEN) """
+
+# função auxiliar que valida o token enviado no cabeçalho X-Debug-Token ou Authorization: Bearer
+def _is_debug_request_authorized():
+    received_token = request.headers.get("X-Debug-Token", "")
+    authorization_header = request.headers.get("Authorization", "")
+    if not received_token and authorization_header.startswith("Bearer "):
+        received_token = authorization_header[len("Bearer "):]
+    return profiler.is_debug_token_valid(received_token)
+
+# definindo a rota que inicia (POST) ou consulta (GET) uma sessão de profiling dos ciclos de coleta ou das requisições
+@app_flask_instance.route('/api/debug/profile', methods=['GET', 'POST'])
+def handle_api_debug_profile():
+
+    # sem token configurado a rota fica indisponível; com token inválido, o acesso é negado
+    if not profiler.DEBUG_TOKEN:
+        return jsonify({"error": "Profiling desabilitado. Defina SO_DASHBOARD_DEBUG_TOKEN para habilitar."}), 404
+    if not _is_debug_request_authorized():
+        return jsonify({"error": "Token de depuração inválido."}), 401
+
+    if request.method == 'GET':
+        return jsonify(profiler.PROFILER.status())
+
+    # parâmetros aceitos tanto na URL quanto no corpo JSON
+    params = {**request.args.to_dict(), **(request.get_json(silent=True) or {})}
+    try:
+        count = int(params.get("count", 3))
+        interval_seconds = float(params.get("interval_ms", profiler.DEFAULT_SAMPLER_INTERVAL_SECONDS * 1000)) / 1000.0
+    except (TypeError, ValueError):
+        return jsonify({"error": "Parâmetros 'count' e 'interval_ms' devem ser numéricos."}), 400
+
+    session, error_message = profiler.PROFILER.start(params.get("target", "collector"), params.get("mode", "cprofile"),
+                                                     count, interval_seconds)
+    if session is None:
+        return jsonify({"error": error_message}), 409 if "ativa" in error_message else 400
+    return jsonify(session.to_dict()), 202
+
+# definindo a rota que baixa um perfil concluído (.pstats ou .collapsed)
+@app_flask_instance.route('/api/debug/profile/<file_name>')
+def handle_api_debug_profile_download(file_name):
+
+    if not profiler.DEBUG_TOKEN or not _is_debug_request_authorized():
+        return jsonify({"error": "Token de depuração inválido."}), 401
+
+    profile_path = profiler.PROFILER.finished_profile_path(file_name)
+    if profile_path is None or not os.path.isfile(profile_path):
+        return jsonify({"error": f"Perfil {file_name} não encontrado."}), 404
+    return send_file(profile_path, as_attachment=True)
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
 # definindo a rota raiz / para verificar se a API está em execução
 @app_flask_instance.route('/')
 def handle_api_root():
@@ -125,8 +722,9 @@ def handle_api_root():
 
 if __name__ == "__main__":
 
-    # iniciando o servidor Flask na porta 5000
-    print(f"Iniciando servidor Flask backend em http://0.0.0.0:5000")
+    # iniciando o servidor Flask na porta 5000 (ou na definida em SO_DASHBOARD_PORT, útil para vários agentes na mesma máquina)
+    server_port = int(os.environ.get("SO_DASHBOARD_PORT", "5000"))
+    print(f"Iniciando servidor Flask backend em http://0.0.0.0:{server_port}")
 
     # desabilitando o modo debug e o recarregamento automático para evitar problemas com threads
-    app_flask_instance.run(host='0.0.0.0', port=5000, debug=False, use_reloader=False)
+    app_flask_instance.run(host='0.0.0.0', port=server_port, debug=False, use_reloader=False)
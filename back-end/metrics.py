@@ -0,0 +1,298 @@
+import sys
+import time
+import threading
+import functools
+
+# limites padrão (em segundos) dos buckets dos histogramas de latência
+DEFAULT_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função auxiliar que formata os rótulos de uma amostra no formato de texto do Prometheus
+def _format_labels(label_names, label_values, extra_pairs=()):
+
+    pairs = list(zip(label_names, label_values)) + list(extra_pairs)
+    if not pairs:
+        return ""
+
+    # escapa barras, aspas e quebras de linha, conforme a especificação do formato de texto
+    escaped = [(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for name, value in pairs]
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+# função auxiliar que formata um valor numérico sem notação desnecessária
+def _format_value(value):
+
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# classe base das métricas: nome, descrição e rótulos, com uma trava própria para atualizações concorrentes
+class _Metric:
+
+    metric_type = "untyped"
+
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    # função que retorna as linhas de texto desta métrica no formato do Prometheus
+    def render_lines(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.metric_type}"]
+        with self._lock:
+            items = sorted(self._values.items())
+
+        # métricas sem rótulos são expostas com zero antes da primeira atualização, para facilitar alertas
+        if not items and not self.label_names:
+            items = [((), 0)]
+        for label_values, value in items:
+            lines.append(f"{self.name}{_format_labels(self.label_names, label_values)} {_format_value(value)}")
+        return lines
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# contador monotônico (ex: total de ciclos, acertos de cache)
+class Counter(_Metric):
+
+    metric_type = "counter"
+
+    def inc(self, amount=1, *label_values):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def get(self, *label_values):
+        with self._lock:
+            return self._values.get(label_values, 0)
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# medidor que pode subir ou descer; aceita uma função de leitura avaliada no momento da coleta
+class Gauge(_Metric):
+
+    metric_type = "gauge"
+
+    def __init__(self, name, help_text, label_names=(), value_fn=None):
+        super().__init__(name, help_text, label_names)
+        self._value_fn = value_fn
+
+    def set(self, value, *label_values):
+        with self._lock:
+            self._values[label_values] = value
+
+    def get(self, *label_values):
+        with self._lock:
+            return self._values.get(label_values, 0)
+
+    def render_lines(self):
+        if self._value_fn is not None:
+            try:
+                self.set(self._value_fn())
+            except Exception:
+                pass # uma falha na leitura não deve impedir a exposição das demais métricas
+        return super().render_lines()
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# histograma com buckets fixos, acumulando contagem e soma por combinação de rótulos
+class Histogram(_Metric):
+
+    metric_type = "histogram"
+
+    def __init__(self, name, help_text, label_names=(), buckets=DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            state = self._values.get(label_values)
+            if state is None:
+                state = self._values[label_values] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+
+            # incrementa apenas o primeiro bucket que comporta o valor; a soma cumulativa é feita na exposição
+            for bucket_index, upper_bound in enumerate(self.buckets):
+                if value <= upper_bound:
+                    state["counts"][bucket_index] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+
+    # função que retorna um resumo (contagem, soma) para uso interno
+    def summary(self, *label_values):
+        with self._lock:
+            state = self._values.get(label_values)
+            return (state["count"], state["sum"]) if state else (0, 0.0)
+
+    def render_lines(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.metric_type}"]
+        with self._lock:
+            items = sorted((labels, {"counts": list(s["counts"]), "sum": s["sum"], "count": s["count"]})
+                           for labels, s in self._values.items())
+        for label_values, state in items:
+            cumulative = 0
+            for upper_bound, bucket_count in zip(self.buckets, state["counts"]):
+                cumulative += bucket_count
+                labels_text = _format_labels(self.label_names, label_values, [("le", _format_value(float(upper_bound)))])
+                lines.append(f"{self.name}_bucket{labels_text} {cumulative}")
+            labels_text = _format_labels(self.label_names, label_values, [("le", "+Inf")])
+            lines.append(f"{self.name}_bucket{labels_text} {state['count']}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, label_values)} {_format_value(state['sum'])}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, label_values)} {state['count']}")
+        return lines
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# registro que guarda as métricas na ordem de criação e gera a exposição completa em texto
+class MetricsRegistry:
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, label_names=()):
+        return self.register(Counter(name, help_text, label_names))
+
+    def gauge(self, name, help_text, label_names=(), value_fn=None):
+        return self.register(Gauge(name, help_text, label_names, value_fn))
+
+    def histogram(self, name, help_text, label_names=(), buckets=DEFAULT_LATENCY_BUCKETS):
+        return self.register(Histogram(name, help_text, label_names, buckets))
+
+    # função que gera o texto no formato de exposição do Prometheus (versão 0.0.4)
+    def render(self):
+        with self._lock:
+            metrics_snapshot = list(self._metrics)
+        lines = []
+        for metric in metrics_snapshot:
+            lines.extend(metric.render_lines())
+        return "\n".join(lines) + "\n"
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# registro global do backend e métricas compartilhadas entre model, controller e main
+REGISTRY = MetricsRegistry()
+
+COLLECTOR_DURATION_SECONDS = REGISTRY.histogram(
+    "so_dashboard_collector_duration_seconds", "Latência de cada coletor do model.", ("collector",))
+COLLECTOR_FILES_OPENED_TOTAL = REGISTRY.counter(
+    "so_dashboard_collector_files_opened_total", "Arquivos abertos pelos coletores do model.", ("collector",))
+COLLECTOR_ERRORS_TOTAL = REGISTRY.counter(
+    "so_dashboard_collector_errors_total", "Exceções propagadas pelos coletores do model.", ("collector",))
+
+UPDATE_CYCLE_DURATION_SECONDS = REGISTRY.histogram(
+    "so_dashboard_update_cycle_duration_seconds", "Duração de cada ciclo de atualização do cache.")
+UPDATE_CYCLES_TOTAL = REGISTRY.counter(
+    "so_dashboard_update_cycles_total", "Ciclos de atualização do cache executados.")
+UPDATE_CYCLE_OVERRUNS_TOTAL = REGISTRY.counter(
+    "so_dashboard_update_cycle_overruns_total", "Ciclos cuja duração excedeu o intervalo de atualização.")
+UPDATE_INTERVAL_SECONDS = REGISTRY.gauge(
+    "so_dashboard_update_interval_seconds", "Intervalo atual entre ciclos de atualização (alongado pelo regulador de custo).")
+STARTUP_SECONDS = REGISTRY.gauge(
+    "so_dashboard_startup_seconds", "Segundos desde a criação do Controller até o primeiro snapshot parcial e o primeiro completo.", ("stage",))
+LAST_UPDATE_TIMESTAMP_SECONDS = REGISTRY.gauge(
+    "so_dashboard_last_update_timestamp_seconds", "Horário (Unix) do último ciclo de atualização concluído.")
+COLLECTOR_CYCLE_CPU_SECONDS_TOTAL = REGISTRY.counter(
+    "so_dashboard_collector_cycle_cpu_seconds_total", "Tempo de CPU consumido pela thread de coleta nos ciclos de atualização.")
+COLLECTOR_DEGRADATION_LEVEL = REGISTRY.gauge(
+    "so_dashboard_collector_degradation_level", "Nível de degradação atual da coleta (0 = todos os detalhes).")
+UPDATE_LAG_SECONDS = REGISTRY.gauge(
+    "so_dashboard_update_lag_seconds", "Segundos desde o último ciclo de atualização concluído.",
+    value_fn=lambda: (time.time() - LAST_UPDATE_TIMESTAMP_SECONDS.get()) if LAST_UPDATE_TIMESTAMP_SECONDS.get() else 0.0)
+
+CACHE_REQUESTS_TOTAL = REGISTRY.counter(
+    "so_dashboard_cache_requests_total", "Consultas aos caches sob demanda, por resultado (hit/miss/coalesced/stale).", ("cache", "result"))
+CACHE_ENTRIES = REGISTRY.gauge(
+    "so_dashboard_cache_entries", "Entradas atualmente armazenadas nos caches sob demanda.", ("cache",))
+CACHE_LOCK_WAIT_SECONDS = REGISTRY.histogram(
+    "so_dashboard_cache_lock_wait_seconds", "Tempo de espera pela trava data_cache_lock.", ("operation",),
+    buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5))
+
+PSS_SAMPLES_TOTAL = REGISTRY.counter(
+    "so_dashboard_pss_samples_total", "Leituras de smaps_rollup feitas pelo amostrador de PSS/USS.")
+PSS_SAMPLER_CPU_SECONDS_TOTAL = REGISTRY.counter(
+    "so_dashboard_pss_sampler_cpu_seconds_total", "Tempo de CPU consumido pelo amostrador de PSS/USS.")
+PSS_SAMPLER_BUDGET_EXHAUSTED_TOTAL = REGISTRY.counter(
+    "so_dashboard_pss_sampler_budget_exhausted_total", "Rodadas do amostrador de PSS/USS interrompidas pelo orçamento de CPU.")
+
+CPU_SAMPLER_SAMPLES_TOTAL = REGISTRY.counter(
+    "so_dashboard_cpu_sampler_samples_total", "Leituras de /proc/stat feitas pelo amostrador de CPU de alta frequência.")
+CPU_SAMPLER_CPU_SECONDS_TOTAL = REGISTRY.counter(
+    "so_dashboard_cpu_sampler_cpu_seconds_total", "Tempo de CPU consumido pelo amostrador de CPU de alta frequência.")
+
+DISK_USAGE_DIRECTORIES_TOTAL = REGISTRY.counter(
+    "so_dashboard_disk_usage_directories_total", "Diretórios contabilizados pelo motor de uso de disco, por origem da listagem (scandir/cache).",
+    ("source",))
+
+RECORDER_BYTES_WRITTEN_TOTAL = REGISTRY.counter(
+    "so_dashboard_recorder_bytes_written_total", "Bytes gravados pelo gravador de snapshots.")
+RECORDER_DROPPED_SNAPSHOTS_TOTAL = REGISTRY.counter(
+    "so_dashboard_recorder_dropped_snapshots_total", "Snapshots descartados porque a fila do gravador estava cheia.")
+
+HTTP_REQUEST_DURATION_SECONDS = REGISTRY.histogram(
+    "so_dashboard_http_request_duration_seconds", "Latência das requisições da API por rota.", ("endpoint",))
+RESPONSE_SERIALIZATION_SECONDS = REGISTRY.histogram(
+    "so_dashboard_response_serialization_seconds", "Tempo gasto serializando respostas JSON.", ("endpoint",))
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# contexto por thread do coletor em execução, para atribuir as aberturas de arquivos ao coletor correto
+_collector_context = threading.local()
+_open_audit_hook_installed = False
+
+# função que instala o hook de auditoria que conta as chamadas a open() feitas dentro de um coletor
+def _install_open_audit_hook():
+
+    global _open_audit_hook_installed
+    if _open_audit_hook_installed:
+        return
+
+    def _count_open_event(event_name, _event_args):
+        if event_name == "open":
+            collector_name = getattr(_collector_context, "name", None)
+            if collector_name is not None:
+                _collector_context.files_opened += 1
+
+    sys.addaudithook(_count_open_event)
+    _open_audit_hook_installed = True
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# decorador que mede latência, arquivos abertos e erros de uma função coletora do model
+def instrument_collector(collector_name):
+
+    _install_open_audit_hook()
+
+    def decorator(collector_fn):
+
+        @functools.wraps(collector_fn)
+        def wrapper(*args, **kwargs):
+
+            # coletores aninhados (ex: get_thread_details dentro de get_processes) contam apenas no mais externo
+            if getattr(_collector_context, "name", None) is not None:
+                return collector_fn(*args, **kwargs)
+
+            _collector_context.name, _collector_context.files_opened = collector_name, 0
+            started_at = time.perf_counter()
+            try:
+                return collector_fn(*args, **kwargs)
+            except Exception:
+                COLLECTOR_ERRORS_TOTAL.inc(1, collector_name)
+                raise
+            finally:
+                COLLECTOR_DURATION_SECONDS.observe(time.perf_counter() - started_at, collector_name)
+                COLLECTOR_FILES_OPENED_TOTAL.inc(_collector_context.files_opened, collector_name)
+                _collector_context.name = None
+
+        return wrapper
+
+    return decorator
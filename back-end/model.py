@@ -2,11 +2,28 @@ import os
 import time
 import datetime
 
+import metrics
+import procfs_reader
+
+# raízes do procfs e do sysfs e caminho do arquivo de usuários; configuráveis para permitir apontar os coletores
+# para árvores sintéticas (ver procfs_fixture.py) ao medir o desempenho sem depender do hardware real
+PROC_ROOT = os.environ.get("SO_DASHBOARD_PROC_ROOT", "/proc")
+SYS_ROOT = os.environ.get("SO_DASHBOARD_SYS_ROOT", "/sys")
+PASSWD_PATH = os.environ.get("SO_DASHBOARD_PASSWD_PATH", "/etc/passwd")
+
 # variáveis globais para armazenar os dados de CPU e processos
 previous_overall_cpu_times = None
 previous_per_core_cpu_times = {} 
 previous_process_cpu_times = {}
 
+# starttime (em jiffies desde o boot) de cada PID visto na última varredura de processos; o par (pid, starttime)
+# identifica um processo de forma única, mesmo quando o kernel reutiliza o PID
+process_start_times = {}
+
+# cache de campos estáticos por processo (ex: cgroup), lidos uma única vez enquanto o processo existir;
+# cada entrada guarda (starttime, campos) e é descartada quando o PID some ou passa a ser de outro processo
+process_static_cache = {}
+
 # mapeamento de dos significados de status de processos do Linux
 PROCESS_STATUS_MAP = {
     'S': 'Dormindo', 'R': 'Rodando', 'Z': 'Zumbi', 'T': 'Parado', 
@@ -14,6 +31,55 @@ PROCESS_STATUS_MAP = {
     'P': 'Parked', 't': 'Parado (Tracing)'
 }
 
+# campos de memória lidos de /proc/<pid>/status (em kB), com a chave usada em memory_details_kb
+PROCESS_STATUS_MEMORY_FIELDS = tuple((f"{status_key}:".encode(), detail_key) for status_key, detail_key in (
+    ("VmPeak", "vm_peak"), ("VmSize", "vms"), ("VmLck", "vm_lck_kb"), ("VmPin", "vm_pin_kb"), ("VmHWM", "vm_hwm_kb"),
+    ("VmRSS", "rss"), ("RssAnon", "rss_anon_kb"), ("RssFile", "rss_file_kb"), ("RssShmem", "rss_shmem_kb"),
+    ("VmData", "data"), ("VmStk", "stack"), ("VmExe", "code"), ("VmLib", "shared"), ("VmPTE", "page_tables"),
+    ("VmSwap", "swap"),
+))
+
+# campos de /proc/meminfo usados no cálculo de RAM e swap
+MEMINFO_FIELDS = tuple((f"{key}:".encode(), key) for key in (
+    "MemTotal", "MemFree", "MemAvailable", "Buffers", "Cached", "SReclaimable", "SwapTotal", "SwapFree"))
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que redefine as raízes do procfs/sysfs e o arquivo de usuários usados por todos os coletores
+def configure_system_roots(proc_root=None, sys_root=None, passwd_path=None):
+
+    global PROC_ROOT, SYS_ROOT, PASSWD_PATH
+    global previous_overall_cpu_times, previous_per_core_cpu_times, previous_process_cpu_times
+    global process_start_times, process_static_cache
+
+    # atualiza apenas as raízes informadas, mantendo as demais
+    if proc_root is not None: PROC_ROOT = proc_root.rstrip("/") or "/"
+    if sys_root is not None: SYS_ROOT = sys_root.rstrip("/") or "/"
+    if passwd_path is not None: PASSWD_PATH = passwd_path
+
+    # descarta os snapshots anteriores de CPU, pois pertencem a outra árvore de /proc
+    previous_overall_cpu_times = None
+    previous_per_core_cpu_times = {}
+    previous_process_cpu_times = {}
+    process_start_times = {}
+    process_static_cache = {}
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que retorna um campo estático do processo, chamando loader_fn(pid) apenas na primeira consulta
+# do processo (identificado por PID e starttime da última varredura)
+def get_process_static_field(pid, field_name, loader_fn):
+
+    starttime = process_start_times.get(pid)
+    cached_entry = process_static_cache.get(pid)
+    if cached_entry is None or cached_entry[0] != starttime:
+        cached_entry = process_static_cache[pid] = (starttime, {})
+
+    static_fields = cached_entry[1]
+    if field_name not in static_fields:
+        static_fields[field_name] = loader_fn(pid)
+    return static_fields[field_name]
+
 # ---------------------------------------------------------------------------------------------------------------------------------
 
 """                             PROJETO A - Implementação da Funcionalidade Inicial do Dashboard                                """
@@ -47,7 +113,7 @@ def get_username_from_uid(uid_str_or_int_param):
 
     # tenta abrir o arquivo /etc/passwd para buscar o nome de usuário associado ao UID
     try:
-        with open("/etc/passwd", "r") as passwd_file:
+        with open(PASSWD_PATH, "r") as passwd_file:
             for line_content in passwd_file:
                 parts = line_content.strip().split(":") # divide a linha em partes
 
@@ -67,19 +133,13 @@ def get_process_creation_time_iso(pid_param, hertz_param):
 
     # tenta ler o arquivo stat (dados brutos) para obter o tempo de criação do processo
     try:
-        with open(f"/proc/{pid_param}/stat", 'r') as stat_file:
-
-            # lê o conteúdo do arquivo e divide em partes
-            parts = stat_file.read().split()
+        _, stat_fields = procfs_reader.read_stat(f"{PROC_ROOT}/{pid_param}/stat")
 
         # obtém o tempo de início do processo em jiffies (unidade de tempo do kernel)
-        starttime_jiffies = int(parts[21])
+        starttime_jiffies = int(stat_fields[procfs_reader.STAT_STARTTIME])
 
-        # abre o arquivo uptime, que informa há quanto tempo o sistema está ligado
-        with open('/proc/uptime', 'r') as uptime_file:
-
-            # lê o tempo de atividade do sistema em segundos
-            system_uptime_seconds = float(uptime_file.readline().split()[0])
+        # lê o arquivo uptime, que informa há quanto tempo o sistema está ligado (em segundos)
+        system_uptime_seconds = float(procfs_reader.read_text(f'{PROC_ROOT}/uptime').split()[0])
 
         # calcula o tempo de criação do processo em segundos desde o boot do sistema
         boot_time_unix = time.time() - system_uptime_seconds
@@ -91,9 +151,9 @@ def get_process_creation_time_iso(pid_param, hertz_param):
         return datetime.datetime.fromtimestamp(process_create_time_unix).isoformat()
 
     # se ocorrer algum erro ao ler os arquivos, tenta obter o tempo de modificação do diretório /proc/<pid>
-    except (FileNotFoundError, IndexError, ValueError, OSError, ZeroDivisionError):
+    except (FileNotFoundError, IndexError, ValueError, TypeError, OSError, ZeroDivisionError):
         try:
-            return datetime.datetime.fromtimestamp(os.stat(f"/proc/{pid_param}").st_mtime).isoformat()
+            return datetime.datetime.fromtimestamp(os.stat(f"{PROC_ROOT}/{pid_param}").st_mtime).isoformat()
         except Exception:
             return None
 
@@ -108,27 +168,13 @@ def get_thread_details(pid_param, tid_str_param):
     # inicializa variáveis para armazenar o status e nome da thread
     thread_status_char, thread_name = "N/A", f"Thread {tid}" 
 
-    # tenta abrir o arquivo de status da thread para obter informações sobre o status e nome
+    # lê o stat da thread, que traz o nome (comm) e o estado em um único arquivo (antes eram lidos status e comm)
     try:
-
-        with open(f"/proc/{pid_param}/task/{tid}/status", 'r') as status_file:
-
-            for line in status_file:
-
-                # verifica se a linha contém informações sobre o estado da thread
-                if line.startswith("State:"):
-                    thread_status_char = line.split(":", 1)[1].strip().split()[0] # pega o primeiro caractere do estado
-
-                # verifica se a linha contém o nome da thread
-                elif line.startswith("Name:"): 
-                    thread_name = line.split(":", 1)[1].strip() # pega o nome da thread
-
-        with open(f"/proc/{pid_param}/task/{tid}/comm", 'r') as comm_file:
-
-            # abre o arquivo comm, que geralmente contém o nome mais preciso da thread e atualiza o nome se não estiver vazio
-            thread_name_comm = comm_file.read().strip()
+        thread_stat = procfs_reader.read_stat(f"{PROC_ROOT}/{pid_param}/task/{tid}/stat")
+        if thread_stat is not None:
+            thread_name_comm, thread_stat_fields = thread_stat
+            thread_status_char = thread_stat_fields[procfs_reader.STAT_STATE].decode("ascii", "replace")
             if thread_name_comm: thread_name = thread_name_comm
-
     except FileNotFoundError:
         thread_status_char = "Terminada" # se o arquivo não existir, a thread foi terminada
     except Exception:
@@ -139,14 +185,36 @@ def get_thread_details(pid_param, tid_str_param):
 
 # ---------------------------------------------------------------------------------------------------------------------------------
 
+# função que lê /proc/uptime uma única vez por ciclo e retorna o horário de boot (unix), ou None se indisponível
+def _get_boot_time_unix():
+
+    try:
+        return time.time() - float(procfs_reader.read_text(f'{PROC_ROOT}/uptime').split()[0])
+    except (FileNotFoundError, IndexError, ValueError, OSError):
+        return None
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
 # função que obtém a lista de processos em execução no sistema
-def get_processes():
+#
+# sources indica quais arquivos de /proc/<pid> ler (ver collection_plan.py); None lê todos. O arquivo stat é sempre
+# lido: ele mantém a base do cálculo de CPU e fornece nome, estado, PPID, threads, prioridade e horário de criação,
+# de modo que uma varredura só de contagens (card de CPU) abre um único arquivo por processo
+@metrics.instrument_collector("get_processes")
+def get_processes(sources=None):
 
     # variável global que armazena dados anteriores do tempo CPU dos processos para cálculo de uso CPU
-    global previous_process_cpu_times 
+    global previous_process_cpu_times, process_start_times
+
+    # arquivos opcionais que serão lidos nesta varredura
+    read_status = sources is None or "status" in sources
+    read_cmdline = sources is None or "cmdline" in sources
+    read_exe = sources is None or "exe" in sources
+    read_statm = sources is None or "statm" in sources
+    read_task = sources is None or "task" in sources
 
     # inicializa a lista de processos e o dicionário de snapshots de CPU dos processos
-    processes_list_result, current_process_cpu_snapshot = [], {}
+    processes_list_result, current_process_cpu_snapshot, current_start_times = [], {}, {}
 
     # obtém o número de jiffies por segundo do sistema, usado para calcular o uso de CPU
     hertz = os.sysconf(os.sysconf_names['SC_CLK_TCK'])
@@ -154,9 +222,14 @@ def get_processes():
     # se o valor de hertz for zero, define um valor padrão de 100 jiffies por segundo
     if hertz == 0: hertz = 100
 
+    # valores constantes durante a varredura, obtidos uma única vez (antes eram lidos a cada processo)
+    page_size_bytes = os.sysconf('SC_PAGE_SIZE')
+    num_system_cores = os.cpu_count() or 1
+    boot_time_unix = _get_boot_time_unix()
+
     try:
         # obtém a lista de PIDs ativos no sistema, filtrando apenas os diretórios numéricos em /proc
-        active_pids = [p_str for p_str in os.listdir('/proc') if p_str.isdigit()]
+        active_pids = [p_str for p_str in os.listdir(PROC_ROOT) if p_str.isdigit()]
     except FileNotFoundError: 
         # se /proc não existir (não estamos em Linux ou não tem acesso), retorna lista vazia
         return []
@@ -204,153 +277,133 @@ def get_processes():
                 }
             }
 
-            # abre o arquivo de status do processo para coletar informações detalhadas do processo
-            with open(f"/proc/{pid_int_current}/status", "r") as f_status_file:
-
-                for line_content_status in f_status_file:
-
-                    # remove espaços em branco do início e fim da linha e ignora linhas vazias
-                    line_stripped = line_content_status.strip()
-
-                    # se a linha estiver vazia, pula para a próxima iteração
-                    if not line_stripped: continue
-
-                    #s epara a linha na primeira ocorrência de ":" para chave e valor
-                    parts_line = line_stripped.split(":", 1)
-
-                    # se a linha não tiver exatamente duas partes, pula para a próxima iteração
-                    if len(parts_line) != 2: continue
-
-                    # obtém a chave e o valor da linha, removendo espaços em branco
-                    key_status = parts_line[0].strip()
-                    value_str_status = parts_line[1].strip()
-                    value_parts_status = value_str_status.split()
-
-                    current_field_int_value = 0
-
-                    # tenta converter o primeiro valor da parte do valor para inteiro, se for numérico
-                    if value_parts_status and value_parts_status[0].isdigit():
-                        try: current_field_int_value = int(value_parts_status[0])
-                        except ValueError: current_field_int_value = 0
-                    
-                    # preenche o dicionário de informações do processo com base na chave
-                    if key_status == "Name": proc_info["name"] = value_str_status
-
-                    elif key_status == "State":
-                        # mapeia o estado do processo para uma string legível
-                        if value_parts_status: proc_info["status"] = PROCESS_STATUS_MAP.get(value_parts_status[0], value_parts_status[0])
-                    
-                    elif key_status == "PPid": proc_info["ppid"] = current_field_int_value
-
-                    elif key_status == "Uid":
-                        if value_parts_status: 
-                            # obtém o nome de usuário associado ao UID do processo
-                            proc_info["user_name"] = get_username_from_uid(value_str_status) 
-                            try: proc_info["uid"] = int(value_parts_status[0])
-                            except ValueError: proc_info["uid"] = -1
-
-                    # utiliza métricas de memória para preencher o dicionário de detalhes de memória do processo
-                    elif key_status == "Threads": proc_info["threads"] = current_field_int_value
-                    elif key_status == "VmPeak": proc_info["memory_details_kb"]["vm_peak"] = current_field_int_value
-                    elif key_status == "VmSize": proc_info["memory_details_kb"]["vms"] = current_field_int_value
-                    elif key_status == "VmLck": proc_info["memory_details_kb"]["vm_lck_kb"] = current_field_int_value
-                    elif key_status == "VmPin": proc_info["memory_details_kb"]["vm_pin_kb"] = current_field_int_value
-                    elif key_status == "VmHWM": proc_info["memory_details_kb"]["vm_hwm_kb"] = current_field_int_value
-                    elif key_status == "VmRSS": proc_info["memory_details_kb"]["rss"] = current_field_int_value
-                    elif key_status == "RssAnon": proc_info["memory_details_kb"]["rss_anon_kb"] = current_field_int_value
-                    elif key_status == "RssFile": proc_info["memory_details_kb"]["rss_file_kb"] = current_field_int_value
-                    elif key_status == "RssShmem": proc_info["memory_details_kb"]["rss_shmem_kb"] = current_field_int_value
-                    elif key_status == "VmData": proc_info["memory_details_kb"]["data"] = current_field_int_value
-                    elif key_status == "VmStk": proc_info["memory_details_kb"]["stack"] = current_field_int_value
-                    elif key_status == "VmExe": proc_info["memory_details_kb"]["code"] = current_field_int_value
-                    elif key_status == "VmLib": proc_info["memory_details_kb"]["shared"] = current_field_int_value
-                    elif key_status == "VmPTE": proc_info["memory_details_kb"]["page_tables"] = current_field_int_value
-                    elif key_status == "VmSwap": proc_info["memory_details_kb"]["swap"] = current_field_int_value
-            
+            # lê o arquivo de estatísticas do processo (sempre lido) para coletar nome, estado, CPU e prioridade;
+            # o leitor do procfs_reader separa apenas os campos usados, direto dos bytes lidos
+            process_stat = procfs_reader.read_stat(f"{PROC_ROOT}/{pid_int_current}/stat")
+
+            # um stat ilegível (ex: truncado) não descarta o processo: estado, PPID e threads vêm do arquivo de status
+            # (lido abaixo) e os demais campos do stat ficam nos valores padrão
+            if process_stat is not None:
+
+                # preenche nome, estado, PPID e número de threads a partir do stat
+                proc_info["name"], stat_fields = process_stat
+                state_char = stat_fields[procfs_reader.STAT_STATE].decode("ascii", "replace")
+                proc_info["status"] = PROCESS_STATUS_MAP.get(state_char, state_char)
+                proc_info["ppid"] = int(stat_fields[procfs_reader.STAT_PPID])
+                proc_info["threads"] = int(stat_fields[procfs_reader.STAT_NUM_THREADS])
+
+                # preenche as informações de CPU e prioridade do processo
+                utime_jiffies, stime_jiffies = int(stat_fields[procfs_reader.STAT_UTIME]), int(stat_fields[procfs_reader.STAT_STIME])
+                proc_info["priority"] = int(stat_fields[procfs_reader.STAT_PRIORITY])
+                proc_info["nice"] = int(stat_fields[procfs_reader.STAT_NICE])
+                current_total_jiffies_proc = utime_jiffies + stime_jiffies
+                current_timestamp_sec = time.time()
+                current_process_cpu_snapshot[pid_int_current] = {
+                    'active_jiffies': current_total_jiffies_proc, 
+                    'timestamp': current_timestamp_sec
+                }
+
+                # verifica se o processo já foi registrado anteriormente para calcular o uso de CPU
+                if pid_int_current in previous_process_cpu_times:
+                    prev_snapshot_proc = previous_process_cpu_times[pid_int_current]
+                    delta_time_seconds = current_timestamp_sec - prev_snapshot_proc['timestamp']
+                    delta_jiffies_proc = current_total_jiffies_proc - prev_snapshot_proc['active_jiffies']
+
+                    if delta_time_seconds > 0: 
+
+                        # calcula uso CPU % relativo ao tempo decorrido e jiffies
+                        cpu_usage_raw = (delta_jiffies_proc / hertz) / delta_time_seconds * 100.0
+
+                        # limita o uso de CPU entre 0% e 100% multiplicado pelo número de núcleos
+                        proc_info["cpu_percent"] = round(max(0.0, min(cpu_usage_raw, 100.0 * num_system_cores)), 1)
+
+                # guarda o starttime, que identifica o processo no cache de campos estáticos
+                starttime_jiffies = int(stat_fields[procfs_reader.STAT_STARTTIME])
+                current_start_times[pid_int_current] = starttime_jiffies
+
+                # calcula o tempo de criação com o horário de boot lido uma vez no ciclo (sem reler stat e uptime)
+                if boot_time_unix is not None:
+                    process_create_time_unix = boot_time_unix + (starttime_jiffies / hertz)
+                    proc_info["create_time_iso"] = datetime.datetime.fromtimestamp(process_create_time_unix).isoformat()
+                else:
+                    proc_info["create_time_iso"] = get_process_creation_time_iso(pid_int_current, hertz)
+
+            # lê o arquivo de status do processo para coletar usuário e detalhes de memória, se algum consumidor pedir
+            # (ou se o stat não pôde ser lido); o conteúdo é lido uma vez para o buffer e apenas as linhas usadas são
+            # localizadas e convertidas
+            if read_status or process_stat is None:
+                status_reader = procfs_reader.get_reader()
+                status_length = status_reader.read_into(f"{PROC_ROOT}/{pid_int_current}/status")
+
+                # sem o stat, estado, PPID e número de threads vêm das linhas State, PPid e Threads
+                if process_stat is None:
+                    status_state = procfs_reader.parse_line_text(status_reader.buffer, status_length, b"State:")
+                    if status_state:
+                        proc_info["status"] = PROCESS_STATUS_MAP.get(status_state[0], status_state[0])
+                    for status_key, info_key in ((b"PPid:", "ppid"), (b"Threads:", "threads")):
+                        status_value = procfs_reader.parse_line_text(status_reader.buffer, status_length, status_key)
+                        try: proc_info[info_key] = int(status_value)
+                        except (TypeError, ValueError): pass
+
+                status_name = procfs_reader.parse_line_text(status_reader.buffer, status_length, b"Name:")
+                if status_name is not None: proc_info["name"] = status_name
+
+                # obtém o nome de usuário associado ao UID (real) do processo
+                status_uid = procfs_reader.parse_line_text(status_reader.buffer, status_length, b"Uid:")
+                if status_uid:
+                    proc_info["user_name"] = get_username_from_uid(status_uid)
+                    try: proc_info["uid"] = int(status_uid.split()[0])
+                    except ValueError: proc_info["uid"] = -1
+
+                # preenche o dicionário de detalhes de memória do processo
+                proc_info["memory_details_kb"].update(
+                    procfs_reader.parse_kb_fields(status_reader.buffer, status_length, PROCESS_STATUS_MEMORY_FIELDS))
+
             #tenta abrir e ler arquivo de linha de comando do processo
-            try:
-                with open(f"/proc/{pid_int_current}/cmdline", 'rb') as cmd_f:
+            if read_cmdline:
+                try:
+                    cmdline_reader = procfs_reader.get_reader()
+                    cmdline_length = cmdline_reader.read_into(f"{PROC_ROOT}/{pid_int_current}/cmdline")
 
-                    # lê o conteúdo do arquivo, substitui bytes nulos por espaços e remove espaços em branco
-                    cmd_str_bytes = cmd_f.read().replace(b'\x00', b' ').strip()
+                    # substitui bytes nulos por espaços e remove espaços em branco
+                    cmd_str_bytes = cmdline_reader.buffer[:cmdline_length].replace(b'\x00', b' ').strip()
 
                     # decodifica os bytes para string, substituindo caracteres inválidos
                     cmd_str_decoded = cmd_str_bytes.decode('utf-8', 'replace')
 
                     # se a string decodificada não estiver vazia, usa como comando; caso contrário, usa o nome do processo
                     proc_info["command_line"] = cmd_str_decoded or f"[{proc_info.get('name', 'unknown')}]"
-            except Exception: 
-                proc_info["command_line"] = f"[{proc_info.get('name', 'unknown')}]"
+                except Exception: 
+                    proc_info["command_line"] = f"[{proc_info.get('name', 'unknown')}]"
             
             # tenta abrir e ler o caminho do executável do processo
-            try:
-                proc_info["executable_path"] = os.readlink(f"/proc/{pid_int_current}/exe")
-            except (FileNotFoundError, PermissionError, OSError): 
-                proc_info["executable_path"] = None
+            if read_exe:
+                try:
+                    proc_info["executable_path"] = os.readlink(f"{PROC_ROOT}/{pid_int_current}/exe")
+                except (FileNotFoundError, PermissionError, OSError): 
+                    proc_info["executable_path"] = None
             
             # tenta abrir e ler o arquivo de estatísticas de memória do processo
-            try:
-                with open(f"/proc/{pid_int_current}/statm", 'r') as statm_f:
-
-                    # lê o conteúdo do arquivo e divide em partes
-                    rss_pages = int(statm_f.read().split()[1]) 
-                    page_size_bytes = os.sysconf('SC_PAGE_SIZE') # obtém o tamanho da página do sistema
+            if read_statm:
+                try:
+                    # lê o RSS em páginas (segundo campo do arquivo)
+                    rss_pages = procfs_reader.read_statm_rss_pages(f"{PROC_ROOT}/{pid_int_current}/statm")
                     proc_info["memory_rss_mb"] = round(rss_pages * (page_size_bytes / (1024**2)), 1)
 
-            except (FileNotFoundError, IndexError, ValueError, OSError):
-                if proc_info["memory_details_kb"].get("rss", 0) > 0 and proc_info["memory_rss_mb"] == 0.0:
-                    proc_info["memory_rss_mb"] = round(proc_info["memory_details_kb"]["rss"] / 1024, 1)
-            
-            # tenta abrir o arquivo de estatísticas do processo para coletar informações de CPU e prioridade
-            with open(f"/proc/{pid_int_current}/stat", 'r') as stat_f_p:
-                stat_parts_list = stat_f_p.read().split()
-
-                # verifica se o processo tem informações suficientes no arquivo stat
-                if len(stat_parts_list) > 21: 
-
-                    # preenche as informações de CPU e prioridade do processo
-                    utime_jiffies, stime_jiffies = int(stat_parts_list[13]), int(stat_parts_list[14])
-                    proc_info["priority"], proc_info["nice"] = int(stat_parts_list[17]), int(stat_parts_list[18])
-                    current_total_jiffies_proc = utime_jiffies + stime_jiffies
-                    current_timestamp_sec = time.time()
-                    current_process_cpu_snapshot[pid_int_current] = {
-                        'active_jiffies': current_total_jiffies_proc, 
-                        'timestamp': current_timestamp_sec
-                    }
-
-                    # verifica se o processo já foi registrado anteriormente para calcular o uso de CPU
-                    if pid_int_current in previous_process_cpu_times:
-                        prev_snapshot_proc = previous_process_cpu_times[pid_int_current]
-                        delta_time_seconds = current_timestamp_sec - prev_snapshot_proc['timestamp']
-                        delta_jiffies_proc = current_total_jiffies_proc - prev_snapshot_proc['active_jiffies']
-
-                        if delta_time_seconds > 0: 
-
-                            # calcula uso CPU % relativo ao tempo decorrido e jiffies
-                            cpu_usage_raw = (delta_jiffies_proc / hertz) / delta_time_seconds * 100.0
-
-                            # considera quantidade de núcleos da CPU para ajustar o máximo possível
-                            num_system_cores = os.cpu_count() or 1
-
-                            # limita o uso de CPU entre 0% e 100% multiplicado pelo número de núcleos
-                            proc_info["cpu_percent"] = round(max(0.0, min(cpu_usage_raw, 100.0 * num_system_cores)), 1)
-
-                    # chama a função para obter o tempo de criação do processo em formato ISO 8601
-                    proc_info["create_time_iso"] = get_process_creation_time_iso(pid_int_current, hertz)
-
-                # se não conseguir ler o arquivo stat ou não tiver informações suficientes, define como nulo
-                else: 
-                    proc_info["create_time_iso"] = None
+                except (FileNotFoundError, IndexError, ValueError, OSError):
+                    if proc_info["memory_details_kb"].get("rss", 0) > 0 and proc_info["memory_rss_mb"] == 0.0:
+                        proc_info["memory_rss_mb"] = round(proc_info["memory_details_kb"]["rss"] / 1024, 1)
             
             # obtém informações detalhadas de cada thread do processo lendo o diretório /proc/[pid]/task/
-            task_dir_path_proc = f"/proc/{pid_int_current}/task"
+            if read_task:
+                task_dir_path_proc = f"{PROC_ROOT}/{pid_int_current}/task"
 
-            if os.path.isdir(task_dir_path_proc):
-                for tid_str_val in os.listdir(task_dir_path_proc):
+                if os.path.isdir(task_dir_path_proc):
+                    for tid_str_val in os.listdir(task_dir_path_proc):
 
-                    # verifica se o ID da thread é um número válido e chama a função para obter detalhes da thread
-                    if tid_str_val.isdigit():
-                        proc_info["threads_detailed_info"].append(get_thread_details(pid_int_current, tid_str_val))
+                        # verifica se o ID da thread é um número válido e chama a função para obter detalhes da thread
+                        if tid_str_val.isdigit():
+                            proc_info["threads_detailed_info"].append(get_thread_details(pid_int_current, tid_str_val))
 
             # adiciona o dicionário de informações do processo à lista de processos
             processes_list_result.append(proc_info)
@@ -360,11 +413,48 @@ def get_processes():
 
     # atualiza o dicionário global de tempos de CPU dos processos com o snapshot atual
     previous_process_cpu_times = current_process_cpu_snapshot
+
+    # publica os starttimes da varredura e descarta os campos estáticos de processos que terminaram
+    process_start_times = current_start_times
+    for finished_pid in [pid for pid in process_static_cache if pid not in current_start_times]:
+        del process_static_cache[finished_pid]
     return processes_list_result
 
+# função que registra apenas os tempos de CPU dos processos (somente /proc/<pid>/stat, sem montar os dicionários),
+# usada na partida rápida do Controller para que a primeira varredura completa já calcule o uso de CPU; retorna
+# (número de processos, número de threads)
+@metrics.instrument_collector("prime_process_cpu_times")
+def prime_process_cpu_times():
+
+    global previous_process_cpu_times
+
+    try:
+        active_pids = [p_str for p_str in os.listdir(PROC_ROOT) if p_str.isdigit()]
+    except FileNotFoundError:
+        return 0, 0
+
+    current_process_cpu_snapshot, total_threads = {}, 0
+    for pid_str_current in active_pids:
+        try:
+            process_stat = procfs_reader.read_stat(f"{PROC_ROOT}/{pid_str_current}/stat")
+            if process_stat is None:
+                continue
+            stat_fields = process_stat[1]
+            current_process_cpu_snapshot[int(pid_str_current)] = {
+                'active_jiffies': int(stat_fields[procfs_reader.STAT_UTIME]) + int(stat_fields[procfs_reader.STAT_STIME]),
+                'timestamp': time.time()
+            }
+            total_threads += int(stat_fields[procfs_reader.STAT_NUM_THREADS])
+        except (IndexError, ValueError, OSError):
+            continue
+
+    previous_process_cpu_times = current_process_cpu_snapshot
+    return len(current_process_cpu_snapshot), total_threads
+
 # ---------------------------------------------------------------------------------------------------------------------------------
 
 # função que obtém informações de uso de memória do sistema, incluindo RAM e swap
+@metrics.instrument_collector("get_memory_usage")
 def get_memory_usage():
 
     # dicionários para armazenar dados brutos de memória e swap
@@ -375,28 +465,14 @@ def get_memory_usage():
     default_swap_data = {"total_gb": 0.0, "used_gb": 0.0, "free_gb": 0.0, "usage_percent": 0.0, "free_percent": 0.0}
 
     try:
-        with open('/proc/meminfo', 'r') as f_meminfo_sys:
-            for line_meminfo_sys in f_meminfo_sys:
-
-                # divide a linha em partes usando ":" como delimitador
-                parts_meminfo_sys = line_meminfo_sys.split(":")
+        # lê apenas os campos usados de /proc/meminfo e os separa em memória e swap
+        meminfo_values = procfs_reader.read_kb_fields(f'{PROC_ROOT}/meminfo', MEMINFO_FIELDS)
+        for key_meminfo_sys, val_kb_sys in meminfo_values.items():
+            if key_meminfo_sys.startswith("Swap"):
+                swap_raw_data[key_meminfo_sys] = val_kb_sys
+            else:
+                mem_raw_data[key_meminfo_sys] = val_kb_sys
 
-                # verifica se a linha tem exatamente duas partes (chave:valor)
-                if len(parts_meminfo_sys) == 2:
-
-                    # remove espaços em branco
-                    key_meminfo_sys = parts_meminfo_sys[0].strip()
-
-                    # extrai apenas o valor numérico da parte de valor
-                    val_str_meminfo_sys = parts_meminfo_sys[1].strip().split()[0] if parts_meminfo_sys[1].strip() else "0"
-                    val_kb_sys = int(val_str_meminfo_sys)
-
-                    # armazena os dados de memória e swap em seus respectivos dicionários
-                    if key_meminfo_sys in ["MemTotal", "MemFree", "MemAvailable", "Buffers", "Cached", "SReclaimable"]:
-                        mem_raw_data[key_meminfo_sys] = val_kb_sys
-                    elif key_meminfo_sys in ["SwapTotal", "SwapFree"]:
-                        swap_raw_data[key_meminfo_sys] = val_kb_sys
-        
         # obtém o total de RAM disponível no sistema
         ram_total_kb_sys = mem_raw_data.get("MemTotal", 0)
 
@@ -458,6 +534,7 @@ def get_memory_usage():
 # ---------------------------------------------------------------------------------------------------------------------------------
 
 # função que obtém informações de uso de CPU do sistema, incluindo uso geral e por núcleo
+@metrics.instrument_collector("get_cpu_usage")
 def get_cpu_usage():
 
     # variáveis globais para armazenar os tempos de CPU anteriores
@@ -475,9 +552,8 @@ def get_cpu_usage():
     current_core_times_snapshot_sys = {}
 
     try:
-        # tenta abrir e ler o arquivo stat do sistema para obter informações gerais de CPU
-        with open("/proc/stat", "r") as f_stat_cpu_sys:
-            lines_stat_cpu_sys = f_stat_cpu_sys.readlines()
+        # tenta ler o arquivo stat do sistema para obter informações gerais de CPU
+        lines_stat_cpu_sys = procfs_reader.read_text(f"{PROC_ROOT}/stat").splitlines()
         
         # extrai a linha com estatísticas globais da CPU (primeira linha) e converte os valores para inteiros
         parts_overall_sys = list(map(int, lines_stat_cpu_sys[0].strip().split()[1:]))
@@ -572,6 +648,7 @@ def get_cpu_usage():
 
 
 # Função para obter informações do sistema de arquivos
+@metrics.instrument_collector("get_filesystem_info")
 def get_filesystem_info():
 
     # cria uma lista vazia para armazenar as informações de cada ponto de montagem válido
@@ -579,43 +656,42 @@ def get_filesystem_info():
 
     # tenta abrir o arquivo '/proc/mounts', que contém informações sobre todos os sistemas de arquivos montados
     try:
-        with open('/proc/mounts', 'r') as f:
-            for line in f: # lê o arq linha por linha
+        for line in procfs_reader.read_text(f'{PROC_ROOT}/mounts').splitlines(): # lê o arq linha por linha
 
-                # divide a linha em partes, esperando pelo menos 4 colunas
-                parts = line.split()
+            # divide a linha em partes, esperando pelo menos 4 colunas
+            parts = line.split()
 
-                # se a linha não tiver pelo menos 4 partes, ignora
-                if len(parts) < 4:
-                    continue
+            # se a linha não tiver pelo menos 4 partes, ignora
+            if len(parts) < 4:
+                continue
 
-                # extrai as informações principais: dispositivo, ponto de montagem e tipo de sistema de arquivos
-                device, mountpoint, fstype = parts[0], parts[1], parts[2]
+            # extrai as informações principais: dispositivo, ponto de montagem e tipo de sistema de arquivos
+            device, mountpoint, fstype = parts[0], parts[1], parts[2]
+            
+            # ignora sistemas de arquivos virtuais e que não são relevantes para o monitoramento de uso
+            if fstype in ('proc', 'sysfs', 'devpts', 'tmpfs', 'cgroup'):
+                continue
                 
-                # ignora sistemas de arquivos virtuais e que não são relevantes para o monitoramento de uso
-                if fstype in ('proc', 'sysfs', 'devpts', 'tmpfs', 'cgroup'):
-                    continue
-                    
-                try:
-                    stat = os.statvfs(mountpoint) # obtém espaço em disco do ponto de montagem atual
-                    total = stat.f_blocks * stat.f_frsize # total de espaço em bytes
-                    free = stat.f_bfree * stat.f_frsize # espaço livre em bytes
-                    used = total - free # espaço usado em bytes
-                    
-                    # adiciona as informações coletadas a um dicionário e o adiciona à lista de montagens
-                    mounts.append({
-                        "device": device,
-                        "mountpoint": mountpoint,
-                        "type": fstype,
-                        "total_gb": round(total / (1024**3), 2), # em GB
-                        "used_gb": round(used / (1024**3), 2),
-                        "free_gb": round(free / (1024**3), 2),
-                        "usage_percent": round(used / total * 100, 2) if total > 0 else 0
-                    })
-
-                # ignora erros de permissão ou outros problemas ao acessar o ponto de montagem
-                except Exception:
-                    continue
+            try:
+                stat = os.statvfs(mountpoint) # obtém espaço em disco do ponto de montagem atual
+                total = stat.f_blocks * stat.f_frsize # total de espaço em bytes
+                free = stat.f_bfree * stat.f_frsize # espaço livre em bytes
+                used = total - free # espaço usado em bytes
+                
+                # adiciona as informações coletadas a um dicionário e o adiciona à lista de montagens
+                mounts.append({
+                    "device": device,
+                    "mountpoint": mountpoint,
+                    "type": fstype,
+                    "total_gb": round(total / (1024**3), 2), # em GB
+                    "used_gb": round(used / (1024**3), 2),
+                    "free_gb": round(free / (1024**3), 2),
+                    "usage_percent": round(used / total * 100, 2) if total > 0 else 0
+                })
+
+            # ignora erros de permissão ou outros problemas ao acessar o ponto de montagem
+            except Exception:
+                continue
 
     # exibe mensagem de erro se não for possível ler o arquivo '/proc/mounts'
     except Exception as e:
@@ -627,6 +703,7 @@ def get_filesystem_info():
 #--------------------------------------------------------------------------------------------------------------------------
 
 # função para obter o conteúdo de um diretório
+@metrics.instrument_collector("get_directory_contents")
 def get_directory_contents(path='/'):
 
     contents = [] # lista para armazenar os detalhes dos arquivos e subdiretórios
@@ -688,30 +765,16 @@ def _bytes_to_human(size):
 #--------------------------------------------------------------------------------------------------------------------------
 
 # função para obter informações de E/S de um processo
+@metrics.instrument_collector("get_process_es_info")
 def get_process_es_info(pid):
    
    # inicializa um dicionário vazio para armazenar as estatísticas de E/S
     es_stats = {}
 
-    # tenta abrir o arquivo '/proc/[pid]/io', que contém estatísticas de entrada/saída do processo com o PID fornecido
+    # tenta ler o arquivo '/proc/[pid]/io', que contém estatísticas de entrada/saída do processo com o PID fornecido
     try:
-        with open(f'/proc/{pid}/io', 'r') as f:
-            for line in f:
-
-                # divide a linha em chave e valor usando o primeiro ':' como delimitador
-                key, value = line.split(':', 1)
-
-                # remove espaços em branco e converte a chave para minúsculas
-                key = key.strip().lower()
-
-                # verifica se a chave é uma das estatísticas de E/S relevantes
-                if key in ['rchar', 'wchar', 'read_bytes', 'write_bytes',
-                          'syscr', 'syscw', 'cancelled_write_bytes']:
-                    try:
-                        # tenta converter o valor para inteiro e adiciona ao dicionário de estatísticas
-                        es_stats[key] = int(value.strip())
-                    except ValueError:
-                        continue
+        # lê apenas as estatísticas de E/S relevantes (rchar, wchar, syscr, syscw, read_bytes, write_bytes, cancelled_write_bytes)
+        es_stats = procfs_reader.read_process_io(f'{PROC_ROOT}/{pid}/io')
 
     # exibe mensagem de erro se o processo não for encontrado, se PID for inválido ou se houver problemas de permissão
     except FileNotFoundError:
@@ -727,13 +790,14 @@ def get_process_es_info(pid):
 #--------------------------------------------------------------------------------------------------------------------------
 
 # função para obter os arquivos abertos por um processo
+@metrics.instrument_collector("get_process_open_files")
 def get_process_open_files(pid):
 
     open_files = [] # lista para armazenar os arquivos abertos pelo processo
 
     try:
         # define o caminho para o diretório que contém os descritores de arquivos do processo
-        fd_dir = f'/proc/{pid}/fd'
+        fd_dir = f'{PROC_ROOT}/{pid}/fd'
 
         # lista todos os descritores de arquivos (FDs) presentes nesse diretório
         for fd in os.listdir(fd_dir):
@@ -0,0 +1,134 @@
+import os
+import time
+import threading
+
+import model
+import metrics
+import procfs_reader
+
+# orçamento padrão de CPU do ciclo de coleta, em fração de um núcleo (0.02 = 2%)
+DEFAULT_OVERHEAD_BUDGET = float(os.environ.get("SO_DASHBOARD_OVERHEAD_BUDGET", "0.02"))
+
+# níveis de degradação: cada nível desliga os detalhes opcionais do anterior e mais os seus
+# (fontes de /proc/<pid> que deixam de ser lidas e recursos sob demanda desativados)
+DEGRADATION_TIERS = (
+    {"level": 1, "name": "threads", "sources": ("task",), "features": ()},
+    {"level": 2, "name": "cmdline_exe", "sources": ("cmdline", "exe"), "features": ()},
+    {"level": 3, "name": "open_files_pss", "sources": ("smaps_rollup",), "features": ("open_files",)},
+)
+MAX_DEGRADATION_LEVEL = len(DEGRADATION_TIERS)
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que lê o tempo de CPU (utime + stime, em segundos) de todo o processo a partir de /proc/self/stat
+def read_process_cpu_seconds():
+
+    try:
+        _, stat_fields = procfs_reader.read_stat(f"{model.PROC_ROOT}/self/stat")
+        hertz = os.sysconf(os.sysconf_names['SC_CLK_TCK']) or 100
+        return (int(stat_fields[procfs_reader.STAT_UTIME]) + int(stat_fields[procfs_reader.STAT_STIME])) / hertz
+    except (FileNotFoundError, IndexError, ValueError, TypeError, OSError):
+        return None
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# regulador do custo da coleta: mede o tempo de CPU e de parede de cada ciclo e compara o custo com o intervalo atual.
+# Acima do orçamento, desliga os detalhes opcionais um nível por vez (níveis de degradação) e, só com todos os níveis
+# desligados, alonga o intervalo entre ciclos; abaixo de metade do orçamento por alguns ciclos seguidos, desfaz um passo
+# por vez na ordem inversa: primeiro encurta o intervalo até o base, depois religa os níveis (histerese, para não oscilar)
+class OverheadGovernor:
+
+    def __init__(self, base_interval_seconds, budget_fraction=DEFAULT_OVERHEAD_BUDGET, max_interval_seconds=60.0,
+                 relax_after_cycles=3, smoothing=0.5):
+        self.base_interval_seconds = base_interval_seconds
+        self.budget_fraction = budget_fraction
+        self.max_interval_seconds = max_interval_seconds
+        self.relax_after_cycles = relax_after_cycles
+        self.smoothing = smoothing
+
+        self._lock = threading.Lock()
+        self.degradation_level = 0
+        self.interval_seconds = base_interval_seconds
+        self._cycle_cpu_seconds_avg = None
+        self._restart_average = False
+        self._cycles_under_budget = 0
+        self._last_cycle = {"cpu_seconds": None, "wall_seconds": None, "finished_at": None}
+        self._process_cpu_sample = (time.monotonic(), read_process_cpu_seconds())
+        self._process_cpu_percent = None
+
+    # função que retorna as fontes de /proc/<pid> desligadas no nível atual
+    def disabled_sources(self):
+        level = self.degradation_level
+        return frozenset(source for tier in DEGRADATION_TIERS[:level] for source in tier["sources"])
+
+    # função que indica se um recurso sob demanda (ex: listagem de arquivos abertos) está ativo no nível atual
+    def is_feature_enabled(self, feature_name):
+        level = self.degradation_level
+        return not any(feature_name in tier["features"] for tier in DEGRADATION_TIERS[:level])
+
+    # função chamada ao fim de cada ciclo com o tempo de CPU da thread coletora e o tempo de parede do ciclo
+    def record_cycle(self, cycle_cpu_seconds, cycle_wall_seconds):
+
+        with self._lock:
+            if self._cycle_cpu_seconds_avg is None or self._restart_average:
+                self._cycle_cpu_seconds_avg = cycle_cpu_seconds
+                self._restart_average = False
+            else:
+                self._cycle_cpu_seconds_avg += self.smoothing * (cycle_cpu_seconds - self._cycle_cpu_seconds_avg)
+            self._last_cycle = {"cpu_seconds": cycle_cpu_seconds, "wall_seconds": cycle_wall_seconds, "finished_at": time.time()}
+
+            # fração de um núcleo consumida pelos ciclos no intervalo atual
+            overhead_fraction = self._cycle_cpu_seconds_avg / self.interval_seconds
+            required_interval = self._cycle_cpu_seconds_avg / self.budget_fraction if self.budget_fraction > 0 else 0
+
+            if overhead_fraction > self.budget_fraction:
+                self._cycles_under_budget = 0
+                if self.degradation_level < MAX_DEGRADATION_LEVEL:
+                    # acima do orçamento: primeiro desliga um nível de detalhes; a média recomeça no próximo ciclo,
+                    # que já mede o custo do novo nível
+                    self.degradation_level += 1
+                    self._restart_average = True
+                else:
+                    # sem detalhes para desligar: alonga o intervalo o suficiente para o custo caber no orçamento
+                    self.interval_seconds = round(min(self.max_interval_seconds, max(self.base_interval_seconds, required_interval)), 3)
+            elif overhead_fraction < self.budget_fraction / 2 and (self.degradation_level > 0 or self.interval_seconds > self.base_interval_seconds):
+                self._cycles_under_budget += 1
+                if self._cycles_under_budget >= self.relax_after_cycles:
+                    self._cycles_under_budget = 0
+                    if self.interval_seconds > self.base_interval_seconds:
+                        # folga no orçamento: encurta o intervalo (até o base) antes de religar os detalhes
+                        self.interval_seconds = round(max(self.base_interval_seconds, required_interval), 3)
+                    else:
+                        self.degradation_level -= 1
+                        self._restart_average = True
+            else:
+                self._cycles_under_budget = 0
+
+            # uso de CPU de todo o backend (coleta, amostradores e API) desde a última medição
+            now_monotonic, process_cpu_seconds = time.monotonic(), read_process_cpu_seconds()
+            previous_monotonic, previous_cpu_seconds = self._process_cpu_sample
+            if process_cpu_seconds is not None and previous_cpu_seconds is not None and now_monotonic > previous_monotonic:
+                self._process_cpu_percent = round((process_cpu_seconds - previous_cpu_seconds) / (now_monotonic - previous_monotonic) * 100.0, 2)
+            self._process_cpu_sample = (now_monotonic, process_cpu_seconds)
+
+        metrics.COLLECTOR_CYCLE_CPU_SECONDS_TOTAL.inc(cycle_cpu_seconds)
+        metrics.COLLECTOR_DEGRADATION_LEVEL.set(self.degradation_level)
+        metrics.UPDATE_INTERVAL_SECONDS.set(self.interval_seconds)
+
+    # função que retorna o estado do regulador, exposto em /api/collector/status
+    def status(self):
+        with self._lock:
+            level = self.degradation_level
+            cycle_cpu_seconds_avg = self._cycle_cpu_seconds_avg
+            return {
+                "budget_fraction": self.budget_fraction,
+                "degradation_level": level,
+                "max_degradation_level": MAX_DEGRADATION_LEVEL,
+                "disabled_tiers": [tier["name"] for tier in DEGRADATION_TIERS[:level]],
+                "base_interval_seconds": self.base_interval_seconds,
+                "interval_seconds": self.interval_seconds,
+                "cycle_cpu_seconds_avg": round(cycle_cpu_seconds_avg, 6) if cycle_cpu_seconds_avg is not None else None,
+                "overhead_fraction": round(cycle_cpu_seconds_avg / self.interval_seconds, 6) if cycle_cpu_seconds_avg is not None else None,
+                "last_cycle": dict(self._last_cycle),
+                "process_cpu_percent": self._process_cpu_percent,
+            }
@@ -0,0 +1,294 @@
+import os
+import sys
+import random
+import argparse
+
+# nomes de processos usados para gerar árvores sintéticas com aparência realista
+FIXTURE_PROCESS_NAMES = [
+    "systemd", "kthreadd", "sshd", "bash", "python3", "postgres", "nginx", "node",
+    "java", "containerd", "dockerd", "rsyslogd", "cron", "dbus-daemon", "redis-server"
+]
+
+# estados possíveis dos processos sintéticos, com pesos aproximados aos de um host real
+FIXTURE_PROCESS_STATES = [("S", "sleeping"), ("R", "running"), ("I", "idle"), ("D", "disk sleep"), ("Z", "zombie")]
+FIXTURE_STATE_WEIGHTS = [80, 5, 10, 3, 2]
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função auxiliar que escreve um arquivo de texto, criando os diretórios intermediários necessários
+def _write_text_file(path, content):
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as output_file:
+        output_file.write(content)
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que monta o conteúdo do arquivo /proc/<pid>/stat (52 campos, com o nome entre parênteses)
+def _build_stat_line(pid, name, state_char, ppid, threads, utime, stime, starttime, vsize_bytes, rss_pages):
+
+    fields = [str(pid), f"({name})", state_char, str(ppid), str(pid), str(pid), "0", "-1", "4194560",
+              "100", "0", "0", "0", str(utime), str(stime), "0", "0", "20", "0", str(threads), "0",
+              str(starttime), str(vsize_bytes), str(rss_pages)]
+
+    # completa os campos restantes (rsslim em diante) com zeros
+    fields.extend(["0"] * (52 - len(fields)))
+    return " ".join(fields) + "\n"
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que monta o conteúdo do arquivo /proc/<pid>/status com os campos lidos pelos coletores
+def _build_status_text(name, state_char, state_label, pid, ppid, uid, threads, rss_kb, vms_kb):
+
+    return (
+        f"Name:\t{name}\n"
+        f"Umask:\t0022\n"
+        f"State:\t{state_char} ({state_label})\n"
+        f"Tgid:\t{pid}\n"
+        f"Ngid:\t0\n"
+        f"Pid:\t{pid}\n"
+        f"PPid:\t{ppid}\n"
+        f"TracerPid:\t0\n"
+        f"Uid:\t{uid}\t{uid}\t{uid}\t{uid}\n"
+        f"Gid:\t{uid}\t{uid}\t{uid}\t{uid}\n"
+        f"FDSize:\t64\n"
+        f"VmPeak:\t{vms_kb + 4096} kB\n"
+        f"VmSize:\t{vms_kb} kB\n"
+        f"VmLck:\t0 kB\n"
+        f"VmPin:\t0 kB\n"
+        f"VmHWM:\t{rss_kb + 512} kB\n"
+        f"VmRSS:\t{rss_kb} kB\n"
+        f"RssAnon:\t{rss_kb * 3 // 4} kB\n"
+        f"RssFile:\t{rss_kb // 4} kB\n"
+        f"RssShmem:\t0 kB\n"
+        f"VmData:\t{vms_kb // 3} kB\n"
+        f"VmStk:\t132 kB\n"
+        f"VmExe:\t1024 kB\n"
+        f"VmLib:\t{vms_kb // 5} kB\n"
+        f"VmPTE:\t{max(4, rss_kb // 512)} kB\n"
+        f"VmSwap:\t0 kB\n"
+        f"Threads:\t{threads}\n"
+        f"voluntary_ctxt_switches:\t{pid * 3}\n"
+        f"nonvoluntary_ctxt_switches:\t{pid}\n"
+    )
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que gera os arquivos globais do /proc (stat, meminfo, uptime, vmstat, pressure/memory, mounts)
+def _generate_system_files(proc_dir, fs_dir, cores, rng):
+
+    # gera a linha agregada e as linhas por núcleo do /proc/stat
+    per_core_lines, totals = [], [0] * 10
+    for core_index in range(cores):
+        core_times = [rng.randint(10000, 90000), rng.randint(0, 500), rng.randint(5000, 40000),
+                      rng.randint(200000, 900000), rng.randint(0, 3000), 0, rng.randint(0, 800), 0, 0, 0]
+        totals = [a + b for a, b in zip(totals, core_times)]
+        per_core_lines.append(f"cpu{core_index} " + " ".join(map(str, core_times)))
+
+    _write_text_file(os.path.join(proc_dir, "stat"),
+                     "cpu  " + " ".join(map(str, totals)) + "\n" + "\n".join(per_core_lines) +
+                     "\nintr 0\nctxt 123456\nbtime 1700000000\nprocesses 99999\nprocs_running 3\nprocs_blocked 0\n")
+
+    _write_text_file(os.path.join(proc_dir, "meminfo"),
+                     "MemTotal:       65849004 kB\nMemFree:        12582912 kB\nMemAvailable:   41943040 kB\n"
+                     "Buffers:          524288 kB\nCached:         25165824 kB\nSReclaimable:    1048576 kB\n"
+                     "SwapTotal:       8388604 kB\nSwapFree:        8126460 kB\n")
+
+    _write_text_file(os.path.join(proc_dir, "uptime"), "864000.00 6000000.00\n")
+
+    # contadores de memória virtual e pressão de memória (PSI) de um host com alguma atividade de swap
+    _write_text_file(os.path.join(proc_dir, "vmstat"),
+                     "nr_free_pages 3145728\nworkingset_refault_anon 1200\nworkingset_refault_file 98000\n"
+                     "pgpgin 52428800\npgpgout 73400320\npswpin 65536\npswpout 131072\nallocstall_normal 12\n"
+                     "allocstall_movable 40\npgfault 987654321\npgmajfault 54321\npgsteal_kswapd 2097152\n"
+                     "pgsteal_direct 4096\npgscan_kswapd 3145728\npgscan_direct 8192\noom_kill 2\n")
+    _write_text_file(os.path.join(proc_dir, "pressure", "memory"),
+                     "some avg10=1.25 avg60=0.80 avg300=0.35 total=48123456\n"
+                     "full avg10=0.40 avg60=0.22 avg300=0.10 total=12345678\n")
+
+    # o ponto de montagem principal aponta para a árvore de arquivos sintética, para que o statvfs funcione
+    _write_text_file(os.path.join(proc_dir, "mounts"),
+                     f"/dev/fixture0 {fs_dir} ext4 rw,relatime 0 0\n"
+                     f"proc /proc proc rw,nosuid,nodev,noexec,relatime 0 0\n"
+                     f"sysfs /sys sysfs rw,nosuid,nodev,noexec,relatime 0 0\n"
+                     f"tmpfs /run tmpfs rw,nosuid,nodev 0 0\n")
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que gera a árvore de um único processo, incluindo threads (task/) e descritores de arquivos (fd/)
+def _generate_process(proc_dir, data_dir, pid, ppid, threads, fds, users, rng):
+
+    pid_dir = os.path.join(proc_dir, str(pid))
+    name = rng.choice(FIXTURE_PROCESS_NAMES)
+    state_char, state_label = rng.choices(FIXTURE_PROCESS_STATES, weights=FIXTURE_STATE_WEIGHTS)[0]
+    uid = 0 if pid < 100 else 1000 + rng.randrange(users)
+    rss_kb = rng.randint(512, 512 * 1024)
+    vms_kb = rss_kb * rng.randint(2, 8)
+    utime, stime = rng.randint(0, 500000), rng.randint(0, 100000)
+    starttime = rng.randint(100, 80000000)
+
+    _write_text_file(os.path.join(pid_dir, "status"),
+                     _build_status_text(name, state_char, state_label, pid, ppid, uid, threads, rss_kb, vms_kb))
+    _write_text_file(os.path.join(pid_dir, "stat"),
+                     _build_stat_line(pid, name, state_char, ppid, threads, utime, stime, starttime, vms_kb * 1024, rss_kb // 4))
+    _write_text_file(os.path.join(pid_dir, "statm"), f"{vms_kb // 4} {rss_kb // 4} {rss_kb // 16} 256 0 {vms_kb // 12} 0\n")
+    _write_text_file(os.path.join(pid_dir, "comm"), name + "\n")
+    _write_text_file(os.path.join(pid_dir, "io"),
+                     f"rchar: {rng.randint(0, 10**9)}\nwchar: {rng.randint(0, 10**9)}\nsyscr: {rng.randint(0, 10**6)}\n"
+                     f"syscw: {rng.randint(0, 10**6)}\nread_bytes: {rng.randint(0, 10**9)}\n"
+                     f"write_bytes: {rng.randint(0, 10**9)}\ncancelled_write_bytes: 0\n")
+
+    # smaps_rollup com PSS menor que o RSS (páginas compartilhadas entre processos), como em workers criados por fork
+    pss_kb, private_kb = rss_kb * rng.randint(30, 90) // 100, rss_kb * rng.randint(10, 30) // 100
+    _write_text_file(os.path.join(pid_dir, "smaps_rollup"),
+                     f"00400000-7ffffffff000 ---p 00000000 00:00 0                          [rollup]\n"
+                     f"Rss:            {rss_kb} kB\nPss:            {pss_kb} kB\nPss_Anon:       {pss_kb // 2} kB\n"
+                     f"Shared_Clean:   {rss_kb - private_kb} kB\nShared_Dirty:   0 kB\n"
+                     f"Private_Clean:  {private_kb // 2} kB\nPrivate_Dirty:  {private_kb - private_kb // 2} kB\n"
+                     f"Swap:           0 kB\nSwapPss:        0 kB\n")
+
+    # a linha de comando usa bytes nulos como separador, igual ao kernel
+    with open(os.path.join(pid_dir, "cmdline"), "wb") as cmdline_file:
+        cmdline_file.write(f"/usr/bin/{name}\x00--worker\x00{pid}\x00".encode())
+
+    os.symlink(f"/usr/bin/{name}", os.path.join(pid_dir, "exe"))
+
+    # processos de sistema ficam em serviços do systemd e os demais em sessões de usuário (hierarquia v2 unificada)
+    cgroup_path = f"/system.slice/{name}.service" if uid == 0 else f"/user.slice/user-{uid}.slice/session-{pid % 4}.scope"
+    _write_text_file(os.path.join(pid_dir, "cgroup"), f"0::{cgroup_path}\n")
+
+    # cada thread recebe seu próprio diretório em task/, sendo a primeira a thread principal (tid == pid)
+    for thread_index in range(threads):
+        tid = pid if thread_index == 0 else pid * 1000 + thread_index
+        tid_dir = os.path.join(pid_dir, "task", str(tid))
+        thread_name = name if thread_index == 0 else f"{name}:w{thread_index}"
+        _write_text_file(os.path.join(tid_dir, "status"),
+                         _build_status_text(thread_name, state_char, state_label, tid, ppid, uid, threads, rss_kb, vms_kb))
+        _write_text_file(os.path.join(tid_dir, "stat"),
+                         _build_stat_line(tid, thread_name, state_char, ppid, threads, utime // threads, stime // threads,
+                                          starttime, vms_kb * 1024, rss_kb // 4))
+        _write_text_file(os.path.join(tid_dir, "comm"), thread_name + "\n")
+
+    # os descritores apontam para arquivos reais da árvore de dados, para que o stat de cada fd funcione
+    fd_dir = os.path.join(pid_dir, "fd")
+    os.makedirs(fd_dir, exist_ok=True)
+    for fd_number in range(fds):
+        target = os.path.join(data_dir, f"file_{(pid + fd_number) % 64}.dat")
+        os.symlink(target, os.path.join(fd_dir, str(fd_number)))
+
+    return cgroup_path
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que gera a hierarquia unificada de cgroups (sys/fs/cgroup) para os cgroups usados pelos processos e seus ancestrais
+def _generate_cgroup_tree(sys_dir, cgroup_paths, rng):
+
+    all_cgroup_paths = {"/"}
+    for cgroup_path in cgroup_paths:
+        while cgroup_path not in all_cgroup_paths:
+            all_cgroup_paths.add(cgroup_path)
+            cgroup_path = cgroup_path.rsplit("/", 1)[0] or "/"
+
+    cgroup_root = os.path.join(sys_dir, "fs", "cgroup")
+    for cgroup_path in sorted(all_cgroup_paths):
+        cgroup_dir = cgroup_root + (cgroup_path if cgroup_path != "/" else "")
+        usage_usec = rng.randint(10**6, 10**10)
+        _write_text_file(os.path.join(cgroup_dir, "cpu.stat"),
+                         f"usage_usec {usage_usec}\nuser_usec {usage_usec * 3 // 4}\nsystem_usec {usage_usec // 4}\n")
+        _write_text_file(os.path.join(cgroup_dir, "io.stat"),
+                         f"8:0 rbytes={rng.randint(0, 10**10)} wbytes={rng.randint(0, 10**10)} rios={rng.randint(0, 10**6)} "
+                         f"wios={rng.randint(0, 10**6)} dbytes=0 dios=0\n")
+        # a raiz da hierarquia não tem memory.current nem memory.max, como no kernel
+        if cgroup_path == "/":
+            _write_text_file(os.path.join(cgroup_dir, "cgroup.controllers"), "cpuset cpu io memory pids\n")
+        else:
+            _write_text_file(os.path.join(cgroup_dir, "memory.current"), f"{rng.randint(10**6, 10**10)}\n")
+            _write_text_file(os.path.join(cgroup_dir, "memory.max"), "max\n")
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que gera uma árvore sintética completa de /proc, /sys (incluindo cgroups) e /etc/passwd em output_dir
+def generate_procfs_fixture(output_dir, processes=1000, threads_per_process=4, fds_per_process=8,
+                            cores=8, users=20, directory_entries=500, seed=0):
+
+    rng = random.Random(seed)
+    output_dir = os.path.abspath(output_dir)
+    proc_dir = os.path.join(output_dir, "proc")
+    sys_dir = os.path.join(output_dir, "sys")
+    fs_dir = os.path.join(output_dir, "fs")
+    data_dir = os.path.join(output_dir, "data")
+    passwd_path = os.path.join(output_dir, "etc", "passwd")
+
+    if os.path.exists(proc_dir):
+        raise FileExistsError(f"O diretório {proc_dir} já existe; escolha outro destino para a fixture.")
+
+    os.makedirs(sys_dir, exist_ok=True)
+    os.makedirs(data_dir, exist_ok=True)
+
+    # arquivos alvo dos descritores de arquivos
+    for file_index in range(64):
+        _write_text_file(os.path.join(data_dir, f"file_{file_index}.dat"), "x" * (file_index * 64))
+
+    # árvore de arquivos usada pelo navegador de diretórios (get_directory_contents)
+    for entry_index in range(directory_entries):
+        if entry_index % 10 == 0:
+            os.makedirs(os.path.join(fs_dir, f"dir_{entry_index}"), exist_ok=True)
+        else:
+            _write_text_file(os.path.join(fs_dir, f"file_{entry_index}.txt"), "y" * (entry_index % 4096))
+    os.makedirs(fs_dir, exist_ok=True)
+
+    # arquivo de usuários no mesmo formato do /etc/passwd
+    passwd_lines = ["root:x:0:0:root:/root:/bin/bash"]
+    passwd_lines += [f"user{index}:x:{1000 + index}:{1000 + index}::/home/user{index}:/bin/bash" for index in range(users)]
+    _write_text_file(passwd_path, "\n".join(passwd_lines) + "\n")
+
+    _generate_system_files(proc_dir, fs_dir, cores, rng)
+
+    # PIDs crescentes e esparsos, como em um host real; o pai é sempre um PID já criado
+    created_pids, next_pid, cgroup_paths = [], 1, set()
+    for _ in range(processes):
+        ppid = rng.choice(created_pids) if created_pids else 0
+        cgroup_paths.add(_generate_process(proc_dir, data_dir, next_pid, ppid, max(1, threads_per_process), fds_per_process, users, rng))
+        created_pids.append(next_pid)
+        next_pid += rng.randint(1, 3)
+
+    _generate_cgroup_tree(sys_dir, cgroup_paths, rng)
+
+    return {"proc_root": proc_dir, "sys_root": sys_dir, "passwd_path": passwd_path, "fs_root": fs_dir}
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que retorna os caminhos de uma fixture já gerada anteriormente
+def fixture_paths(output_dir):
+
+    output_dir = os.path.abspath(output_dir)
+    return {
+        "proc_root": os.path.join(output_dir, "proc"),
+        "sys_root": os.path.join(output_dir, "sys"),
+        "passwd_path": os.path.join(output_dir, "etc", "passwd"),
+        "fs_root": os.path.join(output_dir, "fs"),
+    }
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Gera uma árvore sintética de /proc para benchmarks do SO Dashboard.")
+    parser.add_argument("output_dir", help="diretório de destino da fixture")
+    parser.add_argument("--processes", type=int, default=1000, help="quantidade de processos")
+    parser.add_argument("--threads", type=int, default=4, help="threads por processo")
+    parser.add_argument("--fds", type=int, default=8, help="descritores de arquivos por processo")
+    parser.add_argument("--cores", type=int, default=8, help="quantidade de núcleos de CPU")
+    parser.add_argument("--users", type=int, default=20, help="quantidade de usuários no passwd")
+    parser.add_argument("--dir-entries", type=int, default=500, help="entradas no diretório de teste")
+    parser.add_argument("--seed", type=int, default=0, help="semente do gerador aleatório")
+    args = parser.parse_args()
+
+    try:
+        paths = generate_procfs_fixture(args.output_dir, args.processes, args.threads, args.fds,
+                                        args.cores, args.users, args.dir_entries, args.seed)
+    except FileExistsError as e_exists:
+        print(e_exists)
+        sys.exit(1)
+
+    print(f"Fixture gerada: {paths['proc_root']} ({args.processes} processos, {args.cores} núcleos)")
@@ -0,0 +1,143 @@
+import os
+import threading
+
+# tamanho inicial do buffer de leitura; arquivos maiores (ex: /proc/stat com muitos núcleos) fazem o buffer crescer
+# uma vez e o tamanho maior é mantido para as próximas leituras
+DEFAULT_BUFFER_SIZE = 8192
+
+# campos de /proc/<pid>/stat após o ")" do nome (estado = 0): índices usados pelos coletores
+STAT_STATE, STAT_PPID, STAT_UTIME, STAT_STIME = 0, 1, 11, 12
+STAT_PRIORITY, STAT_NICE, STAT_NUM_THREADS, STAT_STARTTIME, STAT_RSS_PAGES = 15, 16, 17, 19, 21
+
+# campos de /proc/<pid>/io, com a chave usada no dicionário de retorno
+PROCESS_IO_FIELDS = tuple((f"{key}:".encode(), key) for key in (
+    "rchar", "wchar", "syscr", "syscw", "read_bytes", "write_bytes", "cancelled_write_bytes"))
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# leitor de arquivos do procfs sem objetos de arquivo do Python: os.open + os.preadv em um buffer pré-alocado e
+# reutilizado, sem decodificar o conteúdo para str. Cada leitura sobrescreve o buffer, então o conteúdo deve ser
+# interpretado (pelos analisadores abaixo) antes da próxima leitura do mesmo leitor
+class ProcfsReader:
+
+    def __init__(self, buffer_size=DEFAULT_BUFFER_SIZE):
+        self.buffer = bytearray(buffer_size)
+
+    # função que lê o arquivo inteiro para o buffer e retorna a quantidade de bytes lidos
+    def read_into(self, path):
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            length = os.preadv(fd, [self.buffer], 0)
+
+            # buffer cheio: o arquivo pode ter mais conteúdo, então o buffer dobra e a leitura continua do ponto atual
+            while length == len(self.buffer):
+                self.buffer.extend(bytes(len(self.buffer)))
+                chunk_length = os.preadv(fd, [memoryview(self.buffer)[length:]], length)
+                if chunk_length == 0:
+                    break
+                length += chunk_length
+            return length
+        finally:
+            os.close(fd)
+
+# cada thread (ciclo de coleta, amostradores, requisições da API) usa o seu próprio leitor, para que os buffers
+# nunca sejam compartilhados entre leituras concorrentes
+_thread_state = threading.local()
+
+# função que retorna o leitor da thread atual, criando-o na primeira chamada
+def get_reader():
+
+    reader = getattr(_thread_state, "reader", None)
+    if reader is None:
+        reader = _thread_state.reader = ProcfsReader()
+    return reader
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que localiza o valor de uma linha "Chave:   valor" (início e fim do valor), ou None se a chave não existir;
+# key deve incluir os dois-pontos e a busca só aceita ocorrências no início de uma linha (ex: "Pss:" não casa com "SwapPss:")
+def _find_line_value(buffer, length, key):
+
+    position = buffer.find(key, 0, length)
+    while position > 0 and buffer[position - 1] != 10:
+        position = buffer.find(key, position + 1, length)
+    if position < 0:
+        return None
+    value_end = buffer.find(b"\n", position, length)
+    return position + len(key), value_end if value_end >= 0 else length
+
+# função que analisa o conteúdo de /proc/<pid>/stat no buffer e retorna (nome, campos após o nome), ou None se
+# estiver incompleto; os campos são separados apenas até o RSS (índice 21), sem dividir o restante da linha
+def parse_stat(buffer, length):
+
+    # o nome (comm) fica entre parênteses e pode conter espaços e parênteses; os demais campos vêm após o último ")"
+    comm_start, comm_end = buffer.find(b"(", 0, length), buffer.rfind(b")", 0, length)
+    if comm_start < 0 or comm_end < 0:
+        return None
+    stat_fields = buffer[comm_end + 1:length].split(None, STAT_RSS_PAGES + 1)
+    if len(stat_fields) <= STAT_STARTTIME:
+        return None
+    return buffer[comm_start + 1:comm_end].decode("utf-8", "replace"), stat_fields
+
+# função que retorna o RSS em páginas (segundo campo) do conteúdo de /proc/<pid>/statm no buffer
+def parse_statm_rss_pages(buffer, length):
+
+    return int(buffer[:length].split(None, 2)[1])
+
+# função que extrai apenas os campos numéricos pedidos de arquivos no formato "Chave: valor [kB]" (status, meminfo,
+# smaps_rollup, io); fields é uma sequência de pares (chave em bytes com ":", nome no retorno)
+def parse_kb_fields(buffer, length, fields):
+
+    parsed_fields = {}
+    for key, field_name in fields:
+        value_bounds = _find_line_value(buffer, length, key)
+        if value_bounds is None:
+            continue
+        value_start, value_end = value_bounds
+        unit_position = buffer.find(b" kB", value_start, value_end)
+        try:
+            parsed_fields[field_name] = int(buffer[value_start:unit_position if unit_position >= 0 else value_end])
+        except ValueError:
+            continue
+    return parsed_fields
+
+# função que retorna o texto (decodificado e sem espaços nas bordas) do valor de uma linha "Chave: valor", ou None
+def parse_line_text(buffer, length, key):
+
+    value_bounds = _find_line_value(buffer, length, key)
+    if value_bounds is None:
+        return None
+    return buffer[value_bounds[0]:value_bounds[1]].strip().decode("utf-8", "replace")
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# funções de conveniência usadas pelos coletores: leem com o leitor da thread atual e já interpretam o conteúdo
+
+# função que lê e analisa um arquivo stat (de processo ou de thread); retorna (nome, campos) ou None
+def read_stat(path):
+
+    reader = get_reader()
+    return parse_stat(reader.buffer, reader.read_into(path))
+
+# função que lê o RSS em páginas de um arquivo statm
+def read_statm_rss_pages(path):
+
+    reader = get_reader()
+    return parse_statm_rss_pages(reader.buffer, reader.read_into(path))
+
+# função que lê apenas os campos numéricos pedidos de um arquivo "Chave: valor [kB]"
+def read_kb_fields(path, fields):
+
+    reader = get_reader()
+    return parse_kb_fields(reader.buffer, reader.read_into(path), fields)
+
+# função que lê as estatísticas de E/S de /proc/<pid>/io
+def read_process_io(path):
+
+    return read_kb_fields(path, PROCESS_IO_FIELDS)
+
+# função que lê o arquivo inteiro como texto (para arquivos lidos por linhas, como /proc/stat e /proc/mounts)
+def read_text(path):
+
+    reader = get_reader()
+    return reader.buffer[:reader.read_into(path)].decode("utf-8", "replace")
@@ -0,0 +1,274 @@
+import os
+import sys
+import time
+import hmac
+import pstats
+import cProfile
+import tempfile
+import threading
+import contextlib
+import collections
+
+# alvos que podem ser perfilados: o ciclo de coleta do Controller ou as requisições da API
+PROFILE_TARGETS = ("collector", "requests")
+
+# modos disponíveis: cProfile determinístico (arquivo .pstats) ou amostragem de pilhas (arquivo .collapsed)
+PROFILE_MODES = ("cprofile", "sampler")
+
+# limites de segurança para sessões iniciadas remotamente
+MAX_PROFILE_COUNT = 1000
+DEFAULT_SAMPLER_INTERVAL_SECONDS = 0.005
+
+# diretório onde os perfis são gravados e token exigido pelo endpoint de depuração (desabilitado se vazio)
+PROFILE_OUTPUT_DIR = os.environ.get("SO_DASHBOARD_PROFILE_DIR", os.path.join(tempfile.gettempdir(), "so-dashboard-profiles"))
+DEBUG_TOKEN = os.environ.get("SO_DASHBOARD_DEBUG_TOKEN", "")
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que verifica o token de depuração recebido, em tempo constante
+def is_debug_token_valid(received_token):
+
+    if not DEBUG_TOKEN or not received_token:
+        return False
+    return hmac.compare_digest(DEBUG_TOKEN.encode(), received_token.encode())
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função auxiliar que converte um frame em pilha no formato "collapsed" (raiz;...;folha) usado por flamegraph.pl e speedscope
+def _collapse_frame_stack(frame):
+
+    stack_parts = []
+    while frame is not None:
+        code = frame.f_code
+        stack_parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    stack_parts.reverse()
+    return ";".join(stack_parts)
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# amostrador de pilhas de baixo custo: uma thread lê sys._current_frames() em intervalos fixos
+class StackSampler:
+
+    def __init__(self, interval_seconds=DEFAULT_SAMPLER_INTERVAL_SECONDS):
+        self.interval_seconds = interval_seconds
+        self.stack_counts = collections.Counter()
+        self.samples_taken = 0
+        self._watched_thread_ids = set()
+        self._watched_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    # funções que adicionam e removem as threads observadas (a thread de coleta ou as que atendem requisições)
+    def watch_thread(self, thread_id):
+        with self._watched_lock:
+            self._watched_thread_ids.add(thread_id)
+
+    def unwatch_thread(self, thread_id):
+        with self._watched_lock:
+            self._watched_thread_ids.discard(thread_id)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._sampling_loop, name="so-dashboard-stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+
+    def _sampling_loop(self):
+        while not self._stop_event.wait(self.interval_seconds):
+            with self._watched_lock:
+                watched_ids = set(self._watched_thread_ids)
+            if not watched_ids:
+                continue
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id in watched_ids:
+                    self.stack_counts[_collapse_frame_stack(frame)] += 1
+                    self.samples_taken += 1
+
+    # função que grava as pilhas agregadas, uma por linha, seguidas da quantidade de amostras
+    def write_collapsed(self, output_path):
+        with open(output_path, "w") as collapsed_file:
+            for stack, count in self.stack_counts.most_common():
+                collapsed_file.write(f"{stack} {count}\n")
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# sessão de profiling ativa: perfila as próximas N iterações do alvo e grava o resultado ao final
+class ProfilingSession:
+
+    def __init__(self, target, mode, count, interval_seconds, output_dir):
+        self.target = target
+        self.mode = mode
+        self.requested_count = count
+        self.remaining_count = count
+        self.output_dir = output_dir
+        self.started_at = time.time()
+        self.output_path = None
+        self.finished_at = None
+        self.profiler = cProfile.Profile() if mode == "cprofile" else None
+        self.sampler = StackSampler(interval_seconds) if mode == "sampler" else None
+        self.profiled_time_seconds = 0.0
+
+        # com cProfile, apenas uma thread é perfilada por vez (o perfil é por thread e não é reentrante)
+        self.cprofile_lock = threading.Lock()
+
+        if self.sampler is not None:
+            self.sampler.start()
+
+    # função que encerra a sessão, grava o arquivo de saída e retorna seu caminho
+    def finish(self):
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        timestamp_text = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started_at))
+        base_name = f"so-dashboard-{self.target}-{timestamp_text}-{os.getpid()}"
+
+        if self.profiler is not None:
+            self.output_path = os.path.join(self.output_dir, base_name + ".pstats")
+            pstats.Stats(self.profiler).dump_stats(self.output_path)
+        else:
+            self.sampler.stop()
+            self.output_path = os.path.join(self.output_dir, base_name + ".collapsed")
+            self.sampler.write_collapsed(self.output_path)
+
+        self.finished_at = time.time()
+        return self.output_path
+
+    def to_dict(self):
+        return {
+            "target": self.target,
+            "mode": self.mode,
+            "requested_count": self.requested_count,
+            "remaining_count": self.remaining_count,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "profiled_time_seconds": round(self.profiled_time_seconds, 6),
+            "samples_taken": self.sampler.samples_taken if self.sampler is not None else None,
+            "output_path": self.output_path,
+        }
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# gerenciador de profiling sob demanda: no máximo uma sessão ativa, sem interromper o atendimento da API
+class ProfilerManager:
+
+    def __init__(self, output_dir=PROFILE_OUTPUT_DIR):
+        self.output_dir = output_dir
+        self._lock = threading.Lock()
+        self._active_session = None
+        self._finished_sessions = collections.deque(maxlen=20)
+
+    # função que inicia uma sessão; retorna (sessão, None) ou (None, mensagem de erro)
+    def start(self, target="collector", mode="cprofile", count=3, interval_seconds=DEFAULT_SAMPLER_INTERVAL_SECONDS):
+
+        if target not in PROFILE_TARGETS:
+            return None, f"Alvo inválido '{target}'. Use um de: {', '.join(PROFILE_TARGETS)}."
+        if mode not in PROFILE_MODES:
+            return None, f"Modo inválido '{mode}'. Use um de: {', '.join(PROFILE_MODES)}."
+        if not isinstance(count, int) or count <= 0 or count > MAX_PROFILE_COUNT:
+            return None, f"Quantidade inválida; use um inteiro entre 1 e {MAX_PROFILE_COUNT}."
+
+        with self._lock:
+            if self._active_session is not None:
+                return None, "Já existe uma sessão de profiling ativa."
+            self._active_session = ProfilingSession(target, mode, count, max(0.001, interval_seconds), self.output_dir)
+            return self._active_session, None
+
+    # função que retorna o estado atual: sessão ativa e sessões concluídas recentemente
+    def status(self):
+        with self._lock:
+            return {
+                "active": self._active_session.to_dict() if self._active_session is not None else None,
+                "finished": [session.to_dict() for session in self._finished_sessions],
+                "output_dir": self.output_dir,
+            }
+
+    # função que retorna o caminho de um perfil concluído a partir do nome do arquivo (evita acesso a outros caminhos)
+    def finished_profile_path(self, file_name):
+        with self._lock:
+            for session in self._finished_sessions:
+                if session.output_path and os.path.basename(session.output_path) == file_name:
+                    return session.output_path
+        return None
+
+    def _session_for(self, target):
+        session = self._active_session
+        return session if session is not None and session.target == target and session.remaining_count > 0 else None
+
+    # função que contabiliza uma iteração perfilada e encerra a sessão quando a contagem chega a zero
+    def _complete_iteration(self, session):
+        with self._lock:
+            session.remaining_count -= 1
+            if session.remaining_count > 0 or self._active_session is not session:
+                return
+            self._active_session = None
+
+        try:
+            output_path = session.finish()
+            print(f"Profiler: perfil de '{session.target}' gravado em {output_path}")
+        except Exception as e_profile_write:
+            print(f"Profiler: erro ao gravar o perfil de '{session.target}': {e_profile_write}")
+        with self._lock:
+            self._finished_sessions.append(session)
+
+    # contexto que envolve uma iteração do alvo (ciclo de coleta ou requisição); sem sessão ativa, o custo é uma comparação
+    @contextlib.contextmanager
+    def profile_iteration(self, target):
+
+        session = self._session_for(target)
+        if session is None:
+            yield
+            return
+
+        # no modo cProfile, iterações concorrentes (outras requisições) seguem sem profiling e não são contabilizadas
+        if session.profiler is not None and not session.cprofile_lock.acquire(blocking=False):
+            yield
+            return
+
+        thread_id = threading.get_ident()
+        started_at = time.perf_counter()
+        if session.profiler is not None:
+            session.profiler.enable()
+        else:
+            session.sampler.watch_thread(thread_id)
+
+        try:
+            yield
+        finally:
+            if session.profiler is not None:
+                session.profiler.disable()
+                session.cprofile_lock.release()
+            else:
+                session.sampler.unwatch_thread(thread_id)
+            session.profiled_time_seconds += time.perf_counter() - started_at
+            self._complete_iteration(session)
+
+    # variantes para requisições, cujo início e fim ocorrem em ganchos separados (before_request/after_request)
+    def begin_request(self):
+        context_manager = self.profile_iteration("requests")
+        context_manager.__enter__()
+        return context_manager
+
+    @staticmethod
+    def end_request(context_manager):
+        if context_manager is not None:
+            context_manager.__exit__(None, None, None)
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# instância global usada pelo Controller (ciclos de coleta) e pelo main (requisições)
+PROFILER = ProfilerManager()
+
+# função que instala um tratador de sinal (ex: SIGUSR2) que perfila os próximos ciclos de coleta
+def install_signal_handler(signal_module, signal_number, count=3):
+
+    def _handle_profile_signal(_signum, _frame):
+        session, error_message = PROFILER.start("collector", "cprofile", count)
+        if session is None:
+            print(f"Profiler: sinal ignorado ({error_message})")
+        else:
+            print(f"Profiler: perfilando os próximos {count} ciclos de coleta (via sinal).")
+
+    signal_module.signal(signal_number, _handle_profile_signal)
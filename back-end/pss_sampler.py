@@ -0,0 +1,126 @@
+import time
+import threading
+
+import model
+import metrics
+import procfs_reader
+
+# campos de smaps_rollup lidos pelo amostrador (em kB)
+SMAPS_ROLLUP_FIELDS = tuple((f"{key}:".encode(), key) for key in ("Rss", "Pss", "Private_Clean", "Private_Dirty", "SwapPss"))
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que lê /proc/<pid>/smaps_rollup e retorna PSS, USS (páginas privadas) e swap-PSS em kB, ou None se indisponível
+def read_smaps_rollup(pid):
+
+    try:
+        rollup_values = procfs_reader.read_kb_fields(f"{model.PROC_ROOT}/{pid}/smaps_rollup", SMAPS_ROLLUP_FIELDS)
+    except (FileNotFoundError, PermissionError, ProcessLookupError, OSError):
+        return None
+
+    # processos de kernel e zumbis têm o arquivo vazio
+    if "Pss" not in rollup_values:
+        return None
+    return {
+        "pss_kb": rollup_values["Pss"],
+        "uss_kb": rollup_values.get("Private_Clean", 0) + rollup_values.get("Private_Dirty", 0),
+        "swap_pss_kb": rollup_values.get("SwapPss", 0),
+    }
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# amostrador de PSS/USS em segundo plano, com orçamento de tempo de CPU
+#
+# ler smaps_rollup percorre todas as VMAs do processo, então ler todos os PIDs a cada ciclo é caro. A cada rodada,
+# o amostrador lê primeiro os maiores consumidores de RSS e depois os demais em rodízio (do mais antigo para o mais
+# recente), até esgotar o orçamento de CPU da rodada, medido com time.thread_time() da própria thread
+class PssSampler:
+
+    def __init__(self, snapshot_fn, is_active_fn=None, round_interval_seconds=1.0, cpu_budget_fraction=0.01,
+                 top_rss_processes=16, top_refresh_seconds=5.0):
+        self.snapshot_fn = snapshot_fn
+        self.is_active_fn = is_active_fn or (lambda: True)
+        self.round_interval_seconds = round_interval_seconds
+        self.cpu_budget_fraction = cpu_budget_fraction
+        self.top_rss_processes = top_rss_processes
+        self.top_refresh_seconds = top_refresh_seconds
+
+        # resultados por PID: (starttime, horário da amostra, valores); a troca do dicionário inteiro a cada rodada
+        # permite que o Controller leia a referência sem trava
+        self._samples = {}
+        self._thread = None
+
+    # função que inicia a thread do amostrador
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._sample_loop, name="so-dashboard-pss-sampler", daemon=True)
+            self._thread.start()
+
+    def _sample_loop(self):
+        while True:
+            try:
+                if self.is_active_fn():
+                    self.sample_round()
+            except Exception as e_pss_round:
+                print(f"Erro no amostrador de PSS/USS: {e_pss_round}")
+            time.sleep(self.round_interval_seconds)
+
+    # função que define a ordem de leitura da rodada: maiores RSS sem amostra recente e, depois, o rodízio dos demais
+    def _sampling_order(self, processes, samples, now):
+
+        def _rss_kb(process_info):
+            return process_info.get("memory_rss_mb", 0.0) * 1024 or process_info.get("memory_details_kb", {}).get("rss", 0)
+
+        processes_by_rss = sorted(processes, key=_rss_kb, reverse=True)
+        top_pids = [process_info["pid"] for process_info in processes_by_rss[:self.top_rss_processes]
+                    if now - samples.get(process_info["pid"], (None, 0.0))[1] >= self.top_refresh_seconds]
+        rotation_pids = sorted((process_info["pid"] for process_info in processes_by_rss[self.top_rss_processes:]),
+                               key=lambda pid: samples.get(pid, (None, 0.0))[1])
+        return top_pids + rotation_pids
+
+    # função que executa uma rodada de amostragem dentro do orçamento; retorna quantos processos foram lidos
+    def sample_round(self):
+
+        processes = self.snapshot_fn().processes
+        start_times = model.process_start_times
+        now = time.time()
+
+        # descarta amostras de processos que terminaram ou cujo PID foi reutilizado
+        samples = {pid: sample for pid, sample in self._samples.items() if start_times.get(pid) == sample[0]}
+
+        cpu_budget_seconds = self.cpu_budget_fraction * self.round_interval_seconds
+        cpu_started_at = time.thread_time()
+        sampled_processes = 0
+
+        for pid in self._sampling_order(processes, samples, now):
+            if time.thread_time() - cpu_started_at >= cpu_budget_seconds:
+                metrics.PSS_SAMPLER_BUDGET_EXHAUSTED_TOTAL.inc()
+                break
+            rollup_values = read_smaps_rollup(pid)
+            if rollup_values is not None:
+                samples[pid] = (start_times.get(pid), time.time(), rollup_values)
+                sampled_processes += 1
+
+        self._samples = samples
+        metrics.PSS_SAMPLES_TOTAL.inc(sampled_processes)
+        metrics.PSS_SAMPLER_CPU_SECONDS_TOTAL.inc(time.thread_time() - cpu_started_at)
+        return sampled_processes
+
+    # função que acrescenta PSS, USS, swap-PSS (em MB) e o horário da amostra aos processos antes da publicação
+    def merge_into(self, processes):
+
+        samples, start_times = self._samples, model.process_start_times
+        for process_info in processes:
+            sample = samples.get(process_info["pid"])
+            if sample is not None and start_times.get(process_info["pid"]) == sample[0]:
+                _, sampled_at, rollup_values = sample
+                process_info["memory_pss_mb"] = round(rollup_values["pss_kb"] / 1024, 1)
+                process_info["memory_uss_mb"] = round(rollup_values["uss_kb"] / 1024, 1)
+                process_info["memory_swap_pss_mb"] = round(rollup_values["swap_pss_kb"] / 1024, 1)
+                process_info["memory_pss_sampled_at"] = sampled_at
+            else:
+                process_info["memory_pss_mb"] = None
+                process_info["memory_uss_mb"] = None
+                process_info["memory_swap_pss_mb"] = None
+                process_info["memory_pss_sampled_at"] = None
+        return processes
@@ -0,0 +1,216 @@
+import os
+import zlib
+import queue
+import bisect
+import struct
+import threading
+
+import wire
+import metrics
+import snapshot
+
+# formato do arquivo de gravação de snapshots
+#
+# cabeçalho do arquivo: magic "SDREC" + versão do formato (1 byte)
+# cada registro: timestamp do snapshot (double) | tamanho do payload (4 bytes) | payload
+#   payload = zlib(wire.encode_value(snapshot)), com as mesmas seções publicadas pelo Controller
+#
+# o timestamp fica fora do payload comprimido, para que a busca por horário percorra apenas os cabeçalhos
+
+RECORDING_MAGIC = b"SDREC"
+RECORDING_FORMAT_VERSION = 1
+RECORD_HEADER = struct.Struct(">dI")
+
+# extras do snapshot que são gravados (os demais são estado interno do processo que gravou)
+RECORDED_EXTRAS = ("process_sources", "cgroups")
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# exceção lançada quando o arquivo não é uma gravação válida
+class RecordingFormatError(ValueError):
+    pass
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que converte um snapshot publicado no valor gravado (seções publicadas e extras gravados), codificável pelo wire.py
+def snapshot_to_record_value(published_snapshot):
+
+    recorded_extras = {}
+    for extra_name in RECORDED_EXTRAS:
+        if extra_name in published_snapshot.extras:
+            extra_value = published_snapshot.extras[extra_name]
+            recorded_extras[extra_name] = sorted(extra_value) if isinstance(extra_value, frozenset) else extra_value
+
+    return {
+        "version": published_snapshot.version,
+        "timestamp": published_snapshot.timestamp,
+        "processes": published_snapshot.processes,
+        "memory": published_snapshot.memory,
+        "cpu": published_snapshot.cpu,
+        "filesystem": published_snapshot.filesystem,
+        "extras": recorded_extras,
+    }
+
+# função que reconstrói o snapshot imutável a partir do valor gravado
+def snapshot_from_record_value(record):
+
+    recorded_extras = record.get("extras", {})
+    if "process_sources" in recorded_extras:
+        recorded_extras["process_sources"] = frozenset(recorded_extras["process_sources"])
+    return snapshot.Snapshot(
+        version=record["version"],
+        processes=record["processes"],
+        memory=record["memory"],
+        cpu=record["cpu"],
+        filesystem=record["filesystem"],
+        timestamp=record["timestamp"],
+        extras=recorded_extras,
+    )
+
+# função que converte um snapshot publicado em um registro comprimido (cabeçalho + payload)
+def encode_snapshot_record(published_snapshot, compression_level=6):
+
+    payload = zlib.compress(wire.encode_value(snapshot_to_record_value(published_snapshot)), compression_level)
+    return RECORD_HEADER.pack(published_snapshot.timestamp, len(payload)) + payload
+
+# função que reconstrói o snapshot imutável a partir do payload de um registro; um payload que não descomprime, não
+# decodifica ou não tem a estrutura de um snapshot (ex: seção ausente, registro que não é um dicionário) resulta em
+# RecordingFormatError
+def decode_snapshot_record(payload):
+
+    try:
+        return snapshot_from_record_value(wire.decode_value(zlib.decompress(payload)))
+    # ValueError inclui wire.WireFormatError
+    except (zlib.error, ValueError, KeyError, TypeError, AttributeError) as e_record:
+        raise RecordingFormatError(f"registro corrompido: {e_record!r}")
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# gravador: acrescenta cada snapshot publicado pelo Controller ao arquivo
+#
+# a compressão e a escrita rodam em uma thread própria, fora do ciclo de coleta; se o disco atrasar e a fila
+# encher, os snapshots excedentes são descartados (e contados) em vez de atrasar a coleta
+class SnapshotRecorder:
+
+    def __init__(self, controller, recording_path, max_pending_snapshots=32):
+        self.recording_path = recording_path
+        self._pending_snapshots = queue.Queue(maxsize=max_pending_snapshots)
+        self._thread = None
+
+        # estatísticas simples da gravação
+        self.records_written = 0
+        self.bytes_written = 0
+
+        controller.add_snapshot_listener(self._on_snapshot_published)
+
+    # função chamada pelo Controller a cada snapshot publicado
+    def _on_snapshot_published(self, published_snapshot):
+        try:
+            self._pending_snapshots.put_nowait(published_snapshot)
+        except queue.Full:
+            metrics.RECORDER_DROPPED_SNAPSHOTS_TOTAL.inc()
+
+    # função que inicia a thread de gravação, escrevendo o cabeçalho se o arquivo for novo
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            with open(self.recording_path, "ab") as recording_file:
+                if recording_file.tell() == 0:
+                    recording_file.write(RECORDING_MAGIC + bytes([RECORDING_FORMAT_VERSION]))
+            print(f"Gravador: acrescentando snapshots em {self.recording_path}")
+            self._thread = threading.Thread(target=self._write_loop, name="so-dashboard-recorder", daemon=True)
+            self._thread.start()
+
+    # laço da thread de gravação; cada registro é gravado por inteiro e o arquivo é fechado em seguida, para que
+    # uma gravação interrompida perca no máximo o último registro (ignorado pelo leitor)
+    def _write_loop(self):
+        while True:
+            published_snapshot = self._pending_snapshots.get()
+            try:
+                record = encode_snapshot_record(published_snapshot)
+                with open(self.recording_path, "ab") as recording_file:
+                    recording_file.write(record)
+                self.records_written += 1
+                self.bytes_written += len(record)
+                metrics.RECORDER_BYTES_WRITTEN_TOTAL.inc(len(record))
+            except (OSError, wire.WireFormatError) as e_record_write:
+                print(f"Gravador: falha ao gravar snapshot em {self.recording_path}: {e_record_write}")
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# leitor de uma gravação: indexa os registros (horário, posição, tamanho) lendo apenas os cabeçalhos
+class SnapshotRecording:
+
+    def __init__(self, recording_path):
+        self.recording_path = recording_path
+        self.timestamps = []
+        self._record_positions = []
+        self._load_index()
+
+    def _load_index(self):
+        with open(self.recording_path, "rb") as recording_file:
+            file_size = os.fstat(recording_file.fileno()).st_size
+            file_header = recording_file.read(len(RECORDING_MAGIC) + 1)
+            if len(file_header) <= len(RECORDING_MAGIC) or file_header[:len(RECORDING_MAGIC)] != RECORDING_MAGIC:
+                raise RecordingFormatError(f"{self.recording_path} não é uma gravação do SO Dashboard")
+            if file_header[len(RECORDING_MAGIC)] != RECORDING_FORMAT_VERSION:
+                raise RecordingFormatError(f"versão de gravação não suportada: {file_header[len(RECORDING_MAGIC)]}")
+
+            while True:
+                record_header = recording_file.read(RECORD_HEADER.size)
+                if len(record_header) < RECORD_HEADER.size:
+                    break
+                record_timestamp, payload_length = RECORD_HEADER.unpack(record_header)
+                payload_offset = recording_file.tell()
+
+                # um registro incompleto no fim (gravação interrompida) é ignorado
+                if payload_offset + payload_length > file_size:
+                    break
+                recording_file.seek(payload_length, 1)
+                self.timestamps.append(record_timestamp)
+                self._record_positions.append((payload_offset, payload_length))
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    # função que lê e decodifica o registro de índice informado
+    def read_snapshot(self, record_index):
+        payload_offset, payload_length = self._record_positions[record_index]
+        try:
+            with open(self.recording_path, "rb") as recording_file:
+                recording_file.seek(payload_offset)
+                payload = recording_file.read(payload_length)
+        except OSError as e_record_read:
+            raise RecordingFormatError(f"registro ilegível: {e_record_read}")
+        return decode_snapshot_record(payload)
+
+    # função que retorna o índice do último registro gravado até o horário informado (ou o primeiro, se for anterior)
+    def index_at(self, timestamp):
+        return max(0, bisect.bisect_right(self.timestamps, timestamp) - 1)
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+
+    import sys
+    import datetime
+
+    # resumo de uma gravação: quantidade de snapshots, intervalo de horários e tamanho médio por registro
+    if len(sys.argv) != 2:
+        print("uso: python recording.py <arquivo de gravação>")
+        sys.exit(1)
+
+    try:
+        snapshot_recording = SnapshotRecording(sys.argv[1])
+    except (OSError, RecordingFormatError) as e_recording:
+        print(e_recording)
+        sys.exit(1)
+
+    if not len(snapshot_recording):
+        print("Gravação vazia.")
+        sys.exit(0)
+
+    recording_size_bytes = os.path.getsize(sys.argv[1])
+    print(f"{len(snapshot_recording)} snapshots, "
+          f"de {datetime.datetime.fromtimestamp(snapshot_recording.timestamps[0]).isoformat()} "
+          f"a {datetime.datetime.fromtimestamp(snapshot_recording.timestamps[-1]).isoformat()}, "
+          f"{recording_size_bytes / len(snapshot_recording) / 1024:.1f} KB por snapshot")
@@ -0,0 +1,144 @@
+import time
+import threading
+
+import recording
+from controller import Controller
+
+# maior pausa entre dois registros durante a reprodução (lacunas maiores, como o gravador parado, são encurtadas)
+MAX_REPLAY_GAP_SECONDS = 60.0
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# Controller que publica os snapshots de uma gravação (ver recording.py) em vez de chamar o model.*
+#
+# os snapshots são publicados no mesmo ritmo em que foram gravados, dividido pela velocidade (speed=10 reproduz
+# 10x mais rápido; speed=0 pausa). A versão publicada é local e monotônica, pois a reprodução pode voltar no tempo
+# (seek ou loop) e o cache de respostas pré-codificadas depende da versão; o timestamp é o da gravação
+class ReplayController(Controller):
+
+    def __init__(self, recording_path, speed=1.0, loop=False):
+        super().__init__()
+        self.recording = recording.SnapshotRecording(recording_path)
+        if not len(self.recording):
+            raise recording.RecordingFormatError(f"{recording_path} não contém snapshots gravados")
+
+        self.speed = speed
+        self.loop = loop
+        self._replay_condition = threading.Condition()
+        self._next_record_index = 0
+        self._current_record_index = None
+        self._seek_record_index = None
+
+    #---------------------------------------------------------------------------------------------------#
+
+    # função que inicia a thread de reprodução (substitui o ciclo de coleta do Controller)
+    def start_periodic_cache_update_thread(self):
+        if self._update_thread is None or not self._update_thread.is_alive():
+            print(f"Replay: reproduzindo {len(self.recording)} snapshots de {self.recording.recording_path} (velocidade {self.speed}x)")
+            self._update_thread = threading.Thread(target=self._replay_loop, name="so-dashboard-replay", daemon=True)
+            self._update_thread.start()
+
+    # função que publica o registro informado, mantendo o timestamp gravado
+    def _publish_record(self, record_index):
+        recorded_snapshot = self.recording.read_snapshot(record_index)
+        self._publish_snapshot(
+            processes=recorded_snapshot.processes,
+            memory=recorded_snapshot.memory,
+            cpu=recorded_snapshot.cpu,
+            filesystem=recorded_snapshot.filesystem,
+            timestamp=recorded_snapshot.timestamp,
+            extras=recorded_snapshot.extras,
+        )
+        self._current_record_index = record_index
+
+    # laço da thread de reprodução
+    def _replay_loop(self):
+        while True:
+            with self._replay_condition:
+                if self._seek_record_index is not None:
+                    self._next_record_index, self._seek_record_index = self._seek_record_index, None
+
+                # ao fim da gravação, recomeça (loop) ou aguarda um seek
+                if self._next_record_index >= len(self.recording):
+                    if not self.loop:
+                        self._replay_condition.wait()
+                        continue
+                    self._next_record_index = 0
+                record_index = self._next_record_index
+
+            try:
+                self._publish_record(record_index)
+            except recording.RecordingFormatError as e_replay_record:
+                print(f"Replay: registro {record_index} ignorado: {e_replay_record}")
+            except Exception as e_replay_loop:
+                # qualquer outra falha também não encerra a thread de reprodução (como no ciclo do Controller)
+                print(f"Replay: erro ao publicar o registro {record_index}: {e_replay_loop}")
+
+            with self._replay_condition:
+                self._next_record_index = record_index + 1
+                if self._seek_record_index is not None:
+                    continue
+
+                # speed=0 pausa até uma nova velocidade ou seek; caso contrário, aguarda o intervalo gravado
+                if self.speed <= 0:
+                    self._replay_condition.wait()
+                elif self._next_record_index < len(self.recording):
+                    recorded_gap_seconds = self.recording.timestamps[self._next_record_index] - self.recording.timestamps[record_index]
+                    self._replay_condition.wait(min(max(0.0, recorded_gap_seconds), MAX_REPLAY_GAP_SECONDS) / self.speed)
+
+    #---------------------------------------------------------------------------------------------------#
+
+    # função que posiciona a reprodução no último snapshot gravado até o horário informado (Unix)
+    def seek(self, timestamp):
+        with self._replay_condition:
+            self._seek_record_index = self.recording.index_at(timestamp)
+            self._replay_condition.notify_all()
+
+    # função que altera a velocidade da reprodução (0 pausa)
+    def set_speed(self, speed):
+        with self._replay_condition:
+            self.speed = max(0.0, float(speed))
+            self._replay_condition.notify_all()
+
+    # função que retorna o estado da reprodução
+    def replay_status(self):
+        current_record_index = self._current_record_index
+        return {
+            "recording_path": self.recording.recording_path,
+            "records": len(self.recording),
+            "first_timestamp": self.recording.timestamps[0],
+            "last_timestamp": self.recording.timestamps[-1],
+            "position_index": current_record_index,
+            "position_timestamp": self.recording.timestamps[current_record_index] if current_record_index is not None else None,
+            "speed": self.speed,
+            "loop": self.loop,
+        }
+
+    #---------------------------------------------------------------------------------------------------#
+
+    # a reprodução não coleta dados: a demanda dos consumidores é ignorada e não há o que antecipar
+    def note_demand(self, consumer_name, fields=None):
+        pass
+
+    def get_collector_status(self):
+        return {"mode": "replay", **self.replay_status(), "snapshot_version": self._snapshot.version}
+
+    # a série de alta frequência da CPU não é gravada (apenas o resumo de cada ciclo, na seção cpu)
+    def get_cpu_history(self, window_seconds, include_cores=False):
+        return None
+
+    # navegação de diretórios e E/S por processo dependem do host ao vivo e não são gravadas
+    def get_directory_contents(self, path='/'):
+        return {"path": path, "contents": [], "error": "Navegação de diretórios indisponível no modo replay."}
+
+    def get_directory_usage(self, path='/', start=False):
+        return None
+
+    def cancel_directory_usage(self, path='/'):
+        return None
+
+    def search_files(self, query, limit=50):
+        return None
+
+    def get_process_io_info(self, pid):
+        return {"io_stats": {}, "open_files": [], "timestamp": time.time()}
@@ -0,0 +1,189 @@
+import json
+import gzip
+import time
+import zlib
+import threading
+import collections
+
+import metrics
+
+# codificações de conteúdo suportadas, em ordem de preferência quando o cliente aceita mais de uma
+SUPPORTED_CONTENT_ENCODINGS = ("gzip", "deflate")
+
+# nível de compressão: níveis baixos já removem quase toda a redundância dos nomes de campos, com pouco custo de CPU
+COMPRESSION_LEVEL = 5
+
+# respostas menores que este tamanho não compensam a compressão
+MIN_COMPRESSION_BYTES = 1024
+
+# limite de variantes pré-codificadas mantidas em memória (rota x versão x formato x codificação x parâmetros)
+MAX_ENCODED_VARIANTS = 64
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função auxiliar que achata dicionários aninhados em chaves "pai.filho" (ex: memory_details_kb.vms)
+def _flatten_keys(record, prefix=""):
+
+    flattened_keys = []
+    for key, value in record.items():
+        if isinstance(value, dict):
+            flattened_keys.extend(_flatten_keys(value, f"{prefix}{key}."))
+        else:
+            flattened_keys.append(f"{prefix}{key}")
+    return flattened_keys
+
+# função auxiliar que lê o valor de uma chave achatada
+def _read_flattened_value(record, key_path):
+
+    value = record
+    for key_part in key_path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key_part)
+    return value
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que converte uma lista de dicionários para o formato colunar: uma lista de chaves e uma linha de valores por item
+#
+#   {"format": "columnar", "keys": ["pid", "name", "memory_details_kb.vms", ...], "rows": [[1, "systemd", 16000, ...], ...]}
+#
+# listas de dicionários aninhadas (ex: threads_detailed_info) também são convertidas, recursivamente
+def to_columnar(records):
+
+    # a união das chaves preserva a ordem do primeiro registro; registros com campos ausentes recebem null
+    ordered_keys, seen_keys = [], set()
+    for record in records:
+        for key in _flatten_keys(record):
+            if key not in seen_keys:
+                seen_keys.add(key)
+                ordered_keys.append(key)
+
+    key_paths = [tuple(key.split(".")) for key in ordered_keys]
+    rows = []
+    for record in records:
+        row = []
+        for key_path in key_paths:
+            value = _read_flattened_value(record, key_path)
+            if isinstance(value, list) and value and isinstance(value[0], dict):
+                value = to_columnar(value)
+            row.append(value)
+        rows.append(row)
+
+    return {"format": "columnar", "keys": ordered_keys, "rows": rows}
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que escolhe a codificação de conteúdo a partir do cabeçalho Accept-Encoding (respeitando q=0)
+def negotiate_content_encoding(accept_encoding_header):
+
+    if not accept_encoding_header:
+        return None
+
+    accepted_qualities = {}
+    for encoding_item in accept_encoding_header.split(","):
+        encoding_parts = encoding_item.strip().split(";")
+        encoding_name = encoding_parts[0].strip().lower()
+        quality = 1.0
+        for parameter in encoding_parts[1:]:
+            parameter = parameter.strip()
+            if parameter.startswith("q="):
+                try:
+                    quality = float(parameter[2:])
+                except ValueError:
+                    quality = 0.0
+        accepted_qualities[encoding_name] = quality
+
+    best_encoding, best_quality = None, 0.0
+    for encoding_name in SUPPORTED_CONTENT_ENCODINGS:
+        quality = accepted_qualities.get(encoding_name, accepted_qualities.get("*", 0.0))
+        if quality > best_quality:
+            best_encoding, best_quality = encoding_name, quality
+    return best_encoding
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que serializa o payload em JSON compacto (mesma ordenação de chaves do jsonify)
+def serialize_payload(payload, metrics_label="none"):
+
+    serialization_started_at = time.perf_counter()
+    body = json.dumps(payload, separators=(",", ":"), sort_keys=True, ensure_ascii=False).encode("utf-8")
+    metrics.RESPONSE_SERIALIZATION_SECONDS.observe(time.perf_counter() - serialization_started_at, metrics_label)
+    return body
+
+# função que aplica a codificação de conteúdo ao corpo já serializado; retorna (corpo, codificação efetiva)
+def compress_body(body, content_encoding):
+
+    if content_encoding is None or len(body) < MIN_COMPRESSION_BYTES:
+        return body, None
+    if content_encoding == "gzip":
+        return gzip.compress(body, COMPRESSION_LEVEL, mtime=0), "gzip"
+    if content_encoding == "deflate":
+        # "deflate" no HTTP corresponde ao formato zlib (RFC 1950), não ao deflate bruto
+        return zlib.compress(body, COMPRESSION_LEVEL), "deflate"
+    return body, None
+
+# função que monta um objeto JSON a partir de fragmentos já serializados, {chave: bytes}, em ordem de chave
+# (mesma ordenação de serialize_payload), sem decodificar nem serializar os fragmentos de novo
+def join_json_fragments(fragments):
+    return b"{" + b",".join(json.dumps(key).encode("utf-8") + b":" + fragments[key] for key in sorted(fragments)) + b"}"
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# cache das respostas pré-codificadas por versão do snapshot: a serialização e a compressão acontecem uma única vez
+# por versão e variante, e não uma vez por cliente
+class EncodedResponseCache:
+
+    def __init__(self, max_variants=MAX_ENCODED_VARIANTS):
+        self.max_variants = max_variants
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+        self._latest_version_by_route = {}
+
+    def _lookup(self, cache_key):
+        with self._lock:
+            cached_entry = self._entries.get(cache_key)
+            if cached_entry is not None:
+                self._entries.move_to_end(cache_key)
+            return cached_entry
+
+    def _store(self, cache_key, encoded_entry):
+        route_key, snapshot_version = cache_key[0], cache_key[1]
+        with self._lock:
+            # uma versão mais nova da rota invalida todas as variantes das versões anteriores
+            if snapshot_version > self._latest_version_by_route.get(route_key, -1):
+                self._latest_version_by_route[route_key] = snapshot_version
+                for stale_key in [key for key in self._entries if key[0] == route_key and key[1] < snapshot_version]:
+                    del self._entries[stale_key]
+
+            self._entries[cache_key] = encoded_entry
+            while len(self._entries) > self.max_variants:
+                self._entries.popitem(last=False)
+            metrics.CACHE_ENTRIES.set(len(self._entries), "encoded_response")
+        return encoded_entry
+
+    # função que retorna (corpo, codificação) da variante; o JSON é gerado uma vez por versão e reaproveitado
+    # por todas as codificações, e cada codificação é comprimida uma única vez
+    def get_or_encode(self, route_key, snapshot_version, variant_key, payload_fn, content_encoding=None):
+        return self.get_or_encode_body(route_key, snapshot_version, variant_key,
+                                       lambda: serialize_payload(payload_fn(), route_key), content_encoding)
+
+    # função equivalente a get_or_encode para um corpo já serializado por body_fn (ex: montado a partir de
+    # fragmentos JSON armazenados neste mesmo cache)
+    def get_or_encode_body(self, route_key, snapshot_version, variant_key, body_fn, content_encoding=None):
+
+        encoded_key = (route_key, snapshot_version, variant_key, content_encoding)
+        cached_entry = self._lookup(encoded_key)
+        if cached_entry is not None:
+            metrics.CACHE_REQUESTS_TOTAL.inc(1, "encoded_response", "hit")
+            return cached_entry
+        metrics.CACHE_REQUESTS_TOTAL.inc(1, "encoded_response", "miss")
+
+        identity_key = (route_key, snapshot_version, variant_key, None)
+        identity_entry = self._lookup(identity_key)
+        if identity_entry is None:
+            identity_entry = self._store(identity_key, (body_fn(), None))
+        if content_encoding is None:
+            return identity_entry
+
+        return self._store(encoded_key, compress_body(identity_entry[0], content_encoding))
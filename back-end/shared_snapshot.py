@@ -0,0 +1,518 @@
+import os
+import sys
+import hmac
+import time
+import signal
+import struct
+import argparse
+import threading
+import contextlib
+import socketserver
+from multiprocessing import shared_memory, resource_tracker
+
+import wire
+import recording
+import collection_plan
+from controller import Controller
+
+# nome do segmento de memória compartilhada (em /dev/shm) e tamanho total, dividido entre os dois buffers
+DEFAULT_SEGMENT_NAME = os.environ.get("SO_DASHBOARD_SHARED_SNAPSHOT", "so-dashboard")
+DEFAULT_SEGMENT_SIZE_MB = int(os.environ.get("SO_DASHBOARD_SHARED_SNAPSHOT_MB", "64"))
+
+# layout do segmento
+#
+# cabeçalho (80 bytes, little-endian): magic "SDSHM001" | sequência do seqlock | buffer ativo | versão do snapshot |
+#   timestamp | tamanho do payload | tamanho de cada buffer | pedidos de ciclo antecipado | PID do coletor | heartbeat
+# token dos pedidos (a partir de 80, 16 bytes aleatórios): apresentado pelos workers nos pedidos ao coletor
+# demanda (a partir de 128): DEMAND_SLOTS entradas de (horário, consumidor, máscara de campos), escritas pelos workers
+# buffers (a partir de 4096): dois buffers de payload; o coletor escreve no inativo e depois troca o ativo
+#
+# payload = wire.encode_value({"snapshot": valor gravado (recording.snapshot_to_record_value), "collector_status": ...})
+SEGMENT_MAGIC = b"SDSHM001"
+SEGMENT_HEADER = struct.Struct("<8sQQQdQQQQd")
+SEQUENCE_OFFSET, ACTIVE_BUFFER_OFFSET, VERSION_OFFSET, TIMESTAMP_OFFSET, LENGTH_OFFSET = 8, 16, 24, 32, 40
+BUFFER_SIZE_OFFSET, REFRESH_REQUESTS_OFFSET, COLLECTOR_PID_OFFSET, HEARTBEAT_OFFSET = 48, 56, 64, 72
+REQUEST_TOKEN_OFFSET, REQUEST_TOKEN_SIZE = 80, 16
+
+DEMAND_OFFSET = 128
+DEMAND_SLOTS = 64
+DEMAND_SLOT = struct.Struct("<dII")
+BUFFERS_OFFSET = 4096
+
+# consumidores e campos de processo transmitidos pela área de demanda (índice do consumidor e bit de cada campo)
+DEMAND_CONSUMERS = ("cpu", "processes", "process_detail", "cgroups")
+DEMAND_FIELDS = tuple(sorted(collection_plan.ALL_PROCESS_FIELDS))
+
+_U64 = struct.Struct("<Q")
+_F64 = struct.Struct("<d")
+
+# intervalo de leitura do cabeçalho pelos workers e da área de demanda pelo coletor
+POLL_INTERVAL_SECONDS = 0.2
+
+# sem heartbeat do coletor por esse tempo, o worker reabre o segmento (o coletor pode ter sido reiniciado)
+COLLECTOR_STALE_SECONDS = 10.0
+
+# operações que os workers executam no processo coletor (uso de disco e busca de arquivos têm estado próprio, que
+# precisa ser único entre os workers) e tempo máximo de espera pela resposta
+COLLECTOR_REQUEST_METHODS = frozenset(("get_directory_usage", "cancel_directory_usage", "search_files"))
+COLLECTOR_REQUEST_TIMEOUT_SECONDS = 5.0
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que converte uma demanda (consumidor, campos) em (índice do consumidor, máscara), ou None se não transmissível
+def encode_demand(consumer_name, fields):
+
+    if consumer_name not in DEMAND_CONSUMERS:
+        return None
+    fields = fields if fields is not None else collection_plan.DEFAULT_CONSUMER_FIELDS.get(consumer_name, collection_plan.ALL_PROCESS_FIELDS)
+    fields_mask = 0
+    for field_name in fields:
+        if field_name in collection_plan.ALL_PROCESS_FIELDS:
+            fields_mask |= 1 << DEMAND_FIELDS.index(field_name)
+    return DEMAND_CONSUMERS.index(consumer_name), fields_mask
+
+# função inversa de encode_demand: retorna (consumidor, campos)
+def decode_demand(consumer_index, fields_mask):
+
+    return DEMAND_CONSUMERS[consumer_index], frozenset(field_name for bit, field_name in enumerate(DEMAND_FIELDS) if fields_mask >> bit & 1)
+
+# função que retorna o endereço do socket de pedidos do coletor de um segmento (socket Unix no espaço abstrato do
+# Linux: não deixa arquivo para trás quando o coletor é encerrado)
+def request_address(segment_name):
+
+    return f"unix://\0so-dashboard-requests-{segment_name}"
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# segmento de memória compartilhada com o snapshot publicado pelo processo coletor
+#
+# escrita (um único escritor): a sequência fica ímpar, o payload vai para o buffer inativo, o cabeçalho aponta para o
+# novo buffer e a sequência volta a ser par. Leitura: sequência par antes e depois de ler o cabeçalho; o payload é
+# decodificado diretamente do segmento (memoryview, sem copiar o buffer) e, como a próxima publicação escreve no outro
+# buffer, a leitura só é refeita se a publicação seguinte a essa começou (sequência avançou 3 ou mais) durante a decodificação
+class SharedSnapshotSegment:
+
+    def __init__(self, shared_segment, owner=False):
+        self._shared_segment = shared_segment
+        self.owner = owner
+        self.name = shared_segment.name
+
+    # função que cria o segmento (substituindo um segmento antigo com o mesmo nome, deixado por um coletor encerrado)
+    @classmethod
+    def create(cls, name=DEFAULT_SEGMENT_NAME, size_bytes=DEFAULT_SEGMENT_SIZE_MB * 1024 * 1024):
+        try:
+            shared_segment = shared_memory.SharedMemory(name=name, create=True, size=size_bytes)
+        except FileExistsError:
+            stale_segment = shared_memory.SharedMemory(name=name)
+            stale_segment.close()
+            stale_segment.unlink()
+            shared_segment = shared_memory.SharedMemory(name=name, create=True, size=size_bytes)
+
+        buffer_size = (size_bytes - BUFFERS_OFFSET) // 2
+        SEGMENT_HEADER.pack_into(shared_segment.buf, 0, SEGMENT_MAGIC, 0, 0, 0, 0.0, 0, buffer_size, 0, os.getpid(), time.time())
+        shared_segment.buf[REQUEST_TOKEN_OFFSET:REQUEST_TOKEN_OFFSET + REQUEST_TOKEN_SIZE] = os.urandom(REQUEST_TOKEN_SIZE)
+        return cls(shared_segment, owner=True)
+
+    # função que abre um segmento existente; o segmento não é registrado no resource_tracker, que o removeria ao fim do worker
+    @classmethod
+    def attach(cls, name=DEFAULT_SEGMENT_NAME):
+        try:
+            shared_segment = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Python < 3.13 não tem track=False
+            shared_segment = shared_memory.SharedMemory(name=name)
+            resource_tracker.unregister(shared_segment._name, "shared_memory")
+
+        if bytes(shared_segment.buf[:len(SEGMENT_MAGIC)]) != SEGMENT_MAGIC:
+            shared_segment.close()
+            raise ValueError(f"o segmento {name} não contém snapshots do SO Dashboard")
+        return cls(shared_segment)
+
+    def close(self):
+        self._shared_segment.close()
+        if self.owner:
+            self._shared_segment.unlink()
+
+    def _read_u64(self, offset):
+        return _U64.unpack_from(self._shared_segment.buf, offset)[0]
+
+    def _write_u64(self, offset, value):
+        _U64.pack_into(self._shared_segment.buf, offset, value)
+
+    #---------------------------------------------------------------------------------------------------#
+
+    # função que publica um payload no buffer inativo e o torna ativo (somente o coletor)
+    def write_payload(self, payload, version, timestamp):
+
+        segment_buffer = self._shared_segment.buf
+        buffer_size = self._read_u64(BUFFER_SIZE_OFFSET)
+        if len(payload) > buffer_size:
+            raise ValueError(f"snapshot de {len(payload)} bytes não cabe no buffer de {buffer_size} bytes "
+                             "(aumente SO_DASHBOARD_SHARED_SNAPSHOT_MB)")
+
+        # a sequência fica ímpar antes da cópia: um leitor que decodifica o buffer ativo percebe que a publicação
+        # seguinte à próxima (a que sobrescreve esse buffer) começou, mesmo que a cópia ainda não tenha terminado
+        sequence = self._read_u64(SEQUENCE_OFFSET)
+        self._write_u64(SEQUENCE_OFFSET, sequence + 1)
+
+        inactive_buffer = 1 - self._read_u64(ACTIVE_BUFFER_OFFSET)
+        buffer_offset = BUFFERS_OFFSET + inactive_buffer * buffer_size
+        segment_buffer[buffer_offset:buffer_offset + len(payload)] = payload
+
+        self._write_u64(ACTIVE_BUFFER_OFFSET, inactive_buffer)
+        self._write_u64(VERSION_OFFSET, version)
+        _F64.pack_into(segment_buffer, TIMESTAMP_OFFSET, timestamp)
+        self._write_u64(LENGTH_OFFSET, len(payload))
+        self._write_u64(SEQUENCE_OFFSET, sequence + 2)
+
+    # função que lê o payload ativo se a versão for diferente de known_version; retorna (versão, valor) ou None.
+    # Um payload que não pode ser decodificado (ex: coletor de outra versão do SO Dashboard) retorna (versão, None),
+    # para que o chamador marque a versão como vista em vez de tentar de novo
+    def read_payload(self, known_version=None):
+
+        segment_buffer = self._shared_segment.buf
+        while True:
+            sequence_before = self._read_u64(SEQUENCE_OFFSET)
+            if sequence_before & 1:
+                # publicação em andamento (cópia do payload para o buffer inativo)
+                time.sleep(0.001)
+                continue
+            _, _, active_buffer, version, _, payload_length, buffer_size, _, _, _ = SEGMENT_HEADER.unpack_from(segment_buffer, 0)
+            if self._read_u64(SEQUENCE_OFFSET) != sequence_before:
+                continue
+            if version == 0 or version == known_version:
+                return None
+
+            buffer_offset = BUFFERS_OFFSET + active_buffer * buffer_size
+            with segment_buffer[buffer_offset:buffer_offset + payload_length] as payload_view:
+                try:
+                    shared_value = wire.decode_value(payload_view)
+                except (wire.WireFormatError, UnicodeDecodeError, struct.error, TypeError, ValueError, RecursionError):
+                    shared_value = None
+
+            # a publicação seguinte escreve no outro buffer (sequência + 2); a partir da segunda (sequência + 3), este
+            # buffer pode ter sido sobrescrito durante a decodificação, e a leitura é refeita
+            if self._read_u64(SEQUENCE_OFFSET) - sequence_before <= 2:
+                return version, shared_value
+
+    #---------------------------------------------------------------------------------------------------#
+
+    # função que registra a demanda de um consumidor (workers); cada par (consumidor, campos) tem uma entrada fixa
+    def write_demand(self, consumer_name, fields):
+        encoded_demand = encode_demand(consumer_name, fields)
+        if encoded_demand is None:
+            return
+        consumer_index, fields_mask = encoded_demand
+        demand_slot = (consumer_index * 2654435761 ^ fields_mask) % DEMAND_SLOTS
+        DEMAND_SLOT.pack_into(self._shared_segment.buf, DEMAND_OFFSET + demand_slot * DEMAND_SLOT.size, time.time(), consumer_index, fields_mask)
+
+    # função que retorna as demandas registradas: lista de (horário, consumidor, campos)
+    def read_demands(self):
+        demands = []
+        for demand_slot in range(DEMAND_SLOTS):
+            demanded_at, consumer_index, fields_mask = DEMAND_SLOT.unpack_from(self._shared_segment.buf, DEMAND_OFFSET + demand_slot * DEMAND_SLOT.size)
+            if demanded_at > 0 and consumer_index < len(DEMAND_CONSUMERS):
+                demands.append((demanded_at, *decode_demand(consumer_index, fields_mask)))
+        return demands
+
+    # função que pede ao coletor um ciclo antecipado (workers)
+    def request_refresh(self):
+        self._write_u64(REFRESH_REQUESTS_OFFSET, self._read_u64(REFRESH_REQUESTS_OFFSET) + 1)
+
+    @property
+    def refresh_requests(self):
+        return self._read_u64(REFRESH_REQUESTS_OFFSET)
+
+    # função que atualiza o heartbeat do coletor
+    def beat(self):
+        _F64.pack_into(self._shared_segment.buf, HEARTBEAT_OFFSET, time.time())
+
+    # função que retorna (PID do coletor, horário do último heartbeat)
+    def collector_liveness(self):
+        return self._read_u64(COLLECTOR_PID_OFFSET), _F64.unpack_from(self._shared_segment.buf, HEARTBEAT_OFFSET)[0]
+
+    # token dos pedidos ao coletor: só quem pode abrir o segmento (mesmo usuário, /dev/shm com modo 0600) o conhece
+    @property
+    def request_token(self):
+        return bytes(self._shared_segment.buf[REQUEST_TOKEN_OFFSET:REQUEST_TOKEN_OFFSET + REQUEST_TOKEN_SIZE])
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# publicador do processo coletor: escreve cada snapshot do Controller no segmento e repassa ao planejador da coleta
+# a demanda registrada pelos workers (consumidores ativos e pedidos de ciclo antecipado)
+class SharedSnapshotPublisher:
+
+    def __init__(self, controller, segment):
+        self.controller = controller
+        self.segment = segment
+        self._demand_thread = None
+        self._seen_demands = {}
+        self._seen_refresh_requests = segment.refresh_requests
+
+    # função que registra o publicador como ouvinte do Controller e inicia a thread que lê a demanda
+    def start(self):
+        self.controller.add_snapshot_listener(self._publish)
+        if self._demand_thread is None or not self._demand_thread.is_alive():
+            self._demand_thread = threading.Thread(target=self._demand_loop, name="so-dashboard-shared-demand", daemon=True)
+            self._demand_thread.start()
+
+    def _publish(self, published_snapshot):
+        self.segment.write_payload(wire.encode_value({
+            "snapshot": recording.snapshot_to_record_value(published_snapshot),
+            "collector_status": self.controller.get_collector_status(),
+        }), published_snapshot.version, published_snapshot.timestamp)
+
+    def _demand_loop(self):
+        while True:
+            try:
+                self.segment.beat()
+                for demanded_at, consumer_name, fields in self.segment.read_demands():
+                    if self._seen_demands.get((consumer_name, fields)) == demanded_at:
+                        continue
+                    self._seen_demands[(consumer_name, fields)] = demanded_at
+                    self.controller.collection_planner.note_demand(consumer_name, fields, now=demanded_at)
+
+                refresh_requests = self.segment.refresh_requests
+                if refresh_requests != self._seen_refresh_requests:
+                    self._seen_refresh_requests = refresh_requests
+                    self.controller.request_refresh()
+            except Exception as e_shared_demand:
+                print(f"Erro ao ler a demanda dos workers: {e_shared_demand}")
+            time.sleep(POLL_INTERVAL_SECONDS)
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# tratador de uma conexão de worker: cada pedido é um quadro MSG_REQUEST {"token", "method", "args"} respondido com
+# um quadro MSG_RESPONSE {"result"} ou {"error"}
+class _CollectorRequestHandler(socketserver.BaseRequestHandler):
+
+    def handle(self):
+        try:
+            while True:
+                frame = wire.read_frame(self.request)
+                if frame is None:
+                    break
+                message_type, message = frame
+                if message_type != wire.MSG_REQUEST or not isinstance(message, dict):
+                    raise wire.WireFormatError("pedido inesperado")
+
+                # um pedido sem o token do segmento encerra a conexão (qualquer processo pode abrir o socket abstrato)
+                if not hmac.compare_digest(bytes(message.get("token") or b""), self.server.token):
+                    print("Coletor: pedido recusado (token inválido)")
+                    break
+
+                method_name, method_args = message.get("method"), message.get("args") or []
+                if method_name not in COLLECTOR_REQUEST_METHODS:
+                    response = {"error": f"operação desconhecida: {method_name}"}
+                else:
+                    try:
+                        response = {"result": getattr(self.server.controller, method_name)(*method_args)}
+                    except Exception as e_collector_request:
+                        response = {"error": str(e_collector_request)}
+                try:
+                    response_frame = wire.encode_frame(wire.MSG_RESPONSE, response)
+                except (wire.WireFormatError, UnicodeEncodeError) as e_response:
+                    response_frame = wire.encode_frame(wire.MSG_RESPONSE, {"error": str(e_response)})
+                self.request.sendall(response_frame)
+
+        # TypeError: token que não é bytes
+        except (OSError, wire.WireFormatError, TypeError) as e_worker_connection:
+            print(f"Coletor: conexão de worker encerrada: {e_worker_connection}")
+
+class _ThreadingUnixCollectorServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+# servidor de pedidos do processo coletor: uso de disco (início, progresso e cancelamento) e busca de arquivos são
+# executados pelo Controller do coletor, então uma varredura iniciada por um worker é vista por todos os outros e o
+# índice de arquivos existe em uma única cópia
+class CollectorRequestServer:
+
+    def __init__(self, controller, segment):
+        self.controller = controller
+        self.segment = segment
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        _, socket_address = wire.parse_address(request_address(self.segment.name))
+        self._server = _ThreadingUnixCollectorServer(socket_address, _CollectorRequestHandler)
+        self._server.controller = self.controller
+        self._server.token = self.segment.request_token
+        self._thread = threading.Thread(target=self._server.serve_forever, name="so-dashboard-collector-requests", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# Controller dos workers da API quando a coleta roda em um processo separado (SO_DASHBOARD_SHARED_SNAPSHOT)
+#
+# não executa coletores: uma thread lê o cabeçalho do segmento e, a cada nova versão, decodifica o payload uma única
+# vez e o publica localmente (a versão publicada é local e monotônica, como no replay, pois o coletor pode ser
+# reiniciado). A demanda das requisições é registrada no segmento para o planejador do coletor; uso de disco e busca
+# de arquivos são pedidos ao coletor (CollectorRequestServer), e navegação de diretórios e E/S por processo
+# continuam sendo lidos sob demanda pelo próprio worker
+class SharedSnapshotController(Controller):
+
+    def __init__(self, segment_name=DEFAULT_SEGMENT_NAME):
+        super().__init__()
+        self.segment_name = segment_name
+        self._segment = None
+        self._shared_version = None
+        self._collector_status = {}
+
+        # o motor de uso de disco e o índice de arquivos ficam apenas no coletor
+        self.disk_usage_engine = None
+        self.file_index = None
+
+    # função que inicia a thread de leitura do segmento (substitui o ciclo de coleta do Controller)
+    def start_periodic_cache_update_thread(self):
+        if self._update_thread is None or not self._update_thread.is_alive():
+            print(f"Worker: lendo snapshots do segmento de memória compartilhada '{self.segment_name}'")
+            self._update_thread = threading.Thread(target=self._read_loop, name="so-dashboard-shared-reader", daemon=True)
+            self._update_thread.start()
+
+    # função que abre (ou reabre) o segmento quando ainda não foi aberto ou o coletor parou de atualizá-lo
+    def _ensure_segment(self):
+        if self._segment is not None and time.time() - self._segment.collector_liveness()[1] < COLLECTOR_STALE_SECONDS:
+            return self._segment
+        if self._segment is not None:
+            self._segment.close()
+            self._segment, self._shared_version = None, None
+        try:
+            self._segment = SharedSnapshotSegment.attach(self.segment_name)
+        except FileNotFoundError:
+            return None
+        return self._segment
+
+    def _read_loop(self):
+        while True:
+            try:
+                segment = self._ensure_segment()
+                if segment is not None:
+                    # pedidos de ciclo antecipado feitos por note_demand são repassados ao coletor
+                    if self._refresh_requested.is_set():
+                        self._refresh_requested.clear()
+                        segment.request_refresh()
+
+                    shared_payload = segment.read_payload(self._shared_version)
+                    if shared_payload is not None:
+                        self._shared_version, shared_value = shared_payload
+                        if shared_value is None:
+                            print(f"Snapshot compartilhado {self._shared_version} inválido (coletor de outra versão?); ignorado.")
+                        else:
+                            self._publish_shared_value(shared_value)
+            except Exception as e_shared_read:
+                print(f"Erro ao ler o snapshot compartilhado: {e_shared_read}")
+            self._refresh_requested.wait(POLL_INTERVAL_SECONDS)
+
+    # função que publica localmente o snapshot lido do segmento
+    def _publish_shared_value(self, shared_value):
+        shared_snapshot = recording.snapshot_from_record_value(shared_value["snapshot"])
+        self._collector_status = shared_value.get("collector_status") or {}
+
+        # o nível de degradação do coletor define quais fontes as requisições podem esperar (ver Controller.note_demand)
+        self.overhead_governor.degradation_level = self._collector_status.get("degradation_level", 0)
+        self._publish_snapshot(
+            processes=shared_snapshot.processes,
+            memory=shared_snapshot.memory,
+            cpu=shared_snapshot.cpu,
+            filesystem=shared_snapshot.filesystem,
+            timestamp=shared_snapshot.timestamp,
+            extras=shared_snapshot.extras,
+        )
+
+    #---------------------------------------------------------------------------------------------------#
+
+    # a demanda também é registrada no segmento, para o planejador do coletor; a espera pelo ciclo antecipado é a do Controller
+    def note_demand(self, consumer_name, fields=None):
+        if self._segment is not None:
+            self._segment.write_demand(consumer_name, frozenset(fields) if fields is not None else None)
+        super().note_demand(consumer_name, fields)
+
+    def get_collector_status(self):
+        collector_pid, collector_heartbeat = self._segment.collector_liveness() if self._segment is not None else (None, None)
+        return {
+            **self._collector_status,
+            "mode": "shared",
+            "segment": self.segment_name,
+            "collector_pid": collector_pid,
+            "collector_heartbeat": collector_heartbeat,
+            "shared_version": self._shared_version,
+            "snapshot_version": self._snapshot.version,
+        }
+
+    # a série de alta frequência da CPU fica no processo coletor (o resumo de cada ciclo chega na seção cpu)
+    def get_cpu_history(self, window_seconds, include_cores=False):
+        return None
+
+    #---------------------------------------------------------------------------------------------------#
+
+    # função que executa uma operação no Controller do coletor; retorna o resultado, ou None se o coletor não está
+    # disponível ou a operação falhou (as rotas respondem 404, como para uma fonte de dados sem o recurso)
+    def _call_collector(self, method_name, *method_args):
+
+        segment = self._segment
+        if segment is None:
+            return None
+        try:
+            with contextlib.closing(wire.connect(request_address(self.segment_name), COLLECTOR_REQUEST_TIMEOUT_SECONDS)) as sock:
+                sock.sendall(wire.encode_frame(wire.MSG_REQUEST, {"token": segment.request_token, "method": method_name, "args": list(method_args)}))
+                frame = wire.read_frame(sock)
+        except (OSError, wire.WireFormatError) as e_collector_request:
+            print(f"Erro ao pedir {method_name} ao coletor: {e_collector_request}")
+            return None
+
+        if frame is None or frame[0] != wire.MSG_RESPONSE or not isinstance(frame[1], dict):
+            print(f"Erro ao pedir {method_name} ao coletor: resposta inválida")
+            return None
+        if "error" in frame[1]:
+            print(f"Erro ao pedir {method_name} ao coletor: {frame[1]['error']}")
+            return None
+        return frame[1].get("result")
+
+    def get_directory_usage(self, path='/', start=False):
+        return self._call_collector("get_directory_usage", path, start)
+
+    def cancel_directory_usage(self, path='/'):
+        return self._call_collector("cancel_directory_usage", path)
+
+    def search_files(self, query, limit=50):
+        return self._call_collector("search_files", query, limit)
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# processo coletor: executa o Controller e publica cada snapshot no segmento, até receber SIGINT/SIGTERM
+def run_collector(segment_name=DEFAULT_SEGMENT_NAME, segment_size_mb=DEFAULT_SEGMENT_SIZE_MB):
+
+    segment = SharedSnapshotSegment.create(segment_name, segment_size_mb * 1024 * 1024)
+    collector_controller = Controller()
+    SharedSnapshotPublisher(collector_controller, segment).start()
+    request_server = CollectorRequestServer(collector_controller, segment)
+    request_server.start()
+    collector_controller.start_periodic_cache_update_thread()
+    print(f"Coletor: publicando snapshots no segmento '{segment_name}' ({segment_size_mb} MB)")
+
+    stop_event = threading.Event()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signal_number, lambda *_: stop_event.set())
+    try:
+        stop_event.wait()
+    finally:
+        request_server.stop()
+        segment.close()
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description="Processo coletor do SO Dashboard: publica os snapshots em memória compartilhada para os workers da API.")
+    parser.add_argument("--name", default=DEFAULT_SEGMENT_NAME, help="nome do segmento (o mesmo de SO_DASHBOARD_SHARED_SNAPSHOT nos workers)")
+    parser.add_argument("--size-mb", type=int, default=DEFAULT_SEGMENT_SIZE_MB, help="tamanho do segmento em MB (dois buffers)")
+    args = parser.parse_args(argv)
+    run_collector(args.name, args.size_mb)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+import time
+
+# seções de dados publicadas a cada ciclo de atualização do Controller
+SNAPSHOT_SECTIONS = ("processes", "memory", "cpu", "filesystem")
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# snapshot imutável publicado pelo Controller (publicação no estilo RCU)
+#
+# o coletor monta um snapshot novo a cada ciclo e troca uma única referência; os leitores pegam essa referência
+# sem trava e sem cópia. Os atributos não podem ser reatribuídos, a lista de processos é uma tupla e os
+# dicionários internos são tratados como somente leitura por contrato: nenhum código altera um snapshot publicado
+class Snapshot:
+
+    __slots__ = ("version", "timestamp", "processes", "processes_by_pid", "memory", "cpu", "filesystem", "extras")
+
+    def __init__(self, version, processes, memory, cpu, filesystem, timestamp=None, extras=None):
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "timestamp", timestamp if timestamp is not None else time.time())
+        object.__setattr__(self, "processes", tuple(processes))
+        object.__setattr__(self, "processes_by_pid", {process_info["pid"]: process_info for process_info in self.processes})
+        object.__setattr__(self, "memory", memory)
+        object.__setattr__(self, "cpu", cpu)
+        object.__setattr__(self, "filesystem", tuple(filesystem))
+        object.__setattr__(self, "extras", dict(extras or {}))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Snapshot publicado é imutável; monte um novo snapshot para alterar os dados.")
+
+    def __delattr__(self, name):
+        raise AttributeError("Snapshot publicado é imutável.")
+
+    # função que cria um novo snapshot com algumas seções substituídas (o original não é alterado)
+    def replace(self, **changes):
+        fields = {
+            "version": self.version,
+            "processes": self.processes,
+            "memory": self.memory,
+            "cpu": self.cpu,
+            "filesystem": self.filesystem,
+            "timestamp": self.timestamp,
+            "extras": self.extras,
+        }
+        fields.update(changes)
+        return Snapshot(**fields)
+
+# snapshot inicial, antes do primeiro ciclo de coleta (mesmos valores padrão do cache original)
+EMPTY_SNAPSHOT = Snapshot(
+    version=0,
+    processes=(),
+    memory={"ram": {}, "swap": {}, "vm_pressure": None},
+    cpu={
+        "overall_usage_percent": 0.0,
+        "overall_idle_percent": 100.0,
+        "number_of_cores": 0,
+        "cores": [],
+        "total_processes": 0,
+        "total_threads": 0,
+        "collector_degradation_level": 0,
+        "burst": None
+    },
+    filesystem=(),
+    timestamp=0.0,
+)
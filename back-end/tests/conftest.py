@@ -0,0 +1,5 @@
+import os
+import sys
+
+# os módulos do backend ficam na raiz de back-end/ (sem pacote)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,58 @@
+import os
+import time
+
+import pytest
+
+import file_index
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+@pytest.fixture
+def indexed_tree(tmp_path):
+    (tmp_path / "projetos" / "relatorios").mkdir(parents=True)
+    (tmp_path / "projetos" / "relatorios" / "relatorio_anual.txt").write_text("")
+    (tmp_path / "fotos").mkdir()
+    index = file_index.FileIndex(
+        index_path=str(tmp_path / "indice" / "file_index.bin"),
+        mountpoints_fn=lambda: [(os.fsencode(tmp_path), os.stat(tmp_path).st_dev)])
+    return tmp_path, index
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+def test_refresh_counts_listed_and_removed_directories(indexed_tree):
+    tree_path, index = indexed_tree
+    assert index.refresh() == 4
+    assert index.refresh() == 0
+
+    # mtime diferente do indexado mesmo em sistemas de arquivos com mtime de baixa resolução
+    (tree_path / "fotos" / "praia.jpg").write_text("")
+    os.utime(tree_path / "fotos", ns=(time.time_ns(), time.time_ns() + 10**9))
+    assert index.refresh() == 1
+
+    (tree_path / "fotos" / "praia.jpg").unlink()
+    (tree_path / "fotos").rmdir()
+    os.utime(tree_path, ns=(time.time_ns(), time.time_ns() + 2 * 10**9))
+    assert index.refresh() == 2
+    assert index.search("praia") == ([], False)
+
+def test_index_loop_saves_only_after_changes(indexed_tree, monkeypatch):
+    _, index = indexed_tree
+    saves = []
+    monkeypatch.setattr(index, "save", lambda: saves.append(time.monotonic()))
+    refresh_results = iter([4, 0, 0, 3])
+    monkeypatch.setattr(index, "refresh", lambda: next(refresh_results))
+
+    # a pausa entre atualizações interrompe o laço após a quarta atualização
+    class _StopLoop(Exception):
+        pass
+
+    sleeps = []
+    def _sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) == 4:
+            raise _StopLoop()
+    monkeypatch.setattr(file_index.time, "sleep", _sleep)
+
+    with pytest.raises(_StopLoop):
+        index._index_loop()
+    assert len(saves) == 2
@@ -0,0 +1,40 @@
+import os
+
+import pytest
+
+import model
+import procfs_fixture
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+@pytest.fixture
+def fixture_roots(tmp_path):
+    original_roots = (model.PROC_ROOT, model.SYS_ROOT, model.PASSWD_PATH)
+    fixture = procfs_fixture.generate_procfs_fixture(str(tmp_path), processes=5, threads_per_process=1,
+                                                     fds_per_process=1, directory_entries=0)
+    model.configure_system_roots(fixture["proc_root"], fixture["sys_root"], fixture["passwd_path"])
+    yield fixture
+    model.configure_system_roots(*original_roots)
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+def test_process_with_unparseable_stat_is_kept(fixture_roots):
+    process_pids = sorted(int(entry) for entry in os.listdir(fixture_roots["proc_root"]) if entry.isdigit())
+    truncated_pid = process_pids[-1]
+    # estado, PPID e threads lidos do stat enquanto ele está íntegro (os mesmos valores do arquivo de status)
+    intact_process = next(process for process in model.get_processes() if process["pid"] == truncated_pid)
+    expected_status_fields = (intact_process["status"], intact_process["ppid"], intact_process["threads"])
+    assert expected_status_fields != ("N/A", 0, 0)
+
+    with open(os.path.join(fixture_roots["proc_root"], str(truncated_pid), "stat"), "w") as stat_file:
+        stat_file.write(f"{truncated_pid} (truncado")
+
+    processes_by_pid = {process["pid"]: process for process in model.get_processes()}
+
+    assert sorted(processes_by_pid) == process_pids
+    truncated_process = processes_by_pid[truncated_pid]
+    # estado, PPID e threads vêm do arquivo de status; os demais campos do stat ficam nos valores padrão
+    assert (truncated_process["status"], truncated_process["ppid"], truncated_process["threads"]) == expected_status_fields
+    assert truncated_process["create_time_iso"] is None
+    assert truncated_process["name"] != "N/A"
+    assert truncated_process["memory_rss_mb"] > 0
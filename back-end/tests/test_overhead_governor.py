@@ -0,0 +1,63 @@
+import pytest
+
+import overhead_governor
+from overhead_governor import MAX_DEGRADATION_LEVEL, OverheadGovernor
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# custo de CPU de um ciclo por nível de degradação (s): acima de 2% de 5 s em todos os níveis
+HEAVY_CYCLE_CPU_SECONDS = {0: 0.40, 1: 0.25, 2: 0.16, 3: 0.15}
+
+@pytest.fixture
+def governor():
+    return OverheadGovernor(base_interval_seconds=5.0, budget_fraction=0.02, relax_after_cycles=3)
+
+def _run_cycles(governor, cycle_count, cycle_cpu_seconds_fn):
+    for _ in range(cycle_count):
+        governor.record_cycle(cycle_cpu_seconds_fn(governor.degradation_level), 0.5)
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+def test_degrades_tiers_before_stretching_then_relaxes_in_reverse(governor):
+
+    # sobrecarga: desliga um nível por ciclo sem mexer no intervalo
+    for expected_level in range(1, MAX_DEGRADATION_LEVEL + 1):
+        _run_cycles(governor, 1, HEAVY_CYCLE_CPU_SECONDS.get)
+        assert governor.degradation_level == expected_level
+        assert governor.interval_seconds == 5.0
+    assert governor.disabled_sources() == {"task", "cmdline", "exe", "smaps_rollup"}
+    assert not governor.is_feature_enabled("open_files")
+
+    # com todos os níveis desligados, o intervalo é alongado até o custo caber no orçamento
+    _run_cycles(governor, 1, HEAVY_CYCLE_CPU_SECONDS.get)
+    assert governor.interval_seconds == pytest.approx(0.15 / 0.02)
+    assert governor.status()["overhead_fraction"] == pytest.approx(0.02)
+
+    # no orçamento (nem acima, nem abaixo da metade) o estado não muda
+    _run_cycles(governor, 5, HEAVY_CYCLE_CPU_SECONDS.get)
+    assert (governor.degradation_level, governor.interval_seconds) == (MAX_DEGRADATION_LEVEL, pytest.approx(7.5))
+
+    # a carga cai: o intervalo volta ao base antes de os níveis serem religados, um por vez e com ao menos 3 ciclos
+    # com folga entre eles
+    states = [(governor.degradation_level, governor.interval_seconds)]
+    for _ in range(40):
+        _run_cycles(governor, 1, lambda level: 0.02)
+        states.append((governor.degradation_level, governor.interval_seconds))
+    transitions = [state for previous_state, state in zip(states, states[1:]) if state != previous_state]
+    assert transitions == [(3, 5.0), (2, 5.0), (1, 5.0), (0, 5.0)]
+    transition_cycles = [cycle for cycle in range(1, len(states)) if states[cycle] != states[cycle - 1]]
+    assert all(later - earlier >= 3 for earlier, later in zip(transition_cycles, transition_cycles[1:]))
+    assert governor.disabled_sources() == frozenset()
+    assert governor.status()["disabled_tiers"] == []
+
+def test_light_degradation_is_kept_when_the_lighter_level_fits(governor):
+
+    # o nível 1 já cabe no orçamento: os demais detalhes continuam ligados e o intervalo não muda
+    cycle_cpu_seconds = {0: 0.20, 1: 0.08}
+    _run_cycles(governor, 10, lambda level: cycle_cpu_seconds[level])
+    assert (governor.degradation_level, governor.interval_seconds) == (1, 5.0)
+
+def test_metrics_follow_the_governor(governor):
+    _run_cycles(governor, MAX_DEGRADATION_LEVEL + 1, HEAVY_CYCLE_CPU_SECONDS.get)
+    assert overhead_governor.metrics.COLLECTOR_DEGRADATION_LEVEL.get() == MAX_DEGRADATION_LEVEL
+    assert overhead_governor.metrics.UPDATE_INTERVAL_SECONDS.get() == governor.interval_seconds
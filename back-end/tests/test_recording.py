@@ -0,0 +1,69 @@
+import threading
+import zlib
+
+import pytest
+
+import recording
+import replay
+import snapshot
+import wire
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+def _recorded_snapshot(version, timestamp):
+    return snapshot.Snapshot(version=version, processes=[{"pid": 1, "name": "init"}], memory={"ram": {}},
+                             cpu={"overall_usage_percent": 10.0}, filesystem=[], timestamp=timestamp)
+
+# registro com um payload arbitrário (cabeçalho + payload comprimido)
+def _raw_record(timestamp, value):
+    payload = zlib.compress(wire.encode_value(value))
+    return recording.RECORD_HEADER.pack(timestamp, len(payload)) + payload
+
+@pytest.fixture
+def recording_path(tmp_path):
+    recording_path = tmp_path / "gravacao.sdrec"
+    recording_path.write_bytes(
+        recording.RECORDING_MAGIC + bytes([recording.RECORDING_FORMAT_VERSION])
+        + recording.encode_snapshot_record(_recorded_snapshot(1, 1000.0))
+        + _raw_record(1001.0, {"version": 2, "timestamp": 1001.0})
+        + _raw_record(1002.0, [1, 2, 3])
+        + recording.encode_snapshot_record(_recorded_snapshot(4, 1003.0)))
+    return str(recording_path)
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+def test_records_with_unexpected_structure_raise_recording_format_error(recording_path):
+    snapshot_recording = recording.SnapshotRecording(recording_path)
+    assert len(snapshot_recording) == 4
+    assert snapshot_recording.read_snapshot(0).cpu == {"overall_usage_percent": 10.0}
+    for record_index in (1, 2):
+        with pytest.raises(recording.RecordingFormatError):
+            snapshot_recording.read_snapshot(record_index)
+
+    with pytest.raises(recording.RecordingFormatError):
+        recording.decode_snapshot_record(b"nao e zlib")
+    with pytest.raises(recording.RecordingFormatError):
+        recording.decode_snapshot_record(zlib.compress(wire.encode_value({"version": 1, "processes": [7], "memory": {},
+                                                                         "cpu": {}, "filesystem": [], "timestamp": 1.0})))
+
+def test_replay_loop_survives_bad_records_and_unexpected_errors(recording_path, monkeypatch):
+    replay_controller = replay.ReplayController(recording_path, speed=1000.0)
+
+    # uma falha inesperada ao publicar o primeiro registro não pode encerrar a thread de reprodução
+    publish_snapshot = replay_controller._publish_snapshot
+    failures = []
+    def _publish_failing_once(**sections):
+        if not failures:
+            failures.append(sections["timestamp"])
+            raise RuntimeError("falha inesperada")
+        publish_snapshot(**sections)
+    monkeypatch.setattr(replay_controller, "_publish_snapshot", _publish_failing_once)
+
+    published = threading.Event()
+    replay_controller.add_snapshot_listener(lambda published_snapshot: published.set())
+    replay_controller.start_periodic_cache_update_thread()
+
+    assert published.wait(5)
+    assert failures == [1000.0]
+    assert replay_controller.get_snapshot().timestamp == 1003.0
+    assert replay_controller._update_thread.is_alive()
@@ -0,0 +1,196 @@
+import multiprocessing
+import os
+import time
+import uuid
+from multiprocessing import shared_memory
+
+import pytest
+
+import shared_snapshot
+import wire
+
+# publicações do coletor de teste concorrente e quantidade de payloads distintos que ele alterna
+PUBLICATION_COUNT = 2000
+PAYLOAD_VARIANTS = 7
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+@pytest.fixture
+def segments():
+    segment_name = f"so-dashboard-test-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    writer_segment = shared_snapshot.SharedSnapshotSegment.create(segment_name, size_bytes=1024 * 1024)
+    # o leitor abre o segmento sem attach(): no mesmo processo do criador, attach() removeria o registro do segmento
+    # no resource_tracker, que o criador ainda remove ao fechar
+    reader_segment = shared_snapshot.SharedSnapshotSegment(shared_memory.SharedMemory(name=segment_name))
+    yield writer_segment, reader_segment
+    reader_segment.close()
+    writer_segment.close()
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+def test_read_before_first_publication(segments):
+    _, reader_segment = segments
+    assert reader_segment.read_payload() is None
+
+def test_write_and_read(segments):
+    writer_segment, reader_segment = segments
+    writer_segment.write_payload(wire.encode_value({"cpu": {"overall_usage_percent": 12.5}}), 1, 1000.0)
+    assert reader_segment.read_payload() == (1, {"cpu": {"overall_usage_percent": 12.5}})
+    assert reader_segment.read_payload(known_version=1) is None
+
+    writer_segment.write_payload(wire.encode_value([2]), 2, 1001.0)
+    assert reader_segment.read_payload(known_version=1) == (2, [2])
+
+def test_undecodable_payload_is_returned_as_none(segments):
+    writer_segment, reader_segment = segments
+    writer_segment.write_payload(b"\xff\x00 formato de outra versao", 7, 1000.0)
+    assert reader_segment.read_payload() == (7, None)
+    assert reader_segment.read_payload(known_version=7) is None
+
+def test_payload_larger_than_the_buffer(segments):
+    writer_segment, _ = segments
+    with pytest.raises(ValueError):
+        writer_segment.write_payload(b"\x00" * (1024 * 1024), 1, 1000.0)
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# substitui wire.decode_value por uma versão que, na primeira chamada, executa as publicações informadas antes de
+# decodificar, simulando um coletor que publica enquanto o leitor decodifica o buffer ativo
+def _publish_during_next_decode(monkeypatch, writer_segment, publications):
+    decode_value = wire.decode_value
+
+    def _decode_after_publications(data):
+        monkeypatch.setattr(wire, "decode_value", decode_value)
+        for version, value in publications:
+            writer_segment.write_payload(wire.encode_value(value), version, float(version))
+        return decode_value(data)
+
+    monkeypatch.setattr(wire, "decode_value", _decode_after_publications)
+
+def test_publication_into_the_other_buffer_keeps_the_read(segments, monkeypatch):
+    writer_segment, reader_segment = segments
+    writer_segment.write_payload(wire.encode_value({"version": 1}), 1, 1.0)
+    _publish_during_next_decode(monkeypatch, writer_segment, [(2, {"version": 2})])
+    assert reader_segment.read_payload() == (1, {"version": 1})
+
+def test_buffer_overwritten_during_the_read_is_read_again(segments, monkeypatch):
+    writer_segment, reader_segment = segments
+    writer_segment.write_payload(wire.encode_value({"version": 1}), 1, 1.0)
+    # a segunda publicação sobrescreve o buffer que está sendo decodificado
+    _publish_during_next_decode(monkeypatch, writer_segment, [(2, {"version": 2}), (3, {"version": 3})])
+    assert reader_segment.read_payload() == (3, {"version": 3})
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# payload da versão: tamanho diferente conforme a versão e todos os elementos iguais, para que uma leitura que mistura
+# duas publicações falhe na decodificação ou traga elementos de outra versão
+def _versioned_value(version):
+    variant = version % PAYLOAD_VARIANTS
+    return {"variant": variant, "values": [variant] * (50 + variant * 40)}
+
+# coletor de teste, em outro processo como o coletor real; os payloads são codificados antes e as pausas variam de 0 a
+# 0,4 ms, na ordem da decodificação do leitor, para que uma leitura se sobreponha a nenhuma, uma ou várias publicações
+def _publish_versions(segment_name):
+    writer_segment = shared_snapshot.SharedSnapshotSegment(shared_memory.SharedMemory(name=segment_name))
+    encoded_payloads = [wire.encode_value(_versioned_value(variant)) for variant in range(PAYLOAD_VARIANTS)]
+    for version in range(1, PUBLICATION_COUNT + 1):
+        writer_segment.write_payload(encoded_payloads[version % PAYLOAD_VARIANTS], version, float(version))
+        time.sleep(version % 5 * 0.0001)
+    writer_segment.close()
+
+def test_concurrent_publications_are_never_torn(segments):
+    writer_segment, reader_segment = segments
+    writer_process = multiprocessing.get_context("fork").Process(target=_publish_versions, args=(writer_segment.name,))
+    writer_process.start()
+
+    read_versions = []
+    while not read_versions or read_versions[-1] != PUBLICATION_COUNT:
+        read_result = reader_segment.read_payload(read_versions[-1] if read_versions else None)
+        if read_result is None:
+            assert writer_process.is_alive() or writer_process.exitcode == 0
+            continue
+        version, shared_value = read_result
+        assert shared_value == _versioned_value(version)
+        read_versions.append(version)
+    writer_process.join()
+
+    assert writer_process.exitcode == 0
+    assert read_versions == sorted(set(read_versions))
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+def test_demands_and_refresh_requests(segments):
+    writer_segment, reader_segment = segments
+    reader_segment.write_demand("processes", ["pid", "name"])
+    reader_segment.request_refresh()
+    demands = writer_segment.read_demands()
+    assert [(consumer_name, fields) for _, consumer_name, fields in demands] == [("processes", frozenset({"pid", "name"}))]
+    assert writer_segment.refresh_requests == 1
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# Controller do coletor com uma única tabela de varreduras, para verificar que os workers veem o mesmo estado
+class _FakeCollectorController:
+
+    def __init__(self):
+        self.scans = {}
+
+    def get_directory_usage(self, path='/', start=False):
+        if start and path not in self.scans:
+            self.scans[path] = {"path": path, "state": "running", "children": {}}
+        return self.scans.get(path)
+
+    def cancel_directory_usage(self, path='/'):
+        scan = self.scans.get(path)
+        if scan is not None:
+            scan["state"] = "cancelled"
+        return scan
+
+    def search_files(self, query, limit=50):
+        return {"query": query, "results": [], "truncated": False, "limit": limit}
+
+    def get_all_processes_info_from_cache(self):
+        raise AssertionError("operação fora de COLLECTOR_REQUEST_METHODS executada")
+
+@pytest.fixture
+def collector_requests(segments):
+    writer_segment, reader_segment = segments
+    request_server = shared_snapshot.CollectorRequestServer(_FakeCollectorController(), writer_segment)
+    request_server.start()
+
+    workers = []
+    for _ in range(2):
+        worker_controller = shared_snapshot.SharedSnapshotController(writer_segment.name)
+        worker_controller._segment = reader_segment
+        workers.append(worker_controller)
+    yield workers
+    request_server.stop()
+
+def test_disk_usage_and_search_run_in_the_collector(collector_requests):
+    first_worker, second_worker = collector_requests
+    assert first_worker.disk_usage_engine is None and first_worker.file_index is None
+
+    # a varredura iniciada por um worker é vista e cancelada pelos demais
+    assert second_worker.get_directory_usage("/dados") is None
+    assert first_worker.get_directory_usage("/dados", start=True)["state"] == "running"
+    assert second_worker.get_directory_usage("/dados")["state"] == "running"
+    assert second_worker.cancel_directory_usage("/dados")["state"] == "cancelled"
+    assert first_worker.get_directory_usage("/dados")["state"] == "cancelled"
+
+    assert first_worker.search_files("relatorio", 10) == {"query": "relatorio", "results": [], "truncated": False, "limit": 10}
+
+def test_collector_refuses_unknown_operations_and_tokens(collector_requests):
+    first_worker, _ = collector_requests
+    assert first_worker._call_collector("get_all_processes_info_from_cache") is None
+
+    class _SegmentWithWrongToken:
+        request_token = b"\x00" * shared_snapshot.REQUEST_TOKEN_SIZE
+    first_worker._segment = _SegmentWithWrongToken()
+    assert first_worker._call_collector("search_files", "relatorio") is None
+
+def test_worker_without_collector(segments):
+    _, reader_segment = segments
+    worker_controller = shared_snapshot.SharedSnapshotController(f"{reader_segment.name}-sem-coletor")
+    assert worker_controller.get_directory_usage("/dados", start=True) is None
+    worker_controller._segment = reader_segment
+    assert worker_controller.search_files("relatorio") is None
@@ -0,0 +1,157 @@
+import threading
+import time
+
+import pytest
+
+import metrics
+from ttl_cache import TTLCache
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função de cálculo que conta as chamadas e, opcionalmente, só termina quando release for sinalizado
+class _CountingCompute:
+
+    def __init__(self, value, release=None):
+        self.value = value
+        self.release = release
+        self.started = threading.Event()
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+        self.started.set()
+        if self.release is not None:
+            assert self.release.wait(5)
+        if isinstance(self.value, Exception):
+            raise self.value
+        return self.value
+
+# função que aguarda (até 5 s) a condição ficar verdadeira
+def _wait_until(condition_fn):
+    deadline = time.monotonic() + 5
+    while not condition_fn() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition_fn()
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+def test_get_respects_the_ttl():
+    cache = TTLCache("test", ttl_seconds=10)
+    cache.put("key", "value", now=100.0)
+    assert cache.get("key", now=110.0) == "value"
+    assert cache.get("key", now=110.1) is None
+    assert cache.get("missing", now=100.0) is None
+
+def test_get_or_compute_miss_then_hit():
+    cache = TTLCache("test", ttl_seconds=10)
+    compute_fn = _CountingCompute("value")
+    assert cache.get_or_compute("key", compute_fn, now=100.0) == "value"
+    assert cache.get_or_compute("key", compute_fn, now=105.0) == "value"
+    assert compute_fn.calls == 1
+    # fora da validade (sem janela de valores antigos), o valor é recalculado na própria requisição
+    assert cache.get_or_compute("key", compute_fn, now=111.0) == "value"
+    assert compute_fn.calls == 2
+
+def test_concurrent_misses_are_coalesced():
+    cache = TTLCache("test-coalesced", ttl_seconds=10)
+    release = threading.Event()
+    compute_fn = _CountingCompute("value", release)
+    results = []
+
+    def _request():
+        results.append(cache.get_or_compute("key", compute_fn, now=100.0))
+
+    first_request = threading.Thread(target=_request)
+    first_request.start()
+    assert compute_fn.started.wait(5)
+    waiting_requests = [threading.Thread(target=_request) for _ in range(8)]
+    for waiting_request in waiting_requests:
+        waiting_request.start()
+    # todas as requisições aguardam o cálculo em andamento antes de ele terminar
+    assert _wait_until(lambda: metrics.CACHE_REQUESTS_TOTAL.get("test-coalesced", "coalesced") == 8)
+    release.set()
+    for request_thread in [first_request, *waiting_requests]:
+        request_thread.join(5)
+
+    assert compute_fn.calls == 1
+    assert results == ["value"] * 9
+
+def test_error_is_raised_to_every_waiter_and_not_cached():
+    cache = TTLCache("test", ttl_seconds=10)
+    release = threading.Event()
+    compute_fn = _CountingCompute(RuntimeError("falha"), release)
+    errors = []
+
+    def _request():
+        try:
+            cache.get_or_compute("key", compute_fn, now=100.0)
+        except RuntimeError as e_compute:
+            errors.append(e_compute)
+
+    request_threads = [threading.Thread(target=_request) for _ in range(4)]
+    request_threads[0].start()
+    assert compute_fn.started.wait(5)
+    for request_thread in request_threads[1:]:
+        request_thread.start()
+    release.set()
+    for request_thread in request_threads:
+        request_thread.join(5)
+
+    assert compute_fn.calls == 1
+    assert len(errors) == 4
+    assert len(cache) == 0
+    assert cache.get_or_compute("key", _CountingCompute("value"), now=100.0) == "value"
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+def test_stale_value_is_returned_while_revalidating():
+    cache = TTLCache("test", ttl_seconds=10, stale_seconds=5)
+    cache.put("key", "old", now=100.0)
+    release = threading.Event()
+    compute_fn = _CountingCompute("new", release)
+
+    # várias requisições dentro da janela de valores antigos respondem na hora e iniciam um único recálculo
+    assert cache.get_or_compute("key", compute_fn, now=112.0) == "old"
+    assert compute_fn.started.wait(5)
+    assert cache.get_or_compute("key", compute_fn, now=112.5) == "old"
+    release.set()
+
+    assert _wait_until(lambda: cache.get("key", now=112.0) == "new")
+    assert compute_fn.calls == 1
+
+def test_value_older_than_the_stale_window_is_computed_synchronously():
+    cache = TTLCache("test", ttl_seconds=10, stale_seconds=5)
+    cache.put("key", "old", now=100.0)
+    compute_fn = _CountingCompute("new")
+    assert cache.get_or_compute("key", compute_fn, now=115.1) == "new"
+    assert compute_fn.calls == 1
+
+def test_failed_revalidation_keeps_the_stale_value(capsys):
+    cache = TTLCache("test", ttl_seconds=10, stale_seconds=5)
+    cache.put("key", "old", now=100.0)
+    compute_fn = _CountingCompute(RuntimeError("falha"))
+    assert cache.get_or_compute("key", compute_fn, now=112.0) == "old"
+
+    # o erro do recálculo em segundo plano só é registrado
+    printed_output = []
+
+    def _error_printed():
+        printed_output.append(capsys.readouterr().out)
+        return "falha" in "".join(printed_output)
+
+    assert _wait_until(_error_printed)
+    assert cache.get("key", now=112.0) is None
+    assert cache.get_or_compute("key", _CountingCompute("new"), now=114.0) == "old"
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+@pytest.mark.parametrize("stale_seconds, expected_remaining", [(0, 1), (5, 2)])
+def test_prune_expired_keeps_the_stale_window(stale_seconds, expected_remaining):
+    cache = TTLCache("test", ttl_seconds=10, stale_seconds=stale_seconds)
+    cache.put("fresh", 1, now=100.0)
+    cache.put("stale", 2, now=92.0)
+    cache.put("expired", 3, now=80.0)
+    assert cache.prune_expired(now=103.0) == 3 - expected_remaining
+    assert len(cache) == expected_remaining
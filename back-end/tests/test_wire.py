@@ -0,0 +1,98 @@
+import socket
+import zlib
+
+import pytest
+
+import wire
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+@pytest.mark.parametrize("value", [
+    None, True, False, 0, 1, -1, 2 ** 63 - 1, -(2 ** 63), 3.5, float("-inf"), "", "ação", b"", b"\x00\xff",
+    [], {}, [1, [2, [3]]], {"pid": 1, 42: "chave inteira", "aninhado": {"lista": [None, 1.25, "x"]}},
+])
+def test_round_trip(value):
+    assert wire.decode_value(wire.encode_value(value)) == value
+
+def test_repeated_strings_use_the_string_table():
+    processes = [{"name": "bash", "status": "Dormindo"} for _ in range(100)]
+    encoded_payload = wire.encode_value(processes)
+    assert wire.decode_value(encoded_payload) == processes
+    assert encoded_payload.count(b"Dormindo") == 1
+
+def test_tuples_decode_as_lists():
+    assert wire.decode_value(wire.encode_value((1, "a"))) == [1, "a"]
+
+def test_unsupported_type():
+    with pytest.raises(wire.WireFormatError):
+        wire.encode_value({1, 2})
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+@pytest.mark.parametrize("payload", [
+    b"",                                        # vazio
+    bytes([wire._TAG_INT]),                     # varint ausente
+    bytes([wire._TAG_INT]) + b"\xff" * 11,      # varint com mais de 64 bits
+    bytes([wire._TAG_FLOAT]) + b"\x00" * 4,     # float truncado
+    bytes([wire._TAG_STR_NEW, 10]) + b"abc",    # string truncada
+    bytes([wire._TAG_STR_NEW, 2]) + b"\xc3\x28",  # UTF-8 inválido
+    bytes([wire._TAG_STR_REF, 0]),              # referência a string inexistente
+    bytes([wire._TAG_BYTES, 5]) + b"ab",        # bytes truncados
+    bytes([wire._TAG_LIST, 3, wire._TAG_NONE]),  # lista truncada
+    bytes([wire._TAG_DICT, 1, wire._TAG_LIST, 0, wire._TAG_NONE]),  # chave não hashable
+    bytes([wire._TAG_DICT, 1, wire._TAG_NONE, wire._TAG_NONE]),     # chave que não é str nem int
+    bytes([42]),                                # marcador desconhecido
+    wire.encode_value(1) + b"\x00",             # bytes extras após o valor
+    bytes([wire._TAG_LIST, 1]) * 10000 + bytes([wire._TAG_NONE]),  # aninhamento excessivo
+])
+def test_malformed_payload_raises_wire_format_error(payload):
+    with pytest.raises(wire.WireFormatError):
+        wire.decode_value(payload)
+
+def test_nesting_depth_limit():
+    nested_value = None
+    for _ in range(wire.MAX_NESTING_DEPTH - 1):
+        nested_value = [nested_value]
+    assert wire.decode_value(wire.encode_value(nested_value)) == nested_value
+    with pytest.raises(wire.WireFormatError):
+        wire.decode_value(wire.encode_value([[nested_value]]))
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+def test_decompress_payload_limits_the_output():
+    compressed_payload = zlib.compress(b"\x00" * 10000)
+    assert wire.decompress_payload(compressed_payload) == b"\x00" * 10000
+    with pytest.raises(wire.WireFormatError):
+        wire.decompress_payload(compressed_payload, max_bytes=1000)
+
+@pytest.mark.parametrize("payload", [b"nao e zlib", zlib.compress(b"x" * 1000)[:-4]])
+def test_decompress_payload_rejects_invalid_streams(payload):
+    with pytest.raises(wire.WireFormatError):
+        wire.decompress_payload(payload)
+
+def test_frame_round_trip_over_socket():
+    large_value = {"processes": [{"pid": pid, "name": "worker"} for pid in range(2000)]}
+    sender, receiver = socket.socketpair()
+    with sender, receiver:
+        frame = wire.encode_frame(wire.MSG_SNAPSHOT, large_value)
+        assert wire.FRAME_HEADER.unpack_from(frame)[3] & wire.FLAG_ZLIB  # payload grande é comprimido
+        sender.sendall(frame + wire.encode_frame(wire.MSG_HELLO, {"host": "a"}))
+        sender.shutdown(socket.SHUT_WR)
+        assert wire.read_frame(receiver) == (wire.MSG_SNAPSHOT, large_value)
+        assert wire.read_frame(receiver) == (wire.MSG_HELLO, {"host": "a"})
+        assert wire.read_frame(receiver) is None
+
+@pytest.mark.parametrize("frame", [
+    b"XX" + wire.encode_frame(wire.MSG_HELLO, {})[2:],                                   # magic inválido
+    wire.FRAME_HEADER.pack(wire.WIRE_MAGIC, 99, wire.MSG_HELLO, 0, 0),                    # versão desconhecida
+    wire.FRAME_HEADER.pack(wire.WIRE_MAGIC, wire.WIRE_PROTOCOL_VERSION, wire.MSG_HELLO, 0,
+                           wire.MAX_FRAME_PAYLOAD_BYTES + 1),                              # quadro grande demais
+    wire.FRAME_HEADER.pack(wire.WIRE_MAGIC, wire.WIRE_PROTOCOL_VERSION, wire.MSG_HELLO, 0, 10) + b"abc",  # truncado
+])
+def test_read_frame_rejects_malformed_frames(frame):
+    sender, receiver = socket.socketpair()
+    with sender, receiver:
+        sender.sendall(frame)
+        sender.shutdown(socket.SHUT_WR)
+        with pytest.raises(wire.WireFormatError):
+            wire.read_frame(receiver)
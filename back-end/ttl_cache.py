@@ -0,0 +1,119 @@
+import time
+import threading
+
+import metrics
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# cálculo em andamento de uma chave: as requisições concorrentes aguardam o evento e reutilizam o resultado
+class _PendingComputation:
+
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# cache com tempo de validade e trava própria, usado pelos caches sob demanda do Controller (diretórios e E/S)
+#
+# cada entrada guarda (timestamp, valor); leituras e escritas são protegidas pela trava do próprio cache,
+# e a limpeza remove as entradas expiradas no lugar, sem substituir o dicionário sob leitores concorrentes.
+# get_or_compute calcula cada chave uma única vez por falha (single-flight) e, com stale_seconds, responde com o valor
+# expirado há até stale_seconds enquanto uma thread o recalcula
+class TTLCache:
+
+    def __init__(self, name, ttl_seconds, stale_seconds=0):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._pending = {}
+
+    # função que retorna o valor válido da chave ou None; contabiliza acertos e falhas em /api/metrics
+    def get(self, key, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            cached_entry = self._entries.get(key)
+        if cached_entry is not None and (now - cached_entry[0]) <= self.ttl_seconds:
+            metrics.CACHE_REQUESTS_TOTAL.inc(1, self.name, "hit")
+            return cached_entry[1]
+        metrics.CACHE_REQUESTS_TOTAL.inc(1, self.name, "miss")
+        return None
+
+    # função que armazena o valor da chave com o timestamp informado (ou o atual)
+    def put(self, key, value, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            self._entries[key] = (now, value)
+
+    # função que retorna o valor válido da chave ou o calcula com compute_fn(); requisições concorrentes pela mesma
+    # chave aguardam o mesmo cálculo, e um valor expirado há até stale_seconds é retornado enquanto é recalculado
+    def get_or_compute(self, key, compute_fn, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            cached_entry = self._entries.get(key)
+            entry_age = (now - cached_entry[0]) if cached_entry is not None else None
+            pending_computation = self._pending.get(key)
+            if entry_age is not None and entry_age <= self.ttl_seconds:
+                cache_result = "hit"
+            elif entry_age is not None and entry_age <= self.ttl_seconds + self.stale_seconds:
+                cache_result = "stale"
+            else:
+                cache_result = "coalesced" if pending_computation is not None else "miss"
+            start_computation = pending_computation is None and cache_result != "hit"
+            if start_computation:
+                pending_computation = self._pending[key] = _PendingComputation()
+        metrics.CACHE_REQUESTS_TOTAL.inc(1, self.name, cache_result)
+
+        if cache_result in ("hit", "stale"):
+            # um valor antigo é recalculado em segundo plano (uma única vez, mesmo com várias requisições)
+            if start_computation:
+                threading.Thread(target=self._revalidate, args=(key, compute_fn, now, pending_computation),
+                                 name=f"so-dashboard-{self.name}-revalidate", daemon=True).start()
+            return cached_entry[1]
+
+        if cache_result == "miss":
+            self._compute(key, compute_fn, now, pending_computation)
+        else:
+            pending_computation.done.wait()
+        if pending_computation.error is not None:
+            raise pending_computation.error
+        return pending_computation.value
+
+    # função que executa o cálculo de uma chave, armazena o valor e libera as requisições que o aguardam
+    def _compute(self, key, compute_fn, now, pending_computation):
+        try:
+            pending_computation.value = compute_fn()
+            self.put(key, pending_computation.value, now)
+        except Exception as e_compute:
+            pending_computation.error = e_compute
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+            pending_computation.done.set()
+
+    # função executada pela thread de recálculo de um valor antigo; sem requisições aguardando, o erro só é registrado
+    def _revalidate(self, key, compute_fn, now, pending_computation):
+        self._compute(key, compute_fn, now, pending_computation)
+        if pending_computation.error is not None:
+            print(f"Erro ao recalcular a entrada {key!r} do cache {self.name}: {pending_computation.error}")
+
+    # função que remove as entradas expiradas (incluindo a janela de valores antigos) e retorna quantas foram removidas
+    def prune_expired(self, now=None):
+        now = time.time() if now is None else now
+        retention_seconds = self.ttl_seconds + self.stale_seconds
+        with self._lock:
+            expired_keys = [key for key, (stored_at, _) in self._entries.items() if (now - stored_at) > retention_seconds]
+            for expired_key in expired_keys:
+                del self._entries[expired_key]
+            remaining_entries = len(self._entries)
+        metrics.CACHE_ENTRIES.set(remaining_entries, self.name)
+        return len(expired_keys)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
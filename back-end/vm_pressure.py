@@ -0,0 +1,114 @@
+import time
+
+import model
+import metrics
+import procfs_reader
+
+# taxas por segundo calculadas a partir de /proc/vmstat: cada taxa soma os contadores listados (os que não existirem
+# no kernel atual são ignorados; ex: allocstall virou allocstall_<zona> e workingset_refault foi dividido em anon/file)
+VMSTAT_RATE_COUNTERS = (
+    ("swap_in_pages", ("pswpin",)),
+    ("swap_out_pages", ("pswpout",)),
+    ("page_in_kb", ("pgpgin",)),
+    ("page_out_kb", ("pgpgout",)),
+    ("page_faults", ("pgfault",)),
+    ("major_faults", ("pgmajfault",)),
+    ("page_scans_kswapd", ("pgscan_kswapd",)),
+    ("page_scans_direct", ("pgscan_direct",)),
+    ("pages_reclaimed", ("pgsteal_kswapd", "pgsteal_direct", "pgsteal_khugepaged", "pgsteal_proactive")),
+    ("alloc_stalls", ("allocstall", "allocstall_dma", "allocstall_dma32", "allocstall_normal", "allocstall_movable",
+                      "allocstall_device")),
+    ("workingset_refaults", ("workingset_refault", "workingset_refault_anon", "workingset_refault_file")),
+    ("oom_kills", ("oom_kill",)),
+)
+
+# nomes de /proc/vmstat lidos pelo coletor
+VMSTAT_COUNTER_NAMES = frozenset(counter_name.encode() for _, counter_names in VMSTAT_RATE_COUNTERS for counter_name in counter_names)
+
+# amostra anterior (timestamp, totais por taxa, totais de PSI em microssegundos), usada no cálculo das taxas
+previous_vm_sample = None
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que extrai os contadores usados do conteúdo de /proc/vmstat ("nome valor" por linha) em uma única passada
+def parse_vmstat(buffer, length):
+
+    tokens = bytes(buffer[:length]).split()
+    return {counter_name.decode(): int(counter_value) for counter_name, counter_value in zip(tokens[::2], tokens[1::2])
+            if counter_name in VMSTAT_COUNTER_NAMES}
+
+# função que analisa /proc/pressure/memory ("some avg10=.. avg60=.. avg300=.. total=..", idem para "full")
+def parse_memory_pressure(pressure_text):
+
+    pressure = {}
+    for line in pressure_text.splitlines():
+        line_parts = line.split()
+        if not line_parts or line_parts[0] not in ("some", "full"):
+            continue
+        pressure_values = dict(pair.split("=", 1) for pair in line_parts[1:])
+        pressure[line_parts[0]] = {
+            "avg10": float(pressure_values.get("avg10", 0.0)),
+            "avg60": float(pressure_values.get("avg60", 0.0)),
+            "avg300": float(pressure_values.get("avg300", 0.0)),
+            "total_usec": int(pressure_values.get("total", 0)),
+        }
+    return pressure
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que descarta a amostra anterior (ex: ao trocar a raiz do procfs, as taxas perderiam sentido)
+def reset_rate_samples():
+
+    global previous_vm_sample
+    previous_vm_sample = None
+
+# função que coleta a pressão de memória: totais e taxas por segundo de paginação, faltas de página, varredura e
+# recuperação de páginas e OOM kills (/proc/vmstat), e o PSI de memória (/proc/pressure/memory, kernels 4.20+)
+#
+# as taxas usam a amostra do ciclo anterior e ficam None na primeira coleta; o PSI fica None quando o kernel não o
+# expõe (desligado com psi=0 ou kernel antigo)
+@metrics.instrument_collector("get_vm_pressure")
+def get_vm_pressure():
+
+    global previous_vm_sample
+    sampled_at = time.time()
+
+    try:
+        vmstat_reader = procfs_reader.get_reader()
+        vmstat_counters = parse_vmstat(vmstat_reader.buffer, vmstat_reader.read_into(f"{model.PROC_ROOT}/vmstat"))
+    except (FileNotFoundError, PermissionError, OSError, ValueError):
+        return {"available": False}
+
+    totals = {}
+    for rate_name, counter_names in VMSTAT_RATE_COUNTERS:
+        present_values = [vmstat_counters[counter_name] for counter_name in counter_names if counter_name in vmstat_counters]
+        totals[rate_name] = sum(present_values) if present_values else None
+
+    try:
+        pressure = parse_memory_pressure(procfs_reader.read_text(f"{model.PROC_ROOT}/pressure/memory")) or None
+    except (FileNotFoundError, PermissionError, OSError, ValueError):
+        pressure = None
+    pressure_totals = {kind: values["total_usec"] for kind, values in (pressure or {}).items()}
+
+    # taxas por segundo e percentual do tempo com tarefas paradas por falta de memória desde a última coleta
+    rates_per_sec = {rate_name: None for rate_name in totals}
+    stall_percent = {kind: None for kind in pressure_totals}
+    if previous_vm_sample is not None and sampled_at > previous_vm_sample[0]:
+        previous_sampled_at, previous_totals, previous_pressure_totals = previous_vm_sample
+        elapsed_seconds = sampled_at - previous_sampled_at
+        for rate_name, total_value in totals.items():
+            if total_value is not None and previous_totals.get(rate_name) is not None:
+                rates_per_sec[rate_name] = round(max(0, total_value - previous_totals[rate_name]) / elapsed_seconds, 2)
+        for kind, total_usec in pressure_totals.items():
+            if kind in previous_pressure_totals:
+                stall_usec = max(0, total_usec - previous_pressure_totals[kind])
+                stall_percent[kind] = round(min(100.0, stall_usec / (elapsed_seconds * 1e6) * 100.0), 2)
+    previous_vm_sample = (sampled_at, totals, pressure_totals)
+
+    return {
+        "available": True,
+        "totals": totals,
+        "rates_per_sec": rates_per_sec,
+        "pressure": pressure,
+        "pressure_stall_percent": stall_percent if pressure is not None else None,
+    }
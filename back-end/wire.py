@@ -0,0 +1,301 @@
+import zlib
+import socket
+import struct
+
+# formato binário compacto usado entre agentes e agregador (e reaproveitado por outros módulos)
+#
+# quadro: cabeçalho fixo de 9 bytes + payload
+#   magic (2 bytes "SD") | versão do protocolo (1) | tipo da mensagem (1) | flags (1) | tamanho do payload (4, big-endian)
+#
+# payload: valor codificado com marcadores de tipo de 1 byte, inteiros em varint (zigzag) e
+# tabela de strings por mensagem (a primeira ocorrência define a string, as seguintes usam apenas o índice),
+# o que elimina a repetição dos ~30 nomes de campos por processo
+
+WIRE_MAGIC = b"SD"
+WIRE_PROTOCOL_VERSION = 1
+FRAME_HEADER = struct.Struct(">2sBBBI")
+MAX_FRAME_PAYLOAD_BYTES = 256 * 1024 * 1024
+
+# limite do payload após a descompressão (um quadro zlib pequeno pode expandir para vários GB)
+MAX_DECOMPRESSED_PAYLOAD_BYTES = 512 * 1024 * 1024
+
+# profundidade máxima de listas e dicionários aninhados aceita pela decodificação (a decodificação é recursiva)
+MAX_NESTING_DEPTH = 64
+
+# tipos de mensagem
+MSG_HELLO = 1
+MSG_SNAPSHOT = 2
+MSG_DELTA = 3
+MSG_RESYNC = 4
+
+# pedidos dos workers da API ao processo coletor e as respostas (modo de memória compartilhada, ver shared_snapshot.py)
+MSG_REQUEST = 5
+MSG_RESPONSE = 6
+
+# flags do quadro
+FLAG_ZLIB = 0x01
+
+# payloads acima deste tamanho são comprimidos com zlib
+COMPRESSION_THRESHOLD_BYTES = 4096
+
+# marcadores de tipo dos valores
+_TAG_NONE, _TAG_FALSE, _TAG_TRUE = 0, 1, 2
+_TAG_INT, _TAG_FLOAT = 3, 4
+_TAG_STR_NEW, _TAG_STR_REF = 5, 6
+_TAG_LIST, _TAG_DICT = 7, 8
+_TAG_BYTES = 9
+
+_FLOAT_STRUCT = struct.Struct(">d")
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# exceção lançada quando um quadro ou payload não segue o formato esperado
+class WireFormatError(ValueError):
+    pass
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# funções auxiliares de varint (7 bits por byte) e zigzag (inteiros com sinal)
+def _write_varint(output, value):
+
+    while value > 0x7F:
+        output.append((value & 0x7F) | 0x80)
+        value >>= 7
+    output.append(value)
+
+def _read_varint(data, offset):
+
+    result, shift = 0, 0
+    while True:
+        if offset >= len(data):
+            raise WireFormatError("varint truncado")
+        byte = data[offset]
+        offset += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, offset
+        shift += 7
+        if shift > 63:
+            raise WireFormatError("varint excede 64 bits")
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que codifica um valor (dict, list, str, int, float, bool, None, bytes) no formato binário compacto
+def encode_value(value):
+
+    output = bytearray()
+    string_table = {}
+
+    def _encode_string(text):
+        string_index = string_table.get(text)
+        if string_index is not None:
+            output.append(_TAG_STR_REF)
+            _write_varint(output, string_index)
+            return
+        string_table[text] = len(string_table)
+        encoded_text = text.encode("utf-8")
+        output.append(_TAG_STR_NEW)
+        _write_varint(output, len(encoded_text))
+        output.extend(encoded_text)
+
+    def _encode(item):
+        if item is None:
+            output.append(_TAG_NONE)
+        elif item is True:
+            output.append(_TAG_TRUE)
+        elif item is False:
+            output.append(_TAG_FALSE)
+        elif isinstance(item, int):
+            output.append(_TAG_INT)
+            _write_varint(output, (item << 1) if item >= 0 else ((-item << 1) - 1))
+        elif isinstance(item, float):
+            output.append(_TAG_FLOAT)
+            output.extend(_FLOAT_STRUCT.pack(item))
+        elif isinstance(item, str):
+            _encode_string(item)
+        elif isinstance(item, dict):
+            output.append(_TAG_DICT)
+            _write_varint(output, len(item))
+            for key, nested_value in item.items():
+                # chaves inteiras (ex: PIDs) são preservadas como inteiros
+                _encode(key if isinstance(key, (str, int)) else str(key))
+                _encode(nested_value)
+        elif isinstance(item, (list, tuple)):
+            output.append(_TAG_LIST)
+            _write_varint(output, len(item))
+            for nested_value in item:
+                _encode(nested_value)
+        elif isinstance(item, (bytes, bytearray, memoryview)):
+            output.append(_TAG_BYTES)
+            _write_varint(output, len(item))
+            output.extend(item)
+        else:
+            raise WireFormatError(f"tipo não suportado: {type(item).__name__}")
+
+    _encode(value)
+    return bytes(output)
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que decodifica um payload gerado por encode_value; qualquer payload malformado (truncado, UTF-8 inválido,
+# chave não hashable, aninhamento acima de MAX_NESTING_DEPTH) resulta em WireFormatError
+def decode_value(data):
+
+    string_table = []
+
+    def _decode(offset, depth):
+        if offset >= len(data):
+            raise WireFormatError("payload truncado")
+        tag = data[offset]
+        offset += 1
+
+        if tag == _TAG_NONE:
+            return None, offset
+        if tag == _TAG_TRUE:
+            return True, offset
+        if tag == _TAG_FALSE:
+            return False, offset
+        if tag == _TAG_INT:
+            raw_value, offset = _read_varint(data, offset)
+            return ((raw_value >> 1) if not raw_value & 1 else -((raw_value + 1) >> 1)), offset
+        if tag == _TAG_FLOAT:
+            if offset + _FLOAT_STRUCT.size > len(data):
+                raise WireFormatError("float truncado")
+            return _FLOAT_STRUCT.unpack_from(data, offset)[0], offset + _FLOAT_STRUCT.size
+        if tag == _TAG_STR_NEW:
+            length, offset = _read_varint(data, offset)
+            if offset + length > len(data):
+                raise WireFormatError("string truncada")
+            text = bytes(data[offset:offset + length]).decode("utf-8")
+            string_table.append(text)
+            return text, offset + length
+        if tag == _TAG_STR_REF:
+            string_index, offset = _read_varint(data, offset)
+            if string_index >= len(string_table):
+                raise WireFormatError("referência de string inválida")
+            return string_table[string_index], offset
+        if tag in (_TAG_LIST, _TAG_DICT) and depth >= MAX_NESTING_DEPTH:
+            raise WireFormatError("aninhamento excede a profundidade máxima")
+        if tag == _TAG_LIST:
+            count, offset = _read_varint(data, offset)
+            items = []
+            for _ in range(count):
+                item, offset = _decode(offset, depth + 1)
+                items.append(item)
+            return items, offset
+        if tag == _TAG_DICT:
+            count, offset = _read_varint(data, offset)
+            mapping = {}
+            for _ in range(count):
+                key, offset = _decode(offset, depth + 1)
+                if not isinstance(key, (str, int)):
+                    raise WireFormatError(f"chave de dicionário inválida: {type(key).__name__}")
+                mapping[key], offset = _decode(offset, depth + 1)
+            return mapping, offset
+        if tag == _TAG_BYTES:
+            length, offset = _read_varint(data, offset)
+            if offset + length > len(data):
+                raise WireFormatError("bytes truncados")
+            return bytes(data[offset:offset + length]), offset + length
+        raise WireFormatError(f"marcador de tipo desconhecido: {tag}")
+
+    # a visão é liberada ao final, para que o chamador possa fechar o buffer de origem (ex: memória compartilhada)
+    with memoryview(data) as data:
+        try:
+            value, end_offset = _decode(0, 0)
+        except UnicodeDecodeError as e_decode:
+            raise WireFormatError(f"string com UTF-8 inválido: {e_decode}") from None
+        if end_offset != len(data):
+            raise WireFormatError("bytes extras após o valor")
+    return value
+
+# função que descomprime um payload zlib limitando o tamanho do resultado
+def decompress_payload(payload, max_bytes=MAX_DECOMPRESSED_PAYLOAD_BYTES):
+
+    decompressor = zlib.decompressobj()
+    try:
+        decompressed_payload = decompressor.decompress(payload, max_bytes)
+    except zlib.error as e_zlib:
+        raise WireFormatError(f"payload zlib inválido: {e_zlib}") from None
+    if decompressor.unconsumed_tail:
+        raise WireFormatError("payload descomprimido excede o tamanho máximo")
+    if not decompressor.eof:
+        raise WireFormatError("payload zlib truncado")
+    return decompressed_payload
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que monta um quadro completo (cabeçalho + payload), comprimindo payloads grandes
+def encode_frame(message_type, value):
+
+    payload, flags = encode_value(value), 0
+    if len(payload) > COMPRESSION_THRESHOLD_BYTES:
+        compressed_payload = zlib.compress(payload, 1)
+        if len(compressed_payload) < len(payload):
+            payload, flags = compressed_payload, FLAG_ZLIB
+    return FRAME_HEADER.pack(WIRE_MAGIC, WIRE_PROTOCOL_VERSION, message_type, flags, len(payload)) + payload
+
+# função que lê exatamente n bytes de um socket; retorna None se a conexão foi fechada antes do início
+def _recv_exact(sock, byte_count):
+
+    chunks, received = [], 0
+    while received < byte_count:
+        chunk = sock.recv(min(byte_count - received, 1024 * 1024))
+        if not chunk:
+            if received == 0:
+                return None
+            raise WireFormatError("conexão encerrada no meio de um quadro")
+        chunks.append(chunk)
+        received += len(chunk)
+    return b"".join(chunks)
+
+# função que lê um quadro de um socket; retorna (tipo, valor) ou None ao fim da conexão
+def read_frame(sock):
+
+    header = _recv_exact(sock, FRAME_HEADER.size)
+    if header is None:
+        return None
+
+    magic, protocol_version, message_type, flags, payload_length = FRAME_HEADER.unpack(header)
+    if magic != WIRE_MAGIC:
+        raise WireFormatError("magic inválido")
+    if protocol_version != WIRE_PROTOCOL_VERSION:
+        raise WireFormatError(f"versão de protocolo não suportada: {protocol_version}")
+    if payload_length > MAX_FRAME_PAYLOAD_BYTES:
+        raise WireFormatError("quadro excede o tamanho máximo")
+
+    payload = _recv_exact(sock, payload_length) if payload_length else b""
+    if payload is None:
+        raise WireFormatError("conexão encerrada no meio de um quadro")
+    if flags & FLAG_ZLIB:
+        payload = decompress_payload(payload)
+    return message_type, decode_value(payload)
+
+# ---------------------------------------------------------------------------------------------------------------------------------
+
+# função que interpreta um endereço "tcp://host:porta" ou "unix:///caminho/do/socket"
+def parse_address(address):
+
+    if address.startswith("unix://"):
+        return socket.AF_UNIX, address[len("unix://"):]
+
+    host_port = address[len("tcp://"):] if address.startswith("tcp://") else address
+    host, _, port_text = host_port.rpartition(":")
+    if not host or not port_text.isdigit():
+        raise ValueError(f"Endereço inválido '{address}'. Use tcp://host:porta ou unix:///caminho.")
+    return socket.AF_INET, (host.strip("[]"), int(port_text))
+
+# função que abre uma conexão de cliente para o endereço informado
+def connect(address, timeout_seconds=5.0):
+
+    family, socket_address = parse_address(address)
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.settimeout(timeout_seconds)
+    try:
+        sock.connect(socket_address)
+    except OSError:
+        sock.close()
+        raise
+    if family == socket.AF_INET:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
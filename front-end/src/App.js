@@ -8,6 +8,7 @@ import ProcessDetailModal from './components/ProcessList/ProcessDetailModal';
 import SystemSummaryCards from './components/SystemTotals/TotalSystemMetricsCard'; // Importa o wrapper
 import FileSystemView from './components/FileSystem/FileSystemView';
 import DirectoryTree from './components/FileSystem/DirectoryTree';
+import { DashboardSnapshotProvider } from './components/Snapshot/DashboardSnapshotContext';
 import styles from './App.module.css';
 
 function App() {
@@ -17,15 +18,17 @@ function App() {
 
   return (
     <DashboardTabs>
-      <div className={styles.topCardsContainer}>
-        <CpuUsageCard />
-        <MemoryUsageCard />
-      </div>
-      <div className={styles.summaryCardsContainer}> {/* container para os cards de totais */}
-        <SystemSummaryCards /> {/* renderiza os dois cards de totais */}
-      </div>
-      <ProcessListCard onProcessSelect={handleProcessSelect} />
-      <ProcessDetailModal process={selectedProcessForDetail} onClose={handleCloseDetailModal} />
+      <DashboardSnapshotProvider> {/* uma única busca de /api/snapshot para os cards abaixo */}
+        <div className={styles.topCardsContainer}>
+          <CpuUsageCard />
+          <MemoryUsageCard />
+        </div>
+        <div className={styles.summaryCardsContainer}> {/* container para os cards de totais */}
+          <SystemSummaryCards /> {/* renderiza os dois cards de totais */}
+        </div>
+        <ProcessListCard onProcessSelect={handleProcessSelect} />
+        <ProcessDetailModal process={selectedProcessForDetail} onClose={handleCloseDetailModal} />
+      </DashboardSnapshotProvider>
       {/* Projeto B: FileSystem e Navegação de Diretórios */}
       <FileSystemView />
       <DirectoryTree />
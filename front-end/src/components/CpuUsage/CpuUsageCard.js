@@ -8,6 +8,7 @@ import {
     Tooltip, ResponsiveContainer, Legend
 } from 'recharts';
 import styles from './CpuUsageCard.module.css'; // Estilos CSS Modules para este componente.
+import { useDashboardSnapshot } from '../Snapshot/DashboardSnapshotContext'; // Snapshot compartilhado da visão geral.
 
 // Cores pré-definidas para as linhas dos cores no gráfico.
 // Estas cores são definidas como variáveis CSS no arquivo de estilos global.
@@ -21,17 +22,12 @@ const CORE_CHART_COLORS = [
 // Número máximo de pontos de dados a serem mantidos no histórico do gráfico.
 const MAX_HISTORY_POINTS = 60; // 60 pontos com intervalo de 5s = 5 minutos de histórico.
 
-// URL do endpoint da API para buscar dados da CPU.
-const API_URL_CPU = 'http://localhost:5000/api/cpu';
-// Intervalo de atualização dos dados em milissegundos.
-const FETCH_INTERVAL_MS = 5000; // 5 segundos.
-
 /**
  * Componente CpuUsageCard
  * 
  * Exibe informações sobre o uso geral da CPU e o uso individual de cada core,
  * incluindo barras de progresso e um gráfico de histórico de uso.
- * Os dados são buscados periodicamente de uma API backend.
+ * Os dados vêm da seção `cpu` do snapshot compartilhado (DashboardSnapshotProvider).
  */
 const CpuUsageCard = () => {
     // Estado para armazenar os dados da CPU.
@@ -43,12 +39,13 @@ const CpuUsageCard = () => {
         history: [],            // Array de objetos para o histórico do gráfico.
         // Ex: { time: "10:30:00", overall: 25, core0: 10, core1: 15, ... }
         numberOfCores: 0,       // Número total de cores da CPU.
+        collectorDegradationLevel: 0, // Nível de degradação da coleta no backend (0 = todos os detalhes).
+        collectorIntervalSeconds: null, // Intervalo atual entre coletas do backend, em segundos.
+        burst: null,            // Resumo do amostrador de alta frequência desde a última coleta (picos, iowait, steal).
     });
 
-    // Estado para controlar o carregamento inicial dos dados.
-    const [isLoading, setIsLoading] = useState(true);
-    // Estado para armazenar mensagens de erro da busca de dados.
-    const [fetchError, setFetchError] = useState(null);
+    // Snapshot compartilhado, com o estado de carregamento e o erro da última busca.
+    const { snapshot, isLoading, fetchError } = useDashboardSnapshot();
     // Estado para controlar a visibilidade das linhas no gráfico (clicando na legenda).
     // Ex: { overall: true, core0: true, core1: false, ... }
     const [lineVisibility, setLineVisibility] = useState({});
@@ -93,79 +90,48 @@ const CpuUsageCard = () => {
     }, [cpuState.cores]);
 
     /**
-     * Função para buscar os dados da CPU da API.
-     * Usa useCallback para memoizar a função e evitar recriações desnecessárias
-     * em re-renderizações, otimizando o uso em useEffect.
+     * Efeito que incorpora a seção `cpu` de cada nova versão do snapshot compartilhado,
+     * acrescentando um ponto ao histórico do gráfico.
      */
-    const fetchData = useCallback(async () => {
-        try {
-            const response = await fetch(API_URL_CPU);
-            if (!response.ok) {
-                // Se a resposta da API não for bem-sucedida, lança um erro.
-                throw new Error(`Erro HTTP: ${response.status} - ${response.statusText}`);
-            }
-            const data = await response.json(); // Converte a resposta para JSON.
-
-            // Atualiza o estado `cpuState` com os novos dados.
-            setCpuState(prevState => {
-                // Formata a hora atual para o eixo X do gráfico.
-                const currentTime = new Date().toLocaleTimeString([], {
-                    hour: '2-digit', minute: '2-digit', second: '2-digit'
-                });
-
-                // Cria um novo ponto de dados para o histórico do gráfico.
-                const newHistoryPoint = {
-                    time: currentTime,
-                    overall: data.overall_usage_percent || 0, // Uso geral da CPU.
-                };
-                // Adiciona o uso de cada core ao ponto de histórico.
-                (data.cores || []).forEach(core => {
-                    newHistoryPoint[`core${core.id}`] = core.usage_percent || 0;
-                });
+    useEffect(() => {
+        if (!snapshot || !snapshot.cpu) {
+            return;
+        }
+        const data = snapshot.cpu;
 
-                // Atualiza o array de histórico, mantendo apenas os últimos MAX_HISTORY_POINTS.
-                const updatedHistory = [...prevState.history, newHistoryPoint].slice(-MAX_HISTORY_POINTS);
+        // Atualiza o estado `cpuState` com os novos dados.
+        setCpuState(prevState => {
+            // Formata a hora atual para o eixo X do gráfico.
+            const currentTime = new Date().toLocaleTimeString([], {
+                hour: '2-digit', minute: '2-digit', second: '2-digit'
+            });
 
-                // Retorna o novo estado.
-                return {
-                    overallUsage: data.overall_usage_percent || 0,
-                    overallIdle: data.overall_idle_percent || 0, // `overall_idle_percent` do backend
-                    cores: data.cores || [],
-                    history: updatedHistory,
-                    numberOfCores: data.number_of_cores || 0,
-                };
+            // Cria um novo ponto de dados para o histórico do gráfico.
+            const newHistoryPoint = {
+                time: currentTime,
+                overall: data.overall_usage_percent || 0, // Uso geral da CPU.
+            };
+            // Adiciona o uso de cada core ao ponto de histórico.
+            (data.cores || []).forEach(core => {
+                newHistoryPoint[`core${core.id}`] = core.usage_percent || 0;
             });
-            setFetchError(null); // Limpa qualquer erro anterior se a busca for bem-sucedida.
-        } catch (error) {
-            console.error("Erro ao buscar dados da CPU:", error);
-            setFetchError(error.message); // Armazena a mensagem de erro no estado.
-        } finally {
-            // Define isLoading como false após a primeira tentativa de busca (bem-sucedida ou não).
-            if (isLoading) {
-                setIsLoading(false);
-            }
-        }
-        // A dependência `isLoading` garante que `setIsLoading(false)` seja chamado corretamente
-        // após a primeira busca. A ausência de outras dependências (como cpuState) está correta
-        // pois `fetchData` não depende diretamente do valor anterior de `cpuState` para sua lógica principal de busca,
-        // e sim usa o `prevState` no `setCpuState` para atualizações baseadas no estado anterior.
-        // eslint-disable-next-line react-hooks/exhaustive-deps
-    }, [isLoading]); // Não incluir `cpuState` ou outras variáveis que mudam frequentemente aqui
-    // para evitar recriação excessiva da função `fetchData`.
 
-    /**
-     * Efeito para buscar dados da CPU na montagem do componente e, em seguida,
-     * configurar um intervalo para buscar dados periodicamente.
-     * Limpa o intervalo quando o componente é desmontado.
-     */
-    useEffect(() => {
-        fetchData(); // Busca dados imediatamente ao montar o componente.
-        const intervalId = setInterval(fetchData, FETCH_INTERVAL_MS); // Configura busca periódica.
+            // Atualiza o array de histórico, mantendo apenas os últimos MAX_HISTORY_POINTS.
+            const updatedHistory = [...prevState.history, newHistoryPoint].slice(-MAX_HISTORY_POINTS);
 
-        // Função de limpeza: será chamada quando o componente for desmontado.
-        return () => clearInterval(intervalId); // Limpa o intervalo para evitar memory leaks.
-    }, [fetchData]); // `fetchData` é memoizada com `useCallback`, então este efeito
-    // só será re-executado se `fetchData` mudar (o que não deve acontecer frequentemente).
+            // Retorna o novo estado.
+            return {
+                overallUsage: data.overall_usage_percent || 0,
+                overallIdle: data.overall_idle_percent || 0, // `overall_idle_percent` do backend
+                cores: data.cores || [],
+                history: updatedHistory,
+                numberOfCores: data.number_of_cores || 0,
+                collectorDegradationLevel: data.collector_degradation_level || 0,
+                collectorIntervalSeconds: data.collector_interval_seconds || null,
+                burst: data.burst || null,
+            };
+        });
+    }, [snapshot]);
 
     /**
      * Manipulador de evento para cliques na legenda do gráfico.
@@ -244,6 +210,14 @@ const CpuUsageCard = () => {
     // --- Renderização Principal do Componente ---
     return (
         <Card title="Uso de CPU">
+            {/* Aviso exibido quando o backend reduziu os detalhes coletados para respeitar seu orçamento de CPU */}
+            {cpuState.collectorDegradationLevel > 0 && (
+                <p className={styles.degradationNotice}>
+                    Coleta reduzida (nível {cpuState.collectorDegradationLevel})
+                    {cpuState.collectorIntervalSeconds ? ` - atualização a cada ${cpuState.collectorIntervalSeconds.toFixed(0)}s` : ''}
+                </p>
+            )}
+
             {/* Seção de estatísticas gerais da CPU */}
             <div className={styles.cpuOverallStats}>
                 <div className={styles.cpuOverallItem}>
@@ -270,6 +244,16 @@ const CpuUsageCard = () => {
                 </div>
             </div>
 
+            {/* Picos e tempo roubado pelo hipervisor (steal) entre duas coletas, medidos pelo amostrador de alta frequência */}
+            {cpuState.burst && (
+                <div className={styles.burstStats}>
+                    <span>Pico: {(cpuState.burst.peak_usage_percent || 0).toFixed(1)}%</span>
+                    <span>iowait: {(cpuState.burst.breakdown_percent.iowait || 0).toFixed(1)}%</span>
+                    <span>steal: {(cpuState.burst.breakdown_percent.steal || 0).toFixed(1)}%</span>
+                    <span>irq/softirq: {((cpuState.burst.breakdown_percent.irq || 0) + (cpuState.burst.breakdown_percent.softirq || 0)).toFixed(1)}%</span>
+                </div>
+            )}
+
             {/* Seção para exibir o uso de cada core individualmente */}
             {cpuState.cores.map((core, index) => (
                 <div key={core.id || `core-${index}`} className={styles.cpuSection}>
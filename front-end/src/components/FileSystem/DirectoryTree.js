@@ -4,6 +4,8 @@ import styles from './DirectoryTree.module.css';
 
 // URL do endpoint da API para buscar conteúdo de diretórios.
 const API_URL_DIRECTORY = 'http://localhost:5000/api/filesystem/directory';
+// URL do endpoint da API para buscar arquivos pelo nome no índice do backend.
+const API_URL_SEARCH = 'http://localhost:5000/api/filesystem/search';
 
 /**
  * Função utilitária para formatar tamanho de arquivo.
@@ -14,7 +16,8 @@ const formatSize = (bytes) => {
   if (bytes === null || bytes === undefined) return '-';
   if (bytes < 1024) return `${bytes} B`;
   if (bytes < 1024 * 1024) return `${(bytes / 1024).toFixed(1)} KB`;
-  return `${(bytes / (1024 * 1024)).toFixed(2)} MB`;
+  if (bytes < 1024 * 1024 * 1024) return `${(bytes / (1024 * 1024)).toFixed(2)} MB`;
+  return `${(bytes / (1024 * 1024 * 1024)).toFixed(2)} GB`;
 };
 
 /**
@@ -32,17 +35,27 @@ const DirectoryTree = () => {
   // Estado para carregamento e erro.
   const [isLoading, setIsLoading] = useState(true);
   const [fetchError, setFetchError] = useState(null);
+  // Estado da varredura de uso de disco do diretório atual (progresso e tamanhos recursivos dos subdiretórios).
+  const [diskUsage, setDiskUsage] = useState(null);
+  // Estado da busca por nome (texto digitado e resultados do índice).
+  const [searchQuery, setSearchQuery] = useState('');
+  const [searchData, setSearchData] = useState(null);
   // Estado para ordenação
   const [sortBy, setSortBy] = useState('name');
   const [sortDir, setSortDir] = useState('asc');
 
+  // Tamanho usado na ordenação e na exibição: uso de disco recursivo para diretórios (quando já calculado).
+  const getItemSize = (item) => (
+    item.is_dir && item.disk_usage_bytes !== undefined ? item.disk_usage_bytes : (item.size_bytes || 0)
+  );
+
   // Função para ordenar os itens
   const getSortedContents = () => {
     const sorted = [...contents].sort((a, b) => {
       let vA, vB;
       switch (sortBy) {
         case 'size':
-          vA = a.size || 0; vB = b.size || 0; break;
+          vA = getItemSize(a); vB = getItemSize(b); break;
         case 'permissions':
           vA = a.permissions || ''; vB = b.permissions || ''; break;
         case 'type':
@@ -70,18 +83,21 @@ const DirectoryTree = () => {
    * Função para buscar o conteúdo do diretório da API.
    * Usa useCallback para memoização.
    */
-  const fetchData = useCallback(async () => {
-    setIsLoading(true);
+  const fetchData = useCallback(async (silent = false) => {
+    if (!silent) setIsLoading(true);
     try {
-      const response = await fetch(`${API_URL_DIRECTORY}?path=${encodeURIComponent(currentPath)}`);
+      // usage=1 acrescenta os tamanhos recursivos já calculados (ou parciais, durante a varredura); a varredura só
+      // é iniciada pelo botão "Calcular tamanhos".
+      const response = await fetch(`${API_URL_DIRECTORY}?path=${encodeURIComponent(currentPath)}&usage=1`);
       if (!response.ok) throw new Error('Erro ao buscar diretório');
       const data = await response.json();
       setContents(data.contents || []);
+      setDiskUsage(data.disk_usage || null);
       setFetchError(null);
     } catch (error) {
       setFetchError(error.message);
     } finally {
-      setIsLoading(false);
+      if (!silent) setIsLoading(false);
     }
   }, [currentPath]);
 
@@ -90,6 +106,73 @@ const DirectoryTree = () => {
     fetchData();
   }, [fetchData]);
 
+  // Enquanto a varredura estiver em andamento, atualiza os tamanhos parciais a cada segundo.
+  const isScanning = diskUsage !== null && diskUsage.state === 'running';
+  useEffect(() => {
+    if (!isScanning) return undefined;
+    const timeoutId = setTimeout(() => fetchData(true), 1000);
+    return () => clearTimeout(timeoutId);
+  }, [isScanning, diskUsage, fetchData]);
+
+  /**
+   * Inicia a varredura de uso de disco do diretório atual (a atualização periódica acompanha o progresso).
+   */
+  const handleStartScan = async () => {
+    try {
+      const response = await fetch(`${API_URL_DIRECTORY}/usage?path=${encodeURIComponent(currentPath)}`, { method: 'POST' });
+      const data = await response.json();
+      if (response.ok) {
+        setDiskUsage(data);
+        fetchData(true);
+      } else {
+        setFetchError(data.error || 'Erro ao calcular o uso de disco');
+      }
+    } catch (error) {
+      console.error('Erro ao iniciar a varredura de uso de disco:', error);
+    }
+  };
+
+  /**
+   * Cancela a varredura de uso de disco do diretório atual.
+   */
+  const handleCancelScan = async () => {
+    try {
+      const response = await fetch(`${API_URL_DIRECTORY}/usage?path=${encodeURIComponent(currentPath)}`, { method: 'DELETE' });
+      if (response.ok) setDiskUsage(await response.json());
+    } catch (error) {
+      console.error('Erro ao cancelar a varredura de uso de disco:', error);
+    }
+  };
+
+  // Busca por nome com espera de 300 ms após a digitação, para não consultar a API a cada tecla.
+  useEffect(() => {
+    const query = searchQuery.trim();
+    if (!query) {
+      setSearchData(null);
+      return undefined;
+    }
+    const timeoutId = setTimeout(async () => {
+      try {
+        const response = await fetch(`${API_URL_SEARCH}?q=${encodeURIComponent(query)}&limit=100`);
+        const data = await response.json();
+        setSearchData(response.ok ? data : { results: [], error: data.error });
+      } catch (error) {
+        setSearchData({ results: [], error: error.message });
+      }
+    }, 300);
+    return () => clearTimeout(timeoutId);
+  }, [searchQuery]);
+
+  /**
+   * Abre um resultado da busca: diretórios são abertos, arquivos abrem o diretório que os contém.
+   * @param {object} result - Resultado da busca ({ path, is_dir }).
+   */
+  const handleOpenSearchResult = (result) => {
+    const targetPath = result.is_dir ? result.path : (result.path.substring(0, result.path.lastIndexOf('/')) || '/');
+    setSearchQuery('');
+    setCurrentPath(targetPath);
+  };
+
   /**
    * Manipulador para navegar para um subdiretório.
    * @param {string} dir - Nome do diretório.
@@ -128,47 +211,104 @@ const DirectoryTree = () => {
           </svg>
         </button>
         <span className={styles.currentPath} title={currentPath}>{currentPath}</span>
+        <input
+          type="search"
+          value={searchQuery}
+          onChange={(e) => setSearchQuery(e.target.value)}
+          placeholder="Buscar arquivos..."
+          className={styles.searchInput}
+        />
       </div>
-      <div className={styles.tableContainer}>
-        <table>
-          <thead>
-            <tr>
-              <th onClick={() => handleSort('name')} style={{cursor:'pointer'}}>Nome {sortBy==='name' ? (sortDir==='asc'?'▲':'▼') : ''}</th>
-              <th onClick={() => handleSort('size')} style={{cursor:'pointer'}}>Tamanho {sortBy==='size' ? (sortDir==='asc'?'▲':'▼') : ''}</th>
-              <th onClick={() => handleSort('permissions')} style={{cursor:'pointer'}}>Permissões {sortBy==='permissions' ? (sortDir==='asc'?'▲':'▼') : ''}</th>
-              <th onClick={() => handleSort('type')} style={{cursor:'pointer'}}>Tipo {sortBy==='type' ? (sortDir==='asc'?'▲':'▼') : ''}</th>
-            </tr>
-          </thead>
-          <tbody>
-            {getSortedContents().map((item, idx) => (
-              <tr key={idx}
-                  onDoubleClick={() => item.is_dir && handleNavigate(item.name)}
-                  className={item.is_dir ? styles.clickableRow : ''}
-                  tabIndex={item.is_dir ? 0 : undefined}
-                  title={item.name}
-              >
-                <td>
-                  {item.is_dir ? (
-                    <span className={styles.dirLink}>
-                      📁 {item.name}
-                    </span>
-                  ) : (
-                    <span>📄 {item.name}</span>
-                  )}
-                </td>
-                <td>{item.size_human || '-'}</td>
-                <td>{item.permissions || '-'}</td>
-                <td>{item.is_dir ? 'Diretório' : 'Arquivo'}</td>
-              </tr>
-            ))}
-            {getSortedContents().length === 0 && (
+      {searchData && (
+        <div className={styles.tableContainer}>
+          <div className={styles.scanStatus}>
+            <span>
+              {searchData.error
+                ? `Erro na busca: ${searchData.error}`
+                : `${searchData.results.length}${searchData.truncated ? '+' : ''} resultado(s) em ${searchData.elapsed_ms} ms`}
+              {searchData.index && searchData.index.state !== 'ready' && ' (índice em construção, resultados parciais)'}
+            </span>
+          </div>
+          <table>
+            <tbody>
+              {searchData.results.map((result, idx) => (
+                <tr key={idx} onDoubleClick={() => handleOpenSearchResult(result)} className={styles.clickableRow} title={result.path}>
+                  <td>{result.is_dir ? '📁' : '📄'} {result.path}</td>
+                </tr>
+              ))}
+            </tbody>
+          </table>
+        </div>
+      )}
+      {!searchData && (<>
+        <div className={styles.scanStatus}>
+          {isScanning ? (
+            <>
+              <span>
+                Calculando tamanhos...
+                {diskUsage.progress && ` ${diskUsage.progress.directories_scanned + diskUsage.progress.directories_reused} diretórios,`}
+                {' '}{formatSize(diskUsage.total_bytes)}
+              </span>
+              <button onClick={handleCancelScan} className={styles.cancelButton}>Cancelar</button>
+            </>
+          ) : (
+            <>
+              <span>
+                {diskUsage && diskUsage.total_bytes !== undefined
+                  ? `${diskUsage.state === 'cancelled' ? 'Varredura cancelada (tamanhos parciais): ' : 'Uso de disco: '}${formatSize(diskUsage.total_bytes)}`
+                  : 'Tamanho dos subdiretórios não calculado.'}
+              </span>
+              <button onClick={handleStartScan} className={styles.cancelButton}>
+                {diskUsage && diskUsage.total_bytes !== undefined ? 'Recalcular tamanhos' : 'Calcular tamanhos'}
+              </button>
+            </>
+          )}
+        </div>
+        <div className={styles.tableContainer}>
+          <table>
+            <thead>
               <tr>
-                <td colSpan="4" className={styles.noDataCell}>Diretório vazio.</td>
+                <th onClick={() => handleSort('name')} style={{cursor:'pointer'}}>Nome {sortBy==='name' ? (sortDir==='asc'?'▲':'▼') : ''}</th>
+                <th onClick={() => handleSort('size')} style={{cursor:'pointer'}}>Tamanho {sortBy==='size' ? (sortDir==='asc'?'▲':'▼') : ''}</th>
+                <th onClick={() => handleSort('permissions')} style={{cursor:'pointer'}}>Permissões {sortBy==='permissions' ? (sortDir==='asc'?'▲':'▼') : ''}</th>
+                <th onClick={() => handleSort('type')} style={{cursor:'pointer'}}>Tipo {sortBy==='type' ? (sortDir==='asc'?'▲':'▼') : ''}</th>
               </tr>
-            )}
-          </tbody>
-        </table>
-      </div>
+            </thead>
+            <tbody>
+              {getSortedContents().map((item, idx) => (
+                <tr key={idx}
+                    onDoubleClick={() => item.is_dir && handleNavigate(item.name)}
+                    className={item.is_dir ? styles.clickableRow : ''}
+                    tabIndex={item.is_dir ? 0 : undefined}
+                    title={item.name}
+                >
+                  <td>
+                    {item.is_dir ? (
+                      <span className={styles.dirLink}>
+                        📁 {item.name}
+                      </span>
+                    ) : (
+                      <span>📄 {item.name}</span>
+                    )}
+                  </td>
+                  <td>
+                    {item.is_dir && item.disk_usage_bytes !== undefined
+                      ? `${formatSize(item.disk_usage_bytes)}${item.disk_usage_complete ? '' : '…'}`
+                      : (item.size_human || '-')}
+                  </td>
+                  <td>{item.permissions || '-'}</td>
+                  <td>{item.is_dir ? 'Diretório' : 'Arquivo'}</td>
+                </tr>
+              ))}
+              {getSortedContents().length === 0 && (
+                <tr>
+                  <td colSpan="4" className={styles.noDataCell}>Diretório vazio.</td>
+                </tr>
+              )}
+            </tbody>
+          </table>
+        </div>
+      </>)}
     </Card>
   );
 };
@@ -8,6 +8,7 @@ import ProcessDetailModal from '../ProcessList/ProcessDetailModal';
 import SystemSummaryCards from '../SystemTotals/TotalSystemMetricsCard';
 import FileSystemView from '../FileSystem/FileSystemView';
 import DirectoryTree from '../FileSystem/DirectoryTree';
+import { DashboardSnapshotProvider } from '../Snapshot/DashboardSnapshotContext';
 
 /**
  * Componente DashboardTabs
@@ -41,8 +42,9 @@ const DashboardTabs = () => {
     <DashboardLayout headerTabs={tabsHeader}>
       <div className={styles.dashboardTabsContainer}>
         <div className={styles.tabsContent}>
+          {/* os cards da visão geral compartilham uma única busca de /api/snapshot */}
           {selectedTab === 'dashboard' && (
-            <>
+            <DashboardSnapshotProvider>
               <div className={styles.topCardsContainer}>
                 <CpuUsageCard />
                 <MemoryUsageCard />
@@ -52,7 +54,7 @@ const DashboardTabs = () => {
               </div>
               <ProcessListCard onProcessSelect={setSelectedProcessForDetail} />
               <ProcessDetailModal process={selectedProcessForDetail} onClose={() => setSelectedProcessForDetail(null)} />
-            </>
+            </DashboardSnapshotProvider>
           )}
           {selectedTab === 'filesystem' && (
             <>
@@ -8,13 +8,10 @@ import {
   Tooltip, ResponsiveContainer, Legend
 } from 'recharts';
 import styles from './MemoryUsageCard.module.css'; // Estilos CSS Modules para este componente.
+import { useDashboardSnapshot } from '../Snapshot/DashboardSnapshotContext'; // Snapshot compartilhado da visão geral.
 
 // Número máximo de pontos de dados a serem mantidos no histórico do gráfico.
 const MAX_HISTORY_POINTS = 60; // 60 pontos com intervalo de 5s = 5 minutos de histórico.
-// URL do endpoint da API para buscar dados de memória.
-const API_URL_MEMORY = 'http://localhost:5000/api/memory';
-// Intervalo de atualização dos dados em milissegundos.
-const FETCH_INTERVAL_MS = 5000; // 5 segundos.
 
 /**
  * Função utilitária para formatar um valor em Gigabytes (GB).
@@ -37,7 +34,7 @@ const formatGb = (gbValue, decimals = 1) => {
  * 
  * Exibe informações sobre o uso de memória RAM e Swap do sistema,
  * incluindo valores totais, usados, livres, percentuais e um gráfico de histórico.
- * Os dados são buscados periodicamente de uma API backend.
+ * Os dados vêm da seção `memory` do snapshot compartilhado (DashboardSnapshotProvider).
  */
 const MemoryUsageCard = () => {
   // Estado para armazenar os dados de memória.
@@ -46,14 +43,14 @@ const MemoryUsageCard = () => {
     ram: { total_gb: 0, used_gb: 0, free_gb: 0, usage_percent: 0, free_percent: 100 },
     // Dados do Swap. Podem não existir se o sistema não tiver swap.
     swap: { total_gb: 0, used_gb: 0, free_gb: 0, usage_percent: 0, free_percent: 100 },
+    // Pressão de memória (taxas de /proc/vmstat e PSI). Null enquanto o backend não enviar.
+    vmPressure: null,
     // Histórico para o gráfico. Ex: { time: "10:30:00", ramUsedGB: 4.5, swapUsedGB: 0.2 }
     history: [],
   });
 
-  // Estado para controlar o carregamento inicial dos dados.
-  const [isLoading, setIsLoading] = useState(true);
-  // Estado para armazenar mensagens de erro da busca de dados.
-  const [fetchError, setFetchError] = useState(null);
+  // Snapshot compartilhado, com o estado de carregamento e o erro da última busca.
+  const { snapshot, isLoading, fetchError } = useDashboardSnapshot();
   // Estado para controlar a visibilidade das áreas no gráfico (RAM e Swap).
   const [lineVisibility, setLineVisibility] = useState({
     ramUsedGB: true,  // Linha/área da RAM visível por padrão.
@@ -61,79 +58,59 @@ const MemoryUsageCard = () => {
   });
 
   /**
-   * Função para buscar os dados de memória da API.
-   * Usa useCallback para memoização.
+   * Efeito que incorpora a seção `memory` de cada nova versão do snapshot compartilhado,
+   * acrescentando um ponto ao histórico do gráfico.
    */
-  const fetchData = useCallback(async () => {
-    try {
-      const response = await fetch(API_URL_MEMORY);
-      if (!response.ok) {
-        throw new Error(`Erro HTTP: ${response.status} - ${response.statusText}`);
-      }
-      const data = await response.json(); // Espera-se que `data` seja { ram: {...}, swap: {...} }
-
-      setMemoryState(prevState => {
-        const currentTime = new Date().toLocaleTimeString([], {
-          hour: '2-digit', minute: '2-digit', second: '2-digit'
-        });
-
-        // Pega os dados de RAM e Swap da API, ou mantém os anteriores se não vierem.
-        const ramData = data.ram || prevState.ram;
-        const swapData = data.swap || prevState.swap;
+  useEffect(() => {
+    if (!snapshot || !snapshot.memory) {
+      return;
+    }
+    const data = snapshot.memory; // Espera-se que `data` seja { ram: {...}, swap: {...} }
 
-        // Lógica para garantir que `free_percent` seja calculado se não vier da API.
-        // (O backend já deve fornecer `usage_percent` e `free_percent` calculados)
-        // Esta lógica é um fallback caso o backend não envie `free_percent`.
-        if (ramData.total_gb > 0 && ramData.usage_percent !== undefined && ramData.free_percent === undefined) {
-          ramData.free_percent = parseFloat((100 - ramData.usage_percent).toFixed(1));
-        } else if (ramData.free_percent === undefined) {
-          ramData.free_percent = (ramData.total_gb > 0 && ramData.free_gb !== undefined)
-            ? parseFloat(((ramData.free_gb / ramData.total_gb) * 100).toFixed(1))
-            : (ramData.total_gb > 0 ? 0 : 100); // 100% livre se total=0, senão 0%
-        }
+    setMemoryState(prevState => {
+      const currentTime = new Date().toLocaleTimeString([], {
+        hour: '2-digit', minute: '2-digit', second: '2-digit'
+      });
 
-        if (swapData.total_gb > 0 && swapData.usage_percent !== undefined && swapData.free_percent === undefined) {
-          swapData.free_percent = parseFloat((100 - swapData.usage_percent).toFixed(1));
-        } else if (swapData.free_percent === undefined) {
-          swapData.free_percent = (swapData.total_gb > 0 && swapData.free_gb !== undefined)
-            ? parseFloat(((swapData.free_gb / swapData.total_gb) * 100).toFixed(1))
-            : (swapData.total_gb > 0 ? 0 : 100); // 100% livre se total=0, senão 0%
-        }
+      // Copia os dados de RAM e Swap do snapshot (compartilhado entre os cards), ou mantém os anteriores se não vierem.
+      const ramData = { ...(data.ram || prevState.ram) };
+      const swapData = { ...(data.swap || prevState.swap) };
 
-        // Novo ponto para o histórico do gráfico.
-        const newHistoryPoint = {
-          time: currentTime,
-          ramUsedGB: ramData.used_gb || 0,
-          swapUsedGB: swapData.used_gb || 0,
-        };
-        const updatedHistory = [...prevState.history, newHistoryPoint].slice(-MAX_HISTORY_POINTS);
+      // Lógica para garantir que `free_percent` seja calculado se não vier da API.
+      // (O backend já deve fornecer `usage_percent` e `free_percent` calculados)
+      // Esta lógica é um fallback caso o backend não envie `free_percent`.
+      if (ramData.total_gb > 0 && ramData.usage_percent !== undefined && ramData.free_percent === undefined) {
+        ramData.free_percent = parseFloat((100 - ramData.usage_percent).toFixed(1));
+      } else if (ramData.free_percent === undefined) {
+        ramData.free_percent = (ramData.total_gb > 0 && ramData.free_gb !== undefined)
+          ? parseFloat(((ramData.free_gb / ramData.total_gb) * 100).toFixed(1))
+          : (ramData.total_gb > 0 ? 0 : 100); // 100% livre se total=0, senão 0%
+      }
 
-        return {
-          ram: ramData,
-          swap: swapData,
-          history: updatedHistory
-        };
-      });
-      setFetchError(null); // Limpa erros.
-    } catch (error) {
-      console.error("Erro ao buscar dados de Memória:", error);
-      setFetchError(error.message);
-    } finally {
-      if (isLoading) {
-        setIsLoading(false); // Para o indicador de carregamento inicial.
+      if (swapData.total_gb > 0 && swapData.usage_percent !== undefined && swapData.free_percent === undefined) {
+        swapData.free_percent = parseFloat((100 - swapData.usage_percent).toFixed(1));
+      } else if (swapData.free_percent === undefined) {
+        swapData.free_percent = (swapData.total_gb > 0 && swapData.free_gb !== undefined)
+          ? parseFloat(((swapData.free_gb / swapData.total_gb) * 100).toFixed(1))
+          : (swapData.total_gb > 0 ? 0 : 100); // 100% livre se total=0, senão 0%
       }
-    }
-    // eslint-disable-next-line react-hooks/exhaustive-deps
-  }, [isLoading]); // `isLoading` é a dependência principal aqui.
 
-  /**
-   * Efeito para buscar dados na montagem e configurar a busca periódica.
-   */
-  useEffect(() => {
-    fetchData();
-    const intervalId = setInterval(fetchData, FETCH_INTERVAL_MS);
-    return () => clearInterval(intervalId); // Limpeza do intervalo.
-  }, [fetchData]); // `fetchData` é memoizada.
+      // Novo ponto para o histórico do gráfico.
+      const newHistoryPoint = {
+        time: currentTime,
+        ramUsedGB: ramData.used_gb || 0,
+        swapUsedGB: swapData.used_gb || 0,
+      };
+      const updatedHistory = [...prevState.history, newHistoryPoint].slice(-MAX_HISTORY_POINTS);
+
+      return {
+        ram: ramData,
+        swap: swapData,
+        vmPressure: data.vm_pressure || prevState.vmPressure,
+        history: updatedHistory
+      };
+    });
+  }, [snapshot]);
 
   /**
    * Manipulador para cliques na legenda do gráfico (alterna visibilidade da área).
@@ -185,6 +162,13 @@ const MemoryUsageCard = () => {
   );
 
 
+  // Taxas de pressão de memória (ficam null na primeira coleta do backend).
+  const vmRates = memoryState.vmPressure && memoryState.vmPressure.available
+    ? memoryState.vmPressure.rates_per_sec
+    : null;
+  const vmStallPercent = memoryState.vmPressure ? memoryState.vmPressure.pressure_stall_percent : null;
+  const formatRate = (value) => (value === null || value === undefined ? 'N/A' : `${value.toFixed(1)}/s`);
+
   // --- Renderização Principal ---
   return (
     <Card title="Uso de Memória e Swap">
@@ -236,6 +220,17 @@ const MemoryUsageCard = () => {
         </div>
       )}
 
+      {/* Pressão de memória: paginação de swap, faltas de página graves e tempo parado por falta de memória (PSI) */}
+      {vmRates && (
+        <div className={styles.pressureStats}>
+          <span>Swap in/out: {formatRate(vmRates.swap_in_pages)} / {formatRate(vmRates.swap_out_pages)}</span>
+          <span>Faltas graves: {formatRate(vmRates.major_faults)}</span>
+          {vmStallPercent && vmStallPercent.some !== null && vmStallPercent.some !== undefined && (
+            <span>PSI: {vmStallPercent.some.toFixed(1)}%</span>
+          )}
+        </div>
+      )}
+
       {/* Gráfico de Histórico */}
       <div className={styles.chartTitle}>Histórico de Uso (GB)</div>
       <div className={styles.chartContainer}>
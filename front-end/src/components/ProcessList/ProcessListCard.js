@@ -1,23 +1,20 @@
 // so-dashboard/front-end/src/components/ProcessList/ProcessListCard.js
-import React, { useState, useEffect, useCallback, useMemo } from 'react';
+import React, { useState, useMemo } from 'react';
 import Card from '../Card/Card'; // Componente base para o cartão.
 import styles from './ProcessListCard.module.css'; // Estilos CSS Modules para o componente.
+import { useDashboardSnapshot } from '../Snapshot/DashboardSnapshotContext'; // Snapshot compartilhado da visão geral.
 
 // Constantes para controle de paginação/exibição da lista.
 const INITIAL_ITEMS_TO_SHOW = 10; // Número inicial de processos a serem exibidos.
 const ITEMS_PER_LOAD_MORE = 10; // Número de processos a serem carregados ao clicar em "Ver Mais".
 
-// URL do endpoint da API para buscar a lista de processos.
-const API_URL_PROCESSES = 'http://localhost:5000/api/processes';
-// Intervalo de atualização dos dados em milissegundos.
-const FETCH_INTERVAL_MS = 5000; // 5 segundos.
-
 /**
  * Componente ProcessListCard
  * 
  * Exibe uma lista de processos do sistema em uma tabela, com funcionalidades
  * de filtragem, ordenação e carregamento progressivo ("Ver Mais").
  * Permite ao usuário selecionar um processo para ver seus detalhes.
+ * Os processos vêm da seção `processes` do snapshot compartilhado (DashboardSnapshotProvider).
  * 
  * @param {object} props - As propriedades do componente.
  * @param {function} props.onProcessSelect - Função callback a ser chamada quando um processo
@@ -27,12 +24,8 @@ const FETCH_INTERVAL_MS = 5000; // 5 segundos.
  * @returns {JSX.Element} O elemento JSX que representa o card da lista de processos.
  */
 const ProcessListCard = ({ onProcessSelect }) => {
-    // Estado para armazenar todos os processos buscados da API.
-    const [allProcesses, setAllProcesses] = useState([]);
-    // Estado para controlar o carregamento inicial dos dados.
-    const [isLoading, setIsLoading] = useState(true);
-    // Estado para armazenar mensagens de erro da busca de dados.
-    const [fetchError, setFetchError] = useState(null);
+    // Snapshot compartilhado, com o estado de carregamento e o erro da última busca.
+    const { snapshot, isLoading, fetchError } = useDashboardSnapshot();
 
     // Estado para controlar o número de processos visíveis na lista (para "Ver Mais").
     const [visibleCount, setVisibleCount] = useState(INITIAL_ITEMS_TO_SHOW);
@@ -44,62 +37,37 @@ const ProcessListCard = ({ onProcessSelect }) => {
     const [sortConfig, setSortConfig] = useState({ key: 'pid', direction: 'ascending' });
 
     /**
-     * Função para buscar a lista de processos da API.
-     * Usa useCallback para memoização.
+     * Memoiza a lista de processos da versão atual do snapshot compartilhado.
+     * Só é recalculada quando o provedor publica uma nova versão.
      */
-    const fetchData = useCallback(async () => {
-        try {
-            const response = await fetch(API_URL_PROCESSES); // Não envia 'limit' aqui; busca todos.
-            if (!response.ok) {
-                throw new Error(`Erro HTTP: ${response.status} - ${response.statusText}`);
-            }
-            let data = await response.json(); // Array de objetos de processo.
-
-            // Mapeia os dados recebidos para garantir que os tipos numéricos sejam corretos
-            // e que campos opcionais tenham valores padrão.
-            // O backend (model.py) já deve estar retornando todos os campos necessários,
-            // incluindo `memory_details_kb` e `threads_detailed_info`.
-            const processedData = data.map(proc => ({
-                ...proc, // Mantém todos os campos recebidos do backend.
-                pid: parseInt(proc.pid, 10), // Garante que PID seja um número.
-                threads: parseInt(proc.threads, 10) || 0, // Garante que threads seja um número, default 0.
-                cpu_percent: parseFloat(proc.cpu_percent || 0), // Garante que cpu_percent seja float, default 0.
-                memory_rss_mb: parseFloat(proc.memory_rss_mb || 0), // Garante que memory_rss_mb seja float, default 0.
-                // Campos adicionais que o seu backend (model.get_processes) já deve fornecer:
-                ppid: parseInt(proc.ppid || 0, 10),
-                nice: parseInt(proc.nice || 0, 10),
-                priority: parseInt(proc.priority || 0, 10),
-                name: proc.name || "N/A",
-                user_name: proc.user_name || "N/A", // `user_name` é o esperado pelo modal.
-                status: proc.status || "N/A",
-                create_time_iso: proc.create_time_iso || null,
-                executable_path: proc.executable_path || null,
-                command_line: proc.command_line || null,
-                memory_details_kb: proc.memory_details_kb || {}, // Objeto com detalhes de memória.
-                threads_detailed_info: proc.threads_detailed_info || [], // Array de threads.
-            }));
-
-            setAllProcesses(processedData);
-            setFetchError(null); // Limpa erros.
-        } catch (error) {
-            console.error("Erro ao buscar lista de processos:", error);
-            setFetchError(error.message);
-        } finally {
-            if (isLoading) {
-                setIsLoading(false); // Para o indicador de carregamento inicial.
-            }
+    const allProcesses = useMemo(() => {
+        if (!snapshot || !snapshot.processes) {
+            return [];
         }
-        // eslint-disable-next-line react-hooks/exhaustive-deps
-    }, [isLoading]); // `isLoading` é a dependência principal.
-
-    /**
-     * Efeito para buscar dados na montagem e configurar a busca periódica.
-     */
-    useEffect(() => {
-        fetchData(); // Busca inicial.
-        const intervalId = setInterval(fetchData, FETCH_INTERVAL_MS); // Busca periódica.
-        return () => clearInterval(intervalId); // Limpeza na desmontagem.
-    }, [fetchData]); // `fetchData` é memoizada.
+        // Mapeia os dados recebidos para garantir que os tipos numéricos sejam corretos
+        // e que campos opcionais tenham valores padrão.
+        // O backend (model.py) já deve estar retornando todos os campos necessários,
+        // incluindo `memory_details_kb` e `threads_detailed_info`.
+        return snapshot.processes.map(proc => ({
+            ...proc, // Mantém todos os campos recebidos do backend.
+            pid: parseInt(proc.pid, 10), // Garante que PID seja um número.
+            threads: parseInt(proc.threads, 10) || 0, // Garante que threads seja um número, default 0.
+            cpu_percent: parseFloat(proc.cpu_percent || 0), // Garante que cpu_percent seja float, default 0.
+            memory_rss_mb: parseFloat(proc.memory_rss_mb || 0), // Garante que memory_rss_mb seja float, default 0.
+            // Campos adicionais que o seu backend (model.get_processes) já deve fornecer:
+            ppid: parseInt(proc.ppid || 0, 10),
+            nice: parseInt(proc.nice || 0, 10),
+            priority: parseInt(proc.priority || 0, 10),
+            name: proc.name || "N/A",
+            user_name: proc.user_name || "N/A", // `user_name` é o esperado pelo modal.
+            status: proc.status || "N/A",
+            create_time_iso: proc.create_time_iso || null,
+            executable_path: proc.executable_path || null,
+            command_line: proc.command_line || null,
+            memory_details_kb: proc.memory_details_kb || {}, // Objeto com detalhes de memória.
+            threads_detailed_info: proc.threads_detailed_info || [], // Array de threads.
+        }));
+    }, [snapshot]);
 
     /**
      * Memoiza a lista de processos após aplicar o filtro e a ordenação.
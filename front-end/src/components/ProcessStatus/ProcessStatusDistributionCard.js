@@ -1,11 +1,12 @@
 // so-dashboard/front-end/src/components/ProcessStatus/ProcessStatusDistributionCard.js
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useMemo } from 'react';
 import Card from '../Card/Card'; // Componente base para o cartão.
 // Componentes da biblioteca Recharts para criação de gráficos de pizza.
 import {
     PieChart, Pie, Cell, Tooltip, Legend, ResponsiveContainer
 } from 'recharts';
 import styles from './ProcessStatusDistributionCard.module.css'; // Estilos CSS Modules.
+import { useDashboardSnapshot } from '../Snapshot/DashboardSnapshotContext'; // Snapshot compartilhado da visão geral.
 
 // Cores para cada status de processo no gráfico de pizza.
 // É importante que as chaves aqui correspondam exatamente aos valores de status
@@ -21,77 +22,42 @@ const STATUS_COLORS = {
     // Adicionar mais mapeamentos de status e cores conforme necessário.
 };
 
-// URL do endpoint da API para buscar a lista de processos.
-// Este componente reutiliza o mesmo endpoint da lista de processos.
-const API_URL_PROCESSES = 'http://localhost:5000/api/processes';
-// Intervalo de atualização dos dados. Pode ser diferente do ProcessListCard se desejado.
-const FETCH_INTERVAL_MS = 7000; // 7 segundos.
-
 /**
  * Componente ProcessStatusDistributionCard
  * 
  * Exibe um gráfico mostrando a distribuição percentual dos diferentes
  * status dos processos em execução no sistema (ex: Rodando, Dormindo, Zumbi).
- * Os dados são derivados da lista de processos obtida da API.
+ * Os dados são derivados da seção `processes` do snapshot compartilhado (DashboardSnapshotProvider),
+ * a mesma lista usada pelo ProcessListCard.
  */
 const ProcessStatusDistributionCard = () => {
-    // Estado para armazenar os dados formatados para o gráfico de pizza.
-    // Ex: [{ name: 'Rodando', value: 10 }, { name: 'Dormindo', value: 150 }, ...]
-    const [statusChartData, setStatusChartData] = useState([]);
-    // Estado para controlar o carregamento inicial dos dados.
-    const [isLoading, setIsLoading] = useState(true);
-    // Estado para armazenar mensagens de erro da busca de dados.
-    const [fetchError, setFetchError] = useState(null);
+    // Snapshot compartilhado, com o estado de carregamento e o erro da última busca.
+    const { snapshot, isLoading, fetchError } = useDashboardSnapshot();
 
     /**
-     * Função para buscar a lista de processos da API e calcular a distribuição de status.
-     * Usa useCallback para memoização.
+     * Memoiza os dados do gráfico de pizza a partir da lista de processos do snapshot.
+     * Ex: [{ name: 'Rodando', value: 10 }, { name: 'Dormindo', value: 150 }, ...]
      */
-    const fetchData = useCallback(async () => {
-        try {
-            const response = await fetch(API_URL_PROCESSES); // Busca todos os processos.
-            if (!response.ok) {
-                throw new Error(`Erro HTTP: ${response.status} - ${response.statusText}`);
-            }
-            const processesData = await response.json(); // Array de objetos de processo.
-
-            // Calcula a contagem de processos para cada status.
-            const statusCounts = processesData.reduce((accumulator, process) => {
-                // Usa o campo `status` do objeto processo (que já deve ser uma string legível do backend).
-                // Se o status for nulo ou indefinido, classifica como 'Outro'.
-                const statusKey = process.status || 'Outro';
-                accumulator[statusKey] = (accumulator[statusKey] || 0) + 1; // Incrementa a contagem.
-                return accumulator;
-            }, {}); // Objeto inicial para o acumulador (ex: { 'Rodando': 0, 'Dormindo': 0 }).
-
-            // Converte o objeto de contagens para o formato de array esperado pelo PieChart.
-            // Ex: [{ name: 'Rodando', value: 10 }, { name: 'Dormindo', value: 150 }]
-            const chartDataFormatted = Object.keys(statusCounts).map(key => ({
-                name: key,             // Nome do status (para legenda e tooltip).
-                value: statusCounts[key] // Contagem de processos com esse status (para o tamanho da fatia).
-            }));
-
-            setStatusChartData(chartDataFormatted);
-            setFetchError(null); // Limpa erros.
-        } catch (error) {
-            console.error("Erro ao buscar dados para o status dos processos:", error);
-            setFetchError(error.message);
-        } finally {
-            if (isLoading) {
-                setIsLoading(false); // Para o indicador de carregamento inicial.
-            }
+    const statusChartData = useMemo(() => {
+        if (!snapshot || !snapshot.processes) {
+            return [];
         }
-        // eslint-disable-next-line react-hooks/exhaustive-deps
-    }, [isLoading]); // `isLoading` é a dependência principal.
+        // Calcula a contagem de processos para cada status.
+        const statusCounts = snapshot.processes.reduce((accumulator, process) => {
+            // Usa o campo `status` do objeto processo (que já deve ser uma string legível do backend).
+            // Se o status for nulo ou indefinido, classifica como 'Outro'.
+            const statusKey = process.status || 'Outro';
+            accumulator[statusKey] = (accumulator[statusKey] || 0) + 1; // Incrementa a contagem.
+            return accumulator;
+        }, {}); // Objeto inicial para o acumulador (ex: { 'Rodando': 0, 'Dormindo': 0 }).
 
-    /**
-     * Efeito para buscar dados na montagem e configurar a busca periódica.
-     */
-    useEffect(() => {
-        fetchData(); // Busca inicial.
-        const intervalId = setInterval(fetchData, FETCH_INTERVAL_MS); // Busca periódica.
-        return () => clearInterval(intervalId); // Limpeza na desmontagem.
-    }, [fetchData]); // `fetchData` é memoizada.
+        // Converte o objeto de contagens para o formato de array esperado pelo PieChart.
+        // Ex: [{ name: 'Rodando', value: 10 }, { name: 'Dormindo', value: 150 }]
+        return Object.keys(statusCounts).map(key => ({
+            name: key,             // Nome do status (para legenda e tooltip).
+            value: statusCounts[key] // Contagem de processos com esse status (para o tamanho da fatia).
+        }));
+    }, [snapshot]);
 
     // --- Constantes e Funções para o Gráfico ---
     const RADIAN = Math.PI / 180; // Constante para converter graus em radianos.
@@ -0,0 +1,74 @@
+// so-dashboard/front-end/src/components/Snapshot/DashboardSnapshotContext.js
+import React, { createContext, useContext, useState, useEffect, useCallback } from 'react';
+
+// URL do endpoint combinado da API com as seções usadas pelos cards da visão geral.
+// Todas as seções vêm da mesma versão do snapshot publicado pelo backend.
+const API_URL_SNAPSHOT = 'http://localhost:5000/api/snapshot?include=cpu,memory,processes';
+// Intervalo de atualização dos dados em milissegundos.
+const FETCH_INTERVAL_MS = 5000; // 5 segundos.
+
+// Contexto compartilhado pelos cards: { snapshot, isLoading, fetchError }.
+const DashboardSnapshotContext = createContext({ snapshot: null, isLoading: true, fetchError: null });
+
+/**
+ * Componente DashboardSnapshotProvider
+ *
+ * Busca periodicamente /api/snapshot uma única vez para todos os cards da visão geral
+ * (CPU, memória, totais e processos), em vez de cada card consultar o seu próprio endpoint.
+ * O snapshot só é substituído quando a versão muda, então os cards só recalculam
+ * quando o backend publica uma nova coleta.
+ *
+ * @param {object} props - As propriedades do componente.
+ * @param {React.ReactNode} props.children - Os cards que consomem o snapshot.
+ * @returns {JSX.Element} O provedor do contexto.
+ */
+export const DashboardSnapshotProvider = ({ children }) => {
+    // Estado compartilhado: último snapshot recebido, carregamento inicial e erro da última busca.
+    const [snapshotState, setSnapshotState] = useState({ snapshot: null, isLoading: true, fetchError: null });
+
+    /**
+     * Função para buscar o snapshot combinado da API.
+     * Usa useCallback para memoização.
+     */
+    const fetchData = useCallback(async () => {
+        try {
+            const response = await fetch(API_URL_SNAPSHOT);
+            if (!response.ok) {
+                throw new Error(`Erro HTTP: ${response.status} - ${response.statusText}`);
+            }
+            const data = await response.json();
+            setSnapshotState(prevState => (
+                prevState.snapshot && prevState.snapshot.version === data.version && !prevState.fetchError
+                    ? prevState // Mesma versão: mantém o objeto para não re-renderizar os cards.
+                    : { snapshot: data, isLoading: false, fetchError: null }
+            ));
+        } catch (error) {
+            console.error("Erro ao buscar o snapshot do sistema:", error);
+            setSnapshotState(prevState => ({ ...prevState, isLoading: false, fetchError: error.message }));
+        }
+    }, []);
+
+    /**
+     * Efeito para buscar dados na montagem e configurar a busca periódica.
+     */
+    useEffect(() => {
+        fetchData();
+        const intervalId = setInterval(fetchData, FETCH_INTERVAL_MS);
+        return () => clearInterval(intervalId); // Limpeza na desmontagem.
+    }, [fetchData]);
+
+    return (
+        <DashboardSnapshotContext.Provider value={snapshotState}>
+            {children}
+        </DashboardSnapshotContext.Provider>
+    );
+};
+
+/**
+ * Hook useDashboardSnapshot
+ *
+ * Retorna o snapshot compartilhado pelo DashboardSnapshotProvider mais próximo.
+ *
+ * @returns {{snapshot: object|null, isLoading: boolean, fetchError: string|null}} O estado do snapshot.
+ */
+export const useDashboardSnapshot = () => useContext(DashboardSnapshotContext);
@@ -1,5 +1,5 @@
 // so-dashboard/front-end/src/components/SystemTotals/TotalSystemMetricsCard.js
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect } from 'react';
 import Card from '../Card/Card'; // Componente base para o cartão.
 // Componentes da biblioteca Recharts para mini-gráficos de linha.
 import {
@@ -7,16 +7,11 @@ import {
     Tooltip, ResponsiveContainer
 } from 'recharts';
 import styles from './TotalSystemMetricsCard.module.css'; // Estilos CSS Modules.
+import { useDashboardSnapshot } from '../Snapshot/DashboardSnapshotContext'; // Snapshot compartilhado da visão geral.
 
 // Número máximo de pontos de dados a serem mantidos no histórico dos mini-gráficos.
 const MAX_HISTORY_POINTS_TOTALS = 30; // 30 pontos com intervalo de 5s = 2.5 minutos de histórico.
 
-// URL do endpoint da API para buscar dados da CPU (que inclui os totais de processos/threads).
-const API_URL_CPU = 'http://localhost:5000/api/cpu';
-// URL de fallback caso /api/cpu não forneça os totais (menos ideal).
-const API_URL_PROCESSES_FALLBACK = 'http://localhost:5000/api/processes';
-// Intervalo de atualização dos dados em milissegundos.
-const FETCH_INTERVAL_MS = 5000; // 5 segundos.
 
 
 /**
@@ -115,7 +110,7 @@ const SingleTotalMetricCardInternal = ({ title, value, dataHistory, dataKey, lin
 /**
  * Componente Wrapper: SystemSummaryWrapper (Nome original: TotalSystemMetricsCard)
  * 
- * Busca os dados totais do sistema (total de processos e threads) da API
+ * Lê os totais do sistema (total de processos e threads) da seção `cpu` do snapshot compartilhado
  * e renderiza dois componentes `SingleTotalMetricCardInternal` para exibir essas métricas.
  * Mantém um histórico para cada métrica para os mini-gráficos.
  */
@@ -127,93 +122,40 @@ const SystemSummaryWrapper = () => {
         processHistory: [],         // Histórico para o gráfico de total de processos.
         threadHistory: [],          // Histórico para o gráfico de total de threads.
     });
-    // Estado para controle de carregamento e erro.
-    const [isLoading, setIsLoading] = useState(true);
-    const [fetchError, setFetchError] = useState(null);
+    // Snapshot compartilhado, com o estado de carregamento e o erro da última busca.
+    const { snapshot, isLoading, fetchError } = useDashboardSnapshot();
 
     /**
-     * Função para buscar os dados totais da API.
-     * Prioriza buscar de /api/cpu, que já deve conter `total_processes` e `total_threads`
-     * (conforme a refatoração do backend).
-     * Usa /api/processes como fallback se necessário (menos eficiente).
-     * Usa useCallback para memoização.
+     * Efeito que incorpora os totais de cada nova versão do snapshot compartilhado.
+     * A seção `cpu` contém `total_processes` e `total_threads`, sem depender da lista de processos.
      */
-    const fetchData = useCallback(async () => {
-        try {
-            let currentTotalProcesses = 0;
-            let currentTotalThreads = 0;
-
-            // Tenta buscar os totais do endpoint /api/cpu.
-            const cpuApiResponse = await fetch(API_URL_CPU);
-            if (cpuApiResponse.ok) {
-                const cpuData = await cpuApiResponse.json();
-                // Verifica se o backend /api/cpu forneceu os totais.
-                if (cpuData.total_processes !== undefined && cpuData.total_threads !== undefined) {
-                    currentTotalProcesses = cpuData.total_processes;
-                    currentTotalThreads = cpuData.total_threads;
-                } else {
-                    // Fallback: se /api/cpu não tiver os totais, busca de /api/processes.
-                    // Isso é menos ideal, pois busca a lista inteira apenas para as contagens.
-                    console.warn("/api/cpu não forneceu totais, usando fallback para /api/processes.");
-                    const processesApiResponse = await fetch(API_URL_PROCESSES_FALLBACK);
-                    if (!processesApiResponse.ok) {
-                        throw new Error(`Erro ao buscar processos (fallback): ${processesApiResponse.statusText}`);
-                    }
-                    const processesData = await processesApiResponse.json();
-                    currentTotalProcesses = processesData.length;
-                    currentTotalThreads = processesData.reduce((sum, p) => sum + (parseInt(p.threads, 10) || 0), 0);
-                }
-            } else {
-                // Se /api/cpu falhar, tenta o fallback para /api/processes.
-                console.warn(`Falha ao buscar ${API_URL_CPU} (${cpuApiResponse.status}), usando fallback para /api/processes.`);
-                const processesApiResponse = await fetch(API_URL_PROCESSES_FALLBACK);
-                if (!processesApiResponse.ok) {
-                    throw new Error(`Erro ao buscar processos (fallback após falha CPU): ${processesApiResponse.statusText}`);
-                }
-                const processesData = await processesApiResponse.json();
-                currentTotalProcesses = processesData.length;
-                currentTotalThreads = processesData.reduce((sum, p) => sum + (parseInt(p.threads, 10) || 0), 0);
-            }
-
-            // Atualiza o estado com os novos totais e adiciona ao histórico.
-            setSystemTotals(prevState => {
-                const currentTime = new Date().toLocaleTimeString([], {
-                    hour: '2-digit', minute: '2-digit', second: '2-digit'
-                });
-                // 'value' é usado como dataKey no SingleTotalMetricCardInternal.
-                const newProcessHistoryPoint = { time: currentTime, value: currentTotalProcesses };
-                const newThreadHistoryPoint = { time: currentTime, value: currentTotalThreads };
-
-                const updatedProcessHistory = [...prevState.processHistory, newProcessHistoryPoint].slice(-MAX_HISTORY_POINTS_TOTALS);
-                const updatedThreadHistory = [...prevState.threadHistory, newThreadHistoryPoint].slice(-MAX_HISTORY_POINTS_TOTALS);
-
-                return {
-                    totalProcesses: currentTotalProcesses,
-                    totalThreads: currentTotalThreads,
-                    processHistory: updatedProcessHistory,
-                    threadHistory: updatedThreadHistory,
-                };
-            });
-            setFetchError(null); // Limpa erros.
-        } catch (error) {
-            console.error("Erro ao buscar métricas totais do sistema:", error);
-            setFetchError(error.message);
-        } finally {
-            if (isLoading) {
-                setIsLoading(false);
-            }
+    useEffect(() => {
+        if (!snapshot || !snapshot.cpu) {
+            return;
         }
-        // eslint-disable-next-line react-hooks/exhaustive-deps
-    }, [isLoading]); // Dependência principal é `isLoading`.
+        const currentTotalProcesses = snapshot.cpu.total_processes || 0;
+        const currentTotalThreads = snapshot.cpu.total_threads || 0;
 
-    /**
-     * Efeito para buscar dados na montagem e configurar a busca periódica.
-     */
-    useEffect(() => {
-        fetchData();
-        const intervalId = setInterval(fetchData, FETCH_INTERVAL_MS);
-        return () => clearInterval(intervalId); // Limpeza.
-    }, [fetchData]); // `fetchData` é memoizada.
+        // Atualiza o estado com os novos totais e adiciona ao histórico.
+        setSystemTotals(prevState => {
+            const currentTime = new Date().toLocaleTimeString([], {
+                hour: '2-digit', minute: '2-digit', second: '2-digit'
+            });
+            // 'value' é usado como dataKey no SingleTotalMetricCardInternal.
+            const newProcessHistoryPoint = { time: currentTime, value: currentTotalProcesses };
+            const newThreadHistoryPoint = { time: currentTime, value: currentTotalThreads };
+
+            const updatedProcessHistory = [...prevState.processHistory, newProcessHistoryPoint].slice(-MAX_HISTORY_POINTS_TOTALS);
+            const updatedThreadHistory = [...prevState.threadHistory, newThreadHistoryPoint].slice(-MAX_HISTORY_POINTS_TOTALS);
+
+            return {
+                totalProcesses: currentTotalProcesses,
+                totalThreads: currentTotalThreads,
+                processHistory: updatedProcessHistory,
+                threadHistory: updatedThreadHistory,
+            };
+        });
+    }, [snapshot]);
 
     // --- Renderização Condicional ---
     if (isLoading && systemTotals.processHistory.length === 0) {